@@ -0,0 +1,29 @@
+"""dashboard_stats_indexes
+
+Revision ID: a3c1d5e7f901
+Revises: 71da2c499d29
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c1d5e7f901'
+down_revision: Union[str, Sequence[str], None] = '71da2c499d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_payments_status_confirmed', 'payments', ['status', 'confirmed_at'], unique=False)
+    op.create_index(op.f('ix_call_sessions_started_at'), 'call_sessions', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_call_sessions_started_at'), table_name='call_sessions')
+    op.drop_index('ix_payments_status_confirmed', table_name='payments')
@@ -0,0 +1,56 @@
+"""merge alias usage counters
+
+Revision ID: a3c9e7d2f418
+Revises: d1ef5b8c0a23
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e7d2f418'
+down_revision: Union[str, Sequence[str], None] = 'd1ef5b8c0a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Short alias -> canonical quota type (ServiceRegistry.quota_type) for each priced service
+ALIASES = {
+    'doctor': 'doctor_consult',
+    'nurse': 'nurse_consult',
+    'bike': 'bike_request',
+    'taxi': 'taxi_request',
+    'blood': 'blood_request',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for alias, canonical in ALIASES.items():
+        params = {'alias': alias, 'canonical': canonical}
+        # Users with both rows: fold the alias uses into the canonical counter
+        bind.execute(sa.text("""
+            UPDATE usage_counter AS c
+            SET used = c.used + a.used, updated_at = now()
+            FROM usage_counter AS a
+            WHERE a.user_id = c.user_id AND a.service = :alias AND c.service = :canonical
+        """), params)
+        bind.execute(sa.text("""
+            DELETE FROM usage_counter AS a
+            USING usage_counter AS c
+            WHERE a.user_id = c.user_id AND a.service = :alias AND c.service = :canonical
+        """), params)
+        # Alias-only users: the row just changes key
+        bind.execute(
+            sa.text("UPDATE usage_counter SET service = :canonical WHERE service = :alias"), params
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Merged counts cannot be split back per alias; the rows stay under the canonical key
+    pass
@@ -0,0 +1,49 @@
+"""keyset_pagination
+
+Revision ID: a8bc26d0e437
+Revises: f7ab15c9d326
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8bc26d0e437'
+down_revision: Union[str, Sequence[str], None] = 'f7ab15c9d326'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset sort columns must not hold NULL: backfill, then enforce
+    op.execute("UPDATE blood_requests SET urgent = true WHERE urgent IS NULL")
+    op.execute("UPDATE blood_requests SET created_at = now() WHERE created_at IS NULL")
+    op.execute("UPDATE messages SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('blood_requests', 'urgent', existing_type=sa.Boolean(), nullable=False,
+                    server_default=sa.true())
+    op.alter_column('blood_requests', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+    op.alter_column('messages', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+    op.create_index(
+        'ix_blood_requests_feed', 'blood_requests', ['status', 'urgent', 'created_at', 'id'], unique=False
+    )
+    op.create_index('ix_messages_room_created', 'messages', ['room_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_payments_created', 'payments', ['created_at', 'id'], unique=False)
+    op.create_index('ix_blood_donors_blood_type_id', 'blood_donors', ['blood_type', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blood_donors_blood_type_id', table_name='blood_donors')
+    op.drop_index('ix_payments_created', table_name='payments')
+    op.drop_index('ix_messages_room_created', table_name='messages')
+    op.drop_index('ix_blood_requests_feed', table_name='blood_requests')
+
+    op.alter_column('messages', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.alter_column('blood_requests', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.alter_column('blood_requests', 'urgent', existing_type=sa.Boolean(), nullable=True, server_default=None)
@@ -0,0 +1,52 @@
+"""daily_rollups
+
+Revision ID: b7e2f4a6c803
+Revises: a3c1d5e7f901
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f4a6c803'
+down_revision: Union[str, Sequence[str], None] = 'a3c1d5e7f901'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('service_type', sa.Enum('DOCTOR', 'NURSE', 'TAXI', 'BIKER', 'BLOOD_REQUEST', 'CONSULTATION', name='servicetype', native_enum=False), nullable=False),
+    sa.Column('provider', sa.Enum('MTN', 'ORANGE', 'WALLET', 'STRIPE', name='paymentprovider', native_enum=False), nullable=False),
+    sa.Column('success_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('success_amount', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('auto_match_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('refunded_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('refunded_amount', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'service_type', 'provider')
+    )
+    op.create_table('call_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('callee_type', sa.String(length=64), nullable=False),
+    sa.Column('callee_id', sa.String(length=128), nullable=False),
+    sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_duration_seconds', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'callee_type', 'callee_id')
+    )
+    op.create_index(op.f('ix_call_daily_rollups_callee_id'), 'call_daily_rollups', ['callee_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_call_daily_rollups_callee_id'), table_name='call_daily_rollups')
+    op.drop_table('call_daily_rollups')
+    op.drop_table('payment_daily_rollups')
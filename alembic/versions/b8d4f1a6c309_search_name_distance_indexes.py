@@ -0,0 +1,47 @@
+"""search name distance indexes
+
+Revision ID: b8d4f1a6c309
+Revises: a3c9e7d2f418
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f1a6c309'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e7d2f418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _trigram_installed() -> bool:
+    bind = op.get_bind()
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).scalar() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SearchService picks its candidate pool with ORDER BY name <->> query LIMIT n;
+    # only GiST can return rows in distance order (the GIN trgm indexes keep
+    # serving the <% filter)
+    if _trigram_installed():
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_service_users_full_name_trgm_gist "
+            "ON service_users USING gist (full_name gist_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_service_listings_title_trgm_gist "
+            "ON service_listings USING gist (title gist_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_service_listings_title_trgm_gist")
+    op.execute("DROP INDEX IF EXISTS ix_service_users_full_name_trgm_gist")
@@ -0,0 +1,40 @@
+"""donor_matching_index
+
+Revision ID: b9cd37e1f548
+Revises: a8bc26d0e437
+Create Date: 2026-10-16 23:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9cd37e1f548'
+down_revision: Union[str, Sequence[str], None] = 'a8bc26d0e437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Replaces the exact (blood_type, city) fan-out index: matching now loads a
+    # whole city (case-insensitive) and picks compatible types in memory
+    op.create_index(
+        'ix_blood_donors_reachable_city', 'blood_donors',
+        [sa.text('lower(trim(city))'), 'blood_type', 'id'], unique=False,
+        postgresql_include=['fcm_token'],
+        postgresql_where=sa.text('is_active IS true AND fcm_token IS NOT NULL'),
+    )
+    op.drop_index('ix_blood_donors_fanout', table_name='blood_donors')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_blood_donors_fanout', 'blood_donors', ['blood_type', 'city', 'id'], unique=False,
+        postgresql_where=sa.text('is_active IS true AND fcm_token IS NOT NULL'),
+    )
+    op.drop_index('ix_blood_donors_reachable_city', table_name='blood_donors')
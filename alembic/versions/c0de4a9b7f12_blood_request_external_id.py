@@ -0,0 +1,31 @@
+"""blood_request_external_id
+
+Revision ID: c0de4a9b7f12
+Revises: b9cd37e1f548
+Create Date: 2026-10-17 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0de4a9b7f12'
+down_revision: Union[str, Sequence[str], None] = 'b9cd37e1f548'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Firestore document id of imported requests: the bulk importer's merge key
+    op.add_column('blood_requests', sa.Column('external_id', sa.String(length=128), nullable=True))
+    op.create_index('uq_blood_requests_external_id', 'blood_requests', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_blood_requests_external_id', table_name='blood_requests')
+    op.drop_column('blood_requests', 'external_id')
@@ -0,0 +1,31 @@
+"""donor_fanout_index
+
+Revision ID: c4d8e1f2a905
+Revises: b7e2f4a6c803
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e1f2a905'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f4a6c803'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_blood_donors_fanout', 'blood_donors', ['blood_type', 'city', 'id'], unique=False,
+        postgresql_where=sa.text('is_active IS true AND fcm_token IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blood_donors_fanout', table_name='blood_donors')
@@ -0,0 +1,41 @@
+"""service_config_overrides
+
+Revision ID: d1ef5b8c0a23
+Revises: c0de4a9b7f12
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1ef5b8c0a23'
+down_revision: Union[str, Sequence[str], None] = 'c0de4a9b7f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('service_config_version_seq')))
+    op.create_table(
+        'service_config_overrides',
+        sa.Column('service_key', sa.String(length=64), nullable=False),
+        sa.Column('base_fee', sa.Integer(), nullable=True),
+        sa.Column('free_limit', sa.Integer(), nullable=True),
+        sa.Column('is_enabled', sa.Boolean(), nullable=True),
+        sa.Column('promo_message', sa.String(length=512), nullable=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('service_key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('service_config_overrides')
+    op.execute(sa.schema.DropSequence(sa.Sequence('service_config_version_seq')))
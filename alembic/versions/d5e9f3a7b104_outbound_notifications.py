@@ -0,0 +1,53 @@
+"""outbound_notifications
+
+Revision ID: d5e9f3a7b104
+Revises: c4d8e1f2a905
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e9f3a7b104'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1f2a905'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'outbound_notifications',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.Enum('TOKEN', 'TOPIC', 'CALL', name='notificationkind', native_enum=False), nullable=False),
+        sa.Column('target', sa.String(length=512), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'SENT', 'DEAD', name='notificationstatus', native_enum=False),
+                  server_default='PENDING', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_outbound_notifications_due', 'outbound_notifications', ['next_attempt_at'], unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        'ix_outbound_notifications_dead', 'outbound_notifications', ['created_at'], unique=False,
+        postgresql_where=sa.text("status = 'DEAD'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbound_notifications_dead', table_name='outbound_notifications')
+    op.drop_index('ix_outbound_notifications_due', table_name='outbound_notifications')
+    op.drop_table('outbound_notifications')
@@ -0,0 +1,30 @@
+"""reconcile_keyset_index
+
+Revision ID: e6fa04b8c215
+Revises: d5e9f3a7b104
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6fa04b8c215'
+down_revision: Union[str, Sequence[str], None] = 'd5e9f3a7b104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_payments_status_provider_created', 'payments', ['status', 'provider', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_status_provider_created', table_name='payments')
@@ -0,0 +1,72 @@
+"""search_vectors
+
+Revision ID: f7ab15c9d326
+Revises: e6fa04b8c215
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7ab15c9d326'
+down_revision: Union[str, Sequence[str], None] = 'e6fa04b8c215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+USER_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(role, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(city, '')), 'C')"
+)
+LISTING_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', replace(coalesce(service_type, ''), '-', ' ')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(location_city, '')), 'C')"
+)
+
+
+def _trigram_installable() -> bool:
+    bind = op.get_bind()
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('service_users', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(USER_VECTOR, persisted=True), nullable=True
+    ))
+    op.add_column('service_listings', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(LISTING_VECTOR, persisted=True), nullable=True
+    ))
+    op.create_index('ix_service_users_search', 'service_users', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_service_listings_search', 'service_listings', ['search_vector'], postgresql_using='gin')
+
+    # Fuzzy name matching is optional: SearchService checks pg_extension at runtime
+    if _trigram_installable():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_service_users_full_name_trgm "
+            "ON service_users USING gin (full_name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_service_listings_title_trgm "
+            "ON service_listings USING gin (title gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_service_listings_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_service_users_full_name_trgm")
+    op.drop_index('ix_service_listings_search', table_name='service_listings')
+    op.drop_index('ix_service_users_search', table_name='service_users')
+    op.drop_column('service_listings', 'search_vector')
+    op.drop_column('service_users', 'search_vector')
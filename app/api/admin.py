@@ -5,7 +5,7 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 # ✅ Standardized Dependencies
 from app.api.dependencies import get_admin_user, get_db_session
@@ -17,14 +17,23 @@ from app.services.orchestrator import service_orchestrator
 from app.services.stats_service import StatsService
 from app.services.registry import registry
 from app.repositories.payment_repo import PaymentRepository
+from app.repositories.rollup_repo import RollupRepository
 
 from app.schemas.payment_admin import (
     AdminConfirmPaymentRequest,
     AdminPaymentActionResponse,
     PaymentDashboardSummary,
     DetailedPaymentReport,
-    ActiveCallReport
+    ActiveCallReport,
+    ServiceConfigEntry,
+    ServiceConfigOut,
+    ServiceConfigUpdate,
+    SMSMatchRequest,
+    SMSMatchResponse,
 )
+from app.config import settings
+from app.services.service_config import save_override, service_config_sync
+from app.services.sms_matching import SMSMatchingEngine
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin", tags=["Admin Operations"])
@@ -41,20 +50,13 @@ async def get_dashboard_summary(
     """
     Unified Dashboard: Aggregates revenue and pending verifications.
     """
+    # Single cached round trip (includes doctor/nurse revenue)
     metrics = await StatsService.get_dashboard_metrics(db)
 
-    # Use specialized group-by logic for service revenue
-    consultation_stmt = select(func.sum(Payment.amount)).where(
-        Payment.status == PaymentStatus.SUCCESS,
-        Payment.payment_type.in_(["doctor", "nurse"])
-    )
-    res = await db.execute(consultation_stmt)
-    consultation_revenue = res.scalar() or 0.0
-
     return PaymentDashboardSummary(
         total_awaiting_verification=metrics["total_awaiting_verification"],
         total_revenue_today=metrics["total_revenue_today"],
-        consultation_revenue_total=consultation_revenue,
+        consultation_revenue_total=metrics["consultation_revenue_total"],
         bypass_matches_today=metrics["bypass_matches_today"],
         mtn_volume_today=metrics.get("mtn_volume", 0.0),
         orange_volume_today=metrics.get("orange_volume", 0.0)
@@ -111,8 +113,8 @@ async def verify_payment_override(
         .where(
             Payment.status == PaymentStatus.PENDING,
             Payment.amount == req.amount,
-            # metadata search for phone stored during initiate_payment
-            Payment.metadata['phone'].astext == req.payer_phone
+            # Indexed payer phone (the metadata copy is not indexed)
+            Payment.user_phone == req.payer_phone
         )
         .order_by(Payment.created_at.desc())
     )
@@ -133,16 +135,20 @@ async def verify_payment_override(
         raise HTTPException(status_code=400, detail="Transaction ID already verified or payment finalized.")
 
     # 3. Add Audit Metadata
-    meta = updated_payment.metadata or {}
+    meta = dict(updated_payment.metadata_json or {})
     meta.update({"verified_by": admin.email, "mode": "admin_bypass"})
-    updated_payment.metadata = meta
+    updated_payment.metadata_json = meta
+
+    # 4. Dashboard rollups (same transaction as the status change)
+    await RollupRepository(db).record_payment_confirmed(updated_payment)
 
-    # 4. 🚀 Trigger Domain Orchestration
+    # 5. 🚀 Trigger Domain Orchestration
     # This activates the Listing, sends FCM alerts, and logs the Quota use
+    service_type = getattr(updated_payment.service_type, "value", updated_payment.service_type)
     await service_orchestrator.activate_listing(
         db=db,
         user_id=updated_payment.user_id,
-        service_type=updated_payment.payment_type,
+        service_type=service_type,
         activation_ref=updated_payment.idempotency_key
     )
 
@@ -150,7 +156,8 @@ async def verify_payment_override(
     return AdminPaymentActionResponse(
         success=True,
         reference=str(updated_payment.id),
-        message=f"Service {updated_payment.payment_type} activated via Admin bypass."
+        new_status=updated_payment.status,
+        message=f"Service {service_type} activated via Admin bypass."
     )
 
 # ---------------------------------------------------------
@@ -169,14 +176,94 @@ async def get_recent_payments(
 
     report = []
     for p in payments:
-        meta = registry.get_service_meta(p.payment_type)
+        meta = registry.get(p.payment_type)
         report.append(DetailedPaymentReport(
             reference=str(p.id),
             amount=p.amount,
             status=p.status,
-            service_display_name=meta.get("display_name", p.payment_type),
+            service_display_name=meta.display_name,
             user_phone=p.metadata.get("phone", "N/A") if p.metadata else "N/A",
             created_at=p.created_at
         ))
 
-    return report
\ No newline at end of file
+    return report
+
+
+# ---------------------------------------------------------
+# 5. RUNTIME PRICING (no redeploy)
+# ---------------------------------------------------------
+
+def _service_config_out() -> ServiceConfigOut:
+    snapshot = registry.snapshot
+    return ServiceConfigOut(
+        config_version=snapshot.config_version,
+        services=[
+            ServiceConfigEntry(
+                key=record.key,
+                base_fee=record.base_fee,
+                free_limit=record.free_limit,
+                is_enabled=record.is_enabled,
+                promo_message=record.promo_message,
+                overridden=sorted(snapshot.overrides.get(record.key, {})),
+            )
+            for record in snapshot.records.values()
+        ],
+    )
+
+
+@router.get("/service-config", response_model=ServiceConfigOut)
+async def get_service_config(admin=Depends(get_admin_user)):
+    """Fees, free limits, switches and promos as this worker applies them."""
+    return _service_config_out()
+
+
+@router.put("/service-config/{service_key}", response_model=ServiceConfigOut)
+async def update_service_config(
+    service_key: str,
+    req: ServiceConfigUpdate,
+    db: AsyncSession = Depends(get_db_session),
+    admin=Depends(get_admin_user)
+):
+    """
+    Changes pricing for one service on every worker within seconds.
+    Accepts any alias ('doctor', 'doctor_consult'); null resets a field.
+    """
+    key = registry.get(service_key).key
+    if key not in registry.snapshot.records:
+        raise HTTPException(status_code=404, detail=f"Unknown service '{service_key}'")
+
+    changes = req.model_dump(include=req.model_fields_set)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to change")
+
+    version = await save_override(db, key, changes, updated_by=getattr(admin, "email", None))
+    await db.commit()
+    logger.info(f"💲 Admin {getattr(admin, 'email', '?')} set {key} {changes} (config v{version})")
+
+    await service_config_sync.refresh("local", min_version=version)
+    await service_config_sync.publish(version)
+    return _service_config_out()
+
+
+# ---------------------------------------------------------
+# 6. SMS AUTO-MATCHING
+# ---------------------------------------------------------
+
+@router.post("/sms-match", response_model=SMSMatchResponse)
+async def match_payment_sms(
+    req: SMSMatchRequest,
+    admin=Depends(get_admin_user)
+):
+    """
+    Bulk verification: settles open MTN/Orange payments from the provider SMS
+    forwarded by the merchant line. Ambiguous matches are flagged for review.
+    """
+    if len(req.messages) > settings.SMS_MATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.SMS_MATCH_MAX_MESSAGES} messages per request",
+        )
+
+    report = await SMSMatchingEngine().run(req.messages)
+    logger.info(f"📩 Admin {getattr(admin, 'email', '?')} matched {report.confirmed}/{report.received} SMS")
+    return report.as_dict()
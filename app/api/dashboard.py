@@ -1,29 +1,38 @@
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import Optional
-from sqlalchemy import select, desc, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
 
 from app.api.deps import get_db
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment_dashboard import PaymentListResponse, PaymentItem
+from app.utils.pagination import InvalidCursor, Keyset, SortKey
 
 router = APIRouter(
     prefix="/dashboard",
     tags=["Dashboard"],
 )
 
+# Newest first; ix_payments_status_provider_created / ix_payments_created serve every filter combination
+PAYMENTS_KEYSET = Keyset(
+    "dashboard_payments",
+    SortKey(Payment.created_at, descending=True),
+    SortKey(Payment.id, descending=True),
+)
+
 
 @router.get("/payments", response_model=PaymentListResponse)
 async def list_payments(
     status: Optional[PaymentStatus] = Query(None),
     provider: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Add total (approximate on large result sets)"),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Returns a paginated list of payments for admin dashboard.
+    Returns a cursor-paginated list of payments for admin dashboard.
     Supports filtering by status and payment provider.
     """
 
@@ -36,19 +45,17 @@ async def list_payments(
     if provider:
         stmt = stmt.where(Payment.provider == provider)
 
-    # 3️⃣ Total count for pagination
-    total = await db.scalar(
-        select(func.count()).select_from(stmt.subquery())
-    )
-
-    # 4️⃣ Apply ordering and pagination
-    stmt = stmt.order_by(desc(Payment.created_at)).limit(limit).offset(offset)
-
-    # 5️⃣ Execute query
-    result = await db.execute(stmt)
-    payments = result.scalars().all()
+    # 3️⃣ Keyset page (+ bounded/approximate total only when asked for)
+    try:
+        page = await PAYMENTS_KEYSET.fetch(
+            db, stmt, limit, cursor,
+            filters={"status": status.value if status else None, "provider": provider},
+            offset=offset, with_total=include_total,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # 6️⃣ Map ORM Payment -> Pydantic PaymentItem
+    # 4️⃣ Map ORM Payment -> Pydantic PaymentItem
     items = [
         PaymentItem(
             id=str(p.id),
@@ -57,16 +64,19 @@ async def list_payments(
             amount=float(p.amount),
             currency=getattr(p, "currency", "XAF"),
             status=p.status,
-            transaction_id=getattr(p, "internal_tx_id", None),
+            provider=getattr(p.provider, "value", p.provider),
+            provider_tx_id=p.provider_tx_id,
             created_at=p.created_at,
         )
-        for p in payments
+        for p in page.items
     ]
 
-    # 7️⃣ Return response
+    # 5️⃣ Return response
     return {
-        "total": total,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
         "limit": limit,
         "offset": offset,
+        "next_cursor": page.next_cursor,
         "items": items,
     }
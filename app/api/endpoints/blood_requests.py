@@ -1,19 +1,17 @@
 from __future__ import annotations
 
 import logging
-import asyncio
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status, BackgroundTasks
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ✅ Standards-aligned Dependencies
 from app.api.dependencies import get_current_user, get_db as get_db_session
 from app.schemas.blood_requests import BloodRequestCreate, BloodRequest as BloodRequestOut
 from app.crud.blood_request import get_blood_requests
-from app.models.blood_donor import BloodDonor
-from app.firebase_client import send_fcm_to_donor
+from app.services.donor_fanout import DonorFanout
+from app.utils.pagination import InvalidCursor, set_page_headers
 
 # ✅ The Modular Service Linker
 from app.services.blood_request_service import BloodRequestService
@@ -29,49 +27,30 @@ router = APIRouter(prefix="/blood-requests", tags=["BloodRequests"])
 # -------------------------------------------------------------------------
 async def notify_donors_background(req_data: BloodRequestCreate, request_id: str):
     """
-    Handles donor lookup and FCM dispatch using thread pooling for blocking SDK calls.
-    Optimized for 2026 to handle concurrent notification bursts.
+    Sends to every compatible, reachable donor in the city (DonorMatcher
+    buckets) through DonorFanout: send_each batches of <= 500, bounded
+    concurrency, bulk token purge.
     """
-    from app.database import AsyncSessionLocal
-
-    async with AsyncSessionLocal() as db:
-        try:
-            # Match donors by blood type and location
-            query = select(BloodDonor).where(
-                BloodDonor.blood_type == req_data.blood_type,
-                BloodDonor.city == req_data.city,
-                BloodDonor.is_active == True,
-                BloodDonor.fcm_token.isnot(None)
-            )
-            result = await db.execute(query)
-            donors = result.scalars().all()
-
-            if not donors:
-                logger.info(f"[{request_id}] No donors found for {req_data.blood_type} in {req_data.city}")
-                return
-
-            title = f"{'🚨 Urgent:' if req_data.urgent else 'New'} {req_data.blood_type} needed"
-            body = f"{req_data.requester_name} needs {req_data.needed_units} unit(s) at {req_data.hospital or req_data.city}"
-
-            # ✅ 2026 Optimization: Fire notifications in parallel
-            # This prevents a long list of donors from blocking the background worker
-            tasks = [
-                asyncio.to_thread(
-                    send_fcm_to_donor,
-                    donor.fcm_token,
-                    title,
-                    body,
-                    {"type": "BLOOD_REQUEST_ALERT", "request_id": str(request_id)}
-                )
-                for donor in donors
-            ]
-
-            await asyncio.gather(*tasks)
-
-            logger.info(f"[{request_id}] Notifications sent to {len(donors)} donors.")
-
-        except Exception as e:
-            logger.error(f"[{request_id}] Notification background task failed: {e}")
+    try:
+        title = f"{'🚨 Urgent:' if req_data.urgent else 'New'} {req_data.blood_type} needed"
+        body = f"{req_data.requester_name} needs {req_data.needed_units} unit(s) at {req_data.hospital or req_data.city}"
+
+        report = await DonorFanout().notify_donors(
+            blood_type=req_data.blood_type,
+            city=req_data.city,
+            title=title,
+            body=body,
+            data={"type": "BLOOD_REQUEST_ALERT", "request_id": str(request_id)},
+        )
+
+        if not report.recipients:
+            logger.info(f"[{request_id}] No compatible donors found for {req_data.blood_type} in {req_data.city}")
+            return
+
+        logger.info(f"[{request_id}] Notifications sent to {report.success}/{report.recipients} donors.")
+
+    except Exception as e:
+        logger.error(f"[{request_id}] Notification background task failed: {e}")
 
 
 # -------------------------------------------------------------------------
@@ -106,10 +85,19 @@ async def create_blood_request_endpoint(
 # -------------------------------------------------------------------------
 @router.get("/", response_model=List[BloodRequestOut])
 async def list_all_blood_requests(
-        skip: int = 0,
+        response: Response,
+        skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
         limit: int = 100,
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        include_total: bool = Query(False, description="Send X-Total-Count (approximate on large lists)"),
         current_user=Depends(get_current_user),
         db: AsyncSession = Depends(get_db_session)
 ):
     """Returns a global feed of active blood requests for the mobile app."""
-    return await get_blood_requests(db, skip=skip, limit=limit)
\ No newline at end of file
+    try:
+        page = await get_blood_requests(db, skip=skip, limit=limit, cursor=cursor, with_total=include_total)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    set_page_headers(response, page)
+    return page.items
\ No newline at end of file
@@ -57,6 +57,125 @@ REDIS_LOCK_CONFLICTS = Counter(
     ["lock_type"],
 )
 
+USAGE_CACHE_LOOKUPS = Counter(
+    "bloodonal_usage_cache_lookups_total",
+    "Quota counter cache lookups by outcome (hit, miss, error)",
+    ["result"],
+)
+
+JANITOR_ROWS_EXPIRED = Counter(
+    "bloodonal_janitor_rows_expired_total",
+    "Payments expired by the janitor, per sweep rule",
+    ["rule"],
+)
+
+JANITOR_BATCH_SECONDS = Histogram(
+    "bloodonal_janitor_batch_seconds",
+    "Duration of a single janitor UPDATE batch (including commit)",
+    ["rule"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+FANOUT_BATCH_SECONDS = Histogram(
+    "bloodonal_fanout_batch_seconds",
+    "Latency of one FCM send_each batch during donor fan-out",
+    ["outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+FANOUT_MESSAGES = Counter(
+    "bloodonal_fanout_messages_total",
+    "Donor alert messages handed to FCM, by batch outcome",
+    ["outcome"],
+)
+
+NOTIFY_QUEUE_OUTCOMES = Counter(
+    "bloodonal_notify_queue_outcomes_total",
+    "Outbound push attempts by outcome (sent / retry / dead)",
+    ["outcome"],
+)
+
+NOTIFY_QUEUE_LAG_SECONDS = Histogram(
+    "bloodonal_notify_queue_lag_seconds",
+    "Time from enqueue to FCM acceptance for queued pushes",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 15, 60, 300, 900),
+)
+
+RECONCILE_CHECKS = Counter(
+    "bloodonal_reconcile_checks_total",
+    "Provider status polls during reconciliation, by outcome",
+    ["provider", "outcome"],
+)
+
+RECONCILE_VERIFY_SECONDS = Histogram(
+    "bloodonal_reconcile_verify_seconds",
+    "Latency of one verify_transaction call during reconciliation",
+    ["provider"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+SEARCH_QUERY_SECONDS = Histogram(
+    "bloodonal_search_query_seconds",
+    "Latency of one ranked search query, by source",
+    ["source"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+SEARCH_SOURCE_OUTCOMES = Counter(
+    "bloodonal_search_source_outcomes_total",
+    "Per-source search executions by outcome (ok / timeout / error)",
+    ["source", "outcome"],
+)
+
+CHAT_BROADCAST_MESSAGES = Counter(
+    "bloodonal_chat_broadcast_messages_total",
+    "Cross-worker chat fan-out events (published / received / dropped / publish_error)",
+    ["event"],
+)
+
+SERVICE_CONFIG_RELOADS = Counter(
+    "bloodonal_service_config_reloads_total",
+    "Pricing/promo configuration reloads by trigger (startup / local / pubsub / poll)",
+    ["source"],
+)
+
+SMS_MATCHES = Counter(
+    "bloodonal_sms_matches_total",
+    "Payment SMS processed by the auto-matcher, by outcome",
+    ["provider", "outcome"],
+)
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "bloodonal_idempotency_requests_total",
+    "Requests with X-Idempotency-Key by outcome (stored / replayed / mismatch / busy / not_stored / passthrough)",
+    ["outcome"],
+)
+
+CHAT_FANOUT_SECONDS = Histogram(
+    "bloodonal_chat_fanout_seconds",
+    "Time from local fan-out to the frame being written to a socket, by room size",
+    ["room_size"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+CHAT_SLOW_CLIENTS = Counter(
+    "bloodonal_chat_slow_client_total",
+    "Slow-consumer actions on chat sockets with a full send queue (dropped / disconnected)",
+    ["action"],
+)
+
+CHAT_WRITE_ROWS = Counter(
+    "bloodonal_chat_write_rows_total",
+    "Chat messages written by the batching writer, by outcome (ok / retry / failed)",
+    ["outcome"],
+)
+
+CHAT_WRITE_BATCH_SECONDS = Histogram(
+    "bloodonal_chat_write_batch_seconds",
+    "Latency of one chat message batch INSERT + commit",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
 # -----------------------------
 # 3. Helpers
 # -----------------------------
@@ -82,6 +201,68 @@ def record_db_usage():
 def record_redis_lock_conflict(lock_type: str = "default"):
     REDIS_LOCK_CONFLICTS.labels(lock_type).inc()
 
+
+def record_usage_cache_lookup(result: str):
+    USAGE_CACHE_LOOKUPS.labels(result).inc()
+
+
+def record_janitor_batch(rule: str, rows: int, seconds: float):
+    JANITOR_ROWS_EXPIRED.labels(rule).inc(rows)
+    JANITOR_BATCH_SECONDS.labels(rule).observe(seconds)
+
+
+def record_fanout_batch(size: int, seconds: float, outcome: str = "ok"):
+    FANOUT_MESSAGES.labels(outcome).inc(size)
+    FANOUT_BATCH_SECONDS.labels(outcome).observe(seconds)
+
+
+def record_reconcile_check(provider: str, outcome: str, seconds: float):
+    RECONCILE_CHECKS.labels(provider, outcome).inc()
+    RECONCILE_VERIFY_SECONDS.labels(provider).observe(seconds)
+
+
+def record_search_query(source: str, seconds: float):
+    SEARCH_QUERY_SECONDS.labels(source).observe(seconds)
+
+
+def record_search_source(source: str, outcome: str):
+    SEARCH_SOURCE_OUTCOMES.labels(source, outcome).inc()
+
+
+def record_chat_broadcast(event: str):
+    CHAT_BROADCAST_MESSAGES.labels(event).inc()
+
+
+def record_service_config_reload(source: str):
+    SERVICE_CONFIG_RELOADS.labels(source).inc()
+
+
+def record_sms_match(provider: str, outcome: str, count: int = 1):
+    SMS_MATCHES.labels(provider, outcome).inc(count)
+
+
+def record_idempotency(outcome: str):
+    IDEMPOTENCY_REQUESTS.labels(outcome).inc()
+
+
+def record_chat_fanout(room_size: str, seconds: float):
+    CHAT_FANOUT_SECONDS.labels(room_size).observe(seconds)
+
+
+def record_chat_slow_client(action: str):
+    CHAT_SLOW_CLIENTS.labels(action).inc()
+
+
+def record_chat_write(rows: int, seconds: float, outcome: str):
+    CHAT_WRITE_ROWS.labels(outcome).inc(rows)
+    CHAT_WRITE_BATCH_SECONDS.observe(seconds)
+
+
+def record_notification_outcome(outcome: str, lag_seconds: float = None):
+    NOTIFY_QUEUE_OUTCOMES.labels(outcome).inc()
+    if lag_seconds is not None:
+        NOTIFY_QUEUE_LAG_SECONDS.observe(lag_seconds)
+
 # -----------------------------
 # 4. Prometheus Endpoint
 # -----------------------------
@@ -66,18 +66,18 @@ async def get_usage_status(
         user=Depends(get_current_user),
         db: AsyncSession = Depends(get_db_session)
 ):
-    meta = registry.get_service_meta(service)
+    meta = registry.get(service)
     usage_repo = SQLAlchemyUsageRepository(db)
 
     # user.uid is a UUID object; repo handles the count
     used = await usage_repo.count_uses(user.uid, service)
-    remaining = max(0, meta["free_limit"] - used)
-    fee = meta["base_fee"] if meta["is_payment_globally_enabled"] else 0
+    remaining = max(0, meta.free_limit - used)
+    fee = meta.base_fee if meta.is_payment_globally_enabled else 0
 
     return RemainingWithFeeResponse(
         remaining=remaining,
         fee=fee,
-        promo_message=meta["promo_message"]
+        promo_message=meta.promo_message
     )
 
 
@@ -53,10 +53,130 @@ class Settings(BaseSettings):
     # -------------------------
     REDIS_URL: Optional[str] = None
 
+    # Write-through cache for usage_counter reads (quota checks)
+    USAGE_CACHE_ENABLED: bool = True
+    USAGE_CACHE_TTL_SECONDS: int = 900
+
     # Worker Settings
     WORKER_CLEANUP_INTERVAL_SECONDS: int = 300
     DAILY_REPORT_HOUR_UTC: int = 23
 
+    # Janitor: rows expired per UPDATE, and a cap on batches per run
+    JANITOR_BATCH_SIZE: int = 500
+    JANITOR_MAX_BATCHES: int = 200
+
+    # Scheduler: leader lease (Redis or PG advisory lock), poll tick and start jitter
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: float = 5.0
+    SCHEDULER_LEASE_TTL_SECONDS: int = 30
+    SCHEDULER_JITTER_SECONDS: float = 15.0
+
+    # Rollups: trailing UTC days the catch-up job re-aggregates, and how often
+    ROLLUP_CATCHUP_DAYS: int = 2
+    ROLLUP_CATCHUP_INTERVAL_SECONDS: int = 3600
+
+    # Donor fan-out: tokens per send_each call (FCM max 500), batches in flight,
+    # tokens copied out of the cached matcher buckets per page
+    FANOUT_BATCH_SIZE: int = 500
+    FANOUT_MAX_CONCURRENCY: int = 4
+    FANOUT_PAGE_SIZE: int = 2000
+    # Donor matching: per-city buckets of reachable donors (active + FCM token),
+    # cached per worker this long; donor CRUD drops its city immediately
+    DONOR_MATCH_CACHE_TTL_SECONDS: int = 60
+
+    # Reconciliation: pending payments per keyset page, verify calls in flight and
+    # started per second (per provider), transitions buffered per UPDATE, run interval
+    RECONCILE_PAGE_SIZE: int = 500
+    RECONCILE_CONCURRENCY: int = 8
+    RECONCILE_RATE_PER_SECOND: float = 20.0
+    RECONCILE_FLUSH_SIZE: int = 200
+    RECONCILE_INTERVAL_SECONDS: int = 600
+    # SMS auto-matching: pending rows per index-build page, matches confirmed per
+    # transaction, most SMS accepted in one request
+    SMS_MATCH_PAGE_SIZE: int = 2000
+    SMS_MATCH_BATCH_SIZE: int = 500
+    SMS_MATCH_MAX_MESSAGES: int = 5000
+
+    # Outbound push queue: consumers per process, claim size, idle poll, retry policy
+    NOTIFY_QUEUE_ENABLED: bool = True
+    NOTIFY_WORKERS: int = 2
+    NOTIFY_BATCH_SIZE: int = 100
+    NOTIFY_POLL_SECONDS: float = 1.0
+    # Empty polls back off from NOTIFY_POLL_SECONDS up to this (never past the
+    # next scheduled retry), so an idle queue lets a serverless Postgres suspend;
+    # enqueues in the same process still wake consumers at once
+    NOTIFY_IDLE_POLL_MAX_SECONDS: float = 600.0
+    NOTIFY_MAX_ATTEMPTS: int = 6
+    NOTIFY_BACKOFF_BASE_SECONDS: float = 5.0
+    NOTIFY_BACKOFF_MAX_SECONDS: float = 900.0
+    # Claim lease: a crashed consumer's rows become due again after this
+    NOTIFY_LEASE_SECONDS: int = 60
+    # Call signals older than this are dead-lettered instead of ringing late
+    NOTIFY_CALL_TTL_SECONDS: int = 45
+    # SENT rows kept this long; DEAD rows are kept until requeued or removed
+    NOTIFY_RETENTION_DAYS: int = 7
+
+    # Search: rows per source by default / at most, query words considered,
+    # and pg_trgm fuzzy name matching (used only when the extension is installed)
+    SEARCH_DEFAULT_LIMIT: int = 20
+    SEARCH_MAX_LIMIT: int = 100
+    SEARCH_MAX_TERMS: int = 6
+    # Matches ranked per source before LIMIT, nearest names first; needs pg_trgm
+    # (without it, or at 0, every match is ranked)
+    SEARCH_RANK_CANDIDATES: int = 1000
+    # Sources run in parallel; one slower than this is left out of the page
+    SEARCH_SOURCE_TIMEOUT_SECONDS: float = 1.5
+    # Multiplier on each source's rank when merging into one result list
+    SEARCH_SOURCE_WEIGHTS: Dict[str, float] = {"provider": 1.0, "listing": 1.0}
+    SEARCH_TRIGRAM_ENABLED: bool = True
+
+    # Autocomplete: in-memory prefix index built at startup, fully rebuilt when
+    # older than this; optionally mirrored to Redis sorted sets for all workers
+    AUTOCOMPLETE_ENABLED: bool = True
+    AUTOCOMPLETE_REBUILD_SECONDS: int = 300
+    AUTOCOMPLETE_REDIS_ENABLED: bool = False
+
+    # X-Idempotency-Key responses kept in Redis for replay; a retry waits up to
+    # IDEMPOTENCY_WAIT_SECONDS for an in-flight first attempt (locked at most
+    # IDEMPOTENCY_LOCK_SECONDS)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Runtime pricing overrides (service_config_overrides): announced over Redis
+    # pub/sub; workers also poll the version this often in case they miss one
+    SERVICE_CONFIG_POLL_SECONDS: float = 30.0
+
+    # List endpoints page by cursor; optional totals are exact up to this many
+    # rows and a planner estimate beyond it
+    PAGINATION_EXACT_COUNT_LIMIT: int = 10000
+
+    # Bulk import (python -m app.tasks.bulk_import): documents per COPY + merge
+    # transaction; the checkpoint is written after each one
+    BULK_IMPORT_CHUNK_SIZE: int = 10000
+    # Firestore export (python -m app.tasks.firestore_export): documents per read
+    # and collections exported at once
+    FIRESTORE_EXPORT_PAGE_SIZE: int = 1000
+    FIRESTORE_EXPORT_WORKERS: int = 4
+
+    # Chat fan-out across workers: "redis" (pub/sub channel per room), "memory"
+    # (one process only) or "auto" (redis when connected); messages received
+    # from other workers are queued up to this many, then dropped
+    CHAT_BROADCAST_BACKEND: str = "auto"
+    CHAT_BROADCAST_QUEUE_SIZE: int = 10000
+    # Outbound frames queued per socket; a socket that falls this far behind is
+    # handled per CHAT_SLOW_CLIENT_POLICY: "drop_oldest" or "disconnect"
+    CHAT_CLIENT_QUEUE_SIZE: int = 256
+    CHAT_SLOW_CLIENT_POLICY: str = "drop_oldest"
+    # Chat persistence: messages are broadcast with a pre-allocated id and written
+    # in multi-row batches of up to CHAT_WRITE_BATCH_SIZE, at most CHAT_WRITE_FLUSH_MS
+    # after arriving. CHAT_WRITE_BEHIND=False waits for the write before broadcasting
+    CHAT_WRITE_BEHIND: bool = True
+    CHAT_WRITE_BATCH_SIZE: int = 200
+    CHAT_WRITE_FLUSH_MS: int = 50
+    CHAT_WRITE_MAX_PENDING: int = 5000
+    CHAT_ID_BLOCK_SIZE: int = 100
+
     # -------------------------
     # Firebase / Google Credentials
     # -------------------------
@@ -85,6 +205,15 @@ class Settings(BaseSettings):
     MTN_MOMO_ENVIRONMENT: str = "sandbox"
 
     GATEWAY_TIMEOUT: float = 30.0
+    # Shared provider clients (app.gateways.transport): per-provider overrides of
+    # GATEWAY_TIMEOUT, status-poll timeout, connect timeout and pool limits
+    GATEWAY_PROVIDER_TIMEOUTS: Dict[str, float] = {"STRIPE": 10.0}
+    GATEWAY_POLL_TIMEOUT: float = 5.0
+    GATEWAY_CONNECT_TIMEOUT: float = 5.0
+    GATEWAY_MAX_CONNECTIONS: int = 50
+    GATEWAY_MAX_KEEPALIVE: int = 20
+    GATEWAY_KEEPALIVE_EXPIRY: float = 60.0
+    GATEWAY_HTTP2: bool = True
 
     # -------------------------
     # Calls & Video
@@ -1,8 +1,27 @@
 import logging
+from typing import Any, Optional
+
 from fastapi import Request, HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------
+# Shared client for code that runs outside a Request scope
+# (repositories, background jobs). Set by main.lifespan.
+# ---------------------------------------------------------
+_shared_redis: Optional[Any] = None
+
+
+def set_shared_redis(client: Optional[Any]) -> None:
+    """Registers (or clears, with None) the process-wide Redis client."""
+    global _shared_redis
+    _shared_redis = client
+
+
+def get_shared_redis() -> Optional[Any]:
+    """Returns the lifespan Redis client, or None when Redis is unavailable."""
+    return _shared_redis
+
 
 async def get_redis_client(request: Request):
     """
@@ -23,4 +42,4 @@ async def get_redis_client(request: Request):
             detail="Redis service not available",
         )
 
-    return redis
\ No newline at end of file
+    return redis
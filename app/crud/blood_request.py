@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Optional, Sequence
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, update
+from sqlalchemy import update
 from app.models.blood_request import BloodRequest
 from app.schemas.blood_requests import BloodRequestCreate
+from app.utils.pagination import InvalidCursor, Keyset, Page, SortKey
 
 logger = logging.getLogger(__name__)
 
+# Feed order: urgent first, then newest; id breaks created_at ties
+FEED_KEYSET = Keyset(
+    "blood_requests",
+    SortKey(BloodRequest.urgent, descending=True),
+    SortKey(BloodRequest.created_at, descending=True),
+    SortKey(BloodRequest.id, descending=True),
+)
+
 
 # -------------------------------------------------------------------------
 # CREATE: ATOMIC STAGING
@@ -63,11 +72,16 @@ async def get_blood_requests(
         db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
-        status_filter: Optional[str] = "PENDING"
-) -> Sequence[BloodRequest]:
+        status_filter: Optional[str] = "PENDING",
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+) -> Page[BloodRequest]:
     """
     Fetches requests for the global feed.
     Sorting: Urgent (🚨) first, then newest created_at.
+
+    Pages by cursor (ix_blood_requests_feed); `skip` is only honoured for
+    clients that have not sent a cursor yet.
     """
     try:
         query = select(BloodRequest)
@@ -76,21 +90,15 @@ async def get_blood_requests(
         if status_filter:
             query = query.where(BloodRequest.status == status_filter)
 
-        # 2026 Sorting Logic: Prioritize high-urgency cases for the Limbe/Southwest region
-        query = query.order_by(
-            desc(BloodRequest.urgent),
-            desc(BloodRequest.created_at)
+        return await FEED_KEYSET.fetch(
+            db, query, limit, cursor, filters={"status": status_filter}, offset=skip, with_total=with_total
         )
 
-        query = query.offset(skip).limit(limit)
-
-        result = await db.execute(query)
-        # Unique prevents duplicate objects in joined loads
-        return result.scalars().unique().all()
-
+    except InvalidCursor:
+        raise
     except Exception as e:
         logger.error(f"CRUD Error (get_all): {e}")
-        return []
+        return Page(items=[])
 
 
 async def get_blood_request_by_id(
@@ -1,14 +1,18 @@
 from __future__ import annotations
 import logging
-from typing import List, Optional
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import and_
 from app.models.chat import ChatRoom, Message
 from app.schemas.chat import MessageCreate
+from app.utils.pagination import Keyset, Page, SortKey
 
 logger = logging.getLogger(__name__)
 
+# Oldest first within a room (ix_messages_room_created)
+MESSAGES_KEYSET = Keyset("messages", SortKey(Message.created_at), SortKey(Message.id))
+
 
 async def get_or_create_room(
         db: AsyncSession,
@@ -68,18 +72,15 @@ async def list_messages(
         db: AsyncSession,
         room_id: int,
         limit: int = 50,
-        skip: int = 0
-) -> List[Message]:
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+) -> Page[Message]:
     """
     Fetches message history for a room, sorted by oldest first for the UI.
     Renamed from get_room_messages to match modular import standards.
     """
-    query = (
-        select(Message)
-        .where(Message.room_id == room_id)
-        .order_by(Message.created_at.asc())
-        .offset(skip)
-        .limit(limit)
+    query = select(Message).where(Message.room_id == room_id)
+    return await MESSAGES_KEYSET.fetch(
+        db, query, limit, cursor, filters={"room_id": room_id}, offset=skip, with_total=with_total
     )
-    result = await db.execute(query)
-    return list(result.scalars().all())
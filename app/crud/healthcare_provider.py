@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.models.healthcare_provider import HealthcareProvider
 from app.schemas.healthcare_providers import HealthcareProviderCreate
+from app.services.autocomplete import autocomplete_index, provider_entries
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,8 @@ async def create_provider(db: AsyncSession, prov: HealthcareProviderCreate):
     """
     obj = HealthcareProvider(**prov.model_dump())
     db.add(obj)
+    await db.flush()  # assigns the id the autocomplete entry is keyed by
+    await autocomplete_index.track(db, [], provider_entries(obj))
     # Commit handled by the router layer
     return obj
 
@@ -58,12 +61,14 @@ async def update_provider(db: AsyncSession, provider_id: int, update_data: dict)
     provider = await get_provider_by_id(db, provider_id)
     if not provider:
         return None
+    before = provider_entries(provider)
 
     # Dynamically update provided fields
     for key, value in update_data.items():
         if hasattr(provider, key) and value is not None:
             setattr(provider, key, value)
 
+    await autocomplete_index.track(db, before, provider_entries(provider))
     # Commit handled by the router layer
     return provider
 
@@ -76,6 +81,7 @@ async def delete_provider(db: AsyncSession, provider_id: int):
     if not provider:
         return False
 
+    await autocomplete_index.track(db, provider_entries(provider), [])
     await db.delete(provider)
     # Commit handled by the router layer
     return True
\ No newline at end of file
@@ -5,9 +5,13 @@ from sqlalchemy import select
 from app.models.healthcare_request import HealthcareRequest
 from app.models.healthcare_provider import HealthcareProvider
 from app.schemas.healthcare_requests import HealthcareRequestCreate
+from app.utils.pagination import Keyset, Page, SortKey
 
 logger = logging.getLogger(__name__)
 
+# Newest first by primary key
+REQUESTS_KEYSET = Keyset("healthcare_requests", SortKey(HealthcareRequest.id, descending=True))
+
 
 async def create_healthcare_request(db: AsyncSession, req: HealthcareRequestCreate, user_id: str):
     """
@@ -42,8 +46,10 @@ async def get_healthcare_requests(
         skip: int = 0,
         limit: int = 100,
         user_id: str = None,
-        service_type: Optional[str] = None
-):
+        service_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+) -> Page[HealthcareRequest]:
     """
     Fetches user-owned requests with optional service category filtering.
     """
@@ -54,9 +60,10 @@ async def get_healthcare_requests(
     if service_type:
         query = query.where(HealthcareRequest.service_type == service_type)
 
-    stmt = query.order_by(HealthcareRequest.id.desc()).offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return await REQUESTS_KEYSET.fetch(
+        db, query, limit, cursor, filters={"user_id": user_id, "service_type": service_type},
+        offset=skip, with_total=with_total,
+    )
 
 
 async def assign_provider(db: AsyncSession, request_id: int, provider_id: int):
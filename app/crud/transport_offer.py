@@ -1,8 +1,12 @@
-from typing import List
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.transport_offer import TransportOffer
 from app.schemas.transport_offered import TransportOfferCreate
+from app.utils.pagination import Keyset, Page, SortKey
+
+# Newest first: id is the primary key, so the keyset needs no extra index
+OFFERS_KEYSET = Keyset("transport_offers", SortKey(TransportOffer.id, descending=True))
 
 
 async def create_transport_offer(db: AsyncSession, offer: TransportOfferCreate) -> TransportOffer:
@@ -20,18 +24,16 @@ async def create_transport_offer(db: AsyncSession, offer: TransportOfferCreate)
     return obj
 
 
-async def get_transport_offers(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[TransportOffer]:
+async def get_transport_offers(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+) -> Page[TransportOffer]:
     """
     Fetches transport offers ordered by newest first using async select.
     """
-    # ✅ Optimization: Added id descending order so the most recent
-    # transport offers appear at the top of the feed.
-    stmt = (
-        select(TransportOffer)
-        .order_by(TransportOffer.id.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    # ✅ Optimization: id descending keyset so the most recent
+    # transport offers appear at the top and deep pages stay cheap.
+    return await OFFERS_KEYSET.fetch(db, select(TransportOffer), limit, cursor, offset=skip, with_total=with_total)
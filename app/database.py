@@ -164,6 +164,8 @@ async def init_db() -> None:
     from app.models.usage_counter import UsageCounter
     from app.data.models import Usage
     from app.models.service_listing import ServiceListing
+    from app.models.rollup import PaymentDailyRollup, CallDailyRollup
+    from app.models.outbound_notification import OutboundNotification
 
     try:
         async with async_engine.begin() as conn:
@@ -1,7 +1,7 @@
 # app/domain/usecases.py
 
 import logging
-from typing import Optional, Dict
+from typing import Optional
 
 from app.domain.interfaces import (
     IPaymentGateway,
@@ -12,6 +12,7 @@ from app.domain.interfaces import (
 
 from app.domain.consultation_models import RequestResponse, UserRoles, ChannelType
 from app.config import settings
+from app.services.registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -83,7 +84,7 @@ class ConsultationUseCase:
 
         # FIX: safe fee resolution
         if amount is None:
-            amount = settings.fee_map.get(service_str, 500)
+            amount = registry.snapshot.fee_map.get(service_str, 500)
 
         # -----------------------------------------------------
         # 1. IDEMPOTENCY CHECK
@@ -207,9 +208,3 @@ class ConsultationUseCase:
 
         return await self.call_gateway.create_call_room(channel, user_id, recipient_id)
 
-
-# ---------------------------------------------------------
-# 2. PUBLIC CONSTANTS (SAFE EXPORTS)
-# ---------------------------------------------------------
-SERVICE_FEES: Dict[str, int] = settings.fee_map
-SERVICE_FREE_LIMITS_SIMPLE: Dict[str, int] = settings.free_limits
\ No newline at end of file
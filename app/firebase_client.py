@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import json
 import logging
@@ -97,19 +98,16 @@ def _init_firebase() -> bool:
 # Initialize on module load
 _init_firebase()
 
-def send_fcm_to_donor(
+def build_donor_message(
         target: str,
         title: str,
         body: str,
         data: dict[str, str] | None = None,
-) -> Optional[str]:
+) -> messaging.Message:
     """
-    Synchronous FCM wrapper for BackgroundTasks.
+    Donor alert payload shared by single sends and batched fan-out.
     Handles both specific device tokens and the 'donation' topic.
     """
-    if not _firebase_ready and not _init_firebase():
-        return None
-
     # Standardize data to strings for FCM
     sanitized_data = {k: str(v) for k, v in (data or {}).items()}
 
@@ -139,9 +137,43 @@ def send_fcm_to_donor(
     }
 
     if target == "donation":
-        message = messaging.Message(topic="donation", **message_params)
-    else:
-        message = messaging.Message(token=target, **message_params)
+        return messaging.Message(topic="donation", **message_params)
+    return messaging.Message(token=target, **message_params)
+
+
+async def send_fcm_to_donor(
+        target: str,
+        title: str,
+        body: str,
+        data: dict[str, str] | None = None,
+) -> Optional[str]:
+    """
+    Queues a donor alert for the push consumers, which retry it with backoff.
+    Handles both specific device tokens and the 'donation' topic.
+    Sends inline only if the queue is unavailable.
+    """
+    from app.services.notification_service import notification_service
+
+    try:
+        await notification_service.enqueue_donor_alert(target, title, body, data)
+        return "QUEUED"
+    except Exception as e:
+        logger.error("❌ Queueing FCM for target %s failed: %s; sending inline", target[:10], e)
+
+    return await asyncio.to_thread(_send_now, target, title, body, data)
+
+
+def _send_now(
+        target: str,
+        title: str,
+        body: str,
+        data: dict[str, str] | None = None,
+) -> Optional[str]:
+    """Blocking direct send (send_fcm_to_donor's fallback)."""
+    if not _firebase_ready and not _init_firebase():
+        return None
+
+    message = build_donor_message(target, title, body, data)
 
     try:
         msg_id = messaging.send(message)
@@ -154,4 +186,4 @@ def send_fcm_to_donor(
         return "DELETED"
     except Exception as e:
         logger.error("❌ FCM Error for target %s: %s", target[:10], e)
-        return None
\ No newline at end of file
+        return None
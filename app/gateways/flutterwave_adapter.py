@@ -2,7 +2,9 @@ import uuid
 import httpx
 import logging
 from typing import Optional, Dict, Any
+from app.config import settings
 from app.domain.gateways import IPaymentGateway, GatewayPaymentResponse
+from app.gateways.transport import GatewayTransport, gateway_transport
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +16,9 @@ class FlutterwavePaymentGateway(IPaymentGateway):
     """
     BASE_URL = "https://api.flutterwave.com/v3"
 
-    def __init__(self, secret_key: str):
+    def __init__(self, secret_key: str, transport: Optional[GatewayTransport] = None):
         self.secret_key = secret_key
+        self.transport = transport or gateway_transport
 
     async def charge(
             self,
@@ -40,17 +43,15 @@ class FlutterwavePaymentGateway(IPaymentGateway):
             "country": "CM",  # Mandatory for Cameroon
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.post(
-                    f"{self.BASE_URL}/charges?type=mobile_money_franco",
-                    headers={"Authorization": f"Bearer {self.secret_key}"},
-                    json=payload,
-                    timeout=30.0
-                )
-            except httpx.RequestError as exc:
-                logger.error(f"Network error calling Flutterwave: {exc}")
-                return GatewayPaymentResponse(reference=internal_ref, status="FAILED")
+        try:
+            resp = await self.transport.client("FLUTTERWAVE").post(
+                f"{self.BASE_URL}/charges?type=mobile_money_franco",
+                headers={"Authorization": f"Bearer {self.secret_key}"},
+                json=payload,
+            )
+        except httpx.RequestError as exc:
+            logger.error(f"Network error calling Flutterwave: {exc}")
+            return GatewayPaymentResponse(reference=internal_ref, status="FAILED")
 
         if resp.status_code not in (200, 201):
             logger.error(f"Flutterwave error: {resp.text}")
@@ -77,16 +78,15 @@ class FlutterwavePaymentGateway(IPaymentGateway):
         """
         Checks the final status of a transaction using the FLW ID.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(
-                    f"{self.BASE_URL}/transactions/{reference}/verify",
-                    headers={"Authorization": f"Bearer {self.secret_key}"},
-                    timeout=10.0
-                )
-            except Exception as e:
-                logger.error(f"Verification fetch failed: {e}")
-                return "PENDING"
+        try:
+            resp = await self.transport.client("FLUTTERWAVE").get(
+                f"{self.BASE_URL}/transactions/{reference}/verify",
+                headers={"Authorization": f"Bearer {self.secret_key}"},
+                timeout=settings.GATEWAY_POLL_TIMEOUT,
+            )
+        except Exception as e:
+            logger.error(f"Verification fetch failed: {e}")
+            return "PENDING"
 
         if resp.status_code != 200:
             return "PENDING"
@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 
 from app.domain.gateways import IPaymentGateway, GatewayPaymentResponse
 from app.config import settings
+from app.gateways.transport import GatewayTransport, gateway_transport
 from app.services.payment_service import generate_reference
 
 logger = logging.getLogger("app.gateways")
@@ -77,17 +78,17 @@ class MTNMomoPaymentGateway(IPaymentGateway):
     Production Adapter for MTN MoMo Collection API.
     """
 
-    def __init__(self, api_key: str, subscription_key: str):
+    def __init__(self, api_key: str, subscription_key: str, transport: Optional[GatewayTransport] = None):
         self.api_key = api_key
         self.subscription_key = subscription_key
+        self.transport = transport or gateway_transport
         self.base_url = getattr(
             settings,
             "MTN_MOMO_BASE_URL",
             "https://proxy.momoapi.mtn.com/collection"
         )
 
-        # ✅ FIX: define timeout safely
-        self.timeout = getattr(settings, "GATEWAY_TIMEOUT", 15.0)
+        # Request timeout comes from the shared MTN client (GATEWAY_TIMEOUT)
 
     async def charge(
         self,
@@ -117,13 +118,12 @@ class MTNMomoPaymentGateway(IPaymentGateway):
         }
 
         try:
-            # ✅ FIX: use context manager (important for tests + cleanup)
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.post(
-                    f"{self.base_url}/v1_0/requesttopay",
-                    headers=headers,
-                    json=payload,
-                )
+            # Shared pooled client; lifecycle is owned by main.lifespan
+            resp = await self.transport.client("MTN").post(
+                f"{self.base_url}/v1_0/requesttopay",
+                headers=headers,
+                json=payload,
+            )
 
             # ✅ FIX: correct status mapping
             if resp.status_code in (200, 202):
@@ -167,11 +167,11 @@ class MTNMomoPaymentGateway(IPaymentGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.get(
-                    f"{self.base_url}/v1_0/requesttopay/{reference}",
-                    headers=headers
-                )
+            resp = await self.transport.client("MTN").get(
+                f"{self.base_url}/v1_0/requesttopay/{reference}",
+                headers=headers,
+                timeout=settings.GATEWAY_POLL_TIMEOUT,
+            )
 
             if resp.status_code == 200:
                 data = resp.json()
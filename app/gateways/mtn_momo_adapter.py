@@ -1,10 +1,10 @@
 import uuid
 import asyncio
 import logging
-import httpx
 from typing import Optional, Dict, Any
 from app.domain.gateways import IPaymentGateway, GatewayPaymentResponse
 from app.config import settings
+from app.gateways.transport import GatewayTransport, gateway_transport
 
 logger = logging.getLogger(__name__)
 
@@ -69,10 +69,18 @@ class MTNMomoPaymentGateway(IPaymentGateway):
     """
     BASE_URL = "https://proxy.momoapi.mtn.com/collection"
 
-    def __init__(self, api_key: str, subscription_key: str, momo_account: str = None):
+    def __init__(
+            self,
+            api_key: str,
+            subscription_key: str,
+            momo_account: str = None,
+            transport: Optional[GatewayTransport] = None,
+    ):
         self.api_key = api_key
         self.subscription_key = subscription_key
         self.momo_account = momo_account
+        # Shared keep-alive client: no TLS handshake per charge/poll
+        self.transport = transport or gateway_transport
 
     def _get_headers(self, reference: Optional[str] = None) -> Dict[str, str]:
         """Helper to standardize MTN API headers."""
@@ -105,12 +113,11 @@ class MTNMomoPaymentGateway(IPaymentGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=settings.GATEWAY_TIMEOUT) as client:
-                resp = await client.post(
-                    f"{self.BASE_URL}/v1_0/requesttopay",
-                    headers=self._get_headers(reference),
-                    json=payload,
-                )
+            resp = await self.transport.client("MTN").post(
+                f"{self.BASE_URL}/v1_0/requesttopay",
+                headers=self._get_headers(reference),
+                json=payload,
+            )
 
             # MTN returns 202 Accepted for successful push triggers
             if resp.status_code == 202:
@@ -130,11 +137,11 @@ class MTNMomoPaymentGateway(IPaymentGateway):
     async def verify_transaction(self, reference: str) -> str:
         """Polls MTN API to check the status of a specific RequestToPay."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(
-                    f"{self.BASE_URL}/v1_0/requesttopay/{reference}",
-                    headers=self._get_headers()
-                )
+            resp = await self.transport.client("MTN").get(
+                f"{self.BASE_URL}/v1_0/requesttopay/{reference}",
+                headers=self._get_headers(),
+                timeout=settings.GATEWAY_POLL_TIMEOUT,
+            )
 
             if resp.status_code == 200:
                 data = resp.json()
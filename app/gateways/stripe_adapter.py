@@ -2,7 +2,9 @@ import uuid
 import httpx
 import logging
 from typing import Dict, Any, Optional
+from app.config import settings
 from app.domain.gateways import IPaymentGateway, GatewayPaymentResponse
+from app.gateways.transport import GatewayTransport, gateway_transport
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +18,9 @@ class StripeAdapter(IPaymentGateway):
 
     BASE_URL = "https://api.stripe.com/v1"
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, transport: Optional[GatewayTransport] = None):
         self.api_key = api_key
+        self.transport = transport or gateway_transport
 
     async def charge(
             self,
@@ -48,12 +51,11 @@ class StripeAdapter(IPaymentGateway):
             payload["metadata[merchant_wallet_ref]"] = merchant_number
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(
-                    f"{self.BASE_URL}/payment_intents",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    data=payload,
-                )
+            resp = await self.transport.client("STRIPE").post(
+                f"{self.BASE_URL}/payment_intents",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                data=payload,
+            )
 
             if resp.status_code >= 400:
                 logger.error(f"Stripe API Error: {resp.status_code} - {resp.text}")
@@ -97,11 +99,11 @@ class StripeAdapter(IPaymentGateway):
         Polls the current status of a Stripe PaymentIntent.
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(
-                    f"{self.BASE_URL}/payment_intents/{reference}",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                )
+            resp = await self.transport.client("STRIPE").get(
+                f"{self.BASE_URL}/payment_intents/{reference}",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=settings.GATEWAY_POLL_TIMEOUT,
+            )
 
             if resp.status_code == 200:
                 data = resp.json()
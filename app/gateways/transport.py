@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import ssl
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger("app.gateways")
+
+# Providers whose clients are opened eagerly in lifespan
+PROVIDERS = ("MTN", "FLUTTERWAVE", "STRIPE")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class GatewayTransport:
+    """
+    One long-lived httpx.AsyncClient per payment provider.
+
+    Keep-alive pooling means a charge or status poll reuses an open
+    TLS connection instead of paying a fresh handshake per call.
+    Clients are opened in main.lifespan and closed on shutdown; code that
+    runs without lifespan (scripts, tests) gets one lazily on first use.
+    """
+
+    def __init__(self, verify: Union[bool, str, ssl.SSLContext] = True):
+        # TLS verification (CA bundle path or context for private proxies)
+        self.verify = verify
+        # provider -> (client, loop it was created on)
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+    def timeout_for(self, provider: str) -> float:
+        return settings.GATEWAY_PROVIDER_TIMEOUTS.get(provider, settings.GATEWAY_TIMEOUT)
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        http2 = settings.GATEWAY_HTTP2 and _http2_available()
+        return httpx.AsyncClient(
+            http2=http2,
+            verify=self.verify,
+            timeout=httpx.Timeout(self.timeout_for(provider), connect=settings.GATEWAY_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.GATEWAY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GATEWAY_MAX_KEEPALIVE,
+                keepalive_expiry=settings.GATEWAY_KEEPALIVE_EXPIRY,
+            ),
+            headers={"User-Agent": f"bloodonal-api/{settings.API_VERSION}"},
+        )
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        """Returns the shared client for `provider` (e.g. "MTN"), creating it if needed."""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(provider)
+
+        # Pooled connections belong to the loop that opened them
+        if entry is None or entry[0].is_closed or entry[1] is not loop:
+            entry = (self._build(provider), loop)
+            self._clients[provider] = entry
+
+        return entry[0]
+
+    async def start(self) -> None:
+        for provider in PROVIDERS:
+            self.client(provider)
+        logger.info(f"🔌 Gateway clients ready: {', '.join(PROVIDERS)}")
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for provider, (client, _) in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ Closing {provider} gateway client failed: {e}")
+
+
+# Single instance shared by every adapter
+gateway_transport = GatewayTransport()
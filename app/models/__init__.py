@@ -20,9 +20,12 @@ from .transport_request import TransportRequest
 from .chat import ChatRoom, Message
 from .call_session import CallSession
 from .usage_counter import UsageCounter
+from .outbound_notification import OutboundNotification
 
 # 5. Financials & Orchestration
 from .payment import Payment, PaymentStatus
+from .rollup import PaymentDailyRollup, CallDailyRollup
+from .service_config import ServiceConfigOverride
 
 # ---------------------------------------------------------
 # ✅ EXPLICIT EXPORTS (Fixes "Cannot find reference" errors)
@@ -44,4 +47,8 @@ __all__ = [
     "PaymentStatus",
     "UsageCounter",
     "CallSession",
+    "OutboundNotification",
+    "PaymentDailyRollup",
+    "CallDailyRollup",
+    "ServiceConfigOverride",
 ]
\ No newline at end of file
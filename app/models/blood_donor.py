@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func
 from app.database import Base
 
 
@@ -49,3 +49,18 @@ class BloodDonor(Base):
             f"phone={self.phone!r}, blood_type={self.blood_type!r}, "
             f"city={self.city!r})>"
         )
+
+
+# Donor matching: one city's reachable donors (active, with a push token) per
+# index-only scan; city is keyed case/whitespace-insensitively
+Index(
+    "ix_blood_donors_reachable_city",
+    func.lower(func.trim(BloodDonor.city)),
+    BloodDonor.blood_type,
+    BloodDonor.id,
+    postgresql_include=["fcm_token"],
+    postgresql_where=(BloodDonor.is_active.is_(True) & BloodDonor.fcm_token.isnot(None)),
+)
+
+# Donor list keyset: optional blood_type equality, then id
+Index("ix_blood_donors_blood_type_id", BloodDonor.blood_type, BloodDonor.id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func, true
 from app.database import Base
 
 
@@ -23,17 +23,23 @@ class BloodRequest(Base):
     blood_type = Column(String(5), nullable=False, index=True)
     needed_units = Column(Integer, default=1, nullable=False)
     hospital = Column(String(150), nullable=True)
-    urgent = Column(Boolean, default=True)
+    # NOT NULL: it leads the feed's keyset order, where NULL would break (a, b) < (x, y)
+    urgent = Column(Boolean, default=True, server_default=true(), nullable=False)
 
     # ✅ Request Lifecycle Management
     # Standard Statuses: PENDING, FULFILLED, EXPIRED, CANCELLED
     status = Column(String(20), default="PENDING", nullable=False, index=True)
 
+    # Source document id for rows loaded by app.tasks.bulk_import (NULL for
+    # requests created through the API); the merge key for re-imports
+    external_id = Column(String(128), nullable=True)
+
     # ✅ Timestamps: Crucial for Janitor tasks and UI sorting
     # Added index=True to created_at to speed up "find expired" queries
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
+        nullable=False,
         index=True
     )
 
@@ -43,4 +49,11 @@ class BloodRequest(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         onupdate=func.now()
-    )
\ No newline at end of file
+    )
+
+
+# Global feed keyset: status equality, then (urgent, created_at, id) all DESC
+Index("ix_blood_requests_feed", BloodRequest.status, BloodRequest.urgent, BloodRequest.created_at, BloodRequest.id)
+
+# Bulk import merge key (INSERT ... ON CONFLICT (external_id)); NULLs never conflict
+Index("uq_blood_requests_external_id", BloodRequest.external_id, unique=True)
@@ -53,7 +53,12 @@ class Message(Base):
     content = Column(Text, nullable=False)
 
     # ✅ Optimization: Index on created_at for fast 'load more' pagination
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     # Relationships
-    room = relationship("ChatRoom", back_populates="messages")
\ No newline at end of file
+    room = relationship("ChatRoom", back_populates="messages")
+
+    # History pages: one room in (created_at, id) keyset order
+    __table_args__ = (
+        Index("ix_messages_room_created", "room_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, JSON, String, func, Enum as SAEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class NotificationStatus(str, enum.Enum):
+    PENDING = "PENDING"  # Waiting for (or between) delivery attempts
+    SENT = "SENT"        # Accepted by FCM
+    DEAD = "DEAD"        # Dead-lettered: retries exhausted, expired or rejected
+
+
+class NotificationKind(str, enum.Enum):
+    TOKEN = "TOKEN"  # Single device push
+    TOPIC = "TOPIC"  # FCM topic broadcast
+    CALL = "CALL"    # High-priority RTC call signal (data-only, TTL 0)
+    DONOR = "DONOR"  # Donor alert to a token or the 'donation' topic (high priority)
+
+
+# ----------------------------
+# Outbound Push Queue
+# ----------------------------
+# Producers (NotificationService.enqueue_*) insert rows; the consumer pool
+# in app.services.notification_queue claims due rows with SKIP LOCKED.
+# A claim pushes next_attempt_at forward by a lease, so a worker that dies
+# mid-send simply lets the row become due again.
+
+class OutboundNotification(Base):
+    __tablename__ = "outbound_notifications"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    kind: Mapped[NotificationKind] = mapped_column(SAEnum(NotificationKind, native_enum=False), nullable=False)
+    # Device token or topic name
+    target: Mapped[str] = mapped_column(String(512), nullable=False)
+    # {"title", "body", "data"}
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+    status: Mapped[NotificationStatus] = mapped_column(
+        SAEnum(NotificationStatus, native_enum=False),
+        default=NotificationStatus.PENDING,
+        server_default=NotificationStatus.PENDING.name,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Call signals are worthless once the caller has hung up
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<OutboundNotification {self.id} {self.kind} {self.status} attempts={self.attempts}>"
+
+
+# Consumer claim: due PENDING rows in next_attempt_at order
+Index(
+    "ix_outbound_notifications_due",
+    OutboundNotification.next_attempt_at,
+    postgresql_where=(OutboundNotification.status == NotificationStatus.PENDING),
+)
+
+# Dead-letter inspection / replay
+Index(
+    "ix_outbound_notifications_dead",
+    OutboundNotification.created_at,
+    postgresql_where=(OutboundNotification.status == NotificationStatus.DEAD),
+)
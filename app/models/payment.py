@@ -148,5 +148,14 @@ Index("ix_payments_user_history", Payment.user_id, Payment.service_type, Payment
 # Optimization for the Background Janitor (finds expired PENDING payments)
 Index("ix_payments_janitor_sweep", Payment.status, Payment.expires_at)
 
+# Dashboard "today" aggregates (SUCCESS confirmed since midnight)
+Index("ix_payments_status_confirmed", Payment.status, Payment.confirmed_at)
+
+# Reconciliation keyset pages: PENDING per provider in (created_at, id) order
+Index("ix_payments_status_provider_created", Payment.status, Payment.provider, Payment.created_at, Payment.id)
+
+# Dashboard keyset pages without filters: newest first
+Index("ix_payments_created", Payment.created_at, Payment.id)
+
 # High-speed check for existing provider IDs to prevent fraud
 Index("ix_payments_duplicate_tx_check", Payment.provider, Payment.provider_tx_id)
\ No newline at end of file
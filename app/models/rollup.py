@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, Numeric, String, func, Enum as SAEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.payment import PaymentProvider, ServiceType
+
+
+# ----------------------------
+# Daily Rollups (Analytics)
+# ----------------------------
+# Maintained incrementally by confirm_payment / refund_payment /
+# CallManager.end_session, and rebuilt per day by app.tasks.rollups.
+# Dashboard and payout queries read O(days) rows from here instead of
+# scanning payments / call_sessions history.
+
+class PaymentDailyRollup(Base):
+    """One row per (confirmation day, service, provider)."""
+    __tablename__ = "payment_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    service_type: Mapped[ServiceType] = mapped_column(
+        SAEnum(ServiceType, native_enum=False), primary_key=True
+    )
+    provider: Mapped[PaymentProvider] = mapped_column(
+        SAEnum(PaymentProvider, native_enum=False), primary_key=True
+    )
+
+    # Currently SUCCESS payments confirmed on `day`
+    success_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    success_amount: Mapped[float] = mapped_column(Numeric(14, 2), default=0, server_default="0", nullable=False)
+    # Of those, auto-verified via SMS extraction (dashboard "bypass")
+    auto_match_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # Payments confirmed on `day` and later REFUNDED
+    refunded_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    refunded_amount: Mapped[float] = mapped_column(Numeric(14, 2), default=0, server_default="0", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<PaymentDailyRollup(day={self.day}, service={self.service_type}, provider={self.provider})>"
+
+
+class CallDailyRollup(Base):
+    """One row per (call day, callee type, callee)."""
+    __tablename__ = "call_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    callee_type: Mapped[str] = mapped_column(String(64), primary_key=True)
+    callee_id: Mapped[str] = mapped_column(String(128), primary_key=True, index=True)
+
+    completed_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Duration of COMPLETED calls only (payout basis)
+    total_duration_seconds: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<CallDailyRollup(day={self.day}, callee={self.callee_id})>"
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, Sequence, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+# Every write takes the next value, so max(version) identifies the whole configuration
+SERVICE_CONFIG_VERSION_SEQ = Sequence("service_config_version_seq")
+
+
+# ----------------------------
+# Runtime Pricing Overrides
+# ----------------------------
+# One row per service. A NULL column means "use the environment default"
+# (FEE_* / LIMIT_* / PAYMENT_ENABLED_* / *_PROMO_MESSAGE). Workers cache the
+# overrides in ServiceRegistry and reload when app.services.service_config
+# announces a higher version.
+
+class ServiceConfigOverride(Base):
+    __tablename__ = "service_config_overrides"
+
+    service_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    base_fee: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    free_limit: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    is_enabled: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    promo_message: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_by: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ServiceConfigOverride {self.service_key} v{self.version}>"
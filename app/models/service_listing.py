@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import Column, String, Float, Boolean, DateTime, Text, ForeignKey, func, Index
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, String, Float, Boolean, DateTime, Text, ForeignKey, func, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -21,6 +21,18 @@ class ServiceUser(Base):
     city = Column(String, nullable=False, index=True)
     profile_image = Column(Text, nullable=True)
 
+    # ✅ Search: weighted name (A) > role (B) > city (C), maintained by Postgres
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(role, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(city, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+
     # Relationship to their created requests
     listings = relationship(
         "ServiceListing",
@@ -30,6 +42,11 @@ class ServiceUser(Base):
     )
 
 
+# Full-text search over providers (trigram index on full_name lives in the
+# migration: it needs the pg_trgm extension, which create_all cannot assume)
+Index("ix_service_users_search", ServiceUser.search_vector, postgresql_using="gin")
+
+
 class ServiceListing(Base):
     """
     POLYMORPHIC CORE: The single switchboard for all service requests.
@@ -55,6 +72,18 @@ class ServiceListing(Base):
     price_offered = Column(Float, default=0.0)
     details = Column(JSONB, nullable=False, server_default='{}')
 
+    # ✅ Search: weighted title (A) > service type (B) > city (C), maintained by Postgres
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', replace(coalesce(service_type, ''), '-', ' ')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(location_city, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+
     # Timestamps & Expiry
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -67,6 +96,7 @@ class ServiceListing(Base):
     # ✅ Performance: Optimized Live Feed and Table Meta
     __table_args__ = (
         Index("ix_active_published_listings", "service_type", "is_published", "status"),
+        Index("ix_service_listings_search", "search_vector", postgresql_using="gin"),
         {"extend_existing": True}
     )
 
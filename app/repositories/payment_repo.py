@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, Dict, Any
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
 # ✅ Added 'func' to the main sqlalchemy import
@@ -18,6 +18,9 @@ class PaymentRepository:
     Ensures that payments move strictly through PENDING -> SUCCESS/FAILED.
     """
 
+    # Terminal states are immutable
+    TERMINAL_STATES = (PaymentStatus.SUCCESS, PaymentStatus.FAILED)
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -64,19 +67,21 @@ class PaymentRepository:
         State Machine Guard: Atomic update that prevents altering terminal transactions.
         If a payment is already SUCCESS, it cannot be changed back to FAILED or PENDING.
         """
-        # Terminal states are immutable
-        terminal_states = [PaymentStatus.SUCCESS, PaymentStatus.FAILED]
+        values = {
+            "status": new_status,
+            "provider_tx_id": provider_tx_id or Payment.provider_tx_id,
+            # ✅ func.now() ensures the DB timestamp is used
+            "updated_at": func.now(),
+        }
+        if new_status == PaymentStatus.SUCCESS:
+            # The rollups bucket a confirmation by this day
+            values["confirmed_at"] = func.coalesce(Payment.confirmed_at, func.now())
 
         stmt = (
             update(Payment)
             .where(Payment.id == payment_id)
-            .where(Payment.status.notin_(terminal_states))
-            .values(
-                status=new_status,
-                provider_transaction_id=provider_tx_id or Payment.provider_transaction_id,
-                # ✅ func.now() ensures the DB timestamp is used
-                updated_at=func.now()
-            )
+            .where(Payment.status.notin_(self.TERMINAL_STATES))
+            .values(**values)
             .returning(Payment)
         )
 
@@ -90,6 +95,43 @@ class PaymentRepository:
         logger.info(f"⚠️ Update skipped for {payment_id}: Payment is already finalized or missing.")
         return None
 
+    @classmethod
+    def build_bulk_status_update(cls, payment_ids: Sequence[UUID], new_status: PaymentStatus):
+        """
+        update_status for many rows in one statement, one round trip. Only rows
+        still PENDING move: the reconciler read them as PENDING, and one that was
+        expired, cancelled or refunded since must not be revived by a late
+        provider answer. SUCCESS also stamps confirmed_at (kept if already set).
+        """
+        values = {"status": new_status, "updated_at": func.now()}
+        if new_status == PaymentStatus.SUCCESS:
+            values["confirmed_at"] = func.coalesce(Payment.confirmed_at, func.now())
+
+        return (
+            update(Payment)
+            .where(Payment.id.in_(list(payment_ids)))
+            .where(Payment.status == PaymentStatus.PENDING)
+            .values(**values)
+            .returning(
+                Payment.id,
+                Payment.service_type,
+                Payment.provider,
+                Payment.amount,
+                Payment.confirmed_at,
+                Payment.metadata_json,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def update_status_many(self, payment_ids: Sequence[UUID], new_status: PaymentStatus) -> List[Any]:
+        """Returns the rows that actually transitioned (ones no longer PENDING are skipped)."""
+        if not payment_ids:
+            return []
+        result = await self.db.execute(self.build_bulk_status_update(payment_ids, new_status))
+        rows = result.all()
+        logger.info(f"✅ {len(rows)}/{len(payment_ids)} payment(s) transitioned to {new_status}")
+        return rows
+
     async def get_by_provider_ref(self, reference: str) -> Optional[Payment]:
         """Essential for Webhook processing from mobile money providers (MTN/Orange)."""
         stmt = select(Payment).where(Payment.provider_transaction_id == reference)
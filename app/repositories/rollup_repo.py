@@ -0,0 +1,203 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import Date, and_, case, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.call_session import CallSession, CallStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.rollup import CallDailyRollup, PaymentDailyRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_day(moment: datetime) -> date:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).date()
+
+
+def _day_bounds(start: date, end: date):
+    """[start 00:00 UTC, end+1 00:00 UTC) for timestamp range filters."""
+    lower = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    return lower, upper
+
+
+def _is_auto_match(payment: Payment) -> bool:
+    return (payment.metadata_json or {}).get("verification_mode") == "AUTO_MATCH"
+
+
+class RollupRepository:
+    """
+    Maintains payment_daily_rollups and call_daily_rollups.
+
+    Incremental writers are additive upserts executed inside the caller's
+    transaction, so a rollup bump commits (or rolls back) with the status
+    change that caused it. Rebuilds recompute whole days from raw rows.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # =========================================================
+    # INCREMENTAL (hot path)
+    # =========================================================
+    @staticmethod
+    def _additive_upsert(model, keys: dict, deltas: dict):
+        stmt = insert(model).values(**keys, **deltas)
+        return stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                **{col: getattr(model, col) + stmt.excluded[col] for col in deltas},
+                "updated_at": func.now(),
+            },
+        )
+
+    def _payment_delta_stmt(self, payment: Payment, sign: int, refunded: bool = False):
+        amount = float(payment.amount or 0)
+        deltas = {
+            "success_count": sign,
+            "success_amount": sign * amount,
+            "auto_match_count": sign if _is_auto_match(payment) else 0,
+        }
+        if refunded:
+            deltas.update({"refunded_count": 1, "refunded_amount": amount})
+
+        keys = {
+            "day": _utc_day(payment.confirmed_at),
+            "service_type": payment.service_type,
+            "provider": payment.provider,
+        }
+        return self._additive_upsert(PaymentDailyRollup, keys, deltas)
+
+    async def record_payment_confirmed(self, payment: Payment) -> None:
+        """Call after a payment transitions into SUCCESS (confirmed_at set)."""
+        await self.db.execute(self._payment_delta_stmt(payment, sign=1))
+
+    async def record_payments_confirmed(self, payments: Iterable[Any]) -> None:
+        """
+        Bulk form of record_payment_confirmed for batch transitions
+        (e.g. reconciliation): one upsert per (day, service, provider).
+        """
+        totals: Dict[tuple, Dict[str, float]] = {}
+        for payment in payments:
+            key = (_utc_day(payment.confirmed_at), payment.service_type, payment.provider)
+            bucket = totals.setdefault(key, {"success_count": 0, "success_amount": 0.0, "auto_match_count": 0})
+            bucket["success_count"] += 1
+            bucket["success_amount"] += float(payment.amount or 0)
+            bucket["auto_match_count"] += 1 if _is_auto_match(payment) else 0
+
+        for (day, service_type, provider), deltas in totals.items():
+            keys = {"day": day, "service_type": service_type, "provider": provider}
+            await self.db.execute(self._additive_upsert(PaymentDailyRollup, keys, deltas))
+
+    async def record_payment_refunded(self, payment: Payment) -> None:
+        """Moves a SUCCESS payment's totals to the refunded columns of its confirmation day."""
+        if payment.confirmed_at is None:
+            return
+        await self.db.execute(self._payment_delta_stmt(payment, sign=-1, refunded=True))
+
+    async def record_call_ended(self, session: CallSession) -> None:
+        """Call after end_session sets a terminal COMPLETED / FAILED status."""
+        completed = session.status == CallStatus.COMPLETED
+        keys = {
+            "day": _utc_day(session.started_at or session.created_at or datetime.now(timezone.utc)),
+            "callee_type": session.callee_type,
+            "callee_id": session.callee_id,
+        }
+        deltas = {
+            "completed_count": 1 if completed else 0,
+            "failed_count": 0 if completed else 1,
+            "total_duration_seconds": (session.duration_seconds or 0) if completed else 0,
+        }
+        await self.db.execute(self._additive_upsert(CallDailyRollup, keys, deltas))
+
+    # =========================================================
+    # REBUILD (catch-up / backfill)
+    # =========================================================
+    async def _lock(self, model) -> None:
+        # Blocks incremental upserts (ROW EXCLUSIVE) until this rebuild commits,
+        # so a confirmation can't land between the DELETE and the re-aggregate.
+        await self.db.execute(text(f"LOCK TABLE {model.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    async def rebuild_payment_days(self, start: date, end: date) -> int:
+        """Recomputes payment rollups for [start, end] from payments. Returns rows written."""
+        lower, upper = _day_bounds(start, end)
+        day = cast(func.timezone("UTC", Payment.confirmed_at), Date)
+        is_success = Payment.status == PaymentStatus.SUCCESS
+        is_refunded = Payment.status == PaymentStatus.REFUNDED
+        auto_matched = Payment.metadata_json["verification_mode"].as_string() == "AUTO_MATCH"
+
+        source = (
+            select(
+                day.label("day"),
+                Payment.service_type,
+                Payment.provider,
+                func.count().filter(is_success),
+                func.coalesce(func.sum(Payment.amount).filter(is_success), 0),
+                func.count().filter(and_(is_success, auto_matched)),
+                func.count().filter(is_refunded),
+                func.coalesce(func.sum(Payment.amount).filter(is_refunded), 0),
+            )
+            .where(
+                Payment.status.in_([PaymentStatus.SUCCESS, PaymentStatus.REFUNDED]),
+                Payment.confirmed_at >= lower,
+                Payment.confirmed_at < upper,
+            )
+            .group_by(day, Payment.service_type, Payment.provider)
+        )
+
+        await self._lock(PaymentDailyRollup)
+        await self.db.execute(
+            delete(PaymentDailyRollup).where(PaymentDailyRollup.day.between(start, end))
+        )
+        result = await self.db.execute(
+            insert(PaymentDailyRollup).from_select(
+                [
+                    "day", "service_type", "provider",
+                    "success_count", "success_amount", "auto_match_count",
+                    "refunded_count", "refunded_amount",
+                ],
+                source,
+            )
+        )
+        return result.rowcount or 0
+
+    async def rebuild_call_days(self, start: date, end: date) -> int:
+        """Recomputes call rollups for [start, end] from call_sessions. Returns rows written."""
+        lower, upper = _day_bounds(start, end)
+        moment = func.coalesce(CallSession.started_at, CallSession.created_at)
+        day = cast(func.timezone("UTC", moment), Date)
+        completed = CallSession.status == CallStatus.COMPLETED
+
+        source = (
+            select(
+                day.label("day"),
+                CallSession.callee_type,
+                CallSession.callee_id,
+                func.count().filter(completed),
+                func.count().filter(CallSession.status == CallStatus.FAILED),
+                func.coalesce(func.sum(case((completed, CallSession.duration_seconds), else_=0)), 0),
+            )
+            .where(
+                CallSession.status.in_([CallStatus.COMPLETED, CallStatus.FAILED]),
+                moment >= lower,
+                moment < upper,
+            )
+            .group_by(day, CallSession.callee_type, CallSession.callee_id)
+        )
+
+        await self._lock(CallDailyRollup)
+        await self.db.execute(
+            delete(CallDailyRollup).where(CallDailyRollup.day.between(start, end))
+        )
+        result = await self.db.execute(
+            insert(CallDailyRollup).from_select(
+                ["day", "callee_type", "callee_id", "completed_count", "failed_count", "total_duration_seconds"],
+                source,
+            )
+        )
+        return result.rowcount or 0
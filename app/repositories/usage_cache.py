@@ -0,0 +1,143 @@
+import logging
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.monitoring import record_usage_cache_lookup
+from app.config import settings
+from app.core.redis import get_shared_redis
+from app.utils.background import SerialTasks
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "usage_cache_writes"
+
+# Post-commit publishes, kept alive and applied in commit order
+_publishes = SerialTasks("usage-cache-publish")
+
+
+class UsageCounterCache:
+    """
+    Write-through cache for (user_id, quota_type) -> used.
+
+    - Backed by the Redis client created in main.lifespan
+    - Every Redis failure degrades to a miss (Postgres stays the source of truth)
+    - Writes made inside a real AsyncSession are deferred until COMMIT,
+      so a rolled-back quota bump never reaches the cache
+    """
+
+    KEY_PREFIX = "usage"
+
+    def __init__(self, client: Any, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds or settings.USAGE_CACHE_TTL_SECONDS
+
+    @classmethod
+    def key(cls, user_id: Any, quota_type: str) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}:{quota_type}"
+
+    # ======================================================
+    # READ
+    # ======================================================
+    async def get(self, user_id: Any, quota_type: str) -> Optional[int]:
+        try:
+            raw = await self.client.get(self.key(user_id, quota_type))
+        except Exception as e:
+            logger.warning(f"Usage cache read failed, using Postgres: {e}")
+            record_usage_cache_lookup("error")
+            return None
+
+        if raw is None:
+            record_usage_cache_lookup("miss")
+            return None
+
+        try:
+            value = int(raw)
+        except (TypeError, ValueError):
+            record_usage_cache_lookup("miss")
+            return None
+
+        record_usage_cache_lookup("hit")
+        return value
+
+    # ======================================================
+    # WRITE
+    # ======================================================
+    async def set(self, user_id: Any, quota_type: str, used: int) -> None:
+        try:
+            await self.client.set(self.key(user_id, quota_type), int(used), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Usage cache write failed: {e}")
+
+    async def fill(self, user_id: Any, quota_type: str, used: int) -> None:
+        """
+        Read-miss fill: SET NX, so a count read before a concurrent write never
+        replaces the value that write published.
+        """
+        try:
+            await self.client.set(self.key(user_id, quota_type), int(used), ex=self.ttl_seconds, nx=True)
+        except Exception as e:
+            logger.warning(f"Usage cache fill failed: {e}")
+
+    async def invalidate(self, user_id: Any, quota_type: str) -> None:
+        try:
+            await self.client.delete(self.key(user_id, quota_type))
+        except Exception as e:
+            logger.warning(f"Usage cache invalidation failed: {e}")
+
+    async def write_through(self, session: Any, user_id: Any, quota_type: str, used: Optional[int]) -> None:
+        """
+        Publishes the post-write counter value.
+
+        Real ORM sessions get the write queued until after_commit; test doubles
+        and sessions without a sync_session are written immediately.
+        """
+        sync_session = getattr(session, "sync_session", None)
+
+        if not isinstance(sync_session, Session):
+            if isinstance(used, int):
+                await self.set(user_id, quota_type, used)
+            else:
+                await self.invalidate(user_id, quota_type)
+            return
+
+        sync_session.info.setdefault(_PENDING_KEY, []).append((self, user_id, quota_type, used))
+
+        if not event.contains(sync_session, "after_commit", _flush_pending_writes):
+            event.listen(sync_session, "after_commit", _flush_pending_writes)
+            event.listen(sync_session, "after_rollback", _discard_pending_writes)
+
+
+# ======================================================
+# SESSION HOOKS
+# ======================================================
+def _flush_pending_writes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    async def _publish():
+        for cache, user_id, quota_type, used in pending:
+            if isinstance(used, int):
+                await cache.set(user_id, quota_type, used)
+            else:
+                await cache.invalidate(user_id, quota_type)
+
+    _publishes.submit(_publish)
+
+
+def _discard_pending_writes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_usage_cache() -> Optional[UsageCounterCache]:
+    """Returns a cache bound to the shared Redis client, or None if Redis is missing."""
+    if not settings.USAGE_CACHE_ENABLED:
+        return None
+
+    client = get_shared_redis()
+    if client is None:
+        return None
+
+    return UsageCounterCache(client)
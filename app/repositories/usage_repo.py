@@ -8,10 +8,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.usage_counter import UsageCounter
 from app.domain.interfaces import IUsageRepository
+from app.repositories.usage_cache import UsageCounterCache, get_usage_cache
 from app.services.registry import registry
 
 logger = logging.getLogger(__name__)
 
+# Free grants store their idempotency key with this prefix, so a retried
+# free request is told apart from a paid record_usage under the same key
+FREE_GRANT_KEY_PREFIX = "free:"
+
 
 class SQLAlchemyUsageRepository(IUsageRepository):
     """
@@ -23,21 +28,19 @@ class SQLAlchemyUsageRepository(IUsageRepository):
     - Strong idempotency handling
     - Clean logging (no noisy crashes)
     - Consistent service normalization
+    - Optional Redis write-through cache for count_uses
     """
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: Optional[UsageCounterCache] = None):
         self.session = session
+        self.cache = cache if cache is not None else get_usage_cache()
 
     # ======================================================
     # INTERNAL HELPERS
     # ======================================================
     def _resolve_service(self, service: str) -> str:
         """Normalize service using registry"""
-        try:
-            meta = registry.get_service_meta(service)
-            return meta.get("quota_type", service)
-        except Exception:
-            return service
+        return registry.quota_type(service)
 
     async def _safe_scalar_one_or_none(self, result: Any) -> Any:
         """
@@ -67,6 +70,11 @@ class SQLAlchemyUsageRepository(IUsageRepository):
     async def count_uses(self, user_id: str, service: str) -> int:
         quota_type = self._resolve_service(service)
 
+        if self.cache is not None:
+            cached = await self.cache.get(user_id, quota_type)
+            if cached is not None:
+                return cached
+
         try:
             stmt = select(UsageCounter.used).where(
                 UsageCounter.user_id == user_id,
@@ -77,14 +85,19 @@ class SQLAlchemyUsageRepository(IUsageRepository):
             value = await self._safe_scalar_one_or_none(result)
 
             if value is None:
-                return 0
+                value = 0
 
             # Handle weird async mocks returning coroutine
             if inspect.isawaitable(value):
                 logger.warning("Awaitable detected in count_uses → returning 0")
                 return 0
 
-            return int(value)
+            used = int(value)
+
+            if self.cache is not None:
+                await self.cache.fill(user_id, quota_type, used)
+
+            return used
 
         except Exception as e:
             logger.error(f"Error counting uses {user_id}/{quota_type}: {e}")
@@ -129,9 +142,13 @@ class SQLAlchemyUsageRepository(IUsageRepository):
                     "idempotency_key": idempotency_key,
                     "request_id": request_id
                 }
-            )
+            ).returning(UsageCounter.used)
 
-            await self.session.execute(upsert_stmt)
+            result = await self.session.execute(upsert_stmt)
+
+            if self.cache is not None:
+                used = await self._safe_scalar_one_or_none(result)
+                await self.cache.write_through(self.session, user_id, quota_type, used)
 
             logger.info(f"📈 Usage recorded: {user_id} ({quota_type})")
 
@@ -142,7 +159,13 @@ class SQLAlchemyUsageRepository(IUsageRepository):
     # ======================================================
     # IDEMPOTENCY LOOKUP
     # ======================================================
-    async def get_by_idempotency_key(self, key: str) -> Optional[Dict[str, Any]]:
+    async def get_by_idempotency_key(
+        self,
+        key: str,
+        user_id: Optional[str] = None,
+        service: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Row carrying `key`; when given, it must also belong to `user_id` / `service`."""
         if not key:
             return None
 
@@ -150,6 +173,10 @@ class SQLAlchemyUsageRepository(IUsageRepository):
             stmt = select(UsageCounter).where(
                 UsageCounter.idempotency_key == key
             )
+            if user_id is not None:
+                stmt = stmt.where(UsageCounter.user_id == user_id)
+            if service is not None:
+                stmt = stmt.where(UsageCounter.service == self._resolve_service(service))
 
             result = await self.session.execute(stmt)
             row = await self._safe_scalar_one_or_none(result)
@@ -168,45 +195,91 @@ class SQLAlchemyUsageRepository(IUsageRepository):
             return None
 
     # ======================================================
-    # FREE USAGE CONSUMPTION
+    # FREE USAGE CONSUMPTION (SINGLE STATEMENT)
     # ======================================================
+    def _conditional_consume_stmt(
+        self,
+        user_id: str,
+        quota_type: str,
+        free_limit: int,
+        idempotency_key: Optional[str] = None,
+        request_id: Optional[str] = None
+    ):
+        """
+        INSERT ... ON CONFLICT DO UPDATE ... WHERE used < :limit RETURNING used
+
+        The row lock taken by ON CONFLICT serializes concurrent consumers,
+        so the WHERE guard is evaluated against the latest committed count.
+        No row comes back when the limit is already reached.
+        """
+        stmt = insert(UsageCounter).values(
+            user_id=user_id,
+            service=quota_type,
+            used=1,
+            idempotency_key=idempotency_key,
+            request_id=request_id
+        )
+
+        set_ = {"used": UsageCounter.used + 1}
+        if idempotency_key:
+            set_["idempotency_key"] = idempotency_key
+        if request_id:
+            set_["request_id"] = request_id
+
+        return stmt.on_conflict_do_update(
+            index_elements=["user_id", "service"],
+            set_=set_,
+            where=UsageCounter.used < free_limit
+        ).returning(UsageCounter.used)
+
     async def try_consume_free_usage(
         self,
         user_id: str,
         service: str,
-        free_limit: int
+        free_limit: int,
+        idempotency_key: Optional[str] = None,
+        request_id: Optional[str] = None
     ) -> bool:
 
         quota_type = self._resolve_service(service)
 
         try:
-            current_used = await self.count_uses(user_id, service)
-
-            try:
-                free_limit = int(free_limit)
-            except (TypeError, ValueError):
-                free_limit = 0
-
-            if current_used < free_limit:
-                stmt = insert(UsageCounter).values(
-                    user_id=user_id,
-                    service=quota_type,
-                    used=1
-                )
+            free_limit = int(free_limit)
+        except (TypeError, ValueError):
+            free_limit = 0
+
+        # The INSERT branch would grant a first use, so a zero quota never touches the DB
+        if free_limit <= 0:
+            logger.info(f"🚫 No free quota for: {user_id} ({quota_type})")
+            return False
+
+        try:
+            # ✅ IDEMPOTENCY GUARD: only a free grant of this user and service, under
+            # this key, makes the retry free; a paid record_usage stores the bare key
+            free_key = f"{FREE_GRANT_KEY_PREFIX}{idempotency_key}" if idempotency_key else None
+            if free_key:
+                existing = await self.get_by_idempotency_key(free_key, user_id=user_id, service=service)
+                if existing:
+                    logger.info(f"♻️ Duplicate free usage ignored: {idempotency_key}")
+                    return True
 
-                upsert_stmt = stmt.on_conflict_do_update(
-                    index_elements=["user_id", "service"],
-                    set_={"used": UsageCounter.used + 1}
+            result = await self.session.execute(
+                self._conditional_consume_stmt(
+                    user_id, quota_type, free_limit, free_key, request_id
                 )
+            )
+            used = await self._safe_scalar_one_or_none(result)
 
-                await self.session.execute(upsert_stmt)
+            if used is None:
+                logger.info(f"🚫 Free limit reached: {user_id} ({quota_type})")
+                return False
 
-                logger.info(f"✅ Free usage consumed: {user_id} ({quota_type})")
-                return True
+            if self.cache is not None:
+                await self.cache.write_through(self.session, user_id, quota_type, used)
 
-            logger.info(f"🚫 Free limit reached: {user_id} ({quota_type})")
-            return False
+            logger.info(f"✅ Free usage consumed: {user_id} ({quota_type}) → {used}/{free_limit}")
+            return True
 
         except Exception as e:
             logger.error(f"💥 Failed to consume free usage: {e}")
-            raise RuntimeError(str(e))
\ No newline at end of file
+            raise RuntimeError(str(e))
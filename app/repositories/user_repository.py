@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # ✅ Synchronized with the unified 2026 Model
 from app.models.service_listing import ServiceUser
+from app.services.autocomplete import autocomplete_index, service_user_entries
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,7 @@ class UserRepository:
         )
         self.session.add(user)
         await self.session.flush()
+        await autocomplete_index.track(self.session, [], service_user_entries(user))
         return user
 
     async def update_user(self, user_id: uuid.UUID, **kwargs) -> Optional[ServiceUser]:
@@ -66,6 +68,11 @@ class UserRepository:
         if not kwargs:
             return await self.get_user_by_id(user_id)
 
+        # Name/city feed autocomplete: snapshot them before the UPDATE
+        before = None
+        if {"full_name", "city"} & kwargs.keys():
+            before = service_user_entries(await self.get_user_by_id(user_id))
+
         stmt = (
             update(ServiceUser)
             .where(ServiceUser.id == user_id)
@@ -78,6 +85,8 @@ class UserRepository:
 
         if updated_user:
             logger.debug(f"👤 User {user_id} profile updated.")
+            if before is not None:
+                await autocomplete_index.track(self.session, before, service_user_entries(updated_user))
 
         return updated_user
 
@@ -101,6 +110,9 @@ class UserRepository:
         """
         Removes user and cascades deletions to ServiceListings.
         """
+        before = service_user_entries(await self.get_user_by_id(user_id))
         stmt = delete(ServiceUser).where(ServiceUser.id == user_id)
         result = await self.session.execute(stmt)
+        if result.rowcount > 0:
+            await autocomplete_index.track(self.session, before, [])
         return result.rowcount > 0
\ No newline at end of file
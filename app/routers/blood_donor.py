@@ -1,6 +1,6 @@
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,9 +13,13 @@ from app.schemas.blood_donors import (
     BloodDonorUpdate,
     BloodDonor as BloodDonorOut,
 )
+from app.services.donor_matching import compatible_donor_types, donor_matcher
+from app.utils.pagination import InvalidCursor, Keyset, SortKey, set_page_headers
 
 logger = logging.getLogger(__name__)
 
+DONORS_KEYSET = Keyset("blood_donors", SortKey(BloodDonorModel.id))
+
 # Versioning: Prefix set to /v1/blood-donors
 router = APIRouter(prefix="/blood-donors", tags=["BloodDonors"])
 
@@ -24,22 +28,37 @@ router = APIRouter(prefix="/blood-donors", tags=["BloodDonors"])
 # -------------------------------------------------
 @router.get("/", response_model=List[BloodDonorOut])
 async def list_donors(
-        skip: int = 0,
+        response: Response,
+        skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
         limit: int = 100,
         blood_type: Optional[str] = Query(None, description="Filter by type, e.g., 'O+' or 'UNKNOWN'"),
+        compatible: bool = Query(False, description="Match every donor type that can give to blood_type"),
         city: Optional[str] = Query(None, description="Filter by city"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        include_total: bool = Query(False, description="Send X-Total-Count (approximate on large lists)"),
         db: AsyncSession = Depends(get_db),
         current_user=Depends(get_current_user)
 ):
-    query = select(BloodDonorModel).offset(skip).limit(limit).order_by(BloodDonorModel.id)
+    query = select(BloodDonorModel)
 
-    if blood_type:
+    if blood_type and compatible:
+        query = query.where(BloodDonorModel.blood_type.in_(compatible_donor_types(blood_type)))
+    elif blood_type:
         query = query.where(BloodDonorModel.blood_type == blood_type.upper())
     if city:
         query = query.where(BloodDonorModel.city.ilike(f"%{city}%"))
 
-    result = await db.execute(query)
-    return result.scalars().all()
+    filters = {"blood_type": blood_type and blood_type.upper(), "compatible": compatible, "city": city}
+    try:
+        page = await DONORS_KEYSET.fetch(
+            db, query, limit, cursor, filters=filters,
+            offset=skip, with_total=include_total,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    set_page_headers(response, page)
+    return page.items
 
 # -------------------------------------------------
 # GET SINGLE DONOR
@@ -72,6 +91,7 @@ async def create_donor(
     try:
         await db.commit()
         await db.refresh(new_donor)
+        donor_matcher.invalidate(new_donor.city)
         return new_donor
     except IntegrityError as e:
         await db.rollback()
@@ -96,6 +116,7 @@ async def update_donor(
     if not donor:
         raise HTTPException(status_code=404, detail="Donor not found")
 
+    previous_city = donor.city
     update_data = donor_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(donor, field, value.upper() if field == "blood_type" and value else value)
@@ -103,6 +124,7 @@ async def update_donor(
     try:
         await db.commit()
         await db.refresh(donor)
+        donor_matcher.invalidate(previous_city, donor.city)
         return donor
     except IntegrityError:
         await db.rollback()
@@ -126,6 +148,7 @@ async def delete_donor(
     try:
         await db.delete(donor)
         await db.commit()
+        donor_matcher.invalidate(donor.city)
     except Exception as e:
         await db.rollback()
         logger.error(f"Deletion failed for donor {donor_id}: {e}")
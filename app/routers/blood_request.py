@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ✅ Dependencies
@@ -15,6 +15,7 @@ from app.crud.blood_request import get_blood_requests
 
 # ✅ Service Layer
 from app.services.blood_request_service import BloodRequestService
+from app.utils.pagination import InvalidCursor, set_page_headers
 
 logger = logging.getLogger(__name__)
 
@@ -64,13 +65,22 @@ async def create_blood_request_endpoint(
     response_model=List[BloodRequestOut]
 )
 async def list_all_blood_requests(
-    skip: int = 0,
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Send X-Total-Count (approximate on large lists)"),
     current_user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Returns global blood request feed (paginated).
+    Returns global blood request feed (cursor-paginated via X-Next-Cursor).
     """
 
-    return await get_blood_requests(db, skip=skip, limit=limit)
\ No newline at end of file
+    try:
+        page = await get_blood_requests(db, skip=skip, limit=limit, cursor=cursor, with_total=include_total)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    set_page_headers(response, page)
+    return page.items
\ No newline at end of file
@@ -1,13 +1,21 @@
 from __future__ import annotations
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status, HTTPException
-from typing import List, Dict
+import time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status, HTTPException, Query, Response
+from typing import Any, List, Dict, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import AsyncSessionLocal, get_async_session
-from app.crud.chat import get_or_create_room, create_message
+from app.api.endpoints.monitoring import record_chat_fanout, record_chat_slow_client
+from app.config import settings
+from app.database import get_async_session
+from app.crud.chat import get_or_create_room, list_messages
 from app.schemas.chat import ChatRoomCreate, ChatRoomOut, MessageCreate, MessageOut
 from app.api.dependencies import get_current_user  # Used for REST endpoints
+from app.services.chat_broadcast import LocalChatBroadcast
+from app.services.chat_writer import chat_writer
+from app.utils.pagination import InvalidCursor, set_page_headers
 
 logger = logging.getLogger(__name__)
 
@@ -18,39 +26,154 @@ router = APIRouter(prefix="/chat", tags=["Chat & Signaling"])
 # -----------------------------
 # 1. Connection Manager
 # -----------------------------
+def _room_size_label(size: int) -> str:
+    # Fan-out metrics are labelled by room size, not room id (unbounded cardinality)
+    if size <= 1:
+        return "1"
+    if size <= 10:
+        return "2-10"
+    if size <= 100:
+        return "11-100"
+    return "100+"
+
+
+class ClientSender:
+    """
+    One socket's outbound side: a bounded queue of pre-serialized frames and a
+    writer task that drains it, so a slow client only ever delays itself.
+
+    When the queue is full the slow-consumer policy applies
+    (CHAT_SLOW_CLIENT_POLICY): "drop_oldest" discards the oldest queued
+    frame (history still has it), "disconnect" closes the socket with 1013
+    so the client reconnects and reloads history.
+    """
+
+    def __init__(self, manager: "ConnectionManager", room_id: int, ws: WebSocket,
+                 queue_size: Optional[int] = None, policy: Optional[str] = None):
+        self.manager = manager
+        self.room_id = room_id
+        self.ws = ws
+        self.policy = (policy or settings.CHAT_SLOW_CLIENT_POLICY).lower()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.CHAT_CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name=f"chat-send-{room_id}")
+
+    def offer(self, frame: str, enqueued_at: float, size_label: str) -> None:
+        """Queues a frame without waiting; applies the slow-consumer policy when full."""
+        if self._closing:
+            return
+        if self.queue.full():
+            if self.policy == "disconnect":
+                record_chat_slow_client("disconnected")
+                logger.warning(f"⚠️ [CHAT] Slow client in room {self.room_id}; disconnecting")
+                self._closing = True
+                asyncio.ensure_future(self._kick())
+                return
+            self.queue.get_nowait()
+            self.dropped += 1
+            record_chat_slow_client("dropped")
+        self.queue.put_nowait((frame, enqueued_at, size_label))
+
+    async def _run(self) -> None:
+        while True:
+            frame, enqueued_at, size_label = await self.queue.get()
+            try:
+                await self.ws.send_text(frame)
+            except Exception as e:
+                logger.error(f"Failed to send broadcast to a client: {e}")
+                # Auto-cleanup failed connections
+                self._closing = True
+                await self.manager.disconnect(self.room_id, self.ws)
+                return
+            record_chat_fanout(size_label, time.monotonic() - enqueued_at)
+
+    async def _kick(self) -> None:
+        await self.manager.disconnect(self.room_id, self.ws)
+        try:
+            await asyncio.wait_for(self.ws.close(code=status.WS_1013_TRY_AGAIN_LATER), timeout=5)
+        except Exception:
+            pass  # already gone or too stuck to close cleanly
+
+    def stop(self) -> None:
+        self._closing = True
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
 class ConnectionManager:
     """
     Orchestrates real-time message broadcasting for modular service requests.
+
+    Holds this worker's sockets per room; broadcasts go through the backend
+    (Redis pub/sub across workers, or in-memory for a single process), which
+    calls back into deliver_local on every worker with sockets in the room.
+    The backend follows room membership: joined with the first local socket,
+    left with the last.
+
+    deliver_local serializes a message once and hands the frame to each
+    socket's ClientSender without waiting on any socket.
     """
 
-    def __init__(self):
+    def __init__(self, backend: Optional[LocalChatBroadcast] = None):
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.senders: Dict[Tuple[int, WebSocket], ClientSender] = {}
+        self.backend = backend or LocalChatBroadcast()
+        self.backend.bind(self.deliver_local)
+
+    async def set_backend(self, backend: LocalChatBroadcast):
+        """Swaps the broadcast backend (at startup) and re-joins rooms that already have sockets."""
+        await self.backend.stop()
+        backend.bind(self.deliver_local)
+        await backend.start()
+        self.backend = backend
+        for room_id in list(self.active_connections):
+            await backend.join(room_id)
+
+    async def close(self):
+        await self.backend.stop()
+        for sender in self.senders.values():
+            sender.stop()
+        self.senders.clear()
 
     async def connect(self, room_id: int, ws: WebSocket):
         await ws.accept()
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(ws)
+        connections = self.active_connections.setdefault(room_id, [])
+        connections.append(ws)
+        self.senders[(room_id, ws)] = ClientSender(self, room_id, ws)
+        if len(connections) == 1:
+            await self.backend.join(room_id)
 
-    def disconnect(self, room_id: int, ws: WebSocket):
+    async def disconnect(self, room_id: int, ws: WebSocket):
+        sender = self.senders.pop((room_id, ws), None)
+        if sender is not None:
+            sender.stop()
         if room_id in self.active_connections:
             try:
                 self.active_connections[room_id].remove(ws)
-                if not self.active_connections[room_id]:
-                    del self.active_connections[room_id]
             except ValueError:
-                pass
+                return
+            if not self.active_connections[room_id]:
+                del self.active_connections[room_id]
+                # Last local socket gone: stop receiving this room's traffic
+                await self.backend.leave(room_id)
 
-    async def broadcast(self, room_id: int, message_dict: dict):
-        if room_id in self.active_connections:
-            # Create a copy of the list to avoid "RuntimeError: dictionary changed size"
-            for connection in list(self.active_connections[room_id]):
-                try:
-                    await connection.send_json(message_dict)
-                except Exception as e:
-                    logger.error(f"Failed to send broadcast to a client: {e}")
-                    # Auto-cleanup failed connections
-                    self.disconnect(room_id, connection)
+    async def broadcast(self, room_id: int, message_dict: Dict[str, Any]):
+        """Sends to every socket in the room, on this worker and (via the backend) all others."""
+        await self.backend.publish(room_id, message_dict)
+
+    async def deliver_local(self, room_id: int, message_dict: Dict[str, Any]):
+        connections = self.active_connections.get(room_id)
+        if not connections:
+            return
+        # Same framing as WebSocket.send_json, done once for the whole room
+        frame = json.dumps(message_dict, separators=(",", ":"), ensure_ascii=False)
+        enqueued_at = time.monotonic()
+        size_label = _room_size_label(len(connections))
+        for ws in list(connections):
+            sender = self.senders.get((room_id, ws))
+            if sender is not None:
+                sender.offer(frame, enqueued_at, size_label)
 
 
 manager = ConnectionManager()
@@ -77,10 +200,50 @@ async def open_room(
     return room
 
 
+@router.get("/rooms/{room_id}/messages", response_model=List[MessageOut])
+async def room_history(
+        room_id: int,
+        response: Response,
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        include_total: bool = Query(False, description="Send X-Total-Count (approximate on large rooms)"),
+        current_user=Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Message history for a room, oldest first, cursor-paginated via X-Next-Cursor.
+    """
+    try:
+        page = await list_messages(db, room_id, limit=limit, cursor=cursor, with_total=include_total)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    set_page_headers(response, page)
+    return page.items
+
+
 # -----------------------------
 # 3. WebSocket Endpoint
 # -----------------------------
 
+def _report_unsaved(websocket: WebSocket, message_id: int):
+    """Done-callback for a write-behind message: tells the sender if its batch failed."""
+
+    def _done(persisted):
+        if persisted.cancelled() or persisted.exception() is None:
+            return
+
+        async def _send():
+            try:
+                await websocket.send_json({"error": "Failed to save message", "id": message_id})
+            except Exception:
+                pass  # the socket is already gone
+
+        asyncio.ensure_future(_send())
+
+    return _done
+
+
 @router.websocket("/rooms/{room_id}/ws")
 async def ws_chat(
         room_id: int,
@@ -88,7 +251,11 @@ async def ws_chat(
         token: str | None = None
 ):
     """
-    Real-time WebSocket bridge with per-message transaction handling.
+    Real-time WebSocket bridge.
+
+    Messages get their id and timestamp from the batching chat writer and
+    are broadcast immediately (CHAT_WRITE_BEHIND); the write lands within
+    CHAT_WRITE_FLUSH_MS, and a write that fails is reported to the sender.
     """
     # NOTE: You should ideally verify the 'token' here against Firebase
     # before calling manager.connect() to prevent unauthorized access.
@@ -100,33 +267,31 @@ async def ws_chat(
             # 1. Receive JSON data
             data = await websocket.receive_json()
 
-            # 2. Process transaction in a fresh session scope
-            # This is critical for high-latency/VPN resilience.
-            async with AsyncSessionLocal() as session:
-                try:
-                    data["room_id"] = room_id
+            try:
+                data["room_id"] = room_id
 
-                    # 3. Persistence
-                    msg_in = MessageCreate(**data)
-                    msg = await create_message(session, msg_in)
-                    await session.commit()
-                    await session.refresh(msg)
+                # 2. Persistence (batched; no session per message)
+                msg_in = MessageCreate(**data)
+                msg = await chat_writer.submit(msg_in)
+                if settings.CHAT_WRITE_BEHIND:
+                    msg.persisted.add_done_callback(_report_unsaved(websocket, msg.id))
+                else:
+                    await msg.persisted
 
-                    # 4. Prepare and Broadcast
-                    out = MessageOut.model_validate(msg).model_dump()
-                    out["created_at"] = out["created_at"].isoformat()
+                # 3. Prepare and Broadcast
+                out = MessageOut.model_validate(msg).model_dump()
+                out["created_at"] = out["created_at"].isoformat()
 
-                    await manager.broadcast(room_id, out)
+                await manager.broadcast(room_id, out)
 
-                except Exception as tx_error:
-                    await session.rollback()
-                    logger.error(f"Message transaction failed: {tx_error}")
-                    await websocket.send_json({"error": "Failed to save message"})
+            except Exception as tx_error:
+                logger.error(f"Message transaction failed: {tx_error}")
+                await websocket.send_json({"error": "Failed to save message"})
 
     except WebSocketDisconnect:
         logger.info(f"Client disconnected from room {room_id}")
-        manager.disconnect(room_id, websocket)
+        await manager.disconnect(room_id, websocket)
 
     except Exception as e:
         logger.error(f"WebSocket fatal error in room {room_id}: {e}")
-        manager.disconnect(room_id, websocket)
\ No newline at end of file
+        await manager.disconnect(room_id, websocket)
\ No newline at end of file
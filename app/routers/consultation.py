@@ -2,7 +2,7 @@ import logging
 import uuid
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ✅ Production Standard: Secure identity and database session
@@ -58,6 +58,8 @@ async def start_consultation(
         current_user=Depends(get_current_user),
         amount: Annotated[int, Query(description="Payment amount")] = 500,
         idempotency_key: Annotated[Optional[str], Query(description="Unique idempotency key")] = None,
+        # Preferred over the query parameter: retries carrying it are replayed by IdempotencyMiddleware
+        x_idempotency_key: Annotated[Optional[str], Header(alias="X-Idempotency-Key")] = None,
 ) -> RequestResponse:
     """
     🚀 Production Logic Flow:
@@ -81,7 +83,7 @@ async def start_consultation(
             channel=channel_type,
             recipient_role=recipient_role,
             amount=float(amount),
-            idempotency_key=idempotency_key or f"cons-{uuid.uuid4().hex[:12]}"
+            idempotency_key=x_idempotency_key or idempotency_key or f"cons-{uuid.uuid4().hex[:12]}"
         )
 
         # ✅ Persistence: Commit changes (usage increment) to Neon Postgres
@@ -8,7 +8,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user, get_db
 from app.repositories.usage_repo import SQLAlchemyUsageRepository
-from app.domain.usecases import SERVICE_FREE_LIMITS_SIMPLE as SERVICE_FREE_LIMITS
 from app.schemas.payment import (
     PaymentRequest,
     PaymentResponseOut,
@@ -17,6 +16,7 @@ from app.schemas.payment import (
 )
 
 from app.services.payment_service import PaymentService
+from app.services.registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -40,13 +40,14 @@ async def remaining_doctor_consults(
 
         # 🔥 CRITICAL FIX: use service (this is what test mocks)
         remaining = await PaymentService.get_remaining_free_uses(
+            db=db,
             user_id=target_uid,
             category="doctor"
         )
 
         return FreeUsageResponse(
             remaining=remaining,
-            fee=2000 if remaining == 0 else 0
+            fee=registry.get("doctor").base_fee if remaining == 0 else 0
         )
 
     except Exception as e:
@@ -69,25 +70,22 @@ async def pay_doctor_consult(
 ):
     try:
         usage_repo = SQLAlchemyUsageRepository(db)
-
-        used = await usage_repo.count_uses(current_user.uid, "doctor")
-        free_limit = SERVICE_FREE_LIMITS.get("doctor", 0)
+        # Live pricing: one registry snapshot (settings + runtime overrides) per request
+        doctor = registry.get("doctor")
+        ref = f"DOC-FREE-{uuid.uuid4().hex[:8].upper()}"
 
         # -------------------------------------------------
-        # FREE FLOW
+        # FREE FLOW (single conditional upsert, race-safe)
         # -------------------------------------------------
-        if used < free_limit:
-            ref = f"DOC-FREE-{uuid.uuid4().hex[:8].upper()}"
-
-            await usage_repo.record_usage(
-                user_id=current_user.uid,
-                service="doctor",
-                paid=False,
-                amount=0.0,
-                request_id=ref,
-                idempotency_key=x_idempotency_key
-            )
+        was_consumed = await usage_repo.try_consume_free_usage(
+            user_id=current_user.uid,
+            service="doctor",
+            free_limit=doctor.free_limit,
+            idempotency_key=x_idempotency_key,
+            request_id=ref
+        )
 
+        if was_consumed:
             await db.commit()
 
             return PaymentResponseOut(
@@ -113,7 +111,7 @@ async def pay_doctor_consult(
             user_id=current_user.uid,
             service="doctor",
             paid=True,
-            amount=2000,
+            amount=doctor.base_fee,
             request_id=payment_result.reference,
             idempotency_key=x_idempotency_key
         )
@@ -1,7 +1,7 @@
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, BackgroundTasks, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -14,6 +14,7 @@ from app.crud.healthcare_request import (
     assign_provider,
 )
 from app.crud.healthcare_provider import get_provider_by_id
+from app.utils.pagination import InvalidCursor, set_page_headers
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +59,12 @@ async def create(
 # -------------------------------------------------
 @router.get("/", response_model=List[HealthcareRequest])
 async def list_all(
-        skip: int = 0,
+        response: Response,
+        skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
         limit: int = 100,
         service_type: Optional[str] = Query(None, description="Filter requests by category (e.g., Lab, Transport)"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        include_total: bool = Query(False, description="Send X-Total-Count (approximate on large lists)"),
         db: AsyncSession = Depends(get_db_session),
         current_user = Depends(get_current_user)
 ):
@@ -68,9 +72,14 @@ async def list_all(
     Returns a list of user requests, optionally filtered by service_type.
     """
     try:
-        return await get_healthcare_requests(
-            db, skip=skip, limit=limit, user_id=current_user.uid, service_type=service_type
+        page = await get_healthcare_requests(
+            db, skip=skip, limit=limit, user_id=current_user.uid, service_type=service_type,
+            cursor=cursor, with_total=include_total,
         )
+        set_page_headers(response, page)
+        return page.items
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception:
         logger.exception(f"❌ Failed to list healthcare requests for {current_user.uid}")
         raise HTTPException(
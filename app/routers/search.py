@@ -1,14 +1,12 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy import select, or_
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Query, HTTPException, Response, status
 
 # ✅ Aligned Dependencies
-from app.api.dependencies import get_db
-from app.models import User, ServiceListing
+from app.config import settings
 from app.schemas.search import SearchItem
+from app.services.search_service import InvalidCursor, SearchExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -21,55 +19,59 @@ router = APIRouter(
 
 @router.get("", response_model=List[SearchItem])
 async def global_search(
+        response: Response,
         q: str = Query(..., min_length=1),
-        db: AsyncSession = Depends(get_db)
+        limit: int = Query(settings.SEARCH_DEFAULT_LIMIT, ge=1, le=settings.SEARCH_MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
 ):
     """
     Search across multiple modules (Healthcare, Transport, Blood)
-    Optimized with SQLAlchemy Async.
+    Providers and listings queried in parallel and ranked together, at most
+    `limit` items per page; X-Next-Cursor resumes, X-Search-Partial lists
+    sources that timed out.
     """
     try:
-        search_pattern = f"%{q}%"
-
-        # 1. Search Users (Async)
-        user_stmt = select(User).where(User.full_name.ilike(search_pattern))
-        users_result = await db.execute(user_stmt)
-        users = users_result.scalars().all()
-
-        # 2. Search Services (Async)
-        service_stmt = select(ServiceListing).where(ServiceListing.service_name.ilike(search_pattern))
-        services_result = await db.execute(service_stmt)
-        services = services_result.scalars().all()
+        page = await SearchExecutor().search(q, limit, cursor)
 
         combined_results = []
+        for hit in page.hits:
+            item = hit.item
 
-        # Map Users to SearchItem
-        for u in users:
-            combined_results.append(SearchItem(
-                id=str(u.id),
-                title=u.full_name,
-                subtitle=u.role.capitalize(),
-                type=u.role.lower(),
-                imageUrl=u.profile_image,
-                category=u.role
-            ))
+            # Map Providers to SearchItem
+            if hit.source == "provider":
+                combined_results.append(SearchItem(
+                    id=hit.id,
+                    title=item.full_name,
+                    subtitle=item.role.capitalize(),
+                    type=item.role.lower(),
+                    imageUrl=item.profile_image,
+                    category=item.role,
+                    score=hit.score
+                ))
+                continue
 
-        # Map Services to SearchItem
-        for s in services:
+            # Map Listings to SearchItem
             combined_results.append(SearchItem(
-                id=str(s.id),
-                title=s.service_name,
-                subtitle=s.category.upper(),
-                type=s.category.lower(),
-                imageUrl=s.icon_url,
-                category=s.category
+                id=hit.id,
+                title=item.title,
+                subtitle=item.service_type.upper(),
+                type=item.service_type.lower(),
+                imageUrl=None,
+                category=item.service_type,
+                score=hit.score
             ))
 
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        if page.partial:
+            response.headers["X-Search-Partial"] = ",".join(page.failed_sources)
         return combined_results
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Global search failed for query '{q}': {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Search service temporarily unavailable"
-        )
\ No newline at end of file
+        )
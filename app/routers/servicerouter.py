@@ -1,16 +1,14 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from fastapi import APIRouter, Query, HTTPException, Response, status
 
 # ✅ Standardized Imports
-from app.db.session import get_db
-from app.models.service_listing import ServiceUser, ServiceListing
 from app.schemas import serviceschema
+from app.services.autocomplete import KINDS, autocomplete_index
+from app.services.search_service import InvalidCursor, SearchExecutor
 
 # Use project-standard logger
 log = logging.getLogger("bloodonal")
@@ -24,76 +22,77 @@ router = APIRouter(
 
 @router.get("/search", response_model=List[serviceschema.SearchItemOut])
 async def global_modular_search(
+        response: Response,
         q: str = Query(..., min_length=2, description="Search by name, role, or request title"),
         limit: int = Query(20, ge=1, le=100),
-        db: AsyncSession = Depends(get_db)
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
 ):
     """
     ### 2026 High-Performance Global Search
     Performs asynchronous dual-layer search across Service Providers and Listings.
+    Both layers run in parallel (ranked full-text, GIN-indexed) and are merged
+    by relevance. Next page: X-Next-Cursor; X-Search-Partial lists layers that
+    timed out and will be retried with the cursor.
     """
-    search_pattern = f"%{q}%"
     results = []
 
     try:
-        # --- LAYER 1: PROVIDER SEARCH (ServiceUser) ---
-        provider_stmt = (
-            select(ServiceUser)
-            .where(
-                or_(
-                    ServiceUser.full_name.ilike(search_pattern),
-                    ServiceUser.role.ilike(search_pattern),
-                    ServiceUser.city.ilike(search_pattern)
-                )
-            )
-            .limit(limit)
-        )
-
-        provider_res = await db.execute(provider_stmt)
-        providers = provider_res.scalars().all()
-
-        for p in providers:
-            results.append(serviceschema.SearchItemOut(
-                id=str(p.id),
-                title=p.full_name,
-                subtitle=f"Verified {p.role.title()} in {p.city}",
-                type="provider",
-                imageUrl=getattr(p, "profile_image", None),
-                category=p.role.lower()
-            ))
+        page = await SearchExecutor().search(q, limit, cursor)
 
-        # --- LAYER 2: LISTINGS SEARCH (ServiceListing) ---
-        listing_stmt = (
-            select(ServiceListing)
-            .where(
-                or_(
-                    ServiceListing.title.ilike(search_pattern),
-                    ServiceListing.service_type.ilike(search_pattern),
-                    ServiceListing.location_city.ilike(search_pattern)
-                )
-            )
-            .limit(limit)
-        )
-
-        listing_res = await db.execute(listing_stmt)
-        listings = listing_res.scalars().all()
+        for hit in page.hits:
+            if hit.source == "provider":
+                # --- LAYER 1: PROVIDER (ServiceUser) ---
+                p = hit.item
+                results.append(serviceschema.SearchItemOut(
+                    id=hit.id,
+                    title=p.full_name,
+                    subtitle=f"Verified {p.role.title()} in {p.city}",
+                    type="provider",
+                    imageUrl=getattr(p, "profile_image", None),
+                    category=p.role.lower(),
+                    score=hit.score
+                ))
+            else:
+                # --- LAYER 2: LISTING (ServiceListing) ---
+                l = hit.item
+                results.append(serviceschema.SearchItemOut(
+                    id=hit.id,
+                    title=l.title,
+                    subtitle=f"{l.service_type.replace('-', ' ').title()} - {l.status}",
+                    type="listing",
+                    imageUrl=None,
+                    category=l.service_type,
+                    score=hit.score
+                ))
 
-        for l in listings:
-            results.append(serviceschema.SearchItemOut(
-                id=str(l.id),
-                title=l.title,
-                subtitle=f"{l.service_type.replace('-', ' ').title()} - {l.status}",
-                type="listing",
-                imageUrl=None,
-                category=l.service_type
-            ))
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+        if page.partial:
+            response.headers["X-Search-Partial"] = ",".join(page.failed_sources)
 
         log.info(f"🔍 Search success for '{q}': {len(results)} items found.")
         return results
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         log.error(f"❌ Search Router Error: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="The search engine is currently synchronizing. Please try again."
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/autocomplete", response_model=List[serviceschema.AutocompleteItemOut])
+async def autocomplete(
+        q: str = Query(..., min_length=1, max_length=64, description="What the user has typed so far"),
+        types: Optional[str] = Query(None, description=f"Comma-separated subset of {', '.join(KINDS)}"),
+        limit: int = Query(8, ge=1, le=25, description="Suggestions per type"),
+):
+    """
+    Keystroke suggestions for provider/user names, cities and service types.
+    Served from the in-process prefix index (no database round-trip); empty
+    until the startup build completes.
+    """
+    kinds = [kind.strip() for kind in types.split(",")] if types else None
+    return await autocomplete_index.complete(q, kinds, limit)
@@ -7,7 +7,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.dependencies import get_current_user, get_db
 from app.config import settings
 
-from app.domain.usecases import SERVICE_FREE_LIMITS_SIMPLE as SERVICE_FREE_LIMITS
 from app.repositories.usage_repo import SQLAlchemyUsageRepository
 from app.schemas.payment import (
     PaymentRequest,
@@ -16,6 +15,7 @@ from app.schemas.payment import (
     PaymentStatus,
 )
 from app.services.payment_service import generate_reference
+from app.services.registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -41,17 +41,22 @@ async def remaining_free_taxi_rides(
     target_uid = user_id or current_user.uid
 
     try:
+        # Live pricing: one registry snapshot (settings + runtime overrides) per request
+        taxi = registry.get("taxi")
+        if not taxi.is_enabled:
+            # Payments switched off: rides are free (same promo rule as PaymentService)
+            return FreeUsageResponse(remaining=999, fee=0)
+
         repo = SQLAlchemyUsageRepository(db)
 
         # FIX: safe async usage count
         used = await repo.count_uses(target_uid, "taxi")
 
-        free_limit = SERVICE_FREE_LIMITS.get("taxi", 0)
-        remaining_count = max(0, int(free_limit) - int(used))
+        remaining_count = max(0, taxi.free_limit - int(used))
 
         return FreeUsageResponse(
             remaining=remaining_count,
-            fee=settings.FEE_TAXI_REQUEST if remaining_count == 0 else 0,
+            fee=taxi.base_fee if remaining_count == 0 else 0,
         )
 
     except Exception as e:
@@ -77,14 +82,20 @@ async def pay_for_taxi(
     """
 
     repo = SQLAlchemyUsageRepository(db)
+    taxi = registry.get("taxi")
 
     try:
-        # FIX: correct repo contract (free_limit is correct)
-        was_consumed = await repo.try_consume_free_usage(
-            user_id=current_user.uid,
-            service="taxi",
-            free_limit=SERVICE_FREE_LIMITS.get("taxi", 0),
-        )
+        if not taxi.is_enabled:
+            # Payments switched off: every ride is free, no quota guard
+            await repo.record_usage(user_id=current_user.uid, service="taxi", paid=False, amount=0.0)
+            was_consumed = True
+        else:
+            # FIX: correct repo contract (free_limit is correct)
+            was_consumed = await repo.try_consume_free_usage(
+                user_id=current_user.uid,
+                service="taxi",
+                free_limit=taxi.free_limit,
+            )
 
         if was_consumed:
             await db.commit()
@@ -93,13 +104,13 @@ async def pay_for_taxi(
                 success=True,
                 reference=generate_reference(),
                 status=PaymentStatus.SUCCESS,
-                message="Free taxi ride recorded.",
+                message=(not taxi.is_enabled and taxi.promo_message) or "Free taxi ride recorded.",
             )
 
         # ==================================================
         # Paid fallback flow
         # ==================================================
-        fee = settings.FEE_TAXI_REQUEST
+        fee = taxi.base_fee
         payment_ref = generate_reference()
 
         return PaymentResponseOut(
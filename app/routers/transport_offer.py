@@ -1,13 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ✅ Standardized imports
 from app.api.dependencies import get_db
 from app.schemas.transport_offered import TransportOfferCreate, TransportOffer
 from app.crud.transport_offer import create_transport_offer, get_transport_offers
+from app.utils.pagination import InvalidCursor, set_page_headers
 
 logger = logging.getLogger(__name__)
 
@@ -38,15 +39,22 @@ async def create_transport_offer_endpoint(
 #  LIST OFFERS
 @router.get("", response_model=List[TransportOffer])
 async def list_all_transport_offers(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
     limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Send X-Total-Count (approximate on large lists)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieve a list of available transport offers.
+    Retrieve a list of available transport offers (newest first, cursor-paged).
     """
     try:
-        return await get_transport_offers(db, skip, limit)
+        page = await get_transport_offers(db, skip, limit, cursor=cursor, with_total=include_total)
+        set_page_headers(response, page)
+        return page.items
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching transport offers: {e}")
         raise HTTPException(
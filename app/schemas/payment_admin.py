@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, timezone
 from .payment import PaymentStatus
 
@@ -99,4 +99,69 @@ class ActiveCallReport(BaseModel):
     caller_id: str = Field(..., description="The patient or user UID")
     callee_id: str = Field(..., description="The doctor or nurse UID")
     service_type: str = Field(..., description="Category: doctor, nurse, etc.")
-    duration_current: int = Field(..., description="Elapsed seconds since call start")
\ No newline at end of file
+    duration_current: int = Field(..., description="Elapsed seconds since call start")
+
+# ---------------------------------------------------------
+# 6. RUNTIME PRICING CONFIGURATION
+# ---------------------------------------------------------
+class ServiceConfigUpdate(BaseModel):
+    """
+    Partial override for one service. Omitted fields are left as they are;
+    a field sent as null goes back to its environment default.
+    """
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"base_fee": 300, "promo_message": "Half price this week"}}
+    )
+
+    base_fee: Optional[int] = Field(None, ge=0)
+    free_limit: Optional[int] = Field(None, ge=0)
+    is_enabled: Optional[bool] = None
+    promo_message: Optional[str] = Field(None, max_length=512)
+
+
+class ServiceConfigEntry(BaseModel):
+    """Effective values for one service (environment defaults + overrides)."""
+    key: str
+    base_fee: int
+    free_limit: int
+    is_enabled: bool
+    promo_message: str
+    overridden: List[str] = Field(default_factory=list, description="Fields set at runtime")
+
+
+class ServiceConfigOut(BaseModel):
+    config_version: int
+    services: List[ServiceConfigEntry]
+
+
+# ---------------------------------------------------------
+# 7. SMS AUTO-MATCHING
+# ---------------------------------------------------------
+class SMSMatchRequest(BaseModel):
+    """Raw provider SMS bodies as received on the merchant line, oldest first."""
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"messages": [
+            "You have received 500 FCFA from JOHN (237670000000). TransID: 2589631470"
+        ]}}
+    )
+
+    messages: List[str] = Field(..., min_length=1)
+
+
+class SMSMatchConflict(BaseModel):
+    transaction_id: str
+    provider: str
+    amount: float
+    phone: Optional[str] = None
+    reason: str = Field(..., description="ambiguous | amount_mismatch")
+    payment_ids: List[str]
+
+
+class SMSMatchResponse(BaseModel):
+    received: int
+    indexed: int = Field(..., description="Open payments the SMS were matched against")
+    confirmed: int
+    flagged: int = Field(..., description="Payments moved to AWAITING_VERIFICATION")
+    outcomes: Dict[str, int]
+    conflicts: List[SMSMatchConflict]
+    seconds: float
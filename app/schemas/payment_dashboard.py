@@ -47,9 +47,13 @@ class PaymentListResponse(BaseModel):
     """
     model_config = ConfigDict(from_attributes=True)
 
-    total: int = Field(..., ge=0)
-    limit: int = Field(default=50, le=100)
+    # Only with include_total=true; beyond PAGINATION_EXACT_COUNT_LIMIT rows it is a planner estimate
+    total: Optional[int] = Field(default=None, ge=0)
+    total_is_estimate: bool = False
+    limit: int = Field(default=50, le=200)
     offset: int = Field(default=0, ge=0)
+    # Pass back as ?cursor= for the next page; null on the last page
+    next_cursor: Optional[str] = None
     items: List[PaymentItem]
 
 
@@ -9,6 +9,7 @@ class SearchItem(BaseModel):
     type: str
     imageUrl: Optional[str] = None
     category: str
+    score: Optional[float] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -60,10 +60,18 @@ class SearchItemOut(BaseModel):
     type: str = Field(..., description="'provider' or 'listing'")
     imageUrl: Optional[str] = None
     category: str = Field(..., description="e.g., 'nurse', 'blood-request', 'emergency'")
+    score: Optional[float] = Field(None, description="Relevance, comparable across providers and listings")
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class AutocompleteItemOut(BaseModel):
+    """One suggestion from the in-memory autocomplete index."""
+    type: str = Field(..., description="'provider', 'user', 'city' or 'service_type'")
+    id: str = Field(..., description="Row id for providers/users; normalised value for cities/types")
+    label: str
+
+
 # ✅ Logic for the "Provider" side of the app
 class ServiceAcceptRequest(BaseModel):
     """
@@ -0,0 +1,513 @@
+# app/services/autocomplete.py
+
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.redis import get_shared_redis
+from app.utils.background import SerialTasks
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "autocomplete_changes"
+
+# Post-commit Redis mirroring, kept alive and applied in commit order
+_publishes = SerialTasks("autocomplete-publish")
+
+# Suggestion kinds. Entity kinds are keyed by row id; value kinds by the
+# normalised value and reference-counted (many rows share one city).
+KINDS = ("provider", "user", "city", "service_type")
+VALUE_KINDS = ("city", "service_type")
+
+# (kind, ref, label)
+Entry = Tuple[str, str, str]
+
+_SEP = "\x1f"
+
+# Rows decoded per batch while loading, and keys per sorted run while building:
+# both bound how long the build holds the event loop (or the GIL) at a time
+_LOAD_BATCH = 5_000
+_SORT_RUN = 20_000
+
+
+def normalize(text: str) -> str:
+    """'  Yaoundé  Centre' -> 'yaounde centre' (accents stripped, casefolded, single spaces)."""
+    text = text or ""
+    if text.isascii():
+        # Most names: skip the NFKD pass, it dominates lookup and build time
+        return " ".join(text.lower().split())
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def prefix_keys(label: str) -> List[str]:
+    """One key per word start, so 'Jean Ndongo' completes from 'je' and from 'nd'."""
+    norm = normalize(label)
+    return [norm[i:] for i in range(len(norm)) if i == 0 or norm[i - 1] == " "]
+
+
+# =========================================================
+# 1. IN-MEMORY INDEX
+# =========================================================
+class PrefixIndex:
+    """
+    Sorted array of (key, ref) with bisect lookups.
+
+    A prefix query is one binary search plus a short forward scan, so it
+    costs microseconds at 100k+ entries. Inserts/removals are bisect-based
+    (memmove of the tail), which is fine for CRUD-rate writes.
+    """
+
+    def __init__(self, counted: bool = False):
+        # counted: refs are shared values (cities) that live while any row uses them;
+        # otherwise refs are row ids and add() is an upsert
+        self.counted = counted
+        self._keys: List[Tuple[str, str]] = []
+        self._labels: Dict[str, str] = {}
+        # Normalised label (same object as its first key) for ranking without re-normalising
+        self._norms: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, str]], counted: bool = False) -> "PrefixIndex":
+        """Bulk build: one sort instead of n inserts."""
+        index = cls(counted)
+        for ref, label in entries:
+            if not label:
+                continue
+            if ref in index._counts:
+                if counted:
+                    index._counts[ref] += 1
+                continue
+            index._counts[ref] = 1
+            index._labels[ref] = label
+        keys: List[Tuple[str, str]] = []
+        for ref, label in index._labels.items():
+            label_keys = prefix_keys(label)
+            index._norms[ref] = label_keys[0] if label_keys else ""
+            keys.extend((key, ref) for key in label_keys)
+        # One list.sort() would hold the GIL for the whole sort (seconds at 100k+
+        # names); sorted runs merged in Python let the event loop thread in
+        runs = [sorted(keys[i:i + _SORT_RUN]) for i in range(0, len(keys), _SORT_RUN)]
+        index._keys = list(heapq.merge(*runs))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def snapshot(self) -> Tuple[Dict[str, int], List[Tuple[str, str, str]]]:
+        """({ref: count}, [(key, ref, label)]) for mirroring into Redis."""
+        return dict(self._counts), [(key, ref, self._labels[ref]) for key, ref in self._keys]
+
+    def add(self, ref: str, label: str) -> None:
+        if not label:
+            return
+        if ref in self._counts:
+            if self.counted:
+                self._counts[ref] += 1
+                return
+            if self._labels[ref] == label:
+                return
+            self.remove(ref)
+        self._counts[ref] = 1
+        self._labels[ref] = label
+        keys = prefix_keys(label)
+        self._norms[ref] = keys[0] if keys else ""
+        for key in keys:
+            bisect.insort(self._keys, (key, ref))
+
+    def remove(self, ref: str) -> None:
+        count = self._counts.get(ref)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[ref] = count - 1
+            return
+        del self._counts[ref]
+        label = self._labels.pop(ref)
+        self._norms.pop(ref, None)
+        for key in prefix_keys(label):
+            i = bisect.bisect_left(self._keys, (key, ref))
+            if i < len(self._keys) and self._keys[i] == (key, ref):
+                del self._keys[i]
+
+    def lookup(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """[(ref, label)] whose label has a word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        seen: Set[str] = set()
+        found: List[Tuple[str, str]] = []
+        i = bisect.bisect_left(self._keys, (prefix, ""))
+        # Scan a few times `limit` so whole-label matches can be ranked first
+        scan_cap = limit * 5
+        while i < len(self._keys) and len(found) < scan_cap:
+            key, ref = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if ref not in seen:
+                seen.add(ref)
+                found.append((ref, self._labels[ref]))
+            i += 1
+
+        norms = self._norms
+        found.sort(key=lambda item: (not norms[item[0]].startswith(prefix), len(item[1]), item[1]))
+        return found[:limit]
+
+
+# =========================================================
+# 2. SNAPSHOTS (what a row contributes to the index)
+# =========================================================
+def _value_entry(kind: str, value: Any) -> Optional[Entry]:
+    value = getattr(value, "value", value)  # Enum members
+    if not value:
+        return None
+    return kind, normalize(str(value)), str(value)
+
+
+def provider_entries(provider: Any) -> List[Entry]:
+    """HealthcareProvider -> name, city and service type suggestions."""
+    if provider is None:
+        return []
+    entries = [("provider", str(provider.id), provider.name)]
+    entries += [e for e in (_value_entry("city", provider.city), _value_entry("service_type", provider.service_type)) if e]
+    return entries
+
+
+def service_user_entries(user: Any) -> List[Entry]:
+    """ServiceUser -> name and city suggestions."""
+    if user is None:
+        return []
+    entries = [("user", str(user.id), user.full_name)]
+    city = _value_entry("city", user.city)
+    return entries + ([city] if city else [])
+
+
+def diff_entries(before: List[Entry], after: List[Entry]) -> List[Tuple[str, Entry]]:
+    """Removals of what changed, then additions: [("remove"|"add", entry)]."""
+    before_set, after_set = set(before), set(after)
+    return [("remove", e) for e in before if e not in after_set] + [("add", e) for e in after if e not in before_set]
+
+
+# =========================================================
+# 3. AUTOCOMPLETE SERVICE
+# =========================================================
+class AutocompleteIndex:
+    """
+    Provider/user name, city and service-type suggestions without a DB hit.
+
+    - Built from Postgres at startup (build) and rebuilt in the background
+      when older than AUTOCOMPLETE_REBUILD_SECONDS, which also picks up
+      writes made by other workers or outside the CRUD layer
+    - CRUD writes are applied incrementally once their transaction commits
+      (track); a rollback drops them
+    - With AUTOCOMPLETE_REDIS_ENABLED, the same entries are mirrored into one
+      Redis sorted set per kind (score 0, ZRANGEBYLEX) so every worker sees
+      every write immediately; any Redis failure falls back to memory
+    """
+
+    REDIS_PREFIX = "autocomplete"
+    # A failed build is retried this soon rather than after a full rebuild window
+    RETRY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        redis_getter: Callable[[], Optional[Any]] = get_shared_redis,
+    ):
+        self._session_factory = session_factory
+        self._redis_getter = redis_getter
+        self.indexes: Dict[str, PrefixIndex] = {kind: PrefixIndex(kind in VALUE_KINDS) for kind in KINDS}
+        self.built_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._rebuild: Optional[asyncio.Task] = None
+        # Changes committed while a build is loading; replayed onto the new index
+        self._replay: Optional[List[Tuple[str, Entry]]] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def _redis(self) -> Optional[Any]:
+        return self._redis_getter() if settings.AUTOCOMPLETE_REDIS_ENABLED else None
+
+    @classmethod
+    def redis_key(cls, kind: str) -> str:
+        return f"{cls.REDIS_PREFIX}:{kind}"
+
+    @staticmethod
+    def _member(key: str, ref: str, label: str) -> str:
+        # Lexicographic on the key; ref and label ride along so lookups need no second read
+        return f"{key}{_SEP}{ref}{_SEP}{label}"
+
+    @classmethod
+    def redis_members(cls, entry: Entry) -> List[str]:
+        _kind, ref, label = entry
+        return [cls._member(key, ref, label) for key in prefix_keys(label)]
+
+    # ---------------------------------------------------------
+    # Build
+    # ---------------------------------------------------------
+    async def load_rows(self) -> Tuple[List[Any], List[Any], List[Any]]:
+        """(provider rows, user rows, listing (service_type, city, count) rows)."""
+        from app.models.healthcare_provider import HealthcareProvider
+        from app.models.service_listing import ServiceListing, ServiceUser
+
+        session_factory = self._session_factory
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+
+        async def fetch(db, stmt) -> List[Any]:
+            # Streamed so decoding 100k+ rows yields to the loop between batches
+            rows: List[Any] = []
+            result = await db.stream(stmt)
+            async for batch in result.partitions(_LOAD_BATCH):
+                rows += batch
+            return rows
+
+        async with session_factory() as db:
+            providers = await fetch(db, select(
+                HealthcareProvider.id, HealthcareProvider.name, HealthcareProvider.city, HealthcareProvider.service_type
+            ))
+            users = await fetch(db, select(ServiceUser.id, ServiceUser.full_name, ServiceUser.city))
+            # Listings only feed value suggestions; one row per distinct value pair and its count
+            listings = await fetch(
+                db,
+                select(ServiceListing.service_type, ServiceListing.location_city, func.count())
+                .group_by(ServiceListing.service_type, ServiceListing.location_city),
+            )
+        return providers, users, listings
+
+    @staticmethod
+    def entries_from_rows(providers: List[Any], users: List[Any], listings: List[Any]) -> List[Entry]:
+        entries: List[Entry] = []
+        for row in providers:
+            entries += provider_entries(row)
+        for row in users:
+            entries += service_user_entries(row)
+        for service_type, city, count in listings:
+            for entry in (_value_entry("service_type", service_type), _value_entry("city", city)):
+                if entry:
+                    entries += [entry] * count
+        return entries
+
+    @classmethod
+    def build_indexes(cls, rows: Tuple[List[Any], List[Any], List[Any]]) -> Dict[str, PrefixIndex]:
+        by_kind: Dict[str, List[Tuple[str, str]]] = {kind: [] for kind in KINDS}
+        for kind, ref, label in cls.entries_from_rows(*rows):
+            by_kind[kind].append((ref, label))
+        return {kind: PrefixIndex.from_entries(items, counted=kind in VALUE_KINDS) for kind, items in by_kind.items()}
+
+    async def build(self) -> None:
+        started = time.perf_counter()
+        self._replay = []
+        try:
+            rows = await self.load_rows()
+            # Turning 100k+ rows into normalised, sorted keys takes seconds: do it
+            # off the loop. Commits landing meanwhile go to the old index and _replay
+            indexes = await asyncio.to_thread(self.build_indexes, rows)
+        except BaseException:
+            self._replay = None
+            raise
+        # Swap in whole indexes: lookups never see a half-built one
+        self.indexes = indexes
+        replay, self._replay = self._replay, None
+        self.apply(replay)
+        self.built_at = time.monotonic()
+
+        await self._publish_snapshot()
+        logger.info(
+            "🔤 [AUTOCOMPLETE] Index built in %.2fs: %s",
+            time.perf_counter() - started, {kind: len(index) for kind, index in self.indexes.items()},
+        )
+
+    async def _publish_snapshot(self) -> None:
+        """Replaces the Redis sorted sets (one worker per rebuild window does it)."""
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            lock = f"{self.REDIS_PREFIX}:build-lock"
+            if not await client.set(lock, "1", nx=True, ex=max(int(settings.AUTOCOMPLETE_REBUILD_SECONDS) - 1, 1)):
+                return
+            for kind, index in self.indexes.items():
+                staging = f"{self.redis_key(kind)}:staging"
+                counts, members = index.snapshot()
+                pipe = client.pipeline(transaction=False)
+                pipe.delete(staging)
+                for i in range(0, len(members), 10_000):
+                    pipe.zadd(staging, {self._member(key, ref, label): 0 for key, ref, label in members[i:i + 10_000]})
+                if members:
+                    pipe.rename(staging, self.redis_key(kind))
+                else:
+                    pipe.delete(self.redis_key(kind))
+                pipe.delete(f"{self.redis_key(kind)}:counts")
+                if counts:
+                    pipe.hset(f"{self.redis_key(kind)}:counts", mapping=counts)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ [AUTOCOMPLETE] Redis snapshot failed, serving from memory: {e}")
+
+    def start(self) -> asyncio.Task:
+        """Builds in the background; lookups answer [] until the first build lands."""
+        self._attempted_at = time.monotonic()
+        self._rebuild = asyncio.get_running_loop().create_task(self._safe_build())
+        return self._rebuild
+
+    def stop(self) -> None:
+        if self._rebuild is not None and not self._rebuild.done():
+            self._rebuild.cancel()
+
+    def _maybe_rebuild(self) -> None:
+        if self._attempted_at is None or (self._rebuild is not None and not self._rebuild.done()):
+            return
+        wait = settings.AUTOCOMPLETE_REBUILD_SECONDS if self.ready else self.RETRY_SECONDS
+        if time.monotonic() - self._attempted_at >= wait:
+            self.start()
+
+    async def _safe_build(self) -> None:
+        try:
+            await self.build()
+        except Exception as e:
+            # Keep serving the previous index (if any) until the next attempt
+            logger.error(f"💥 [AUTOCOMPLETE] Build failed: {e}")
+
+    # ---------------------------------------------------------
+    # Incremental writes
+    # ---------------------------------------------------------
+    def apply(self, changes: List[Tuple[str, Entry]]) -> None:
+        if self._replay is not None:
+            self._replay.extend(changes)
+        for op, (kind, ref, label) in changes:
+            index = self.indexes[kind]
+            if op == "add":
+                index.add(ref, label)
+            else:
+                index.remove(ref)
+
+    async def publish(self, changes: List[Tuple[str, Entry]]) -> None:
+        """Mirrors changes into Redis: HINCRBY the shared count, ZADD/ZREM the members."""
+        client = self._redis()
+        if client is None or not changes:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for op, (kind, ref, _label) in changes:
+                pipe.hincrby(f"{self.redis_key(kind)}:counts", ref, 1 if op == "add" else -1)
+            counts = await pipe.execute()
+
+            pipe = client.pipeline(transaction=False)
+            for (op, entry), count in zip(changes, counts):
+                kind, ref, _label = entry
+                if op == "add":
+                    pipe.zadd(self.redis_key(kind), {member: 0 for member in self.redis_members(entry)})
+                elif int(count) <= 0:
+                    # Last reference gone (a city no row uses any more)
+                    pipe.hdel(f"{self.redis_key(kind)}:counts", ref)
+                    pipe.zrem(self.redis_key(kind), *self.redis_members(entry))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ [AUTOCOMPLETE] Redis update failed, next rebuild resyncs it: {e}")
+
+    async def track(self, session: Any, before: List[Entry], after: List[Entry]) -> None:
+        """
+        Records what a CRUD write changed (row snapshots before/after).
+
+        Real ORM sessions get the change queued until after_commit; test
+        doubles and sessions without a sync_session apply it immediately.
+        """
+        changes = diff_entries(before, after)
+        if not changes:
+            return
+
+        sync_session = getattr(session, "sync_session", None)
+        if not isinstance(sync_session, Session):
+            self.apply(changes)
+            await self.publish(changes)
+            return
+
+        sync_session.info.setdefault(_PENDING_KEY, []).append((self, changes))
+
+        if not event.contains(sync_session, "after_commit", _apply_pending_changes):
+            event.listen(sync_session, "after_commit", _apply_pending_changes)
+            event.listen(sync_session, "after_rollback", _discard_pending_changes)
+
+    # ---------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------
+    async def complete(self, prefix: str, kinds: Optional[List[str]] = None, limit: int = 10) -> List[Dict[str, str]]:
+        kinds = [kind for kind in (kinds or KINDS) if kind in KINDS]
+        self._maybe_rebuild()
+
+        client = self._redis()
+        if client is not None:
+            try:
+                return await self._complete_redis(client, prefix, kinds, limit)
+            except Exception as e:
+                logger.warning(f"⚠️ [AUTOCOMPLETE] Redis lookup failed, using memory: {e}")
+
+        return [
+            {"type": kind, "id": ref, "label": label}
+            for kind in kinds
+            for ref, label in self.indexes[kind].lookup(prefix, limit)
+        ]
+
+    async def _complete_redis(self, client: Any, prefix: str, kinds: List[str], limit: int) -> List[Dict[str, str]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        pipe = client.pipeline(transaction=False)
+        for kind in kinds:
+            # Highest code point: sorts after any continuation of the prefix (also as UTF-8)
+            pipe.zrangebylex(self.redis_key(kind), f"[{prefix}", f"[{prefix}\U0010ffff", start=0, num=limit * 5)
+        results = await pipe.execute()
+
+        suggestions = []
+        for kind, members in zip(kinds, results):
+            seen, found = set(), []
+            for member in members:
+                member = member.decode() if isinstance(member, bytes) else member
+                _key, ref, label = member.split(_SEP, 2)
+                if ref not in seen:
+                    seen.add(ref)
+                    found.append((ref, label))
+            found.sort(key=lambda item: (not normalize(item[1]).startswith(prefix), len(item[1]), item[1]))
+            suggestions += [{"type": kind, "id": ref, "label": label} for ref, label in found[:limit]]
+        return suggestions
+
+
+# ======================================================
+# SESSION HOOKS
+# ======================================================
+def _apply_pending_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    for index, changes in pending:
+        index.apply(changes)
+
+    async def _publish():
+        for index, changes in pending:
+            await index.publish(changes)
+
+    _publishes.submit(_publish)
+
+
+def _discard_pending_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Process-wide index (built in main.lifespan)
+autocomplete_index = AutocompleteIndex()
@@ -10,6 +10,7 @@ from sqlalchemy import select
 from app.api.endpoints.monitoring import record_call_event
 from app.config import settings
 from app.models.call_session import CallSession, CallStatus, CallMode
+from app.repositories.rollup_repo import RollupRepository
 from app.schemas.call import CallInitiatePayload
 
 
@@ -113,6 +114,7 @@ class CallManager:
 
             # Record final metrics
             record_call_event(session.callee_type, session.status, session.call_mode)
+            await RollupRepository(self.db).record_call_ended(session)
 
             await self.db.commit()
             logger.info(f"🏁 Session {session_id} ended. Duration: {session.duration_seconds}s")
\ No newline at end of file
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.api.endpoints.monitoring import record_chat_broadcast
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Local fan-out callback: (room_id, message) -> delivered to this worker's sockets
+Deliver = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+CHANNEL_PREFIX = "chat:room:"
+
+
+def room_channel(room_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{room_id}"
+
+
+# =========================================================
+# 1. IN-MEMORY (single process)
+# =========================================================
+class LocalChatBroadcast:
+    """Delivers straight to this process's sockets; enough for one worker."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def bind(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def join(self, room_id: int) -> None:
+        """The first local socket entered `room_id`."""
+
+    async def leave(self, room_id: int) -> None:
+        """The last local socket left `room_id`."""
+
+    async def publish(self, room_id: int, message: Dict[str, Any]) -> None:
+        await self._deliver(room_id, message)
+
+
+# =========================================================
+# 2. REDIS PUB/SUB (every worker)
+# =========================================================
+class RedisChatBroadcast(LocalChatBroadcast):
+    """
+    Cross-worker fan-out over one Redis channel per room.
+
+    A worker holds one pub/sub connection and is subscribed to a room's
+    channel only while it has local sockets in that room. Publishing delivers
+    to local sockets directly and sends an envelope tagged with this worker's
+    node id; the other subscribed workers deliver it to theirs (a worker
+    ignores its own echo).
+
+    Backpressure: the reader never blocks on slow local fan-out. Received
+    messages go through a bounded queue (CHAT_BROADCAST_QUEUE_SIZE) drained by
+    a dispatcher task; when it is full, new messages are dropped and counted
+    rather than letting Redis' pub/sub output buffer grow until it
+    disconnects the worker. Dropped messages remain in the room history.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis, node_id: Optional[str] = None, queue_size: Optional[int] = None):
+        super().__init__()
+        self.redis = redis
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.CHAT_BROADCAST_QUEUE_SIZE)
+        self._pubsub = None
+        self._rooms: Set[int] = set()        # rooms with local sockets
+        self._subscribed: Set[int] = set()   # rooms this worker's channel subscription covers
+        self._sync_lock = asyncio.Lock()
+        self._has_channels = asyncio.Event()
+        self._tasks: list = []
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._pubsub = self.redis.pubsub()
+        self._tasks = [
+            asyncio.create_task(self._read_loop(), name="chat-broadcast-reader"),
+            asyncio.create_task(self._dispatch_loop(), name="chat-broadcast-dispatcher"),
+        ]
+        logger.info(f"📡 [CHAT] Redis fan-out started (node {self.node_id})")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pubsub is not None:
+            try:
+                if self._subscribed:
+                    await self._pubsub.unsubscribe(*(room_channel(r) for r in self._subscribed))
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ [CHAT] Pub/sub close failed: {e}")
+            self._pubsub = None
+        self._subscribed.clear()
+
+    # ---------------------------------------------------------
+    # Subscriptions
+    # ---------------------------------------------------------
+    async def join(self, room_id: int) -> None:
+        self._rooms.add(room_id)
+        await self._sync(room_id)
+
+    async def leave(self, room_id: int) -> None:
+        self._rooms.discard(room_id)
+        await self._sync(room_id)
+
+    async def _sync(self, room_id: int) -> None:
+        # Reconciles the subscription with local membership, so a join racing
+        # a leave for the same room always settles on the latest state
+        async with self._sync_lock:
+            wanted = room_id in self._rooms
+            if wanted == (room_id in self._subscribed) or self._pubsub is None:
+                return
+            try:
+                if wanted:
+                    await self._pubsub.subscribe(room_channel(room_id))
+                    self._subscribed.add(room_id)
+                    self._has_channels.set()
+                else:
+                    await self._pubsub.unsubscribe(room_channel(room_id))
+                    self._subscribed.discard(room_id)
+            except Exception as e:
+                logger.error(f"❌ [CHAT] (Un)subscribe for room {room_id} failed: {e}")
+
+    # ---------------------------------------------------------
+    # Publish / receive
+    # ---------------------------------------------------------
+    async def publish(self, room_id: int, message: Dict[str, Any]) -> None:
+        envelope = json.dumps({"o": self.node_id, "m": message}, default=str)
+        await asyncio.gather(self._deliver(room_id, message), self._publish(room_id, envelope))
+
+    async def _publish(self, room_id: int, envelope: str) -> None:
+        try:
+            await self.redis.publish(room_channel(room_id), envelope)
+            record_chat_broadcast("published")
+        except Exception as e:
+            # Local sockets already have it; other workers' sockets can reload history
+            record_chat_broadcast("publish_error")
+            logger.warning(f"⚠️ [CHAT] Publish to room {room_id} failed: {e}")
+
+    async def _read_loop(self) -> None:
+        while True:
+            if not self._subscribed:
+                # get_message() needs at least one subscription on the connection
+                self._has_channels.clear()
+                await self._has_channels.wait()
+                continue
+            try:
+                raw = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py reconnects and resubscribes on the next read
+                logger.warning(f"⚠️ [CHAT] Pub/sub read failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if raw is None or raw.get("type") != "message":
+                continue
+
+            try:
+                channel = raw["channel"]
+                channel = channel.decode() if isinstance(channel, bytes) else channel
+                envelope = json.loads(raw["data"])
+                if envelope.get("o") == self.node_id:
+                    continue
+                room_id = int(channel[len(CHANNEL_PREFIX):])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️ [CHAT] Ignoring malformed broadcast: {e}")
+                continue
+
+            try:
+                self._inbox.put_nowait((room_id, envelope["m"]))
+                record_chat_broadcast("received")
+            except asyncio.QueueFull:
+                self.dropped += 1
+                record_chat_broadcast("dropped")
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"⚠️ [CHAT] Fan-out queue full; {self.dropped} message(s) dropped so far")
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            room_id, message = await self._inbox.get()
+            try:
+                if room_id in self._rooms:
+                    await self._deliver(room_id, message)
+            except Exception as e:
+                logger.error(f"❌ [CHAT] Local fan-out for room {room_id} failed: {e}")
+
+
+def build_chat_broadcast(redis=None) -> LocalChatBroadcast:
+    """Backend per CHAT_BROADCAST_BACKEND: 'redis', 'memory', or 'auto' (redis when connected)."""
+    backend = settings.CHAT_BROADCAST_BACKEND.lower()
+    if backend == "redis" or (backend == "auto" and redis is not None):
+        if redis is None:
+            logger.warning("⚠️ [CHAT] CHAT_BROADCAST_BACKEND=redis but Redis is unavailable; using memory")
+            return LocalChatBroadcast()
+        return RedisChatBroadcast(redis)
+    return LocalChatBroadcast()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, List, Optional
+
+from sqlalchemy import insert, text
+
+from app.api.endpoints.monitoring import record_chat_write
+from app.config import settings
+from app.models.chat import Message
+from app.schemas.chat import MessageCreate
+
+logger = logging.getLogger(__name__)
+
+# Ids come from the messages.id sequence ahead of the INSERT, so a message can
+# be broadcast with its final id before it is written
+_ALLOCATE_IDS = text("SELECT nextval(pg_get_serial_sequence('messages', 'id')) FROM generate_series(1, :n)")
+
+
+@dataclass
+class PendingMessage:
+    """A chat message with its server-assigned id and timestamp, awaiting its batch."""
+    id: int
+    room_id: int
+    sender_id: str
+    sender_type: str
+    content: str
+    created_at: datetime
+    # Resolves when the batch holding this message commits (or fails)
+    persisted: asyncio.Future = field(repr=False, compare=False, default=None)
+
+    def row(self) -> dict:
+        return {
+            "id": self.id,
+            "room_id": self.room_id,
+            "sender_id": self.sender_id,
+            "sender_type": self.sender_type,
+            "content": self.content,
+            "created_at": self.created_at,
+        }
+
+
+class ChatMessageWriter:
+    """
+    Write-behind persistence for WebSocket chat messages.
+
+    submit() assigns the id (from a per-worker block of sequence values) and
+    timestamp and returns at once; a background loop writes buffered messages
+    with one multi-row INSERT per batch when CHAT_WRITE_BATCH_SIZE messages
+    are waiting or CHAT_WRITE_FLUSH_MS after the oldest one arrived.
+
+    Durability: each message's `persisted` future resolves only after its
+    batch commits. With CHAT_WRITE_BEHIND off the router waits for it before
+    broadcasting (group commit); with it on, a crash can lose at most the
+    messages of the last flush window, and every failed write is reported to
+    its sender. At most CHAT_WRITE_MAX_PENDING messages wait at once; beyond
+    that submit() blocks (backpressure rather than unbounded memory). stop()
+    flushes everything still buffered.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        batch_size: Optional[int] = None,
+        flush_ms: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        id_block: Optional[int] = None,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = max(1, batch_size or settings.CHAT_WRITE_BATCH_SIZE)
+        self.flush_seconds = (flush_ms if flush_ms is not None else settings.CHAT_WRITE_FLUSH_MS) / 1000
+        self.id_block = max(1, id_block or settings.CHAT_ID_BLOCK_SIZE)
+        self._slots = asyncio.Semaphore(max_pending or settings.CHAT_WRITE_MAX_PENDING)
+        self._buffer: List[PendingMessage] = []
+        self._oldest = 0.0  # monotonic arrival of the oldest buffered message
+        self._ids: Deque[int] = collections.deque()
+        self._id_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="chat-writer")
+            logger.info(
+                f"📝 [CHAT_WRITER] Started (batch {self.batch_size}, flush {self.flush_seconds * 1000:.0f}ms)"
+            )
+
+    async def stop(self) -> None:
+        """Writes every buffered message, then stops the loop."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        logger.info("📝 [CHAT_WRITER] Stopped; buffer flushed")
+
+    # ---------------------------------------------------------
+    # Submit
+    # ---------------------------------------------------------
+    async def submit(self, msg_in: MessageCreate) -> PendingMessage:
+        if self._task is None:
+            self.start()
+        await self._slots.acquire()
+        try:
+            message = PendingMessage(
+                id=await self._next_id(),
+                room_id=msg_in.room_id,
+                sender_id=msg_in.sender_id,
+                sender_type=msg_in.sender_type,
+                content=msg_in.content,
+                created_at=datetime.now(timezone.utc),
+                persisted=asyncio.get_running_loop().create_future(),
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer.append(message)
+        if len(self._buffer) >= self.batch_size or len(self._buffer) == 1:
+            # First message starts the flush timer; a full batch flushes now
+            self._wakeup.set()
+        return message
+
+    async def _next_id(self) -> int:
+        if not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    async with self._session() as db:
+                        ids = (await db.execute(_ALLOCATE_IDS, {"n": self.id_block})).scalars().all()
+                    self._ids.extend(ids)
+        return self._ids.popleft()
+
+    # ---------------------------------------------------------
+    # Flush loop
+    # ---------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            if not self._buffer:
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Linger until the batch fills or the oldest message is flush_ms old
+            if len(self._buffer) < self.batch_size and not self._stopping:
+                deadline = self._oldest + self.flush_seconds
+                while len(self._buffer) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            # Leftovers keep the old deadline: they have waited at least as long
+            try:
+                await self._write(batch)
+            except Exception as e:
+                logger.error(f"❌ [CHAT_WRITER] Unexpected flush error: {e}", exc_info=True)
+                self._settle(batch, e)
+
+    async def _write(self, batch: List[PendingMessage]) -> None:
+        started = time.perf_counter()
+        try:
+            async with self._session() as db:
+                await db.execute(insert(Message).values([m.row() for m in batch]))
+                await db.commit()
+        except Exception as e:
+            record_chat_write(len(batch), time.perf_counter() - started, "retry")
+            logger.warning(f"⚠️ [CHAT_WRITER] Batch of {len(batch)} failed ({e}); writing rows one by one")
+            await self._write_each(batch)
+            return
+        record_chat_write(len(batch), time.perf_counter() - started, "ok")
+        self._settle(batch)
+
+    async def _write_each(self, batch: List[PendingMessage]) -> None:
+        # Isolates the rows that cannot be written (e.g. a deleted room)
+        for message in batch:
+            started = time.perf_counter()
+            try:
+                async with self._session() as db:
+                    await db.execute(insert(Message).values([message.row()]))
+                    await db.commit()
+            except Exception as e:
+                record_chat_write(1, time.perf_counter() - started, "failed")
+                logger.error(f"❌ [CHAT_WRITER] Message {message.id} in room {message.room_id} lost: {e}")
+                self._settle([message], e)
+                continue
+            record_chat_write(1, time.perf_counter() - started, "ok")
+            self._settle([message])
+
+    def _settle(self, batch: List[PendingMessage], error: Optional[BaseException] = None) -> None:
+        for message in batch:
+            if not message.persisted.done():
+                if error is None:
+                    message.persisted.set_result(message.id)
+                else:
+                    message.persisted.set_exception(error)
+            self._slots.release()
+
+
+# Process-wide writer used by the chat WebSocket
+chat_writer = ChatMessageWriter()
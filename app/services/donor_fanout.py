@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from firebase_admin import messaging
+from sqlalchemy import update
+
+from app.api.endpoints.monitoring import record_fanout_batch
+from app.config import settings
+from app.firebase_client import build_donor_message, _init_firebase
+from app.models.blood_donor import BloodDonor
+from app.services.donor_matching import DonorMatcher, donor_matcher
+
+logger = logging.getLogger(__name__)
+
+# Hard FCM limit for messaging.send_each
+FCM_MAX_BATCH = 500
+
+
+# =========================================================
+# 1. MESSAGING BACKENDS
+# =========================================================
+class FirebaseMessagingBackend:
+    """messaging.send_each on a worker thread (the SDK call is blocking)."""
+
+    async def send_each(self, messages: List[messaging.Message]):
+        _init_firebase()
+        return await asyncio.to_thread(messaging.send_each, messages)
+
+
+class StubMessagingBackend:
+    """
+    In-memory stand-in for tests and benchmarks.
+    Returns send_each-shaped BatchResponses; tokens in `unregistered`
+    fail with messaging.UnregisteredError.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, unregistered: Optional[Iterable[str]] = None):
+        self.latency_seconds = latency_seconds
+        self.unregistered: Set[str] = set(unregistered or ())
+        self.batches: List[List[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_each(self, messages: List[messaging.Message]):
+        tokens = [m.token for m in messages]
+        self.batches.append(tokens)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+        finally:
+            self.in_flight -= 1
+
+        responses = []
+        for token in tokens:
+            if token in self.unregistered:
+                error = messaging.UnregisteredError("Requested entity was not found.")
+                responses.append(SimpleNamespace(success=False, exception=error, message_id=None))
+            else:
+                responses.append(SimpleNamespace(success=True, exception=None, message_id=f"stub-{token}"))
+
+        success = sum(1 for r in responses if r.success)
+        return SimpleNamespace(responses=responses, success_count=success, failure_count=len(responses) - success)
+
+
+# =========================================================
+# 2. REPORT
+# =========================================================
+@dataclass
+class BatchResult:
+    size: int
+    success: int
+    failure: int
+    unregistered: int
+    seconds: float
+
+
+@dataclass
+class FanoutReport:
+    recipients: int = 0
+    success: int = 0
+    failure: int = 0
+    purged: int = 0
+    seconds: float = 0.0
+    batches: List[BatchResult] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(b.seconds for b in self.batches)
+        return {
+            "recipients": self.recipients,
+            "success": self.success,
+            "failure": self.failure,
+            "purged": self.purged,
+            "batches": len(self.batches),
+            "seconds": round(self.seconds, 3),
+            "max_batch_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+
+# =========================================================
+# 3. FAN-OUT ENGINE
+# =========================================================
+class DonorFanout:
+    """
+    Walks every compatible reachable donor from DonorMatcher (cached
+    per-city buckets, exact blood type first) page by page, sends them in send_each batches of <= 500 with at most
+    `max_concurrency` batches in flight, then purges every token FCM
+    reported as unregistered in one UPDATE per chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        backend: Optional[Any] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        page_size: Optional[int] = None,
+        matcher: Optional[DonorMatcher] = None,
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+
+        self.session_factory = session_factory
+        self.backend = backend or FirebaseMessagingBackend()
+        self.batch_size = min(batch_size or settings.FANOUT_BATCH_SIZE, FCM_MAX_BATCH)
+        self.max_concurrency = max_concurrency or settings.FANOUT_MAX_CONCURRENCY
+        self.page_size = page_size or settings.FANOUT_PAGE_SIZE
+        self.matcher = matcher or donor_matcher
+
+    async def notify_donors(
+        self,
+        blood_type: str,
+        city: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+    ) -> FanoutReport:
+        return await self.dispatch(self.stream_donor_tokens(blood_type, city), title, body, data)
+
+    async def stream_donor_tokens(self, blood_type: str, city: str) -> AsyncIterator[List[str]]:
+        """
+        Compatible donors' tokens, at most page_size per page, cut lazily from
+        the matcher's cached buckets: only the page being sent is copied, and
+        dispatch's back-pressure holds the walk while batches are in flight.
+        """
+        for bucket in await self.matcher.match_buckets(blood_type, city):
+            for i in range(0, len(bucket), self.page_size):
+                yield [match.token for match in bucket[i:i + self.page_size]]
+
+    async def dispatch(
+        self,
+        token_pages: AsyncIterator[List[str]],
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None,
+    ) -> FanoutReport:
+        report = FanoutReport()
+        unregistered: List[str] = []
+        seen: Set[str] = set()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: List[asyncio.Task] = []
+        started = time.perf_counter()
+
+        async def send(batch_no: int, tokens: List[str]) -> None:
+            try:
+                await self._send_batch(batch_no, tokens, title, body, data, report, unregistered)
+            finally:
+                semaphore.release()
+
+        async def spawn(tokens: List[str]) -> None:
+            # Acquire before spawning: back-pressure on the DB reader
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(send(len(tasks) + 1, tokens)))
+
+        pending: List[str] = []
+        try:
+            async for page in token_pages:
+                for token in page:
+                    if token in seen:
+                        continue
+                    seen.add(token)
+                    pending.append(token)
+                    if len(pending) == self.batch_size:
+                        await spawn(pending)
+                        pending = []
+
+            if pending:
+                await spawn(pending)
+        finally:
+            await asyncio.gather(*tasks)
+
+        report.recipients = len(seen)
+
+        if unregistered:
+            report.purged = await self.purge_tokens(unregistered)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(f"📣 [FANOUT] Done: {report.as_dict()}")
+        return report
+
+    async def _send_batch(self, batch_no, tokens, title, body, data, report: FanoutReport, unregistered: List[str]):
+        messages = [build_donor_message(token, title, body, data) for token in tokens]
+        started = time.perf_counter()
+        try:
+            response = await self.backend.send_each(messages)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            logger.error(f"❌ [FANOUT] Batch {batch_no} ({len(tokens)} tokens) failed: {e}")
+            report.failure += len(tokens)
+            report.batches.append(BatchResult(len(tokens), 0, len(tokens), 0, elapsed))
+            record_fanout_batch(len(tokens), elapsed, "error")
+            return
+
+        elapsed = time.perf_counter() - started
+        dead = [
+            token for token, resp in zip(tokens, response.responses)
+            if not resp.success and isinstance(resp.exception, messaging.UnregisteredError)
+        ]
+        unregistered.extend(dead)
+
+        report.success += response.success_count
+        report.failure += response.failure_count
+        report.batches.append(
+            BatchResult(len(tokens), response.success_count, response.failure_count, len(dead), elapsed)
+        )
+        record_fanout_batch(len(tokens), elapsed, "ok")
+        logger.info(
+            "📨 [FANOUT] batch=%s size=%s ok=%s failed=%s unregistered=%s latency_ms=%.1f",
+            batch_no, len(tokens), response.success_count, response.failure_count, len(dead), elapsed * 1000
+        )
+
+    async def purge_tokens(self, tokens: List[str], chunk_size: int = 1000) -> int:
+        """Clears dead FCM tokens in bulk instead of one UPDATE per donor."""
+        purged = 0
+        async with self.session_factory() as db:
+            try:
+                for i in range(0, len(tokens), chunk_size):
+                    result = await db.execute(
+                        update(BloodDonor)
+                        .where(BloodDonor.fcm_token.in_(tokens[i:i + chunk_size]))
+                        .values(fcm_token=None)
+                        .execution_options(synchronize_session=False)
+                    )
+                    purged += result.rowcount or 0
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"💥 [FANOUT] Token purge failed: {e}")
+                return 0
+
+        # Purged donors are no longer reachable; we don't know their cities here
+        if purged:
+            self.matcher.invalidate()
+
+        logger.info(f"🧹 [FANOUT] Purged {purged} unregistered token(s)")
+        return purged
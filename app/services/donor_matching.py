@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models.blood_donor import BloodDonor
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Red-cell compatibility: recipient type -> donor types it can receive, in the
+# order donors are contacted (exact type first, O- last to spare universal donors)
+COMPATIBLE_DONORS: Dict[str, Tuple[str, ...]] = {
+    "O-": ("O-",),
+    "O+": ("O+", "O-"),
+    "A-": ("A-", "O-"),
+    "A+": ("A+", "A-", "O+", "O-"),
+    "B-": ("B-", "O-"),
+    "B+": ("B+", "B-", "O+", "O-"),
+    "AB-": ("AB-", "A-", "B-", "O-"),
+    "AB+": ("AB+", "AB-", "A+", "A-", "B+", "B-", "O+", "O-"),
+}
+
+
+def compatible_donor_types(recipient_type: str) -> Tuple[str, ...]:
+    """Donor types that can give to `recipient_type` ('UNKNOWN' or unrecognised: none)."""
+    return COMPATIBLE_DONORS.get((recipient_type or "").strip().upper(), ())
+
+
+def normalize_city(city: str) -> str:
+    """Bucket key; mirrors lower(trim(city)) in ix_blood_donors_reachable_city."""
+    return (city or "").strip().lower()
+
+
+def city_key_expr():
+    return func.lower(func.trim(BloodDonor.city))
+
+
+@dataclass(frozen=True)
+class DonorMatch:
+    id: int
+    blood_type: str
+    token: str
+
+
+# =========================================================
+# MATCHER
+# =========================================================
+class DonorMatcher:
+    """
+    Compatible, active, reachable donors for a (blood type, city) in one call.
+
+    Each city is loaded once into buckets {donor blood_type: [DonorMatch, ...]}
+    with a single index-only scan of the partial index on reachable donors
+    (is_active AND fcm_token IS NOT NULL), then cached per worker for
+    DONOR_MATCH_CACHE_TTL_SECONDS. A match is a union of at most eight
+    in-memory buckets, so repeated requests in a busy city cost no queries.
+
+    Donor CRUD and FCM token purges invalidate the affected city (or all
+    cities) in this worker; other workers catch up within the TTL.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        # Per-process only: push tokens are not copied into Redis
+        self._cache = TTLCache(
+            "donors:city",
+            ttl_seconds if ttl_seconds is not None else settings.DONOR_MATCH_CACHE_TTL_SECONDS,
+            redis_getter=lambda: None,
+        )
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    async def load_city(self, city_key: str) -> Dict[str, List[DonorMatch]]:
+        started = time.perf_counter()
+        async with self._session() as db:
+            rows = (await db.execute(
+                select(BloodDonor.id, BloodDonor.blood_type, BloodDonor.fcm_token)
+                .where(
+                    city_key_expr() == city_key,
+                    BloodDonor.is_active.is_(True),
+                    BloodDonor.fcm_token.isnot(None),
+                )
+                .order_by(BloodDonor.blood_type, BloodDonor.id)
+            )).all()
+
+        buckets: Dict[str, List[DonorMatch]] = {}
+        for donor_id, blood_type, token in rows:
+            buckets.setdefault(blood_type, []).append(
+                DonorMatch(id=donor_id, blood_type=blood_type, token=token)
+            )
+
+        logger.info(
+            f"🩸 [MATCH] Loaded {len(rows)} reachable donor(s) for '{city_key}' "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return buckets
+
+    async def buckets(self, city: str) -> Dict[str, List[DonorMatch]]:
+        city_key = normalize_city(city)
+        return await self._cache.get_or_compute(city_key, lambda: self.load_city(city_key))
+
+    async def match_buckets(self, blood_type: str, city: str) -> List[List[DonorMatch]]:
+        """The cached buckets compatible with `blood_type` in contact order (shared, not copied)."""
+        donor_types = compatible_donor_types(blood_type)
+        if not donor_types or not normalize_city(city):
+            return []
+
+        buckets = await self.buckets(city)
+        return [buckets[donor_type] for donor_type in donor_types if buckets.get(donor_type)]
+
+    async def match(self, blood_type: str, city: str) -> List[DonorMatch]:
+        """Every reachable donor compatible with a `blood_type` recipient in `city`."""
+        return [m for bucket in await self.match_buckets(blood_type, city) for m in bucket]
+
+    def invalidate(self, *cities: Optional[str]) -> None:
+        """Drops the given cities, or every city when called without arguments."""
+        if not cities:
+            self._cache.invalidate()
+            return
+        for city in cities:
+            if city:
+                self._cache.invalidate(normalize_city(city))
+
+
+# Process-wide matcher shared by the fan-out and donor CRUD
+donor_matcher = DonorMatcher()
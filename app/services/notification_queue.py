@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from firebase_admin import messaging
+from sqlalchemy import delete, func, insert, select, update
+
+from app.api.endpoints.monitoring import record_notification_outcome
+from app.config import settings
+from app.models.outbound_notification import NotificationKind, NotificationStatus, OutboundNotification
+
+logger = logging.getLogger(__name__)
+
+# Hard FCM limit for messaging.send_each
+FCM_MAX_BATCH = 500
+
+# Errors retrying cannot fix: the token is gone or the message is malformed
+PERMANENT_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError, ValueError)
+
+
+# =========================================================
+# 1. MESSAGE BUILDERS (shared with NotificationService direct sends)
+# =========================================================
+def build_topic_message(topic: str, title: str, body: str, data: Optional[Dict[str, str]] = None) -> messaging.Message:
+    return messaging.Message(
+        topic=topic,
+        notification=messaging.Notification(title=title, body=body),
+        data={k: str(v) for k, v in (data or {}).items()},
+    )
+
+
+def build_token_message(token: str, title: str, body: str, data: Optional[Dict[str, str]] = None) -> messaging.Message:
+    return messaging.Message(
+        token=token,
+        notification=messaging.Notification(title=title, body=body),
+        data={k: str(v) for k, v in (data or {}).items()},
+    )
+
+
+def build_call_message(token: str, data: Dict[str, str]) -> messaging.Message:
+    """Data-only, high priority, TTL 0: delivered NOW or not at all."""
+    return messaging.Message(
+        token=token,
+        data={k: str(v) for k, v in data.items()},
+        android=messaging.AndroidConfig(priority="high", ttl=0),
+        # APNs priority is a header, not an aps field
+        apns=messaging.APNSConfig(
+            headers={"apns-priority": "10"},
+            payload=messaging.APNSPayload(aps=messaging.Aps(content_available=True)),
+        ),
+    )
+
+
+def build_message(kind: NotificationKind, target: str, payload: Dict[str, Any]) -> messaging.Message:
+    if kind == NotificationKind.TOPIC:
+        return build_topic_message(target, payload.get("title", ""), payload.get("body", ""), payload.get("data"))
+    if kind == NotificationKind.CALL:
+        return build_call_message(target, payload.get("data") or {})
+    if kind == NotificationKind.DONOR:
+        from app.firebase_client import build_donor_message
+        return build_donor_message(target, payload.get("title", ""), payload.get("body", ""), payload.get("data"))
+    return build_token_message(target, payload.get("title", ""), payload.get("body", ""), payload.get("data"))
+
+
+# =========================================================
+# 2. TRANSPORTS
+# =========================================================
+class FirebaseTransport:
+    """messaging.send_each on a worker thread (the SDK call is blocking)."""
+
+    async def send_each(self, messages: List[messaging.Message]):
+        from app.firebase_client import _init_firebase
+        _init_firebase()
+        return await asyncio.to_thread(messaging.send_each, messages)
+
+
+class LocalTransport:
+    """
+    In-memory stand-in for tests and local runs.
+    `errors` maps a token/topic to exceptions raised on successive
+    attempts (then it succeeds); `delivered` keeps every accepted message.
+    """
+
+    def __init__(self, errors: Optional[Dict[str, List[Exception]]] = None, latency_seconds: float = 0.0):
+        self.errors: Dict[str, List[Exception]] = {k: list(v) for k, v in (errors or {}).items()}
+        self.latency_seconds = latency_seconds
+        self.delivered: List[messaging.Message] = []
+        self.calls = 0
+
+    async def send_each(self, messages: List[messaging.Message]):
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        responses = []
+        for message in messages:
+            target = message.token or message.topic
+            pending = self.errors.get(target)
+            if pending:
+                responses.append(SimpleNamespace(success=False, exception=pending.pop(0), message_id=None))
+            else:
+                self.delivered.append(message)
+                responses.append(SimpleNamespace(success=True, exception=None, message_id=f"local-{target}"))
+
+        success = sum(1 for r in responses if r.success)
+        return SimpleNamespace(responses=responses, success_count=success, failure_count=len(responses) - success)
+
+
+# =========================================================
+# 3. QUEUE STORE (Postgres)
+# =========================================================
+@dataclass
+class QueuedNotification:
+    id: int
+    kind: NotificationKind
+    target: str
+    payload: Dict[str, Any]
+    attempts: int
+    expires_at: Optional[datetime]
+    created_at: datetime
+
+
+@dataclass
+class Outcome:
+    id: int
+    status: NotificationStatus
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(n-1), capped, scaled into [50%, 100%]."""
+    delay = min(settings.NOTIFY_BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), settings.NOTIFY_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class NotificationQueue:
+    """
+    Durable outbox for push notifications.
+
+    Claims are `UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)`
+    that bump attempts and push next_attempt_at out by a lease, so any
+    number of consumers can share the table and a crashed consumer's rows
+    come back on their own.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+        # Wakes local consumers as soon as this process enqueues
+        self.wakeup = asyncio.Event()
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    # ---------------------------------------------------------
+    # Producer side
+    # ---------------------------------------------------------
+    async def enqueue(
+        self,
+        kind: NotificationKind,
+        target: str,
+        payload: Dict[str, Any],
+        expires_at: Optional[datetime] = None,
+        db: Optional[Any] = None,
+    ) -> None:
+        """
+        Inserts one message. Pass `db` to enqueue inside the caller's
+        transaction (sent only if it commits); otherwise commits on its own.
+        """
+        stmt = insert(OutboundNotification).values(
+            kind=kind, target=target, payload=payload, expires_at=expires_at,
+        )
+
+        if db is not None:
+            await db.execute(stmt)
+        else:
+            async with self.session_factory() as session:
+                await session.execute(stmt)
+                await session.commit()
+
+        self.wakeup.set()
+
+    # ---------------------------------------------------------
+    # Consumer side
+    # ---------------------------------------------------------
+    @staticmethod
+    def build_claim(batch_size: int, lease_seconds: int, now: datetime):
+        due = (
+            select(OutboundNotification.id)
+            .where(
+                OutboundNotification.status == NotificationStatus.PENDING,
+                OutboundNotification.next_attempt_at <= now,
+            )
+            .order_by(OutboundNotification.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        return (
+            update(OutboundNotification)
+            .where(OutboundNotification.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=OutboundNotification.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(
+                OutboundNotification.id,
+                OutboundNotification.kind,
+                OutboundNotification.target,
+                OutboundNotification.payload,
+                OutboundNotification.attempts,
+                OutboundNotification.expires_at,
+                OutboundNotification.created_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim(self, batch_size: int, lease_seconds: Optional[int] = None) -> List[QueuedNotification]:
+        lease_seconds = lease_seconds or settings.NOTIFY_LEASE_SECONDS
+        async with self.session_factory() as session:
+            result = await session.execute(self.build_claim(batch_size, lease_seconds, datetime.now(timezone.utc)))
+            rows = result.all()
+            await session.commit()
+        return [QueuedNotification(*row) for row in rows]
+
+    async def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest PENDING row is due (<= 0: due now); None if none is pending."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(func.min(OutboundNotification.next_attempt_at))
+                .where(OutboundNotification.status == NotificationStatus.PENDING)
+            )
+            due = result.scalar()
+        if due is None:
+            return None
+        return (due - datetime.now(timezone.utc)).total_seconds()
+
+    async def complete(self, outcomes: Sequence[Outcome]) -> None:
+        """Applies a batch of outcomes as one executemany UPDATE by primary key."""
+        if not outcomes:
+            return
+        params = [
+            {
+                "id": o.id,
+                "status": o.status,
+                "next_attempt_at": o.next_attempt_at or o.sent_at or datetime.now(timezone.utc),
+                "last_error": (o.last_error or None) and o.last_error[:500],
+                "sent_at": o.sent_at,
+            }
+            for o in outcomes
+        ]
+        async with self.session_factory() as session:
+            await session.execute(update(OutboundNotification), params)
+            await session.commit()
+
+    # ---------------------------------------------------------
+    # Dead-letter set
+    # ---------------------------------------------------------
+    async def list_dead(self, limit: int = 100) -> List[OutboundNotification]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(OutboundNotification)
+                .where(OutboundNotification.status == NotificationStatus.DEAD)
+                .order_by(OutboundNotification.created_at.desc())
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def requeue_dead(self, ids: Optional[Sequence[int]] = None) -> int:
+        """Moves dead letters (all, or `ids`) back to PENDING with a fresh retry budget."""
+        stmt = (
+            update(OutboundNotification)
+            .where(OutboundNotification.status == NotificationStatus.DEAD)
+            .values(
+                status=NotificationStatus.PENDING,
+                attempts=0,
+                next_attempt_at=datetime.now(timezone.utc),
+                last_error=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if ids is not None:
+            stmt = stmt.where(OutboundNotification.id.in_(list(ids)))
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        self.wakeup.set()
+        return result.rowcount or 0
+
+    async def prune(self, older_than_days: Optional[int] = None) -> int:
+        """Deletes SENT rows past retention; dead letters are kept for inspection."""
+        days = older_than_days or settings.NOTIFY_RETENTION_DAYS
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(OutboundNotification)
+                .where(
+                    OutboundNotification.status == NotificationStatus.SENT,
+                    OutboundNotification.created_at < cutoff,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        pruned = result.rowcount or 0
+        logger.info(f"🧹 [NOTIFY_QUEUE] Pruned {pruned} sent notification(s) older than {days}d")
+        return pruned
+
+
+# =========================================================
+# 4. CONSUMER POOL
+# =========================================================
+class NotificationConsumer:
+    """
+    `workers` loops that claim due rows, send them through `transport`
+    in send_each batches, and record SENT / retry-with-backoff / DEAD.
+
+    An idle worker waits poll_seconds, doubling on every empty poll up to
+    idle_poll_max_seconds but never past the next scheduled retry; a local
+    enqueue wakes it at once.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[NotificationQueue] = None,
+        transport: Optional[Any] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        idle_poll_max_seconds: Optional[float] = None,
+    ):
+        self.queue = queue or notification_queue
+        self.transport = transport or FirebaseTransport()
+        self.workers = workers or settings.NOTIFY_WORKERS
+        self.batch_size = min(batch_size or settings.NOTIFY_BATCH_SIZE, FCM_MAX_BATCH)
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.NOTIFY_POLL_SECONDS
+        self.max_attempts = max_attempts or settings.NOTIFY_MAX_ATTEMPTS
+        self.idle_poll_max_seconds = max(
+            idle_poll_max_seconds or settings.NOTIFY_IDLE_POLL_MAX_SECONDS, self.poll_seconds
+        )
+        # Outcome counts since start: SENT / PENDING (retry scheduled) / DEAD
+        self.stats: Dict[str, int] = {status.value: 0 for status in NotificationStatus}
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+
+    async def run(self) -> None:
+        logger.info(f"📬 [NOTIFY_QUEUE] Consumer pool started ({self.workers} worker(s))")
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(1, self.workers + 1)]
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Lets in-flight batches finish; claimed-but-unsent rows reappear after their lease."""
+        self._stopping = True
+        self.queue.wakeup.set()
+
+    async def _worker(self, worker_no: int) -> None:
+        empty_polls = 0
+        while not self._stopping:
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"❌ [NOTIFY_QUEUE] Worker {worker_no} error: {e}", exc_info=True)
+                processed = 0
+
+            if processed or self._stopping:
+                empty_polls = 0
+                continue
+
+            empty_polls += 1
+            self.queue.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.queue.wakeup.wait(), timeout=await self.idle_wait(empty_polls))
+            except asyncio.TimeoutError:
+                pass
+
+    async def idle_wait(self, empty_polls: int) -> float:
+        """Seconds to sleep after `empty_polls` empty claims in a row."""
+        wait = min(self.poll_seconds * 2 ** min(empty_polls - 1, 20), self.idle_poll_max_seconds)
+        try:
+            due_in = await self.queue.next_due_in()
+        except Exception as e:
+            logger.warning(f"⚠️ [NOTIFY_QUEUE] Next-due lookup failed: {e}")
+            return self.poll_seconds
+        if due_in is not None:
+            # A retry is scheduled: be back for it (claim() needs it due, so not sooner than a poll)
+            wait = min(wait, max(due_in, self.poll_seconds))
+        return wait
+
+    async def drain_once(self) -> int:
+        """Claims and processes one batch. Returns how many rows it handled."""
+        rows = await self.queue.claim(self.batch_size)
+        if not rows:
+            return 0
+        outcomes = await self.process(rows)
+        await self.queue.complete(outcomes)
+        return len(rows)
+
+    async def process(self, rows: List[QueuedNotification]) -> List[Outcome]:
+        now = datetime.now(timezone.utc)
+        outcomes: List[Outcome] = []
+        live: List[QueuedNotification] = []
+
+        messages: List[messaging.Message] = []
+
+        for row in rows:
+            if row.expires_at is not None and row.expires_at <= now:
+                outcomes.append(self._dead(row, "expired before delivery"))
+                continue
+            try:
+                messages.append(build_message(row.kind, row.target, row.payload))
+            except Exception as e:
+                # Malformed payload: no retry will fix it
+                outcomes.append(self._dead(row, f"{type(e).__name__}: {e}"))
+                continue
+            live.append(row)
+
+        if live:
+            started = time.perf_counter()
+            try:
+                response = await self.transport.send_each(messages)
+                results = [(r.success, r.exception) for r in response.responses]
+            except Exception as e:
+                # Whole-batch failure (network, auth): every row is retryable
+                logger.warning(f"⚠️ [NOTIFY_QUEUE] send_each failed for {len(live)} message(s): {e}")
+                results = [(False, e)] * len(live)
+
+            sent_at = datetime.now(timezone.utc)
+            for row, (ok, error) in zip(live, results):
+                if ok:
+                    outcomes.append(Outcome(row.id, NotificationStatus.SENT, sent_at=sent_at))
+                    record_notification_outcome("sent", (sent_at - row.created_at).total_seconds())
+                elif isinstance(error, PERMANENT_ERRORS) or row.attempts >= self.max_attempts:
+                    outcomes.append(self._dead(row, f"{type(error).__name__}: {error}"))
+                else:
+                    outcomes.append(self._retry(row, sent_at, f"{type(error).__name__}: {error}"))
+
+            logger.info(
+                "📨 [NOTIFY_QUEUE] batch=%s ok=%s latency_ms=%.1f",
+                len(live), sum(1 for ok, _ in results if ok), (time.perf_counter() - started) * 1000
+            )
+
+        for outcome in outcomes:
+            self.stats[outcome.status.value] += 1
+        return outcomes
+
+    def _retry(self, row: QueuedNotification, now: datetime, error: str) -> Outcome:
+        record_notification_outcome("retry")
+        return Outcome(
+            row.id,
+            NotificationStatus.PENDING,
+            next_attempt_at=now + timedelta(seconds=backoff_seconds(row.attempts)),
+            last_error=error,
+        )
+
+    def _dead(self, row: QueuedNotification, error: str) -> Outcome:
+        record_notification_outcome("dead")
+        logger.warning(f"☠️ [NOTIFY_QUEUE] Dead-lettered #{row.id} ({row.kind.value} after {row.attempts} attempt(s)): {error}")
+        return Outcome(row.id, NotificationStatus.DEAD, last_error=error)
+
+
+# Single instance shared by producers and the lifespan consumer pool
+notification_queue = NotificationQueue()
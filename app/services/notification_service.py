@@ -3,12 +3,21 @@ from __future__ import annotations
 import asyncio
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, List, Any
 
 from firebase_admin import messaging, _apps, initialize_app
 from firebase_admin.exceptions import FirebaseError
 
+from app.config import settings
+from app.models.outbound_notification import NotificationKind
+from app.services.notification_queue import (
+    NotificationQueue,
+    notification_queue,
+    build_call_message,
+    build_topic_message,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,8 +27,9 @@ class NotificationService:
     Orchestrates persistence, bulk topic pushes, and high-priority RTC signaling.
     """
 
-    def __init__(self, repo: Any = None):
+    def __init__(self, repo: Any = None, queue: Optional[NotificationQueue] = None):
         self.repo = repo
+        self.queue = queue or notification_queue
 
     def _ensure_firebase_initialized(self):
         """Lazy initialization to prevent 'App already exists' errors in Uvicorn workers."""
@@ -42,10 +52,8 @@ class NotificationService:
     ):
         """
         Routes notifications based on the service category (e.g., 'BLOOD' -> Topic).
-        Ensures all nearby donors or providers are notified instantly.
+        Queued for the consumer pool, so the request never waits on FCM.
         """
-        self._ensure_firebase_initialized()
-
         topic_name = f"category_{category.upper()}"
         title = f"New {service_type.replace('_', ' ').title()} Request"
         body = f"A new {category.lower()} request is available in your area."
@@ -58,46 +66,107 @@ class NotificationService:
             "sender_id": str(user_id)
         }
 
-        await self.send_push_to_topic(topic_name, title, body, data)
-        logger.info(f"[NOTIF_DISPATCH] Service {listing_id} notified via topic {topic_name}")
+        try:
+            await self.enqueue_topic(topic_name, title, body, data)
+            logger.info(f"[NOTIF_DISPATCH] Service {listing_id} queued for topic {topic_name}")
+        except Exception as e:
+            # Queue unavailable (DB down): fall back to a direct send rather than drop it
+            logger.error(f"[NOTIF_QUEUE_FAIL] {listing_id}: {e}; sending inline")
+            await self.send_push_to_topic(topic_name, title, body, data)
 
     # ---------------------------------------------------------
-    # 📞 High-Priority RTC Signaling (Critical for Video/Audio)
+    # 📬 Queued Producers (durable, retried by the consumer pool)
     # ---------------------------------------------------------
-    async def send_call_signal(
+    async def enqueue_topic(
+            self,
+            topic: str,
+            title: str,
+            body: str,
+            data: Optional[Dict[str, str]] = None,
+            db: Any = None,
+    ) -> None:
+        """Queues a topic broadcast. Pass `db` to commit it with the caller's transaction."""
+        payload = {"title": title, "body": body, "data": {k: str(v) for k, v in (data or {}).items()}}
+        await self.queue.enqueue(NotificationKind.TOPIC, topic, payload, db=db)
+
+    async def enqueue_donor_alert(
+            self,
+            target: str,
+            title: str,
+            body: str,
+            data: Optional[Dict[str, str]] = None,
+            db: Any = None,
+    ) -> None:
+        """Queues a donor alert to a device token or the 'donation' topic (build_donor_message)."""
+        if not target: return
+        payload = {"title": title, "body": body, "data": {k: str(v) for k, v in (data or {}).items()}}
+        await self.queue.enqueue(NotificationKind.DONOR, target, payload, db=db)
+
+    async def enqueue_call_signal(
             self,
             fcm_token: str,
             session_id: str,
             caller_name: str,
             call_mode: str,
             room_name: str,
-            token_repo: Optional[Any] = None,
-    ) -> Optional[str]:
+            db: Any = None,
+    ) -> None:
         """
-        Signals an incoming Jitsi/RTC call.
-        Uses High Priority to wake up devices even in Doze/Battery-Saving mode.
+        Queues an incoming-call signal. It expires after NOTIFY_CALL_TTL_SECONDS:
+        a retry that lands after the caller gave up is dead-lettered, not rung.
         """
-        if not fcm_token: return None
-        self._ensure_firebase_initialized()
+        if not fcm_token: return
+        now = datetime.now(timezone.utc)
+        payload = {"data": self._call_payload(session_id, caller_name, call_mode, room_name, now)}
+        await self.queue.enqueue(
+            NotificationKind.CALL,
+            fcm_token,
+            payload,
+            expires_at=now + timedelta(seconds=settings.NOTIFY_CALL_TTL_SECONDS),
+            db=db,
+        )
 
+    @staticmethod
+    def _call_payload(session_id, caller_name, call_mode, room_name, now: datetime) -> Dict[str, str]:
         # All values must be strings for FCM data payload
-        call_payload = {
+        return {
             "type": "INCOMING_CALL",
             "session_id": str(session_id),
             "caller_name": str(caller_name),
             "call_mode": str(call_mode),
             "room_name": str(room_name),
-            "timestamp": str(int(datetime.now(timezone.utc).timestamp()))
+            "timestamp": str(int(now.timestamp()))
         }
 
-        message = messaging.Message(
-            token=fcm_token,
-            data=call_payload,
-            # Priority high and TTL 0 ensures the message is delivered NOW or not at all.
-            android=messaging.AndroidConfig(priority="high", ttl=0),
-            apns=messaging.APNSConfig(
-                payload=messaging.APNSPayload(aps=messaging.Aps(content_available=True, priority=10))
-            )
+    # ---------------------------------------------------------
+    # 📞 High-Priority RTC Signaling (Critical for Video/Audio)
+    # ---------------------------------------------------------
+    async def send_call_signal(
+            self,
+            fcm_token: str,
+            session_id: str,
+            caller_name: str,
+            call_mode: str,
+            room_name: str,
+            token_repo: Optional[Any] = None,
+    ) -> Optional[str]:
+        """
+        Signals an incoming Jitsi/RTC call through the queue (enqueue_call_signal),
+        so a transient FCM failure is retried until the signal expires.
+        Sends inline only if the queue is unavailable.
+        """
+        if not fcm_token: return None
+        try:
+            await self.enqueue_call_signal(fcm_token, session_id, caller_name, call_mode, room_name)
+            return "queued"
+        except Exception as e:
+            logger.error(f"[RTC_QUEUE_FAIL] {session_id}: {e}; sending inline")
+
+        self._ensure_firebase_initialized()
+
+        # Priority high and TTL 0 ensures the message is delivered NOW or not at all.
+        message = build_call_message(
+            fcm_token, self._call_payload(session_id, caller_name, call_mode, room_name, datetime.now(timezone.utc))
         )
 
         try:
@@ -124,11 +193,7 @@ class NotificationService:
         if not topic: return None
         self._ensure_firebase_initialized()
 
-        message = messaging.Message(
-            topic=topic,
-            notification=messaging.Notification(title=title, body=body),
-            data={k: str(v) for k, v in (data or {}).items()},
-        )
+        message = build_topic_message(topic, title, body, data)
 
         try:
             return await asyncio.to_thread(messaging.send, message)
@@ -77,17 +77,17 @@ class ServiceOrchestrator:
         """
         Handles non-blocking side effects like push notifications and RTC setup.
         """
-        meta = registry.get_service_meta(service_type)
+        meta = registry.get(service_type)
 
         # 1. RTC Readiness (for Doctor/Nurse services)
-        if meta.get("is_rtc_supported"):
+        if meta.is_rtc_supported:
             logger.info(f"👨‍⚕️ RTC Authorization prepared for {listing_id}")
 
         # 2. Push Notifications (FCM)
         # Notifies relevant parties (e.g., Donors in a specific area)
         await notification_service.trigger_service_notifications(
             service_type=service_type,
-            category=meta.get("category"),
+            category=meta.category,
             listing_id=listing_id,
             user_id=user_id
         )
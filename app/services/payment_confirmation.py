@@ -9,9 +9,25 @@ from app.models.payment import Payment, PaymentStatus
 from app.models.wallet import Wallet
 from app.models.usage_counter import UsageCounter
 from app.data.models import Usage
+from app.repositories.rollup_repo import RollupRepository
+from app.repositories.usage_cache import get_usage_cache
+from app.services.registry import registry
 
 logger = logging.getLogger(__name__)
 
+
+def _quota_type(payment: Payment) -> str:
+    """usage_counter.service for the payment's service, as the usage repository keys it."""
+    return registry.quota_type(getattr(payment.service_type, "value", payment.service_type))
+
+
+async def _publish_quota(db: AsyncSession, payment: Payment, used) -> None:
+    """Hands the counter's new value to the usage cache; published after COMMIT."""
+    cache = get_usage_cache()
+    if cache is not None:
+        await cache.write_through(db, payment.user_id, _quota_type(payment), used)
+
+
 # =====================================================================
 # 1. CONFIRM PAYMENT (Credit Logic)
 # =====================================================================
@@ -73,12 +89,17 @@ async def confirm_payment(
 
         # 6️⃣ Increment Quota (UsageCounter)
         # This assumes the record already exists from the initial request stage
-        await db.execute(
+        counter = await db.execute(
             update(UsageCounter)
             .where(UsageCounter.user_id == payment.user_id)
-            .where(UsageCounter.service == payment.service_type)
+            .where(UsageCounter.service == _quota_type(payment))
             .values(used=UsageCounter.used + 1)
+            .returning(UsageCounter.used)
         )
+        await _publish_quota(db, payment, counter.scalar_one_or_none())
+
+        # 7️⃣ Analytics Rollup (same transaction as the status change)
+        await RollupRepository(db).record_payment_confirmed(payment)
 
         await db.commit()
         logger.info(f"✅ Payment {reference} SUCCESS. Wallet credited. TxID: {transaction_id}")
@@ -135,12 +156,17 @@ async def refund_payment(
 
         # 5️⃣ Decrement Quota (UsageCounter)
         # ✅ Using func.greatest for Postgres compatibility (scalar comparison)
-        await db.execute(
+        counter = await db.execute(
             update(UsageCounter)
             .where(UsageCounter.user_id == payment.user_id)
-            .where(UsageCounter.service == payment.service_type)
+            .where(UsageCounter.service == _quota_type(payment))
             .values(used=func.greatest(0, UsageCounter.used - 1))
+            .returning(UsageCounter.used)
         )
+        await _publish_quota(db, payment, counter.scalar_one_or_none())
+
+        # 6️⃣ Analytics Rollup: move totals from success to refunded
+        await RollupRepository(db).record_payment_refunded(payment)
 
         await db.commit()
         logger.info(f"⏪ Refund successful for {reference}. Wallet deducted.")
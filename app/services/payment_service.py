@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.repositories.usage_repo import SQLAlchemyUsageRepository
+from app.services.registry import registry
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment import PaymentResponseOut
 
@@ -68,7 +69,7 @@ class PaymentService:
 
         category = PaymentService._normalize_category(category)
 
-        promo_active = not settings.payment_switches.get(category, True)
+        promo_active = not registry.snapshot.payment_switches.get(category, True)
         if promo_active:
             return 999
 
@@ -83,7 +84,7 @@ class PaymentService:
         if not isinstance(used, int):
             used = 0
 
-        limit = settings.free_limits.get(category, 0)
+        limit = registry.snapshot.free_limits.get(category, 0)
         return max(limit - used, 0)
 
     # --------------------------------------------------
@@ -106,28 +107,35 @@ class PaymentService:
         # -----------------------------
         # FREE FLOW
         # -----------------------------
-        free_left = await PaymentService.get_remaining_free_uses(
-            db, user_id, category
-        )
-
-        promo_active = not settings.payment_switches.get(category, True)
-
-        if promo_active or free_left > 0:
+        promo_active = not registry.snapshot.payment_switches.get(category, True)
+        free_key = f"FREE-{uuid.uuid4().hex[:12]}"
 
+        if promo_active:
+            # Promo periods are unlimited: plain increment, no quota guard
             await usage_repo.record_usage(
                 user_id=user_id,
                 service=category,
                 paid=False,
                 amount=0.0,
-                idempotency_key=f"FREE-{uuid.uuid4().hex[:12]}"
+                idempotency_key=free_key
+            )
+            granted = True
+        else:
+            # One conditional upsert: increments only while used < limit
+            granted = await usage_repo.try_consume_free_usage(
+                user_id=user_id,
+                service=category,
+                free_limit=registry.snapshot.free_limits.get(category, 0),
+                idempotency_key=free_key
             )
 
+        if granted:
             await db.commit()
 
             return PaymentResponseOut(
                 success=True,
                 status=PaymentStatus.SUCCESS,
-                message=settings.promo_messages.get(category, "Access granted."),
+                message=registry.snapshot.promo_messages.get(category, "Access granted."),
                 reference=f"FREE-{uuid.uuid4().hex[:10].upper()}",
                 expires_at=now + timedelta(hours=12),
                 ussd_string=None
@@ -159,7 +167,7 @@ class PaymentService:
         # -----------------------------
         # NEW PAYMENT
         # -----------------------------
-        fee = settings.fee_map.get(category, 500)
+        fee = registry.snapshot.fee_map.get(category, 500)
         reference = generate_reference()
         ussd = get_ussd_code(user_phone, fee)
 
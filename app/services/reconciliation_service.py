@@ -1,66 +1,300 @@
 # app/services/reconciliation_service.py
 
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.payment import Payment
-from app.schemas.payment import PaymentResponse
 import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.endpoints.monitoring import record_reconcile_check
+from app.config import settings
+from app.domain.gateways import IPaymentGateway
+from app.models.payment import Payment, PaymentProvider, PaymentStatus
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.rollup_repo import RollupRepository
 
 logger = logging.getLogger(__name__)
 
+# verify_transaction result -> ledger status; anything else leaves the row alone
+PROVIDER_STATUS_MAP = {
+    "SUCCESS": PaymentStatus.SUCCESS,
+    "SUCCESSFUL": PaymentStatus.SUCCESS,
+    "FAILED": PaymentStatus.FAILED,
+    "REJECTED": PaymentStatus.FAILED,
+}
 
-class ReconciliationService:
+
+def build_gateways() -> Dict[PaymentProvider, IPaymentGateway]:
+    """Gateways with credentials configured; providers without one are not polled."""
+    gateways: Dict[PaymentProvider, IPaymentGateway] = {}
+
+    if settings.MTN_MOMO_API_KEY and settings.MTN_MOMO_SUBSCRIPTION_KEY:
+        from app.gateways.mtn_momo_adapter import MTNMomoPaymentGateway
+        gateways[PaymentProvider.MTN] = MTNMomoPaymentGateway(
+            api_key=settings.MTN_MOMO_API_KEY, subscription_key=settings.MTN_MOMO_SUBSCRIPTION_KEY
+        )
+    if settings.STRIPE_API_KEY:
+        from app.gateways.stripe_adapter import StripeAdapter
+        gateways[PaymentProvider.STRIPE] = StripeAdapter(api_key=settings.STRIPE_API_KEY)
+
+    return gateways
+
+
+# =========================================================
+# 1. PER-PROVIDER LIMITS
+# =========================================================
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart (rate <= 0 disables it)."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# =========================================================
+# 2. REPORT
+# =========================================================
+@dataclass
+class ProviderReport:
+    checked: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    updated: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.checked / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class ReconciliationReport:
+    providers: Dict[str, ProviderReport] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def checked(self) -> int:
+        return sum(p.checked for p in self.providers.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.checked / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "seconds": round(self.seconds, 3),
+            "payments_per_sec": round(self.throughput, 1),
+            "providers": {
+                name: {
+                    "checked": p.checked,
+                    "unchanged": p.unchanged,
+                    "errors": p.errors,
+                    "updated": dict(p.updated),
+                    "payments_per_sec": round(p.throughput, 1),
+                }
+                for name, p in self.providers.items()
+            },
+        }
+
+
+# =========================================================
+# 3. ENGINE
+# =========================================================
+class ReconciliationEngine:
     """
-    Periodically reconciles internal payments ledger with external provider.
+    Polls providers for the real status of PENDING payments.
+
+    Each provider runs its own pipeline, so a slow gateway only slows
+    its own payments:
+      - keyset pages over (created_at, id) for that provider
+      - verify_transaction with at most `concurrency` calls in flight
+        and at most `rate_per_second` started per second
+      - status changes buffered and written as one guarded UPDATE per
+        target status (PaymentRepository.update_status semantics)
     """
 
+    def __init__(
+        self,
+        gateways: Optional[Dict[PaymentProvider, IPaymentGateway]] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        page_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        flush_size: Optional[int] = None,
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+
+        self.gateways = build_gateways() if gateways is None else gateways
+        self.session_factory = session_factory
+        self.page_size = page_size or settings.RECONCILE_PAGE_SIZE
+        self.concurrency = concurrency or settings.RECONCILE_CONCURRENCY
+        self.rate_per_second = settings.RECONCILE_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+        self.flush_size = flush_size or settings.RECONCILE_FLUSH_SIZE
+
+    async def run(self) -> ReconciliationReport:
+        report = ReconciliationReport()
+        started = time.perf_counter()
+
+        if not self.gateways:
+            logger.info("ℹ️ [RECONCILE] No provider gateways configured; nothing to poll.")
+            return report
+
+        results = await asyncio.gather(
+            *(self.reconcile_provider(provider, gateway) for provider, gateway in self.gateways.items()),
+            return_exceptions=True,
+        )
+        for provider, result in zip(self.gateways, results):
+            if isinstance(result, Exception):
+                logger.error(f"💥 [RECONCILE] {provider.value} pipeline failed: {result}", exc_info=result)
+                result = ProviderReport(errors=1)
+            report.providers[provider.value] = result
+
+        report.seconds = time.perf_counter() - started
+        logger.info(f"🔁 [RECONCILE] Done: {report.as_dict()}")
+        return report
+
+    # ---------------------------------------------------------
+    # Streaming
+    # ---------------------------------------------------------
     @staticmethod
-    async def reconcile_payments(db: AsyncSession):
-        """
-        Check all pending payments and update status from the provider.
-        """
-        # Fetch all pending payments
-        query = select(Payment).where(Payment.status == "pending")
-        result = await db.execute(query)
-        pending_payments = result.scalars().all()
+    def build_page_query(provider: PaymentProvider, after: Optional[Tuple[datetime, UUID]], limit: int):
+        stmt = (
+            select(Payment.id, Payment.provider_tx_id, Payment.created_at)
+            .where(
+                Payment.status == PaymentStatus.PENDING,
+                Payment.provider == provider,
+                # The provider is asked about its own id; without one there is nothing to verify yet
+                Payment.provider_tx_id.isnot(None),
+            )
+            .order_by(Payment.created_at, Payment.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Payment.created_at, Payment.id) > tuple_(*after))
+        return stmt
+
+    async def stream_pending(self, provider: PaymentProvider):
+        """Yields pages of (id, provider_tx_id) rows; ix_payments_status_provider_created serves each page."""
+        after = None
+        while True:
+            async with self.session_factory() as db:
+                rows = (await db.execute(self.build_page_query(provider, after, self.page_size))).all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < self.page_size:
+                return
+            after = (rows[-1].created_at, rows[-1].id)
+
+    # ---------------------------------------------------------
+    # Per-provider pipeline
+    # ---------------------------------------------------------
+    async def reconcile_provider(self, provider: PaymentProvider, gateway: IPaymentGateway) -> ProviderReport:
+        report = ProviderReport()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = RateLimiter(self.rate_per_second)
+        changes: Dict[PaymentStatus, List[UUID]] = {}
+        tasks: List[asyncio.Task] = []
+        started = time.perf_counter()
+
+        async def check(payment_id: UUID, provider_tx_id: str) -> None:
+            try:
+                await limiter.acquire()
+                call_started = time.perf_counter()
+                try:
+                    raw = await gateway.verify_transaction(provider_tx_id)
+                except Exception as e:
+                    report.errors += 1
+                    record_reconcile_check(provider.value, "error", time.perf_counter() - call_started)
+                    logger.warning(f"⚠️ [RECONCILE] {provider.value} verify failed for {provider_tx_id}: {e}")
+                    return
+
+                new_status = PROVIDER_STATUS_MAP.get(str(raw or "").upper())
+                outcome = new_status.value.lower() if new_status else "unchanged"
+                record_reconcile_check(provider.value, outcome, time.perf_counter() - call_started)
 
-        if not pending_payments:
-            logger.info("No pending payments to reconcile.")
+                if new_status is None:
+                    report.unchanged += 1
+                else:
+                    changes.setdefault(new_status, []).append(payment_id)
+            finally:
+                report.checked += 1
+                semaphore.release()
+
+        try:
+            async for page in self.stream_pending(provider):
+                for row in page:
+                    # Acquire before spawning: back-pressure on the page reader
+                    await semaphore.acquire()
+                    tasks.append(asyncio.create_task(check(row.id, row.provider_tx_id)))
+
+                    if sum(len(ids) for ids in changes.values()) >= self.flush_size:
+                        await self.flush(changes, report)
+        finally:
+            await asyncio.gather(*tasks)
+
+        await self.flush(changes, report)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "🔁 [RECONCILE] %s checked=%s updated=%s errors=%s rate=%.1f/s",
+            provider.value, report.checked, report.updated, report.errors, report.throughput
+        )
+        return report
+
+    async def flush(self, changes: Dict[PaymentStatus, List[UUID]], report: ProviderReport) -> None:
+        """Writes buffered transitions: one guarded UPDATE per target status, one commit."""
+        pending = {status: ids for status, ids in changes.items() if ids}
+        changes.clear()
+        if not pending:
             return
 
-        for record in pending_payments:
+        async with self.session_factory() as db:
             try:
-                provider_status = await ReconciliationService.query_provider(record.provider_tx_id)
-                if provider_status != record.status:
-                    logger.info(
-                        "Updating payment %s status from %s to %s",
-                        record.internal_tx_id,
-                        record.status,
-                        provider_status
-                    )
-                    record.status = provider_status
-                    db.add(record)
+                repo = PaymentRepository(db)
+                for new_status, ids in pending.items():
+                    rows = await repo.update_status_many(ids, new_status)
+                    if new_status == PaymentStatus.SUCCESS and rows:
+                        await RollupRepository(db).record_payments_confirmed(rows)
+                    report.updated[new_status.value] = report.updated.get(new_status.value, 0) + len(rows)
+                await db.commit()
             except Exception as e:
-                logger.error(
-                    "Failed to reconcile payment %s: %s",
-                    record.internal_tx_id,
-                    str(e)
-                )
+                await db.rollback()
+                report.errors += sum(len(ids) for ids in pending.values())
+                logger.error(f"💥 [RECONCILE] Batch update failed: {e}")
+
 
-        await db.commit()
-        logger.info("Reconciliation completed for %d payment(s).", len(pending_payments))
+class ReconciliationService:
+    """
+    Periodically reconciles internal payments ledger with external provider.
+    """
 
     @staticmethod
-    async def query_provider(provider_tx_id: str) -> str:
+    async def reconcile_payments(
+        db: Optional[AsyncSession] = None,
+        gateways: Optional[Dict[PaymentProvider, IPaymentGateway]] = None,
+    ) -> ReconciliationReport:
         """
-        Placeholder for real provider API call.
-        Simulates checking the provider ledger for the status of a transaction.
-
-        Returns:
-            str: status, e.g., "success", "failed", or "pending"
+        Check pending payments and update status from the provider.
+        `db` is accepted for older callers; the engine opens short sessions per page.
         """
-        await asyncio.sleep(0.1)  # simulate API delay
-        # Here you could call an actual provider API
-        return "success"
-
+        return await ReconciliationEngine(gateways=gateways).run()
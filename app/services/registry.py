@@ -1,6 +1,150 @@
-from typing import Dict, Any, List
+import functools
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_RTC_SERVICES = ("doctor", "nurse", "consultation")
+
+# Per-service fields a runtime override (service_config_overrides) may set
+OVERRIDE_FIELDS = ("base_fee", "free_limit", "is_enabled", "promo_message")
+
+
+# ---------------------------------------------------------
+# ✅ SERVICE RECORDS
+# ---------------------------------------------------------
+
+class ServiceRecord(NamedTuple):
+    """Frozen per-service metadata; one instance per service, shared by all of its aliases."""
+    key: str
+    display_name: str
+    base_fee: int
+    free_limit: int
+    is_enabled: bool
+    is_payment_globally_enabled: bool
+    promo_message: str
+    quota_type: str
+    is_rtc_supported: bool
+    category: str
+    per_minute_fee: int = 0
+
+    def as_meta(self) -> Mapping[str, Any]:
+        """The legacy get_service_meta() shape, read-only."""
+        return MappingProxyType(self._asdict())
+
+
+def service_aliases(key: str) -> Tuple[str, ...]:
+    """'doctor-consult' -> ('doctor-consult', 'doctor_consult', 'doctor')."""
+    return tuple(dict.fromkeys((key, key.replace("-", "_"), key.split("-")[0])))
+
+
+def _make_record(key: str, config, fee_map, free_limits, switches, promos) -> ServiceRecord:
+    rtc_services = getattr(config, "RTC_SERVICES", DEFAULT_RTC_SERVICES)
+    # RTC is a property of the service family, so every alias agrees
+    is_rtc = key in rtc_services or key.split("-")[0] in rtc_services
+    return ServiceRecord(
+        key=key,
+        display_name=key.replace("-", " ").title(),
+        base_fee=fee_map.get(key, 0),
+        free_limit=free_limits.get(key, 0),
+        is_enabled=switches.get(key, True),
+        is_payment_globally_enabled=getattr(config, "PAYMENT_ENABLED", True),
+        promo_message=promos.get(key, ""),
+        quota_type=key.replace("-", "_"),
+        is_rtc_supported=is_rtc,
+        category="medical" if is_rtc or "blood" in key else "logistics",
+        per_minute_fee=fee_map.get(f"{key}-per-minute", 0),
+    )
+
+
+@dataclass(frozen=True, eq=False)
+class RegistrySnapshot:
+    """
+    Everything the price engine reads, built once per (re)load.
+    Maps are read-only; a reload swaps in a whole new snapshot.
+
+    Values are the settings defaults with the runtime overrides
+    (service_config_overrides, see app.services.service_config) on top;
+    config_version is the override version they came from (0: none).
+    """
+    version: int
+    records: Mapping[str, ServiceRecord]   # canonical key -> record
+    lookup: Mapping[str, ServiceRecord]    # every alias -> record
+    manifest: Mapping[str, Mapping[str, Any]]
+    fee_map: Mapping[str, int]
+    free_limits: Mapping[str, int]
+    payment_switches: Mapping[str, bool]
+    promo_messages: Mapping[str, str]
+    config: Any
+    overrides: Mapping[str, Mapping[str, Any]]
+    config_version: int = 0
+
+    @classmethod
+    def build(
+        cls,
+        config,
+        version: int = 1,
+        overrides: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        config_version: int = 0,
+    ) -> "RegistrySnapshot":
+        # Settings' map properties build a fresh dict per access: read each once
+        fee_map = dict(config.fee_map)
+        free_limits = dict(config.free_limits)
+        switches = dict(config.payment_switches)
+        promos = dict(config.promo_messages)
+
+        overrides = overrides or {}
+        targets = {"base_fee": fee_map, "free_limit": free_limits, "is_enabled": switches, "promo_message": promos}
+        for key, fields in overrides.items():
+            if key not in fee_map:
+                logger.warning(f"⚠️ [REGISTRY] Ignoring override for unknown service '{key}'")
+                continue
+            for name, value in fields.items():
+                if name in targets and value is not None:
+                    targets[name][key] = value
+
+        records: Dict[str, ServiceRecord] = {}
+        lookup: Dict[str, ServiceRecord] = {}
+        for key in fee_map:
+            record = _make_record(key, config, fee_map, free_limits, switches, promos)
+            records[key] = record
+            for alias in service_aliases(key):
+                if alias in lookup and lookup[alias].key != key:
+                    logger.warning(f"⚠️ [REGISTRY] Alias '{alias}' is ambiguous; keeping {lookup[alias].key}")
+                    continue
+                lookup[alias] = record
+
+        return cls(
+            version=version,
+            records=MappingProxyType(records),
+            lookup=MappingProxyType(lookup),
+            manifest=MappingProxyType({key: record.as_meta() for key, record in records.items()}),
+            fee_map=MappingProxyType(fee_map),
+            free_limits=MappingProxyType(free_limits),
+            payment_switches=MappingProxyType(switches),
+            promo_messages=MappingProxyType(promos),
+            config=config,
+            overrides=MappingProxyType({k: MappingProxyType(dict(v)) for k, v in overrides.items()}),
+            config_version=config_version,
+        )
+
+    def fallback(self, key: str) -> ServiceRecord:
+        """Record for a key that is not a known service (no fee, no free tier)."""
+        return _fallback_record(self, key)
+
+
+@functools.lru_cache(maxsize=256)
+def _fallback_record(snapshot: RegistrySnapshot, key: str) -> ServiceRecord:
+    # Bounded: unknown keys can come straight from request paths
+    return _make_record(
+        key, snapshot.config, snapshot.fee_map, snapshot.free_limits,
+        snapshot.payment_switches, snapshot.promo_messages,
+    )
+
 
 # ---------------------------------------------------------
 # ✅ DYNAMIC SERVICE REGISTRY (2026 Production Update)
@@ -10,44 +154,71 @@ class ServiceRegistry:
     """
     Business Logic layer: Maps internal keys to human-readable names,
     calculates dynamic fees (Fixed vs. Duration), and manages service availability.
+
+    Reads go to an immutable RegistrySnapshot: a service is found by any alias
+    ('doctor', 'doctor-consult', 'doctor_consult') with one dict lookup.
+    reload() rebuilds the snapshot from config and swaps it in one assignment,
+    so a request never sees half an update. Runtime overrides arrive through
+    reload(overrides=..., config_version=...) from ServiceConfigSync.
     """
 
-    def __init__(self):
-        # ✅ Initialize internal storage to prevent 'attribute not found' errors
-        self._services = {}
-        self.refresh_registry()
+    def __init__(self, config=None):
+        self._snapshot = RegistrySnapshot.build(config or settings)
 
-    def refresh_registry(self):
-        """Builds the internal map from settings.fee_map."""
-        # Using a dictionary comprehension to cache all service metadata at startup
-        self._services = {key: self.get_service_meta(key) for key in settings.fee_map.keys()}
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        return self._snapshot
 
-    @staticmethod
-    def get_service_meta(service_key: str) -> Dict[str, Any]:
+    def reload(
+        self,
+        config=None,
+        overrides: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        config_version: Optional[int] = None,
+    ) -> RegistrySnapshot:
+        """
+        Rebuilds from `config` (default: the current settings) and swaps it in.
+        Without `overrides` the ones in place are kept.
+        """
+        current = self._snapshot
+        snapshot = RegistrySnapshot.build(
+            config or settings,
+            version=current.version + 1,
+            overrides=current.overrides if overrides is None else overrides,
+            config_version=current.config_version if config_version is None else config_version,
+        )
+        self._snapshot = snapshot
+        logger.info(
+            f"🔄 [REGISTRY] Reloaded v{snapshot.version} (config v{snapshot.config_version}): "
+            f"{', '.join(snapshot.records)}"
+        )
+        return snapshot
+
+    # Kept for existing callers
+    refresh_registry = reload
+
+    def get(self, service_key: str) -> ServiceRecord:
+        snapshot = self._snapshot
+        record = snapshot.lookup.get(service_key)
+        if record is None:
+            record = snapshot.lookup.get(service_key.strip().lower())
+        return record if record is not None else snapshot.fallback(service_key)
+
+    def get_service_meta(self, service_key: str) -> Mapping[str, Any]:
         """
         Aggregates metadata for a service.
         Detects RTC support and categorizes services for Admin reporting.
         """
-        display_name = service_key.replace("-", " ").title()
-
-        # ✅ IMPROVEMENT: Pull RTC eligibility from settings instead of hardcoding
-        # settings.RTC_SERVICES should be a list like ['doctor', 'nurse', 'consultation']
-        rtc_supported_list = getattr(settings, "RTC_SERVICES", ["doctor", "nurse", "consultation"])
-        is_rtc_eligible = service_key in rtc_supported_list
-
-        return {
-            "key": service_key,
-            "display_name": display_name,
-            "base_fee": settings.fee_map.get(service_key, 0),
-            "free_limit": settings.free_limits.get(service_key, 0),
-            "is_enabled": settings.payment_switches.get(service_key, True),
-            # ✅ NEW: Global master switch for the repository to check
-            "is_payment_globally_enabled": getattr(settings, "PAYMENT_ENABLED", True),
-            "promo_message": settings.promo_messages.get(service_key, ""),
-            "quota_type": service_key.replace("-", "_"),
-            "is_rtc_supported": is_rtc_eligible,
-            "category": "medical" if is_rtc_eligible or "blood" in service_key else "logistics"
-        }
+        record = self.get(service_key)
+        meta = self._snapshot.manifest.get(record.key)
+        return meta if meta is not None else record.as_meta()
+
+    def quota_type(self, service_key: str) -> str:
+        """
+        Usage-counter key for `service_key`: the canonical record's, so every
+        alias draws on one free tier ('doctor', 'doctor-consult' -> 'doctor_consult').
+        Unknown keys keep their own counter.
+        """
+        return self.get(service_key).quota_type
 
     def calculate_effective_fee(
             self,
@@ -59,28 +230,26 @@ class ServiceRegistry:
         The "Price Engine": Handles Free Tiers, Global Toggles,
         and optional Duration-based billing.
         """
-        # Look up in cached services, fallback to dynamic fetch if not cached
-        meta = self._services.get(service_key, self.get_service_meta(service_key))
+        meta = self.get(service_key)
 
         # If the specific service or global payment is disabled, fee is 0
-        if not meta["is_enabled"] or not meta["is_payment_globally_enabled"]:
+        if not meta.is_enabled or not meta.is_payment_globally_enabled:
             return 0
 
         # Check if user is still within their free quota
-        if current_usage_count < meta["free_limit"]:
+        if current_usage_count < meta.free_limit:
             return 0
 
         # Handle Per-Minute Billing for Telemedicine/RTC
-        if meta["is_rtc_supported"] and duration_minutes > 0:
-            per_minute_rate = settings.fee_map.get(f"{service_key}-per-minute", 0)
-            return meta["base_fee"] + (per_minute_rate * duration_minutes)
+        if meta.is_rtc_supported and duration_minutes > 0:
+            return meta.base_fee + (meta.per_minute_fee * duration_minutes)
 
-        return meta["base_fee"]
+        return meta.base_fee
 
-    def get_all_services_manifest(self) -> Dict[str, Dict[str, Any]]:
+    def get_all_services_manifest(self) -> Mapping[str, Mapping[str, Any]]:
         """Returns the full cached manifest for the Mobile UI."""
-        return self._services
+        return self._snapshot.manifest
 
 
 # ✅ Instantiate as a singleton for use across the app
-registry = ServiceRegistry()
\ No newline at end of file
+registry = ServiceRegistry()
@@ -0,0 +1,313 @@
+# app/services/search_service.py
+
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, desc, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.api.endpoints.monitoring import record_search_query, record_search_source
+from app.config import settings
+from app.models.service_listing import ServiceListing, ServiceUser
+
+logger = logging.getLogger(__name__)
+
+# Letters and digits only: everything else is a separator, so user input
+# can never inject tsquery operators (&, |, !, :, parentheses)
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# None until the first search checks pg_extension; then cached per process
+_trigram_available: Optional[bool] = None
+
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or was issued for a different query."""
+
+
+@dataclass
+class SearchHit:
+    source: str       # "provider" | "listing"
+    id: str
+    score: float      # unified: rank * SEARCH_SOURCE_WEIGHTS[source]
+    item: Any         # ServiceUser / ServiceListing row
+    rank: float = 0.0  # raw per-source rank (keyset position)
+
+
+@dataclass
+class SearchPage:
+    hits: List[SearchHit]
+    next_cursor: Optional[str] = None
+    # Sources that timed out or failed; the cursor retries them next page
+    failed_sources: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed_sources)
+
+
+def tokenize(q: str) -> List[str]:
+    return _TERM_RE.findall((q or "").lower())[:settings.SEARCH_MAX_TERMS]
+
+
+def build_tsquery(terms: List[str]):
+    """Prefix AND query: 'jo ndo' -> to_tsquery('simple', 'jo:* & ndo:*')."""
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+# source name -> (model, display-name column used for fuzzy matching)
+SOURCES = {
+    "provider": (ServiceUser, ServiceUser.full_name),
+    "listing": (ServiceListing, ServiceListing.title),
+}
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    return max(1, min(limit or settings.SEARCH_DEFAULT_LIMIT, settings.SEARCH_MAX_LIMIT))
+
+
+async def trigram_available(db: AsyncSession) -> bool:
+    """True when pg_trgm is installed (checked once per process)."""
+    global _trigram_available
+    if not settings.SEARCH_TRIGRAM_ENABLED:
+        return False
+    if _trigram_available is None:
+        try:
+            result = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            _trigram_available = result.scalar() is not None
+        except Exception as e:
+            logger.warning(f"⚠️ [SEARCH] pg_trgm check failed, using full-text only: {e}")
+            _trigram_available = False
+        logger.info(f"🔍 [SEARCH] Fuzzy name matching {'on' if _trigram_available else 'off'} (pg_trgm)")
+    return _trigram_available
+
+
+class SearchService:
+    """
+    Ranked search over providers (service_users) and listings (service_listings).
+
+    Each source is one indexed query:
+      - search_vector @@ prefix tsquery (GIN on the generated tsvector column)
+      - OR, with pg_trgm, word similarity on the display name (GIN trgm index),
+        which catches typos such as 'ndongo' for 'Ndongoh'
+      - ORDER BY ts_rank (+ word_similarity) DESC, id  LIMIT n. With pg_trgm,
+        at most SEARCH_RANK_CANDIDATES matches are ranked so common prefixes
+        stay cheap: the ones whose display name is closest to the query
+        (GiST trigram distance order). Without it every match is ranked
+      - optional keyset position (rank, id) to continue after a previous page
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ---------------------------------------------------------
+    # Query builders
+    # ---------------------------------------------------------
+    @staticmethod
+    def build_query(model, name_column, terms: List[str], limit: int, trigram: bool = False,
+                    candidates: Optional[int] = None, after: Optional[Tuple[float, str]] = None):
+        candidates = settings.SEARCH_RANK_CANDIDATES if candidates is None else candidates
+        tsquery = build_tsquery(terms)
+        matches = model.search_vector.op("@@")(tsquery)
+        query_text = literal(" ".join(terms))
+
+        if trigram:
+            # `q <% name` is word_similarity(q, name) >= pg_trgm.word_similarity_threshold
+            matches = or_(matches, query_text.op("<%")(name_column))
+
+        # Rank at most `candidates` matches: a one-letter prefix can match most
+        # of the table, and ranking reads every matched vector. The pool is the
+        # matches whose name is nearest the query by word-similarity distance,
+        # which the GiST trigram index returns in order, so the cap drops the
+        # least similar names (ties by id keep it deterministic). The keyset
+        # below is applied over that pool, whose size must not follow the page
+        # size, so every page of a cursor walks the same pool. tsvector has no
+        # index that yields matches by rank, so without pg_trgm all are ranked
+        source = model.__table__.select().where(matches)
+        if candidates and trigram:
+            distance = name_column.op("<->>")(query_text)
+            source = source.order_by(distance, model.__table__.c.id).limit(
+                max(candidates, settings.SEARCH_MAX_LIMIT)
+            )
+        source = source.subquery("candidates")
+        row = aliased(model, source)
+
+        rank = func.ts_rank(source.c.search_vector, tsquery)
+        if trigram:
+            rank = rank + func.word_similarity(query_text, source.c[name_column.key])
+
+        score = rank.label("score")
+        stmt = select(row, score)
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, source.c.id > after_id)))
+
+        return stmt.order_by(desc(score), source.c.id).limit(limit)
+
+    @classmethod
+    def build_source_query(cls, name: str, q: str, limit: int, trigram: bool = False,
+                           after: Optional[Tuple[float, str]] = None):
+        model, name_column = SOURCES[name]
+        return cls.build_query(model, name_column, tokenize(q), limit, trigram, after=after)
+
+    @classmethod
+    def build_provider_query(cls, q: str, limit: int, trigram: bool = False):
+        return cls.build_source_query("provider", q, limit, trigram)
+
+    @classmethod
+    def build_listing_query(cls, q: str, limit: int, trigram: bool = False):
+        return cls.build_source_query("listing", q, limit, trigram)
+
+    # ---------------------------------------------------------
+    # Sources
+    # ---------------------------------------------------------
+    async def search_source(self, name: str, q: str, limit: Optional[int] = None,
+                            after: Optional[Tuple[float, str]] = None) -> List[SearchHit]:
+        if not tokenize(q):
+            return []
+        trigram = await trigram_available(self.db)
+        stmt = self.build_source_query(name, q, clamp_limit(limit), trigram, after)
+
+        started = time.perf_counter()
+        rows = (await self.db.execute(stmt)).all()
+        record_search_query(name, time.perf_counter() - started)
+
+        weight = settings.SEARCH_SOURCE_WEIGHTS.get(name, 1.0)
+        return [
+            SearchHit(source=name, id=str(item.id), score=float(rank or 0.0) * weight, item=item,
+                      rank=float(rank or 0.0))
+            for item, rank in rows
+        ]
+
+    async def search_providers(self, q: str, limit: Optional[int] = None) -> List[SearchHit]:
+        return await self.search_source("provider", q, limit)
+
+    async def search_listings(self, q: str, limit: Optional[int] = None) -> List[SearchHit]:
+        return await self.search_source("listing", q, limit)
+
+
+# =========================================================
+# CURSOR
+# =========================================================
+def encode_cursor(terms: List[str], positions: Dict[str, List[Any]], done: List[str]) -> str:
+    payload = json.dumps({"q": " ".join(terms), "pos": positions, "done": sorted(done)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, terms: List[str]) -> Tuple[Dict[str, Tuple[float, str]], set]:
+    """-> ({source: (rank, id)}, {exhausted sources}); InvalidCursor when unusable."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        positions = {name: (float(rank), str(row_id)) for name, (rank, row_id) in payload["pos"].items()}
+        done = set(payload["done"])
+        query = payload["q"]
+    except Exception as e:
+        raise InvalidCursor("Malformed search cursor") from e
+
+    if query != " ".join(terms):
+        raise InvalidCursor("Cursor was issued for a different query")
+    if not set(positions) | done <= set(SOURCES):
+        raise InvalidCursor("Cursor names an unknown source")
+    return positions, done
+
+
+# =========================================================
+# EXECUTOR
+# =========================================================
+class SearchExecutor:
+    """
+    Runs every source at once, each on its own pooled connection.
+
+    A source that exceeds `timeout_seconds` (server-side statement_timeout
+    plus a client-side guard) or errors is dropped from this page and
+    reported in SearchPage.failed_sources, so search latency is the slowest
+    healthy source rather than the sum of all of them.
+
+    Hits are merged by unified score. The cursor keeps a (rank, id) position
+    per source plus the sources already exhausted, so the next page resumes
+    every source exactly after the last hit it contributed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        timeout_seconds: Optional[float] = None,
+        sources: Optional[List[str]] = None,
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+
+        self.session_factory = session_factory
+        self.timeout_seconds = timeout_seconds or settings.SEARCH_SOURCE_TIMEOUT_SECONDS
+        self.sources = list(sources or SOURCES)
+
+    async def _query(self, name: str, q: str, limit: int, after) -> List[SearchHit]:
+        async with self.session_factory() as db:
+            # Let Postgres cancel the statement too, so the connection goes back clean
+            await db.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout_seconds * 1000)}"))
+            return await SearchService(db).search_source(name, q, limit, after)
+
+    async def _fetch(self, name: str, q: str, limit: int, after) -> List[SearchHit]:
+        try:
+            hits = await asyncio.wait_for(self._query(name, q, limit, after), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            record_search_source(name, "timeout")
+            logger.warning(f"⏱️ [SEARCH] Source '{name}' exceeded {self.timeout_seconds}s for '{q}'")
+            raise
+        except Exception as e:
+            record_search_source(name, "error")
+            logger.error(f"❌ [SEARCH] Source '{name}' failed for '{q}': {e}")
+            raise
+        record_search_source(name, "ok")
+        return hits
+
+    async def search(self, q: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> SearchPage:
+        terms = tokenize(q)
+        if not terms:
+            return SearchPage(hits=[])
+
+        limit = clamp_limit(limit)
+        positions, done = decode_cursor(cursor, terms) if cursor else ({}, set())
+        active = [name for name in self.sources if name not in done]
+
+        results = await asyncio.gather(
+            *(self._fetch(name, q, limit, positions.get(name)) for name in active),
+            return_exceptions=True,
+        )
+
+        fetched: Dict[str, List[SearchHit]] = {}
+        failed: List[str] = []
+        for name, result in zip(active, results):
+            if isinstance(result, BaseException):
+                failed.append(name)
+            else:
+                fetched[name] = result
+
+        merged = sorted(
+            (hit for hits in fetched.values() for hit in hits),
+            key=lambda hit: (-hit.score, hit.source, hit.id),
+        )[:limit]
+
+        # Advance each source past the last hit it contributed to this page
+        last_emitted = {hit.source: hit for hit in merged}
+        next_positions = {name: [rank, row_id] for name, (rank, row_id) in positions.items()}
+        for name, hits in fetched.items():
+            last = last_emitted.get(name)
+            if last is not None:
+                next_positions[name] = [last.rank, last.id]
+            # Fewer rows than asked for, all of them shown: nothing left there
+            if len(hits) < limit and (not hits or last is hits[-1]):
+                done.add(name)
+
+        next_cursor = None
+        if any(name not in done for name in self.sources):
+            next_cursor = encode_cursor(terms, next_positions, list(done))
+
+        return SearchPage(hits=merged, next_cursor=next_cursor, failed_sources=failed)
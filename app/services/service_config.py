@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.api.endpoints.monitoring import record_service_config_reload
+from app.config import settings
+from app.core.redis import get_shared_redis
+from app.models.service_config import SERVICE_CONFIG_VERSION_SEQ, ServiceConfigOverride
+from app.services.registry import OVERRIDE_FIELDS, ServiceRegistry, registry
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "service-config"
+
+Overrides = Dict[str, Dict[str, Any]]
+
+
+# =========================================================
+# 1. STORAGE (Postgres)
+# =========================================================
+async def load_overrides(db) -> Tuple[int, Overrides]:
+    """All overrides (NULL columns left out) and the configuration version."""
+    rows = (await db.execute(select(ServiceConfigOverride))).scalars().all()
+    overrides = {
+        row.service_key: {name: getattr(row, name) for name in OVERRIDE_FIELDS if getattr(row, name) is not None}
+        for row in rows
+    }
+    return max((row.version for row in rows), default=0), overrides
+
+
+async def current_version(db) -> int:
+    return (await db.execute(select(func.coalesce(func.max(ServiceConfigOverride.version), 0)))).scalar()
+
+
+async def save_override(db, service_key: str, changes: Mapping[str, Any], updated_by: Optional[str] = None) -> int:
+    """
+    Upserts the given fields for one service (None clears a field back to
+    its environment default) and returns the new configuration version.
+    The caller commits.
+
+    Writers are serialized until that commit: a version drawn later could
+    otherwise commit first, and every worker (this one too) would skip the
+    earlier one as already seen. Readers (ACCESS SHARE) are not blocked.
+    """
+    await db.execute(text(f"LOCK TABLE {ServiceConfigOverride.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+    values = {name: changes[name] for name in OVERRIDE_FIELDS if name in changes}
+    stmt = insert(ServiceConfigOverride).values(
+        service_key=service_key, version=SERVICE_CONFIG_VERSION_SEQ.next_value(), updated_by=updated_by, **values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ServiceConfigOverride.service_key],
+        set_={
+            **{name: stmt.excluded[name] for name in values},
+            "version": stmt.excluded.version,
+            "updated_by": stmt.excluded.updated_by,
+            "updated_at": func.now(),
+        },
+    ).returning(ServiceConfigOverride.version)
+    return (await db.execute(stmt)).scalar_one()
+
+
+# =========================================================
+# 2. SYNC (every worker)
+# =========================================================
+class ServiceConfigSync:
+    """
+    Keeps this worker's ServiceRegistry in line with service_config_overrides.
+
+    Requests never touch the table: the registry snapshot holds the merged
+    values. A write bumps the configuration version and is announced on the
+    Redis channel 'service-config'; every worker reloads on a version above
+    its own, typically within milliseconds. A cheap max(version) poll every
+    SERVICE_CONFIG_POLL_SECONDS covers workers without Redis and missed
+    messages.
+    """
+
+    def __init__(
+        self,
+        target: Optional[ServiceRegistry] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        redis_getter: Callable[[], Optional[Any]] = get_shared_redis,
+        poll_seconds: Optional[float] = None,
+    ):
+        self.registry = target or registry
+        self._session_factory = session_factory
+        self._redis_getter = redis_getter
+        self.poll_seconds = poll_seconds or settings.SERVICE_CONFIG_POLL_SECONDS
+        self._lock = asyncio.Lock()
+        self._tasks: list = []
+        self._stopping = asyncio.Event()
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    @property
+    def version(self) -> int:
+        return self.registry.snapshot.config_version
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+    async def start(self) -> None:
+        """Loads the current overrides, then follows changes in the background."""
+        try:
+            await self.refresh("startup")
+        except Exception as e:
+            logger.warning(f"⚠️ [SERVICE_CONFIG] Initial load failed; using environment defaults: {e}")
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._poll_loop(), name="service-config-poll")]
+        if self._redis_getter() is not None:
+            self._tasks.append(asyncio.create_task(self._listen_loop(), name="service-config-listen"))
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---------------------------------------------------------
+    # Reload / announce
+    # ---------------------------------------------------------
+    async def refresh(self, source: str = "local", min_version: int = 0) -> int:
+        """Reloads the registry from the table unless it is already at `min_version` or newer."""
+        async with self._lock:
+            if min_version and self.version >= min_version:
+                return self.version
+            async with self._session() as db:
+                version, overrides = await load_overrides(db)
+            if version != self.version or source == "startup":
+                self.registry.reload(overrides=overrides, config_version=version)
+                record_service_config_reload(source)
+                logger.info(f"💲 [SERVICE_CONFIG] Pricing config v{version} applied ({source})")
+            return self.version
+
+    async def publish(self, version: int) -> None:
+        """Tells every worker that configuration `version` exists."""
+        client = self._redis_getter()
+        if client is None:
+            return
+        try:
+            await client.publish(CHANNEL, json.dumps({"version": version}))
+        except Exception as e:
+            # The other workers' poll still picks it up
+            logger.warning(f"⚠️ [SERVICE_CONFIG] Announce of v{version} failed: {e}")
+
+    # ---------------------------------------------------------
+    # Background loops
+    # ---------------------------------------------------------
+    async def _listen_loop(self) -> None:
+        while not self._stopping.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis_getter().pubsub()
+                await pubsub.subscribe(CHANNEL)
+                while not self._stopping.is_set():
+                    raw = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if raw is None or raw.get("type") != "message":
+                        continue
+                    try:
+                        version = int(json.loads(raw["data"])["version"])
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("⚠️ [SERVICE_CONFIG] Ignoring malformed announcement")
+                        continue
+                    if version > self.version:
+                        await self.refresh("pubsub", min_version=version)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [SERVICE_CONFIG] Pub/sub listener failed: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def _poll_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                async with self._session() as db:
+                    version = await current_version(db)
+                if version != self.version:
+                    await self.refresh("poll")
+            except Exception as e:
+                logger.warning(f"⚠️ [SERVICE_CONFIG] Version poll failed: {e}")
+
+
+service_config_sync = ServiceConfigSync()
@@ -0,0 +1,437 @@
+# app/services/sms_matching.py
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import JSON, String, bindparam, cast, column, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID
+
+from app.api.endpoints.monitoring import record_sms_match
+from app.config import settings
+from app.models.payment import Payment, PaymentProvider, PaymentStatus
+from app.repositories.rollup_repo import RollupRepository
+from app.services.orchestrator import service_orchestrator
+from app.services.sms_parser import ParsedSMS, SMSParser
+
+logger = logging.getLogger(__name__)
+
+# Payments an incoming SMS may settle
+MATCHABLE_STATUSES = (PaymentStatus.PENDING, PaymentStatus.AWAITING_VERIFICATION)
+SMS_PROVIDERS = (PaymentProvider.MTN, PaymentProvider.ORANGE)
+
+MatchKey = Tuple[str, int, str]  # (provider, amount in cents, 9-digit phone)
+
+
+_NON_DIGIT = re.compile(r"\D")
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """'+237 677-12-34-56' / '237677123456' / '677123456' -> '677123456'; None if not a 9-digit number."""
+    if not raw:
+        return None
+    digits = raw if raw.isdigit() else _NON_DIGIT.sub("", raw)
+    if len(digits) == 12 and digits.startswith("237"):
+        digits = digits[3:]
+    return digits if len(digits) == 9 else None
+
+
+def amount_cents(amount: Any) -> int:
+    """Numeric(10,2) ledger amounts and parsed SMS floats on one integer scale."""
+    if isinstance(amount, Decimal):
+        return int(amount.scaleb(2).to_integral_value())
+    return round(float(amount) * 100)
+
+
+def _provider_name(provider: Any) -> str:
+    return provider.value if isinstance(provider, PaymentProvider) else str(provider)
+
+
+# =========================================================
+# 1. IN-MEMORY INDEX OF MATCHABLE PAYMENTS
+# =========================================================
+@dataclass(frozen=True)
+class PendingPayment:
+    id: UUID
+    provider: str
+    cents: int
+    phones: Tuple[str, ...]
+    tx_id: Optional[str]  # TxID the user already submitted (AWAITING_VERIFICATION)
+
+    @classmethod
+    def from_row(cls, row) -> "PendingPayment":
+        phones = (normalize_phone(row.user_phone), normalize_phone(row.metadata_phone))
+        return cls(
+            id=row.id,
+            provider=_provider_name(row.provider),
+            cents=amount_cents(row.amount),
+            phones=tuple(p for p in dict.fromkeys(phones) if p),
+            tx_id=row.provider_tx_id or None,
+        )
+
+
+class PendingIndex:
+    """
+    (provider, amount, phone) -> matchable payments, oldest first, plus
+    (provider, TxID) -> the claim carrying it. Built once per matching run
+    so each SMS is a dict lookup instead of a query.
+    """
+
+    def __init__(self, payments: Iterable[PendingPayment] = ()):
+        self.by_key: Dict[MatchKey, List[PendingPayment]] = {}
+        self.by_tx: Dict[Tuple[str, str], PendingPayment] = {}
+        self.size = 0
+        for payment in payments:
+            self.add(payment)
+
+    def add(self, payment: PendingPayment) -> None:
+        self.size += 1
+        if payment.tx_id:
+            # A submitted TxID is the stronger signal; phone+amount would only guess
+            self.by_tx[(payment.provider, payment.tx_id)] = payment
+            return
+        for phone in payment.phones:
+            self.by_key.setdefault((payment.provider, payment.cents, phone), []).append(payment)
+
+
+# =========================================================
+# 2. MATCHING (pure)
+# =========================================================
+MATCHED = "matched"
+UNMATCHED = "unmatched"
+AMBIGUOUS = "ambiguous"              # several payments fit: flagged for an admin
+AMOUNT_MISMATCH = "amount_mismatch"  # TxID claimed for a different amount: flagged
+DUPLICATE = "duplicate"              # TxID already used (earlier in the batch or on a settled payment)
+STALE = "stale"                      # matched, but the payment changed before the write
+UNPARSED = "unparsed"
+
+CONFLICTS = (AMBIGUOUS, AMOUNT_MISMATCH)
+
+
+@dataclass
+class SMSMatch:
+    sms: ParsedSMS
+    outcome: str
+    payment_ids: Tuple[UUID, ...] = ()
+
+
+def match_messages(
+    messages: Sequence[ParsedSMS],
+    index: PendingIndex,
+    used_tx_ids: Set[Tuple[str, str]] = frozenset(),
+) -> List[SMSMatch]:
+    """
+    One outcome per SMS, in order. A payment is matched at most once per
+    batch; when more than one payment fits an SMS nothing is guessed.
+    """
+    claimed: Set[UUID] = set()
+    seen = set(used_tx_ids)
+    results: List[SMSMatch] = []
+
+    for sms in messages:
+        tx_key = (sms.sender, sms.transaction_id)
+        if tx_key in seen:
+            results.append(SMSMatch(sms, DUPLICATE))
+            continue
+        seen.add(tx_key)
+        cents = amount_cents(sms.amount)
+
+        claim = index.by_tx.get(tx_key)
+        if claim is not None and claim.id not in claimed:
+            if claim.cents == cents:
+                claimed.add(claim.id)
+                results.append(SMSMatch(sms, MATCHED, (claim.id,)))
+            else:
+                results.append(SMSMatch(sms, AMOUNT_MISMATCH, (claim.id,)))
+            continue
+
+        phone = normalize_phone(sms.phone)
+        candidates = [
+            p for p in index.by_key.get((sms.sender, cents, phone), ()) if p.id not in claimed
+        ] if phone else []
+
+        if not candidates:
+            results.append(SMSMatch(sms, UNMATCHED))
+        elif len(candidates) == 1:
+            claimed.add(candidates[0].id)
+            results.append(SMSMatch(sms, MATCHED, (candidates[0].id,)))
+        else:
+            results.append(SMSMatch(sms, AMBIGUOUS, tuple(p.id for p in candidates)))
+
+    return results
+
+
+# =========================================================
+# 3. REPORT
+# =========================================================
+@dataclass
+class SMSMatchReport:
+    received: int = 0
+    indexed: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    matches: List[SMSMatch] = field(default_factory=list)
+    flagged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def confirmed(self) -> int:
+        return self.outcomes.get(MATCHED, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "indexed": self.indexed,
+            "confirmed": self.confirmed,
+            "flagged": self.flagged,
+            "outcomes": dict(self.outcomes),
+            "conflicts": [
+                {
+                    "transaction_id": m.sms.transaction_id,
+                    "provider": m.sms.sender,
+                    "amount": m.sms.amount,
+                    "phone": m.sms.phone,
+                    "reason": m.outcome,
+                    "payment_ids": [str(pid) for pid in m.payment_ids],
+                }
+                for m in self.matches if m.outcome in CONFLICTS
+            ],
+            "seconds": round(self.seconds, 3),
+        }
+
+
+# =========================================================
+# 4. ENGINE
+# =========================================================
+def _merge_metadata(extra: Dict[str, str]):
+    """metadata_json || extra, in SQL (the column is json, so round-trip through jsonb)."""
+    pairs = [part for item in extra.items() for part in item]
+    merged = func.coalesce(cast(Payment.metadata_json, JSONB), func.jsonb_build_object()).op(
+        "||", return_type=JSONB
+    )(func.jsonb_build_object(*pairs))
+    return cast(merged, JSON)
+
+
+class SMSMatchingEngine:
+    """
+    Settles MTN/Orange payments from the provider SMS the merchant line receives.
+
+    Per run:
+      - parse all bodies (SMSParser.parse_many)
+      - build a PendingIndex from keyset pages per (status, provider), which
+        ix_payments_status_provider_created serves in order
+      - look up already-used TxIDs for the whole batch in one query
+      - match in memory, then confirm in chunks of `batch_size`: one guarded
+        UPDATE ... FROM unnest(ids, tx_ids) sets status, TxID and AUTO_MATCH
+        per chunk; the rollups and the service activation /admin/verify-bypass
+        runs (listing, quota, FCM) follow in the same transaction
+      - move PENDING payments behind a conflict to AWAITING_VERIFICATION
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        page_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        if session_factory is None:
+            from app.database import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+
+        self.session_factory = session_factory
+        self.page_size = page_size or settings.SMS_MATCH_PAGE_SIZE
+        self.batch_size = batch_size or settings.SMS_MATCH_BATCH_SIZE
+
+    async def run(self, messages: Sequence[Union[str, ParsedSMS]]) -> SMSMatchReport:
+        report = SMSMatchReport(received=len(messages))
+        started = time.perf_counter()
+
+        # Raw bodies are parsed in one batch; arrival order decides who wins a payment
+        parsed_bodies = iter(SMSParser.parse_many([m for m in messages if isinstance(m, str)]))
+        parsed = [m if isinstance(m, ParsedSMS) else next(parsed_bodies) for m in messages]
+        unparsed = parsed.count(None)
+        if unparsed:
+            parsed = [m for m in parsed if m is not None]
+            report.outcomes[UNPARSED] = unparsed
+            record_sms_match("unknown", UNPARSED, unparsed)
+
+        if parsed:
+            index = await self.load_index()
+            report.indexed = index.size
+            used = await self.used_tx_ids(parsed)
+            report.matches = match_messages(parsed, index, used)
+            await self.confirm(report.matches)
+            report.flagged = await self.flag_conflicts(report.matches)
+
+            for match in report.matches:
+                report.outcomes[match.outcome] = report.outcomes.get(match.outcome, 0) + 1
+                record_sms_match(match.sms.sender, match.outcome)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            f"📩 [SMS_MATCH] {report.received} SMS against {report.indexed} open payments: "
+            f"{report.outcomes} in {report.seconds:.2f}s"
+        )
+        return report
+
+    # ---------------------------------------------------------
+    # Reads
+    # ---------------------------------------------------------
+    @staticmethod
+    def build_page_query(status: PaymentStatus, provider: PaymentProvider, after, limit: int):
+        stmt = (
+            select(
+                Payment.id, Payment.provider, Payment.amount, Payment.user_phone, Payment.provider_tx_id,
+                # Only the phone: decoding whole metadata documents dominated the index build
+                Payment.metadata_json["phone"].as_string().label("metadata_phone"),
+                Payment.created_at,
+            )
+            .where(Payment.status == status, Payment.provider == provider)
+            .order_by(Payment.created_at, Payment.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Payment.created_at, Payment.id) > tuple_(*after))
+        return stmt
+
+    async def load_index(self) -> PendingIndex:
+        index = PendingIndex()
+        async with self.session_factory() as db:
+            for status in MATCHABLE_STATUSES:
+                for provider in SMS_PROVIDERS:
+                    after = None
+                    while True:
+                        rows = (await db.execute(self.build_page_query(status, provider, after, self.page_size))).all()
+                        for row in rows:
+                            index.add(PendingPayment.from_row(row))
+                        if len(rows) < self.page_size:
+                            break
+                        after = (rows[-1].created_at, rows[-1].id)
+        return index
+
+    async def used_tx_ids(self, messages: Sequence[ParsedSMS]) -> Set[Tuple[str, str]]:
+        """(provider, TxID) pairs of the batch already recorded on a settled payment."""
+        tx_ids = list({m.transaction_id for m in messages})
+        found: Set[Tuple[str, str]] = set()
+        async with self.session_factory() as db:
+            for start in range(0, len(tx_ids), self.batch_size):
+                rows = (await db.execute(
+                    select(Payment.provider, Payment.provider_tx_id).where(
+                        Payment.provider_tx_id.in_(tx_ids[start:start + self.batch_size]),
+                        Payment.status.notin_(MATCHABLE_STATUSES),
+                    )
+                )).all()
+                found.update((_provider_name(r.provider), r.provider_tx_id) for r in rows)
+        return found
+
+    # ---------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------
+    @staticmethod
+    def build_confirm_stmt():
+        """
+        Guarded UPDATE joined to unnest(:payment_ids, :tx_ids): two array
+        parameters whatever the chunk size, so the statement compiles and
+        prepares once.
+        """
+        matched = func.unnest(
+            bindparam("payment_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+            bindparam("tx_ids", type_=ARRAY(String)),
+        ).table_valued(
+            column("payment_id", PG_UUID(as_uuid=True)), column("tx_id", String)
+        ).render_derived(name="sms_matched")
+        return (
+            update(Payment)
+            .where(Payment.id == matched.c.payment_id, Payment.status.in_(MATCHABLE_STATUSES))
+            .values(
+                status=PaymentStatus.SUCCESS,
+                provider_tx_id=matched.c.tx_id,
+                confirmed_at=func.coalesce(Payment.confirmed_at, func.now()),
+                updated_at=func.now(),
+                metadata_json=_merge_metadata({"verification_mode": "AUTO_MATCH", "matched_by": "sms"}),
+            )
+            .returning(
+                Payment.id,
+                Payment.user_id,
+                Payment.idempotency_key,
+                Payment.service_type,
+                Payment.provider,
+                Payment.amount,
+                Payment.confirmed_at,
+                Payment.metadata_json,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def confirm(self, matches: List[SMSMatch]) -> None:
+        """One transaction per chunk; matches whose payment moved meanwhile become STALE."""
+        pending = [m for m in matches if m.outcome == MATCHED]
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            async with self.session_factory() as db:
+                try:
+                    rows = (await db.execute(self.build_confirm_stmt(), {
+                        "payment_ids": [m.payment_ids[0] for m in chunk],
+                        "tx_ids": [m.sms.transaction_id for m in chunk],
+                    })).all()
+                    if rows:
+                        await RollupRepository(db).record_payments_confirmed(rows)
+                    for row in rows:
+                        await self.activate(db, row)
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"💥 [SMS_MATCH] Confirm batch failed: {e}")
+                    rows = []
+            settled = {row.id for row in rows}
+            for match in chunk:
+                if match.payment_ids[0] not in settled:
+                    match.outcome = STALE
+
+    @staticmethod
+    async def activate(db, row) -> None:
+        """What /admin/verify-bypass does after its SUCCESS update: publish the listing, log quota, notify."""
+        service_type = row.service_type
+        await service_orchestrator.activate_listing(
+            db=db,
+            user_id=row.user_id,
+            service_type=getattr(service_type, "value", service_type),
+            activation_ref=row.idempotency_key,
+        )
+
+    async def flag_conflicts(self, matches: List[SMSMatch]) -> int:
+        """PENDING payments behind a conflict go to AWAITING_VERIFICATION for an admin."""
+        by_reason: Dict[str, Set[UUID]] = {}
+        for match in matches:
+            if match.outcome in CONFLICTS:
+                by_reason.setdefault(match.outcome, set()).update(match.payment_ids)
+        if not by_reason:
+            return 0
+
+        flagged = 0
+        async with self.session_factory() as db:
+            try:
+                for reason, ids in by_reason.items():
+                    result = await db.execute(
+                        update(Payment)
+                        .where(Payment.id.in_(list(ids)), Payment.status == PaymentStatus.PENDING)
+                        .values(
+                            status=PaymentStatus.AWAITING_VERIFICATION,
+                            updated_at=func.now(),
+                            metadata_json=_merge_metadata({"sms_conflict": reason}),
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    flagged += result.rowcount or 0
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"💥 [SMS_MATCH] Flagging conflicts failed: {e}")
+                return 0
+        if flagged:
+            logger.warning(f"⚠️ [SMS_MATCH] {flagged} payment(s) need manual verification")
+        return flagged
+
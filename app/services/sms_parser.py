@@ -1,6 +1,6 @@
 import re
 import logging
-from typing import Optional, Dict, Any
+from typing import List, Optional, Pattern, Sequence
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -11,53 +11,180 @@ class ParsedSMS:
     amount: float
     sender: str  # MTN or ORANGE
     raw_body: str
+    phone: Optional[str] = None  # Counterparty MSISDN (9 digits, no 237 prefix) when the SMS names one
+    template: str = ""
+
+
+# ---------------------------------------------------------
+# ✅ SHARED FIELD PATTERNS (compiled once)
+# ---------------------------------------------------------
+# Every pattern starts with a literal or a digit so the regex engine can skip
+# ahead instead of trying an alternation at each position.
+
+# "500 FCFA", "1,500 FCFA", "12 500 FCFA", "1.500 FCFA", "1,500.00 XAF", "500.5 FCFA"
+AMOUNT = re.compile(
+    r"\d(?<![\d.,]\d)(?:\d{0,2}(?:[ ,.  ]\d{3})+|\d*)(?:[.,]\d{1,2})?(?=\s*(?:FCFA|F\s?CFA|XAF))",
+    re.IGNORECASE,
+)
+# Cameroon mobile numbers: 6XXXXXXXX, optionally +237 / 237 prefixed (checked in find_phone)
+PHONE = re.compile(r"6\d{8}(?!\d)")
+# What follows a template label: ": <id>" (matched on the lowercased body)
+_ID_VALUE = r"\s*:\s*([a-z0-9][a-z0-9.]*[a-z0-9])"
+
+_DECIMAL_TAIL = re.compile(r"[.,](\d{1,2})$")
+_NON_DIGIT = re.compile(r"\D")
+
+
+def parse_amount(raw: str) -> float:
+    """'1,500' / '12 500' / '1.500' -> 1500.0; a 1-2 digit tail is the decimal part ('500.5')."""
+    if raw.isdigit():
+        return float(raw)
+    tail = _DECIMAL_TAIL.search(raw)
+    whole = raw[:tail.start()] if tail else raw
+    digits = _NON_DIGIT.sub("", whole)
+    return float(f"{digits}.{tail.group(1)}" if tail else digits)
+
+
+def find_phone(body: str) -> Optional[str]:
+    """First standalone Cameroon mobile number in `body` (9 digits, country code dropped)."""
+    match = PHONE.search(body)
+    if match is None:
+        return None
+    if not match.start() or not body[match.start() - 1].isdigit():
+        return match.group()
+    for match in PHONE.finditer(body, match.start()):
+        start = match.start()
+        if start and body[start - 1].isdigit():
+            # Only a 237 country code may run into the number
+            if body[start - 3:start] != "237" or (start > 3 and body[start - 4].isdigit()):
+                continue
+        return match.group()
+    return None
+
+
+@dataclass(frozen=True)
+class SMSTemplate:
+    """
+    One SMS format: the transaction id follows "<label>:".
+    `label` matches the lowercased label text (start it with a literal
+    character: the combined scan relies on that to stay fast); `tx_id` must
+    match the whole id.
+    """
+    name: str
+    provider: str
+    label: Pattern
+    tx_id: Pattern
+    amount: Pattern = AMOUNT
+
+    def build(self, body: str, tx_id: str) -> Optional[ParsedSMS]:
+        amount_match = self.amount.search(body)
+        if not amount_match:
+            return None
+        return ParsedSMS(
+            transaction_id=tx_id,
+            amount=parse_amount(amount_match.group()),
+            sender=self.provider,
+            raw_body=body,
+            phone=find_phone(body),
+            template=self.name,
+        )
+
+
+# ---------------------------------------------------------
+# ✅ BUILT-IN TEMPLATES (2026 formats)
+# ---------------------------------------------------------
+# MTN Example: "Transfer confirmed. 500 FCFA sent to... Transaction ID: 2501234567"
+# MTN Cash-in: "You have received 500 FCFA from... TransID: 2501234567"
+MTN_EN = SMSTemplate(
+    name="mtn_en",
+    provider="MTN",
+    label=re.compile(r"financial transaction id|transaction id|transid"),
+    tx_id=re.compile(r"\d{10,12}"),
+)
+# MTN (FR): "Vous avez recu 500 FCFA de ... ID de transaction: 2501234567"
+MTN_FR = SMSTemplate(
+    name="mtn_fr",
+    provider="MTN",
+    label=re.compile(r"id de (?:la )?transaction"),
+    tx_id=re.compile(r"\d{10,12}"),
+)
+# Orange Example: "Le transfert de 500 FCFA au 69XXXXXXX a réussi. ID: CM26..."
+# Orange Cash-in: "Depot de 500 FCFA reussi. Reference: PP26..." (ids may contain dots: PP260101.1234.A12345)
+ORANGE = SMSTemplate(
+    name="orange",
+    provider="ORANGE",
+    label=re.compile(r"id(?<![a-z0-9]id)|r[ée]f[ée]rence|ref(?<![a-z0-9]ref)"),
+    tx_id=re.compile(r"[A-Z0-9][A-Z0-9.]{8,23}[A-Z0-9]", re.IGNORECASE),
+)
+
 
 class SMSParser:
     """
     Utility to parse Cameroon Mobile Money SMS strings.
     Extracts Transaction IDs and Amounts for 2026 standardized formats.
+
+    The engine finds "<label>: <id>" with one scan of the lowercased body
+    for all template labels at once, then names the template (and so the
+    provider) from the matched label; only that template's id and amount
+    patterns run after it. register() adds formats at runtime.
     """
 
-    # --- REGEX PATTERNS ---
-    # MTN Example: "Transfer confirmed. 500 FCFA sent to... Transaction ID: 2501234567"
-    # MTN Cash-in: "You have received 500 FCFA from... TransID: 2501234567"
-    MTN_PATTERN = r"(?:Transaction ID|TransID):\s*(\d{10,12})"
-    MTN_AMOUNT_PATTERN = r"(\d+(?:\.\d+)?)\s*FCFA"
+    templates: List[SMSTemplate] = []
+    _scanner: Optional[Pattern] = None
+
+    @classmethod
+    def register(cls, template: SMSTemplate, first: bool = False) -> None:
+        """Adds a format; `first` makes it win when several templates accept a label."""
+        templates = [t for t in cls.templates if t.name != template.name]
+        if first:
+            templates.insert(0, template)
+        else:
+            templates.append(template)
+        cls.templates = templates
+        cls._build_scanner()
+
+    @classmethod
+    def _build_scanner(cls) -> None:
+        # No per-template groups: a plain alternation keeps the engine's first-character prefilter
+        labels = "|".join(t.label.pattern for t in cls.templates)
+        cls._scanner = re.compile(f"({labels}){_ID_VALUE}") if cls.templates else None
 
-    # Orange Example: "Le transfert de 500 FCFA au 69XXXXXXX a réussi. ID: CM26..."
-    # Orange Cash-in: "Depot de 500 FCFA reussi. Reference: PP26..."
-    ORANGE_PATTERN = r"(?:ID|Reference|Ref):\s*([A-Z0-9]{10,20})"
-    ORANGE_AMOUNT_PATTERN = r"(\d+(?:\.\d+)?)\s*FCFA"
+    @classmethod
+    def _scan(cls, body: str, provider: Optional[str] = None) -> Optional[ParsedSMS]:
+        if cls._scanner is None:
+            return None
+        lowered = body.lower()
+        if len(lowered) != len(body):
+            # Rare case-mapping that changes length: scan the original text instead
+            lowered = body
+        for match in cls._scanner.finditer(lowered):
+            label = match.group(1)
+            id_start, id_end = match.span(match.lastindex)
+            tx_id = body[id_start:id_end]
+            for template in cls.templates:
+                if provider is not None and template.provider != provider:
+                    continue
+                if template.label.fullmatch(label) and template.tx_id.fullmatch(tx_id):
+                    parsed = template.build(body, tx_id)
+                    if parsed:
+                        return parsed
+        return None
+
+    @classmethod
+    def detect_provider(cls, body: str) -> Optional[str]:
+        """Provider of the first SMS template that recognizes `body`, or None."""
+        parsed = cls._scan(" ".join(body.split()))
+        return parsed.sender if parsed else None
 
     @classmethod
     def parse_mtn(cls, body: str) -> Optional[ParsedSMS]:
         """Parses MTN MoMo Cameroon SMS."""
-        tx_id_match = re.search(cls.MTN_PATTERN, body, re.IGNORECASE)
-        amount_match = re.search(cls.MTN_AMOUNT_PATTERN, body, re.IGNORECASE)
-
-        if tx_id_match and amount_match:
-            return ParsedSMS(
-                transaction_id=tx_id_match.group(1),
-                amount=float(amount_match.group(1).replace(",", "")),
-                sender="MTN",
-                raw_body=body
-            )
-        return None
+        return cls._scan(body, "MTN")
 
     @classmethod
     def parse_orange(cls, body: str) -> Optional[ParsedSMS]:
         """Parses Orange Money Cameroon SMS."""
-        tx_id_match = re.search(cls.ORANGE_PATTERN, body, re.IGNORECASE)
-        amount_match = re.search(cls.ORANGE_AMOUNT_PATTERN, body, re.IGNORECASE)
-
-        if tx_id_match and amount_match:
-            return ParsedSMS(
-                transaction_id=tx_id_match.group(1),
-                amount=float(amount_match.group(1).replace(",", "")),
-                sender="ORANGE",
-                raw_body=body
-            )
-        return None
+        return cls._scan(body, "ORANGE")
 
     @classmethod
     def parse_any(cls, body: str) -> Optional[ParsedSMS]:
@@ -66,17 +193,24 @@ class SMSParser:
         Ideal for the Android 'User Consent' payload.
         """
         # Clean up whitespace/newlines from SMS
-        clean_body = " ".join(body.split())
+        parsed = cls._scan(" ".join(body.split()))
+        if parsed is None:
+            logger.warning(f"Failed to parse SMS body: {body[:50]}...")
+        return parsed
 
-        # Try MTN first
-        parsed = cls.parse_mtn(clean_body)
-        if parsed:
-            return parsed
+    @classmethod
+    def parse_many(cls, bodies: Sequence[str]) -> List[Optional[ParsedSMS]]:
+        """
+        Batch form of parse_any: one result per body, in order (None where
+        nothing matched). Failures are logged once per batch, not per SMS.
+        """
+        scan = cls._scan
+        results = [scan(" ".join(body.split())) for body in bodies]
+        failed = results.count(None)
+        if failed:
+            logger.warning(f"⚠️ [SMS] {failed}/{len(results)} SMS bodies matched no template")
+        return results
 
-        # Try Orange
-        parsed = cls.parse_orange(clean_body)
-        if parsed:
-            return parsed
 
-        logger.warning(f"Failed to parse SMS body: {body[:50]}...")
-        return None
\ No newline at end of file
+for _template in (MTN_EN, MTN_FR, ORANGE):
+    SMSParser.register(_template)
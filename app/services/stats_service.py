@@ -1,56 +1,106 @@
-from sqlalchemy import select, func, and_
-from datetime import datetime, timezone, timedelta
-from app.models.payment import Payment, PaymentStatus
+from sqlalchemy import select, func, and_, true
+from datetime import datetime, timezone
+from app.config import settings
+from app.models.payment import Payment, PaymentStatus, PaymentProvider, ServiceType
 from app.models.call_session import CallSession, CallStatus
+from app.models.rollup import CallDailyRollup, PaymentDailyRollup
+from app.utils.ttl_cache import TTLCache
+
+
+# Shared by /admin/dashboard-stats and the daily report; keyed per UTC day
+_dashboard_cache = TTLCache("stats:dashboard", ttl_seconds=settings.STATS_CACHE_TTL)
+
+
+def _dashboard_metrics_stmt(today_start: datetime):
+    """
+    Every dashboard aggregate in one round trip.
+
+    Revenue, provider volume, bypass and consultation totals come from
+    payment_daily_rollups (O(days) rows); only the PENDING backlog and
+    today's calls are read live, both through indexes.
+    """
+    today = today_start.date()
+    is_today = PaymentDailyRollup.day == today
+    is_consultation = PaymentDailyRollup.service_type.in_([ServiceType.DOCTOR, ServiceType.NURSE])
+
+    revenue = (
+        select(
+            func.coalesce(func.sum(PaymentDailyRollup.success_amount).filter(is_today), 0).label("revenue"),
+            func.coalesce(func.sum(PaymentDailyRollup.auto_match_count).filter(is_today), 0).label("bypass"),
+            func.coalesce(
+                func.sum(PaymentDailyRollup.success_amount)
+                .filter(and_(is_today, PaymentDailyRollup.provider == PaymentProvider.MTN)), 0
+            ).label("mtn"),
+            func.coalesce(
+                func.sum(PaymentDailyRollup.success_amount)
+                .filter(and_(is_today, PaymentDailyRollup.provider == PaymentProvider.ORANGE)), 0
+            ).label("orange"),
+            func.coalesce(
+                func.sum(PaymentDailyRollup.success_amount).filter(is_consultation), 0
+            ).label("consultation_revenue"),
+        )
+        .subquery("r")
+    )
+
+    calls = (
+        select(
+            func.avg(CallSession.duration_seconds)
+            .filter(CallSession.status == CallStatus.COMPLETED)
+            .label("avg_duration"),
+            func.count().label("volume"),
+        )
+        .where(CallSession.started_at >= today_start)
+        .subquery("c")
+    )
+
+    awaiting = (
+        select(func.count())
+        .select_from(Payment)
+        .where(Payment.status == PaymentStatus.PENDING)
+        .scalar_subquery()
+    )
+
+    return select(
+        awaiting.label("awaiting"),
+        revenue.c.revenue,
+        revenue.c.bypass,
+        revenue.c.mtn,
+        revenue.c.orange,
+        revenue.c.consultation_revenue,
+        calls.c.avg_duration,
+        calls.c.volume,
+    ).select_from(revenue.join(calls, true()))
 
 
 class StatsService:
     @staticmethod
-    async def get_dashboard_metrics(db):
+    async def get_dashboard_metrics(db, use_cache: bool = True):
         """
         High-performance aggregation for the Admin Dashboard.
         Combines Financial health and RTC operational metrics.
+
+        One query, served through a STATS_CACHE_TTL cache (in-process + Redis).
         """
         # Define the 'Today' boundary
         today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        # 1. Payment Metrics
-        pending_stmt = select(func.count(Payment.id)).where(Payment.status == PaymentStatus.PENDING)
-
-        revenue_stmt = select(func.sum(Payment.amount)).where(
-            and_(
-                Payment.status == PaymentStatus.SUCCESS,
-                Payment.confirmed_at >= today_start
-            )
-        )
-
-        # 2. RTC / Call Metrics (2026 Update)
-        # Average Call Duration for successful consultations
-        avg_duration_stmt = select(func.avg(CallSession.duration_seconds)).where(
-            and_(
-                CallSession.status == CallStatus.COMPLETED,
-                CallSession.started_at >= today_start
-            )
-        )
-
-        # Call Volume (Total calls handled today)
-        call_volume_stmt = select(func.count(CallSession.id)).where(
-            CallSession.started_at >= today_start
-        )
+        async def compute():
+            row = (await db.execute(_dashboard_metrics_stmt(today_start))).one()
+            return {
+                "total_awaiting_verification": row.awaiting or 0,
+                "total_revenue_today": float(row.revenue or 0.0),
+                "bypass_matches_today": int(row.bypass or 0),
+                "mtn_volume": float(row.mtn or 0.0),
+                "orange_volume": float(row.orange or 0.0),
+                "consultation_revenue_total": float(row.consultation_revenue or 0.0),
+                "avg_call_duration_seconds": round(float(row.avg_duration or 0.0), 2),
+                "total_calls_today": row.volume or 0,
+                "system_health_score": "Optimal"  # Logic based on duration/success ratio
+            }
 
-        # 3. Execution
-        res_p = await db.execute(pending_stmt)
-        res_r = await db.execute(revenue_stmt)
-        res_d = await db.execute(avg_duration_stmt)
-        res_v = await db.execute(call_volume_stmt)
-
-        return {
-            "total_awaiting_verification": res_p.scalar() or 0,
-            "total_revenue_today": float(res_r.scalar() or 0.0),
-            "avg_call_duration_seconds": round(float(res_d.scalar() or 0.0), 2),
-            "total_calls_today": res_v.scalar() or 0,
-            "system_health_score": "Optimal"  # Logic based on duration/success ratio
-        }
+        if not use_cache:
+            return await compute()
+        return await _dashboard_cache.get_or_compute(today_start.date().isoformat(), compute)
 
     @staticmethod
     async def get_doctor_performance(db, doctor_id: str):
@@ -58,15 +108,11 @@ class StatsService:
         Calculates specific KPIs for a single medical provider.
         Used for doctor payout calculations and quality auditing.
         """
+        # Reads call_daily_rollups: one row per active day, not per call
         stmt = select(
-            func.count(CallSession.id).label("total_calls"),
-            func.sum(CallSession.duration_seconds).label("total_minutes")
-        ).where(
-            and_(
-                CallSession.callee_id == doctor_id,
-                CallSession.status == CallStatus.COMPLETED
-            )
-        )
+            func.sum(CallDailyRollup.completed_count).label("total_calls"),
+            func.sum(CallDailyRollup.total_duration_seconds).label("total_minutes")
+        ).where(CallDailyRollup.callee_id == doctor_id)
 
         res = await db.execute(stmt)
         data = res.first()
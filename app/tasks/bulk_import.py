@@ -0,0 +1,552 @@
+# app/tasks/bulk_import.py
+"""
+Streaming bulk import of Firestore exports into Postgres.
+
+    python -m app.tasks.bulk_import donors exports/blood_donors.ndjson
+    python -m app.tasks.bulk_import requests exports/blood_requesters.json.gz --chunk-size 20000
+
+Reads NDJSON or a JSON array (optionally gzipped) one document at a time,
+COPYs each chunk into a temporary staging table and merges it with a single
+INSERT ... ON CONFLICT. Every chunk is its own transaction: a chunk the
+database rejects is reported and skipped, and a checkpoint written after each
+chunk lets an interrupted import resume where it stopped (--restart ignores it).
+An undecodable NDJSON line is rejected like an invalid document; a JSON array
+that stops parsing ends the import at that character offset.
+"""
+
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.schemas.blood_donors import BLOOD_TYPE_CHOICES as DONOR_BLOOD_TYPES
+from app.schemas.blood_requests import BLOOD_TYPE_CHOICES as REQUEST_BLOOD_TYPES, STATUS_CHOICES
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 1 << 16
+_ARRAY_SEPARATORS = " \t\r\n,"
+# Rejected documents kept (with their reason) in the report and checkpoint
+_MAX_REJECT_SAMPLES = 20
+
+
+# =========================================================
+# 1. STREAMING READERS
+# =========================================================
+def open_source(path: str):
+    """Text stream over `path`; '.gz' files are decompressed on the fly."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+class SourceError(ValueError):
+    """The source cannot be parsed past character `offset` (decompressed text)."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at character {offset}")
+        self.offset = offset
+
+
+@dataclass(frozen=True)
+class UndecodableLine:
+    """Stands in for an NDJSON line that is not valid JSON, so it is rejected in place."""
+    line_no: int
+    reason: str
+
+
+def iter_records(stream, read_size: int = _READ_SIZE) -> Iterator[Any]:
+    """
+    Documents from a JSON array or NDJSON stream, one at a time, without
+    loading the file. The format is picked from the first non-blank character.
+
+    A bad NDJSON line yields an UndecodableLine and reading goes on; a JSON
+    array has no record boundaries to resync on, so it raises SourceError.
+    """
+    head = stream.read(read_size)
+    if head.lstrip().startswith("["):
+        return _iter_array(stream, head, read_size)
+    return _iter_lines(stream, head, read_size)
+
+
+def _iter_lines(stream, chunk: str, read_size: int) -> Iterator[Any]:
+    pending, line_no = "", 0
+    while chunk:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield _loads(line, line_no)
+        chunk = stream.read(read_size)
+    if pending.strip():
+        yield _loads(pending, line_no + 1)
+
+
+def _loads(line: str, line_no: int) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return UndecodableLine(line_no, f"Invalid JSON on line {line_no}: {e}")
+
+
+def _iter_array(stream, buf: str, read_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    pos = buf.index("[") + 1
+    base = 0   # characters dropped from the front of `buf` so far
+    eof = False
+    while True:
+        # Skip whitespace and separators, refilling as the buffer runs out
+        while True:
+            while pos < len(buf) and buf[pos] in _ARRAY_SEPARATORS:
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            base += len(buf)
+            buf, pos = stream.read(read_size), 0
+            eof = not buf
+        if pos >= len(buf):
+            raise SourceError("Unterminated JSON array", base + pos)
+        if buf[pos] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A value ending exactly at the buffer edge may continue (e.g. a number)
+            complete = end < len(buf) or eof
+        except json.JSONDecodeError as e:
+            if eof:
+                raise SourceError(f"Invalid JSON array element: {e.msg}", base + e.pos) from None
+            complete = False
+        if not complete:
+            more = stream.read(read_size)
+            eof = not more
+            base += pos
+            buf, pos = buf[pos:] + more, 0
+            continue
+
+        yield value
+        pos = end
+
+
+# =========================================================
+# 2. DOCUMENT -> ROW TRANSFORMS
+# =========================================================
+def _text(doc: Dict[str, Any], *keys: str, limit: Optional[int] = None) -> Optional[str]:
+    """First non-blank value among `keys` (Firestore exports mix snake and camel case)."""
+    for key in keys:
+        value = doc.get(key)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value:
+            return value[:limit] if limit else value
+    return None
+
+
+def _bool(value: Any, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "")
+    return bool(value)
+
+
+def _phone(doc: Dict[str, Any]) -> str:
+    # Same rule as the API schemas: digits only, 7-15 of them
+    digits = "".join(filter(str.isdigit, _text(doc, "phone", "phoneNumber", "phone_number") or ""))
+    if not 7 <= len(digits) <= 15:
+        raise ValueError("phone must have 7-15 digits")
+    return digits
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Firestore {seconds, nanoseconds} maps, epoch numbers and ISO-8601 strings."""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        seconds = value.get("seconds", value.get("_seconds"))
+        if seconds is None:
+            return None
+        nanos = value.get("nanoseconds", value.get("_nanoseconds", 0)) or 0
+        return datetime.fromtimestamp(seconds + nanos / 1e9, tz=timezone.utc)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Epoch milliseconds are common in JS-written documents
+        return datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"unparseable timestamp {value!r}") from None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    raise ValueError(f"unparseable timestamp {value!r}")
+
+
+def donor_row(doc: Dict[str, Any]) -> Tuple:
+    """blood_donors row from a Firestore donor document; ValueError rejects it."""
+    city = _text(doc, "city", limit=100)
+    if not city:
+        raise ValueError("missing city")
+    blood_type = (_text(doc, "blood_type", "bloodType", "bloodGroup") or "UNKNOWN").upper()
+    if blood_type not in DONOR_BLOOD_TYPES:
+        raise ValueError(f"unknown blood_type {blood_type!r}")
+    return (
+        _text(doc, "name", "full_name", "fullName") or "Unknown",
+        _phone(doc),
+        blood_type,
+        city,
+        _text(doc, "hospital", "hospital_name", "hospitalName", limit=100),
+        _bool(doc.get("is_active", doc.get("isActive"))),
+        _text(doc, "fcm_token", "fcmToken"),
+    )
+
+
+# Requests exported without an owner are attributed to this user_id
+IMPORTED_REQUEST_OWNER = "firestore-import"
+
+
+def request_row(doc: Dict[str, Any]) -> Tuple:
+    """blood_requests row from a Firestore requester document; ValueError rejects it."""
+    external_id = _text(doc, "id", limit=128)
+    if not external_id:
+        raise ValueError("missing id")
+    city = _text(doc, "city", "hospitalCity", limit=50)
+    if not city:
+        raise ValueError("missing city")
+    blood_type = (_text(doc, "blood_type", "bloodType", "bloodGroup") or "").upper()
+    if blood_type not in REQUEST_BLOOD_TYPES:
+        raise ValueError(f"unknown blood_type {blood_type!r}")
+    status = (_text(doc, "status") or "PENDING").upper()
+    if status not in STATUS_CHOICES:
+        raise ValueError(f"unknown status {status!r}")
+    try:
+        units = int(doc.get("needed_units") or doc.get("units") or 1)
+    except (TypeError, ValueError):
+        raise ValueError("needed_units must be an integer") from None
+    created_at = _timestamp(doc.get("created_at") or doc.get("timestamp")) or datetime.now(timezone.utc)
+    return (
+        external_id,
+        _text(doc, "user_id", "userId", "uid", limit=128) or IMPORTED_REQUEST_OWNER,
+        _text(doc, "requester_name", "requesterName", "name", limit=100) or "Unknown",
+        city,
+        _phone(doc),
+        blood_type,
+        max(units, 1),
+        _text(doc, "hospital", "hospital_name", "hospitalName", limit=150),
+        _bool(doc.get("urgent")),
+        status,
+        created_at,
+    )
+
+
+# =========================================================
+# 3. DATASETS
+# =========================================================
+@dataclass(frozen=True)
+class Dataset:
+    """A target table, its staged columns (name, Postgres type) and merge key."""
+    name: str
+    table: str
+    columns: Tuple[Tuple[str, str], ...]
+    conflict: str
+    transform: Callable[[Dict[str, Any]], Tuple]
+
+    @property
+    def column_names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    @property
+    def staging_table(self) -> str:
+        return f"_import_{self.table}"
+
+    def staging_ddl(self) -> str:
+        # Rows vanish at the end of each chunk's transaction, committed or not
+        columns = ", ".join(f"{name} {pg_type}" for name, pg_type in self.columns)
+        return (
+            f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} "
+            f"(_seq bigint, {columns}) ON COMMIT DELETE ROWS"
+        )
+
+    def merge_sql(self) -> str:
+        # DISTINCT ON keeps the last copy of a key within the chunk: ON CONFLICT
+        # cannot touch the same row twice in one statement
+        columns = ", ".join(self.column_names)
+        updates = ", ".join(
+            [f"{name} = EXCLUDED.{name}" for name in self.column_names if name != self.conflict]
+            + ["updated_at = now()"]
+        )
+        return f"""
+            WITH merged AS (
+                INSERT INTO {self.table} ({columns})
+                SELECT DISTINCT ON ({self.conflict}) {columns}
+                FROM {self.staging_table}
+                ORDER BY {self.conflict}, _seq DESC
+                ON CONFLICT ({self.conflict}) DO UPDATE SET {updates}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) AS merged FROM merged
+        """
+
+
+DATASETS: Dict[str, Dataset] = {
+    "donors": Dataset(
+        name="donors",
+        table="blood_donors",
+        columns=(
+            ("name", "text"), ("phone", "text"), ("blood_type", "text"), ("city", "text"),
+            ("hospital", "text"), ("is_active", "boolean"), ("fcm_token", "text"),
+        ),
+        conflict="phone",
+        transform=donor_row,
+    ),
+    "requests": Dataset(
+        name="requests",
+        table="blood_requests",
+        columns=(
+            ("external_id", "text"), ("user_id", "text"), ("requester_name", "text"), ("city", "text"),
+            ("phone", "text"), ("blood_type", "text"), ("needed_units", "integer"), ("hospital", "text"),
+            ("urgent", "boolean"), ("status", "text"), ("created_at", "timestamptz"),
+        ),
+        conflict="external_id",
+        transform=request_row,
+    ),
+}
+
+
+# =========================================================
+# 4. IMPORTER
+# =========================================================
+@dataclass
+class ImportReport:
+    dataset: str
+    source: str
+    position: int = 0          # documents consumed, including rejected and failed ones
+    staged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    resumed_from: int = 0
+    done: bool = False
+    error: Optional[str] = None  # why the source could not be read to the end
+    elapsed_seconds: float = 0.0
+    failed_chunks: List[Dict[str, Any]] = field(default_factory=list)
+    rejects: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        processed = self.position - self.resumed_from
+        return processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class _Chunk:
+    first: int
+    size: int = 0
+    rows: List[Tuple] = field(default_factory=list)
+    rejects: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None  # the source stopped parsing after this chunk
+
+
+class BulkImporter:
+    """
+    Imports one file into one dataset over an asyncpg connection.
+
+    Every `chunk_size` documents are transformed (on a worker thread, one
+    chunk ahead), COPYed (binary) into the staging table and merged in one
+    transaction; the checkpoint then records how far the file has been consumed.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        chunk_size: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.dataset = dataset
+        self.chunk_size = max(1, chunk_size or settings.BULK_IMPORT_CHUNK_SIZE)
+        self.checkpoint_path = checkpoint_path
+
+    # ---------------------------------------------------------
+    # Checkpoints
+    # ---------------------------------------------------------
+    @staticmethod
+    def _fingerprint(path: str) -> Dict[str, int]:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_checkpoint(self, path: str) -> Optional[ImportReport]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.pop("file", None) != self._fingerprint(path) or saved.get("dataset") != self.dataset.name:
+            logger.warning(f"⚠️ [IMPORT] Checkpoint {self.checkpoint_path} is for another file; starting over")
+            return None
+        return ImportReport(**saved)
+
+    def _save_checkpoint(self, path: str, report: ImportReport) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**asdict(report), "file": self._fingerprint(path)}, f, indent=2)
+        os.replace(tmp, self.checkpoint_path)
+
+    # ---------------------------------------------------------
+    # Import
+    # ---------------------------------------------------------
+    async def run(self, conn, path: str, restart: bool = False) -> ImportReport:
+        report = None if restart else self._load_checkpoint(path)
+        if report is not None and report.done:
+            logger.info(f"✅ [IMPORT] {path} already imported ({report.position} documents); use --restart")
+            return report
+        if report is None:
+            report = ImportReport(dataset=self.dataset.name, source=os.path.abspath(path))
+        report.resumed_from = report.position
+
+        started = time.perf_counter()
+        await conn.execute(self.dataset.staging_ddl())
+        upcoming = None
+        try:
+            with open_source(path) as stream:
+                documents = itertools.islice(iter_records(stream), report.position, None)
+                chunk = await asyncio.to_thread(self._prepare, documents, report.position)
+                while chunk.size:
+                    if chunk.error is None:
+                        # Parse the next chunk on a worker thread while this one is written
+                        upcoming = asyncio.create_task(
+                            asyncio.to_thread(self._prepare, documents, chunk.first + chunk.size)
+                        )
+                    await self._write_chunk(conn, chunk, report)
+                    report.elapsed_seconds = time.perf_counter() - started
+                    self._save_checkpoint(path, report)
+                    if chunk.error is not None:
+                        break
+                    chunk, upcoming = await upcoming, None
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+            await conn.execute(f"DROP TABLE IF EXISTS {self.dataset.staging_table}")
+
+        # Everything before an unreadable spot is merged; the checkpoint keeps
+        # the position so a fixed file (or --restart) can pick it up
+        report.error = chunk.error
+        report.done = chunk.error is None
+        report.elapsed_seconds = time.perf_counter() - started
+        self._save_checkpoint(path, report)
+        if report.error:
+            logger.error(f"❌ [IMPORT] {self.dataset.name}: stopped after document {report.position}: {report.error}")
+            return report
+        logger.info(
+            f"✅ [IMPORT] {self.dataset.name}: {report.position - report.resumed_from} documents in "
+            f"{report.elapsed_seconds:.1f}s ({report.rows_per_second:,.0f}/s) | inserted {report.inserted} | "
+            f"updated {report.updated} | rejected {report.rejected} | failed chunks {len(report.failed_chunks)}"
+        )
+        return report
+
+    def _prepare(self, documents: Iterator[Any], first: int) -> _Chunk:
+        """Reads and transforms up to chunk_size documents starting at position `first`."""
+        chunk = _Chunk(first=first)
+        try:
+            for offset, doc in enumerate(itertools.islice(documents, self.chunk_size)):
+                chunk.size += 1
+                try:
+                    if isinstance(doc, UndecodableLine):
+                        raise ValueError(doc.reason)
+                    if not isinstance(doc, dict):
+                        raise ValueError("document is not an object")
+                    chunk.rows.append((first + offset, *self.dataset.transform(doc)))
+                except ValueError as e:
+                    doc_id = doc.get("id") if isinstance(doc, dict) else None
+                    chunk.rejects.append({"position": first + offset, "id": doc_id, "reason": str(e)})
+        except SourceError as e:
+            chunk.error = str(e)
+        return chunk
+
+    async def _write_chunk(self, conn, chunk: _Chunk, report: ImportReport) -> None:
+        report.chunks += 1
+        report.rejected += len(chunk.rejects)
+        report.rejects.extend(chunk.rejects[:max(0, _MAX_REJECT_SAMPLES - len(report.rejects))])
+        last = chunk.first + chunk.size - 1
+        try:
+            if chunk.rows:
+                async with conn.transaction():
+                    await conn.copy_records_to_table(
+                        self.dataset.staging_table,
+                        records=chunk.rows,
+                        columns=["_seq", *self.dataset.column_names],
+                    )
+                    merged = await conn.fetchrow(self.dataset.merge_sql())
+                report.staged += len(chunk.rows)
+                report.inserted += merged["inserted"]
+                report.updated += merged["merged"] - merged["inserted"]
+        except Exception as e:
+            report.failed_chunks.append({
+                "chunk": report.chunks,
+                "first": chunk.first,
+                "last": last,
+                "error": f"{type(e).__name__}: {e}",
+            })
+            logger.error(f"❌ [IMPORT] Chunk {report.chunks} (documents {chunk.first}-{last}) failed: {e}")
+        finally:
+            report.position = chunk.first + chunk.size
+
+
+async def import_file(
+    dataset: str,
+    path: str,
+    chunk_size: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    restart: bool = False,
+) -> ImportReport:
+    """Runs a BulkImporter on a dedicated pooled connection."""
+    from app.database import async_engine
+
+    importer = BulkImporter(
+        DATASETS[dataset],
+        chunk_size=chunk_size,
+        checkpoint_path=checkpoint_path or f"{path}.checkpoint.json",
+    )
+    async with async_engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        return await importer.run(raw.driver_connection, path, restart=restart)
+
+
+async def _main(args) -> int:
+    from app.database import async_engine
+
+    try:
+        report = await import_file(args.dataset, args.path, args.chunk_size, args.checkpoint, args.restart)
+    finally:
+        await async_engine.dispose()
+    for failed in report.failed_chunks:
+        print(f"chunk {failed['chunk']} (documents {failed['first']}-{failed['last']}): {failed['error']}")
+    for reject in report.rejects:
+        print(f"rejected document {reject['position']} ({reject['id']}): {reject['reason']}")
+    if report.error:
+        print(f"stopped after document {report.position}: {report.error}")
+    return 1 if report.failed_chunks or report.error else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Stream a Firestore JSON/NDJSON export into Postgres")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("path", help="NDJSON or JSON array file, optionally .gz")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"Documents per COPY + merge (default {settings.BULK_IMPORT_CHUNK_SIZE})")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(_main(args)))
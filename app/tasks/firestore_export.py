@@ -0,0 +1,273 @@
+# app/tasks/firestore_export.py
+"""
+Parallel, streaming export of Firestore collections to NDJSON.
+
+    python -m app.tasks.firestore_export -s serviceAccountKey.json -o exports --gzip
+    python -m app.tasks.firestore_export --emulator localhost:8080 -o exports blood_donors
+
+Each collection is read in document-id order, a page at a time, and appended
+to <output>/<collection>.ndjson (.ndjson.gz with --gzip: one gzip member per
+page) as it arrives; collections are exported concurrently on a bounded thread
+pool. After every page the state file records the last document id and the
+file size, so a rerun resumes after that document (anything written past the
+last checkpoint is truncated first). The output feeds app.tasks.bulk_import.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+# Firestore's document-id pseudo field, for ordering and cursors
+DOCUMENT_ID = "__name__"
+
+
+# =========================================================
+# 1. SERIALIZATION
+# =========================================================
+def _json_default(value: Any) -> Any:
+    """Firestore value types json cannot encode natively."""
+    # Timestamps (DatetimeWithNanoseconds is a datetime; older SDKs expose to_datetime())
+    if hasattr(value, "to_datetime") and callable(value.to_datetime):
+        return value.to_datetime().isoformat()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    # GeoPoint
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    # DocumentReference
+    if hasattr(value, "path"):
+        return value.path
+    return str(value)
+
+
+def document_line(snapshot) -> str:
+    """One NDJSON line: the document's fields plus its id."""
+    doc = snapshot.to_dict() or {}
+    doc["id"] = snapshot.id
+    return json.dumps(doc, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+# =========================================================
+# 2. EXPORTER
+# =========================================================
+@dataclass
+class CollectionState:
+    file: str
+    last_id: Optional[str] = None
+    documents: int = 0
+    bytes: int = 0
+    done: bool = False
+    seconds: float = 0.0
+
+
+class FirestoreExporter:
+    """
+    Exports collections of a Firestore client (or anything with the same
+    collections() / order_by / limit / start_after / stream surface).
+    """
+
+    def __init__(
+        self,
+        client,
+        output_dir: str,
+        compress: bool = False,
+        page_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ):
+        self.client = client
+        self.output_dir = output_dir
+        self.compress = compress
+        self.page_size = max(1, page_size or settings.FIRESTORE_EXPORT_PAGE_SIZE)
+        self.workers = max(1, workers or settings.FIRESTORE_EXPORT_WORKERS)
+        self._state: Dict[str, CollectionState] = {}
+        self._state_lock = threading.Lock()
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.output_dir, STATE_FILE)
+
+    def file_name(self, collection: str) -> str:
+        return f"{collection}.ndjson.gz" if self.compress else f"{collection}.ndjson"
+
+    # ---------------------------------------------------------
+    # State (shared by the worker threads)
+    # ---------------------------------------------------------
+    def _load_state(self) -> None:
+        self._state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self._state = {name: CollectionState(**entry) for name, entry in saved.get("collections", {}).items()}
+
+    def _checkpoint(self, state: CollectionState, **changes: Any) -> None:
+        """Applies `changes` to `state` and persists all states as one atomic step."""
+        with self._state_lock:
+            for field_name, value in changes.items():
+                setattr(state, field_name, value)
+            payload = {"collections": {name: asdict(state) for name, state in sorted(self._state.items())}}
+            tmp = f"{self.state_path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp, self.state_path)
+
+    # ---------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------
+    def run(self, collections: Optional[Iterable[str]] = None, restart: bool = False) -> Dict[str, CollectionState]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        if restart:
+            self._state = {}
+        else:
+            self._load_state()
+
+        wanted = set(collections) if collections else None
+        targets = [c for c in self.client.collections() if wanted is None or c.id in wanted]
+        for collection in targets:
+            state = self._state.get(collection.id)
+            if state is None or state.file != self.file_name(collection.id):
+                self._state[collection.id] = CollectionState(file=self.file_name(collection.id))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="firestore-export") as pool:
+            # Re-raises the first failed collection; the others still run to completion
+            list(pool.map(self.export_collection, targets))
+
+        total = sum(self._state[c.id].documents for c in targets)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"📤 [EXPORT] {len(targets)} collection(s), {total} documents in {elapsed:.1f}s "
+            f"({total / elapsed if elapsed else 0:,.0f}/s) -> {self.output_dir}"
+        )
+        return {c.id: self._state[c.id] for c in targets}
+
+    def export_collection(self, collection) -> CollectionState:
+        name = collection.id
+        state = self._state[name]
+        if state.done:
+            logger.info(f"📤 [EXPORT] {name}: already exported ({state.documents} documents)")
+            return state
+
+        started = time.perf_counter()
+        path = os.path.join(self.output_dir, state.file)
+        with open(path, "ab") as out:
+            # Anything past the last checkpoint is a partial page from an interrupted run
+            out.truncate(state.bytes)
+            out.seek(state.bytes)
+            while True:
+                query = collection.order_by(DOCUMENT_ID).limit(self.page_size)
+                if state.last_id is not None:
+                    query = query.start_after({DOCUMENT_ID: state.last_id})
+
+                lines: List[str] = []
+                last_id = None
+                for snapshot in query.stream():
+                    lines.append(document_line(snapshot))
+                    last_id = snapshot.id
+                if not lines:
+                    break
+
+                payload = ("\n".join(lines) + "\n").encode("utf-8")
+                out.write(gzip.compress(payload) if self.compress else payload)
+                out.flush()
+                now = time.perf_counter()
+                self._checkpoint(
+                    state,
+                    last_id=last_id,
+                    documents=state.documents + len(lines),
+                    bytes=out.tell(),
+                    seconds=state.seconds + now - started,
+                )
+                started = now
+                if len(lines) < self.page_size:
+                    break
+
+        self._checkpoint(state, done=True, seconds=state.seconds + time.perf_counter() - started)
+        logger.info(
+            f"📤 [EXPORT] {name}: {state.documents} documents, {state.bytes / 1e6:.1f} MB "
+            f"in {state.seconds:.1f}s -> {path}"
+        )
+        return state
+
+
+# =========================================================
+# 3. CLIENTS
+# =========================================================
+def firestore_client(service_account: Optional[str] = None, emulator: Optional[str] = None):
+    """A Firestore client for a service account, the app's default credentials or an emulator."""
+    if emulator:
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud import firestore
+
+        os.environ["FIRESTORE_EMULATOR_HOST"] = emulator
+        return firestore.Client(project=settings.FIREBASE_PROJECT_ID, credentials=AnonymousCredentials())
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if service_account:
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(service_account))
+    else:
+        from app.firebase_client import _init_firebase
+
+        if not _init_firebase():
+            raise RuntimeError("Firebase credentials are not configured")
+    return firestore.client()
+
+
+def export_collections(
+    service_account_path: Optional[str] = None,
+    output_dir: str = "exported_data",
+    compress: bool = False,
+    collections: Optional[Iterable[str]] = None,
+    emulator: Optional[str] = None,
+    restart: bool = False,
+    page_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, CollectionState]:
+    client = firestore_client(service_account_path, emulator)
+    exporter = FirestoreExporter(client, output_dir, compress=compress, page_size=page_size, workers=workers)
+    return exporter.run(collections, restart=restart)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export Firestore collections to NDJSON files")
+    parser.add_argument("collections", nargs="*", help="Collections to export (default: all)")
+    parser.add_argument("--service-account", "-s", help="Path to Firebase serviceAccountKey.json")
+    parser.add_argument("--emulator", help="Firestore emulator host:port (no credentials needed)")
+    parser.add_argument("--output-dir", "-o", default="exported_data", help="Directory for the NDJSON files")
+    parser.add_argument("--gzip", action="store_true", help="Write .ndjson.gz files")
+    parser.add_argument("--page-size", type=int, default=None,
+                        help=f"Documents per read (default {settings.FIRESTORE_EXPORT_PAGE_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Collections exported at once (default {settings.FIRESTORE_EXPORT_WORKERS})")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved export state")
+    args = parser.parse_args(argv)
+
+    export_collections(
+        args.service_account, args.output_dir, compress=args.gzip, collections=args.collections,
+        emulator=args.emulator, restart=args.restart, page_size=args.page_size, workers=args.workers,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
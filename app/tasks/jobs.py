@@ -3,8 +3,10 @@ import logging
 from typing import Optional
 
 from app.domain.interfaces import IPaymentGateway, IUsageRepository
+from app.models.payment import PaymentProvider
 from app.repositories.payment_repo import PaymentRepository
-from app.repositories.usage_repo import UsageRepository
+from app.repositories.usage_repo import SQLAlchemyUsageRepository as UsageRepository
+from app.services.reconciliation_service import ReconciliationEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
@@ -70,16 +72,22 @@ async def retry_job(
 
 
 async def reconciliation_job(
-    db: AsyncSession,
-    payment_gateway: IPaymentGateway
+    db: Optional[AsyncSession] = None,
+    payment_gateway: Optional[IPaymentGateway] = None,
+    provider: PaymentProvider = PaymentProvider.MTN,
 ):
     """
     Periodic reconciliation between provider and local ledger.
+
+    Runs ReconciliationEngine over every configured gateway, or only
+    `payment_gateway` (for `provider`) when one is passed. `db` is kept
+    for older callers; the engine commits its own batches.
     """
-    from app.repositories.payment_repo import PaymentRepository
+    gateways = {provider: payment_gateway} if payment_gateway is not None else None
+    report = await ReconciliationEngine(gateways=gateways).run()
 
-    payment_repo = PaymentRepository(db)
-    # Example: fetch pending payments from local DB
-    # Compare with provider records
-    # Update status if needed
-    logger.info("Reconciliation job executed")
+    logger.info(
+        "Reconciliation job executed: checked=%s rate=%.1f payments/s",
+        report.checked, report.throughput
+    )
+    return report
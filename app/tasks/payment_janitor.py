@@ -1,92 +1,184 @@
 import logging
-import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import update, func, cast, Text
-from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from typing import Dict, Optional
+
+from sqlalchemy import update, select, func, cast, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import SQLAlchemyError, DBAPIError
 
-# Importing from session to ensure we use the updated engine with 60s timeout
+from app.api.endpoints.monitoring import record_janitor_batch
+from app.config import settings
 from app.db.session import AsyncSessionLocal
 from app.models.payment import Payment, PaymentStatus
 
+# ✅ 2026 Timeouts: PENDING rows carry their own expires_at (15m USSD window)
+# | 24h for forgotten manual claims
+VERIFICATION_STALE_HOURS = 24
+
 logger = logging.getLogger(__name__)
 
-PAYMENT_EXPIRY_MINUTES = 15
-VERIFICATION_STALE_HOURS = 24
 
+# ---------------------------------------------------------
+# Sweep Rules
+# ---------------------------------------------------------
+@dataclass(frozen=True)
+class SweepRule:
+    """One status -> FAILED transition, driven by a timestamp column."""
+    name: str
+    status: PaymentStatus
+    time_column: object
+    reason: str
+
+
+# PENDING rides ix_payments_janitor_sweep (status, expires_at)
+ABANDONED_USSD = SweepRule("abandoned_ussd", PaymentStatus.PENDING, Payment.expires_at, "ussd_timeout")
+STALE_CLAIMS = SweepRule("stale_claims", PaymentStatus.AWAITING_VERIFICATION, Payment.created_at, "stale_verification")
+
+
+def _tag_reason(reason: str):
+    """metadata_json || {"expiry_reason": reason}, preserving existing keys."""
+    current = func.coalesce(cast(Payment.metadata_json, JSONB), literal_column("'{}'::jsonb"))
+    return current.op("||")(func.jsonb_build_object("expiry_reason", reason))
+
+
+def build_batch_update(rule: SweepRule, cutoff: datetime, batch_size: int, now: datetime):
+    """
+    UPDATE payments SET ... WHERE id IN (
+        SELECT id FROM payments WHERE status = :s AND <col> < :cutoff
+        ORDER BY <col> LIMIT :n FOR UPDATE SKIP LOCKED
+    )
+
+    SKIP LOCKED lets a second janitor (or a user confirming a payment)
+    proceed without waiting on rows this batch already holds.
+    """
+    victims = (
+        select(Payment.id)
+        .where(Payment.status == rule.status, rule.time_column < cutoff)
+        .order_by(rule.time_column)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    return (
+        update(Payment)
+        .where(Payment.id.in_(victims.scalar_subquery()))
+        .values({
+            Payment.status: PaymentStatus.FAILED,
+            Payment.updated_at: now,
+            Payment.metadata_json: _tag_reason(rule.reason),
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def sweep(
+    session,
+    rule: SweepRule,
+    cutoff: datetime,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Expires `rule` rows in committed chunks until a short batch shows
+    the backlog is drained (or max_batches is hit). Returns rows expired.
+    """
+    batch_size = batch_size or settings.JANITOR_BATCH_SIZE
+    max_batches = max_batches or settings.JANITOR_MAX_BATCHES
+    total = 0
+
+    for batch_no in range(1, max_batches + 1):
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+
+        result = await session.execute(build_batch_update(rule, cutoff, batch_size, now))
+        await session.commit()
+
+        rows = result.rowcount or 0
+        elapsed = time.perf_counter() - started
+        total += rows
 
-async def expire_unconfirmed_payments():
+        record_janitor_batch(rule.name, rows, elapsed)
+        logger.info(
+            "🧹 [JANITOR] %s batch=%s rows=%s elapsed_ms=%.1f",
+            rule.name, batch_no, rows, elapsed * 1000
+        )
+
+        if rows < batch_size:
+            break
+    else:
+        logger.warning("⚠️ [JANITOR] %s hit max_batches=%s; backlog continues next run", rule.name, max_batches)
+
+    return total
+
+
+async def expire_unconfirmed_payments(
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> Dict[str, int]:
     """
-    Mark old pending payments as FAILED in bulk.
-    Updated for 2026: Includes resiliency for high-latency Neon connections.
+    Marks expired PENDING payments and stale AWAITING_VERIFICATION claims as FAILED.
+
+    ✅ BATCHED: Bounded UPDATEs, committed per chunk, so no run holds a large lock set.
+    ✅ INDEXED: PENDING is swept on expires_at (ix_payments_janitor_sweep).
+    ✅ TRACEABLE: Tags metadata_json.expiry_reason for 2026 analytics.
     """
-    # We open the session here, but use a try block to catch connection drops
+    summary = {ABANDONED_USSD.name: 0, STALE_CLAIMS.name: 0}
+
     async with AsyncSessionLocal() as session:
         try:
             now = datetime.now(timezone.utc)
-            pending_cutoff = now - timedelta(minutes=PAYMENT_EXPIRY_MINUTES)
-            stale_cutoff = now - timedelta(hours=VERIFICATION_STALE_HOURS)
-
-            # Cast the column to JSONB once for use in jsonb_set
-            json_as_jsonb = cast(Payment.metadata_json, JSONB)
-
-            # Task 1: Cleanup PENDING
-            stmt_pending = (
-                update(Payment)
-                .where(
-                    Payment.status == PaymentStatus.PENDING,
-                    Payment.created_at < pending_cutoff
-                )
-                .values({
-                    Payment.status: PaymentStatus.FAILED,
-                    Payment.updated_at: now,
-                    Payment.metadata_json: func.jsonb_set(
-                        func.coalesce(json_as_jsonb, cast({}, JSONB)),
-                        cast(['expiry_reason'], ARRAY(Text)),
-                        cast("ussd_timeout", JSONB)
-                    )
-                })
-            )
 
-            # Task 2: Cleanup AWAITING_VERIFICATION
-            stmt_stale = (
-                update(Payment)
-                .where(
-                    Payment.status == PaymentStatus.AWAITING_VERIFICATION,
-                    Payment.created_at < stale_cutoff
-                )
-                .values({
-                    Payment.status: PaymentStatus.FAILED,
-                    Payment.updated_at: now,
-                    Payment.metadata_json: func.jsonb_set(
-                        func.coalesce(json_as_jsonb, cast({}, JSONB)),
-                        cast(['expiry_reason'], ARRAY(Text)),
-                        cast("stale_verification", JSONB)
-                    )
-                })
+            summary[ABANDONED_USSD.name] = await sweep(
+                session, ABANDONED_USSD, now, batch_size, max_batches
+            )
+            summary[STALE_CLAIMS.name] = await sweep(
+                session, STALE_CLAIMS, now - timedelta(hours=VERIFICATION_STALE_HOURS), batch_size, max_batches
             )
 
-            # ✅ RESILIENCY BLOCK: Execute and Commit
-            # If the connection is closed by Neon/Network during this, we catch it.
-            res_p = await session.execute(stmt_pending)
-            res_s = await session.execute(stmt_stale)
-
-            await session.commit()
-
-            p_rows = res_p.rowcount or 0
-            s_rows = res_s.rowcount or 0
-
-            if (p_rows + s_rows) > 0:
-                logger.info(f"🧹 Janitor: Cleaned {p_rows} pending and {s_rows} stale payments.")
+            total_affected = sum(summary.values())
+            if total_affected > 0:
+                logger.info(
+                    "🧹 [JANITOR] Cleanup Summary | Abandoned: %s | Stale Claims: %s | Total: %s",
+                    summary[ABANDONED_USSD.name], summary[STALE_CLAIMS.name], total_affected
+                )
 
         except (DBAPIError, ConnectionResetError) as connection_err:
-            # ✅ Specific catch for the Limbe/Singapore connection drops
+            # Committed batches stay committed; the rest is retried next cycle
             await session.rollback()
             logger.warning(
                 f"📡 Database connection flickered during Janitor run. "
-                f"Operation aborted, will retry next cycle. Details: {str(connection_err)}"
+                f"Remaining backlog will be retried next cycle. Details: {str(connection_err)}"
             )
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"💥 Database error during payment cleanup: {str(e)}")
         except Exception as e:
-            # For other logic errors, we still want the full traceback
             await session.rollback()
-            logger.error(f"💥 Janitor failed: {str(e)}", exc_info=True)
\ No newline at end of file
+            logger.error(f"Unexpected error in payment worker: {str(e)}", exc_info=True)
+
+    return summary
+
+
+# ---------------------------------------------------------
+# NEW: Individual Service Cleanup (Hook for Orchestrator)
+# ---------------------------------------------------------
+async def fail_single_payment(reference: str, reason: str = "manual_cancel"):
+    """
+    Allows the API or Worker to manually expire a specific payment.
+    Useful for 'Cancel' buttons in the UI.
+    """
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            update(Payment)
+            .where(Payment.reference == reference)
+            .values({
+                Payment.status: PaymentStatus.FAILED,
+                Payment.updated_at: datetime.now(timezone.utc),
+                Payment.metadata_json: _tag_reason(reason),
+            })
+        )
+        await session.execute(stmt)
+        await session.commit()
+        logger.info(f"🚫 Payment {reference} manually failed. Reason: {reason}")
@@ -1,11 +1,15 @@
 import logging
-import asyncio
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.db.session import AsyncSessionLocal
 from app.services.stats_service import StatsService
+from app.services.notification_queue import notification_queue
 from app.services.registry import registry
+from app.tasks.jobs import reconciliation_job
+from app.tasks.payment_janitor import expire_unconfirmed_payments
+from app.tasks.rollups import catch_up_rollups
+from app.tasks.scheduler import Scheduler, ScheduledJob
 
 logger = logging.getLogger(__name__)
 
@@ -51,20 +55,43 @@ async def send_daily_platform_report():
 
 
 # ----------------------------
-# 2. Background Worker Integration
+# 2. Scheduled Jobs (run by the elected leader only)
 # ----------------------------
-async def run_payment_worker_loop():
+def build_payment_scheduler(lease=None) -> Scheduler:
     """
-    Main loop for the background worker.
-    Combines the Janitor (Cleanup) and Reporting.
+    Periodic payment jobs for app.tasks.scheduler.
+    Every uvicorn worker starts one; the lease holder alone executes.
     """
-    while True:
-        # Import the cleanup task from your file
-        from .payment_janitor import expire_unconfirmed_payments
-
-        # Run Cleanup every 5 minutes
-        await expire_unconfirmed_payments()
-
-        # logic to run reporting only once a day at 23:59...
-
-        await asyncio.sleep(300)  # Sleep for 5 minutes
\ No newline at end of file
+    jobs = [
+        ScheduledJob(
+            name="expire_unconfirmed_payments",
+            func=expire_unconfirmed_payments,
+            interval_seconds=settings.WORKER_CLEANUP_INTERVAL_SECONDS,
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        ),
+        ScheduledJob(
+            name="send_daily_platform_report",
+            func=send_daily_platform_report,
+            cron=f"0 {settings.DAILY_REPORT_HOUR_UTC} * * *",
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        ),
+        ScheduledJob(
+            name="catch_up_rollups",
+            func=catch_up_rollups,
+            interval_seconds=settings.ROLLUP_CATCHUP_INTERVAL_SECONDS,
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        ),
+        ScheduledJob(
+            name="reconciliation_job",
+            func=reconciliation_job,
+            interval_seconds=settings.RECONCILE_INTERVAL_SECONDS,
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        ),
+        ScheduledJob(
+            name="prune_outbound_notifications",
+            func=notification_queue.prune,
+            cron="30 3 * * *",
+            jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+        ),
+    ]
+    return Scheduler(jobs, lease=lease)
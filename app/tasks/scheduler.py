@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.redis import get_shared_redis
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "bloodonal:scheduler:leader"
+# pg_try_advisory_lock takes a bigint; any constant unique to this app works
+ADVISORY_LOCK_ID = 0x626C6F6F64  # "blood"
+
+
+# =========================================================
+# 1. CRON SPEC (minute hour day-of-month month day-of-week)
+# =========================================================
+def _parse_field(expr: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in expr.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(p) for p in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < low or end > high or step < 1:
+            raise ValueError(f"Cron field '{expr}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """
+    Five-field UTC cron expression: "M H DOM MON DOW".
+    Supports '*', numbers, ranges (a-b), lists (a,b) and steps (*/n).
+    DOW follows standard cron: 0 = Sunday ... 6 = Saturday (7 is also Sunday).
+    """
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got '{expr}'")
+        self.expr = expr
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = {day % 7 for day in _parse_field(fields[4], 0, 7)}
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment` (UTC)."""
+        t = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 4)
+
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            # datetime.weekday() is 0 = Monday; cron counts from Sunday
+            if t.day not in self.days or (t.weekday() + 1) % 7 not in self.weekdays:
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+
+        raise ValueError(f"Cron expression '{self.expr}' never matches")
+
+
+# =========================================================
+# 2. JOBS
+# =========================================================
+@dataclass
+class ScheduledJob:
+    """
+    A periodic coroutine. Give exactly one of `interval_seconds` or `cron`.
+    `jitter_seconds` spreads start times so pods don't stampede the DB.
+    """
+    name: str
+    func: Callable[[], Awaitable[object]]
+    interval_seconds: Optional[float] = None
+    cron: Optional[str] = None
+    jitter_seconds: float = 0.0
+    next_run: Optional[datetime] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if (self.interval_seconds is None) == (self.cron is None):
+            raise ValueError(f"Job '{self.name}' needs exactly one of interval_seconds or cron")
+        self._cron = CronSpec(self.cron) if self.cron else None
+
+    def schedule_next(self, now: datetime, first: bool = False) -> datetime:
+        if self._cron is not None:
+            base = self._cron.next_after(now)
+        elif first:
+            # A fresh leader runs interval jobs soon, not a full interval later
+            base = now
+        else:
+            base = now + timedelta(seconds=self.interval_seconds)
+
+        self.next_run = base + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        return self.next_run
+
+
+# =========================================================
+# 3. LEADER LEASES
+# =========================================================
+def _holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class RedisLease:
+    """
+    SET NX PX lease. Renew and release are compare-and-act Lua scripts,
+    so a worker never extends or drops a lease someone else now holds.
+    """
+
+    RENEW_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+    )
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, client, key: str = LEADER_KEY, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.key = key
+        self.ttl_ms = int((ttl_seconds or settings.SCHEDULER_LEASE_TTL_SECONDS) * 1000)
+        self.token = _holder_id()
+        self.held = False
+
+    async def acquire(self) -> bool:
+        """Takes or renews the lease. Returns whether this worker is leader."""
+        try:
+            if self.held:
+                renewed = await self.client.eval(self.RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms)
+                self.held = bool(renewed)
+            if not self.held:
+                self.held = bool(await self.client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        except Exception as e:
+            logger.warning(f"⚠️ Scheduler lease check failed (Redis): {e}")
+            self.held = False
+        return self.held
+
+    async def release(self) -> None:
+        if not self.held:
+            return
+        self.held = False
+        try:
+            await self.client.eval(self.RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            logger.warning(f"⚠️ Scheduler lease release failed: {e}")
+
+
+class AdvisoryLockLease:
+    """
+    Session-level pg_try_advisory_lock on a dedicated connection.
+    Postgres drops the lock if the connection dies, so a crashed
+    leader is replaced on the next follower tick.
+    """
+
+    def __init__(self, engine, lock_id: int = ADVISORY_LOCK_ID):
+        self.engine = engine
+        self.lock_id = lock_id
+        self.conn = None
+        self.held = False
+
+    async def acquire(self) -> bool:
+        try:
+            if self.conn is None:
+                self.conn = await self.engine.connect()
+
+            if self.held:
+                # Liveness probe: the lock lives as long as this connection
+                await self.conn.execute(text("SELECT 1"))
+            else:
+                result = await self.conn.execute(
+                    text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id}
+                )
+                self.held = bool(result.scalar())
+            await self.conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Scheduler lease check failed (Postgres): {e}")
+            await self._close()
+        return self.held
+
+    async def release(self) -> None:
+        if self.conn is None:
+            return
+        try:
+            if self.held:
+                await self.conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id})
+                await self.conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Scheduler lease release failed: {e}")
+        finally:
+            await self._close()
+
+    async def _close(self) -> None:
+        self.held = False
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+
+def build_lease():
+    """Redis lease when Redis is up, otherwise a Postgres advisory lock."""
+    client = get_shared_redis()
+    if client is not None:
+        return RedisLease(client)
+
+    from app.db.session import engine
+    return AdvisoryLockLease(engine)
+
+
+# =========================================================
+# 4. SCHEDULER
+# =========================================================
+class Scheduler:
+    """
+    Runs in every worker; only the lease holder executes jobs.
+    Followers keep polling so leadership moves within one tick
+    of a graceful shutdown (or one lease TTL after a crash).
+    """
+
+    def __init__(
+        self,
+        jobs: List[ScheduledJob],
+        lease=None,
+        tick_seconds: Optional[float] = None,
+        shutdown_grace_seconds: float = 30.0,
+    ):
+        self.jobs = jobs
+        self.lease = lease
+        self.tick_seconds = tick_seconds or settings.SCHEDULER_TICK_SECONDS
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.is_leader = False
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        if self.lease is None:
+            self.lease = build_lease()
+
+        logger.info(f"🗓️ Scheduler started with jobs: {', '.join(j.name for j in self.jobs)}")
+        try:
+            while not self._stopping.is_set():
+                await self.tick()
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=self.tick_seconds * random.uniform(0.8, 1.2),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._handover()
+
+    async def tick(self, now: Optional[datetime] = None) -> None:
+        """One lease check plus dispatch of due jobs (exposed for tests)."""
+        leader = await self.lease.acquire()
+        now = now or datetime.now(timezone.utc)
+
+        if leader and not self.is_leader:
+            logger.info("👑 Scheduler lease acquired; this worker now runs periodic jobs")
+            for job in self.jobs:
+                job.schedule_next(now, first=True)
+        elif not leader and self.is_leader:
+            logger.warning("🔻 Scheduler lease lost; standing down")
+            # The new leader will start these jobs too; never run them twice
+            await self._cancel_running()
+        self.is_leader = leader
+
+        if not leader:
+            return
+
+        for job in self.jobs:
+            if job.next_run is None or job.next_run > now:
+                continue
+            if job.name in self._running:
+                # Previous run still going; never overlap the same job
+                continue
+            job.schedule_next(now)
+            self._running[job.name] = asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: ScheduledJob) -> None:
+        started = time.perf_counter()
+        try:
+            await job.func()
+            logger.info(f"✅ Job '{job.name}' finished in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"💥 Job '{job.name}' failed: {str(e)}", exc_info=True)
+        finally:
+            self._running.pop(job.name, None)
+
+    async def _cancel_running(self) -> None:
+        running = list(self._running.values())
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+            logger.warning(f"⚠️ Cancelled {len(running)} in-flight job(s) after losing the lease")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+
+    async def _handover(self) -> None:
+        """Let in-flight jobs finish (bounded), then free the lease for a peer."""
+        running = list(self._running.values())
+        if running:
+            done, pending = await asyncio.wait(running, timeout=self.shutdown_grace_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.warning(f"⚠️ Cancelled {len(pending)} job(s) still running at shutdown")
+
+        if self.lease is not None:
+            await self.lease.release()
+        if self.is_leader:
+            logger.info("🤝 Scheduler lease released for the next worker")
+        self.is_leader = False
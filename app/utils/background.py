@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class SerialTasks:
+    """
+    Background coroutines started from sync hooks (e.g. after_commit), run one
+    at a time in the order they were submitted.
+
+    The event loop only keeps weak references to tasks, so every task is held
+    in `tasks` until it finishes. Each one waits for its predecessor, so two
+    commits publish in commit order even if the first one's I/O is slower.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tasks: Set[asyncio.Task] = set()
+        self._last: Optional[asyncio.Task] = None
+
+    def submit(self, work: Callable[[], Awaitable[None]]) -> Optional[asyncio.Task]:
+        """Schedules `work()`; returns None (work dropped) when no loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"No running loop; {self.name} work dropped")
+            return None
+
+        previous = self._last
+        if previous is not None and (previous.done() or previous.get_loop() is not loop):
+            previous = None
+
+        async def run():
+            if previous is not None:
+                # Ordering only: the predecessor's failure is its own to log
+                await asyncio.wait({previous})
+            await work()
+
+        task = loop.create_task(run(), name=self.name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        self._last = task
+        return task
+
+    async def drain(self) -> None:
+        """Waits for everything submitted so far (tests, shutdown)."""
+        if self.tasks:
+            await asyncio.wait(set(self.tasks))
@@ -1,9 +1,31 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
 import uuid
-from typing import Optional, Dict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
 
-# Simple in-memory store for idempotency keys.
-# For production, use Redis or DB table to persist across restarts.
-IDEMPOTENCY_STORE: Dict[str, str] = {}
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.endpoints.monitoring import record_idempotency
+from app.config import settings
+from app.core.redis import get_shared_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "X-Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Outcomes a retry may legitimately change, so they are never replayed
+_UNCACHED_STATUSES = {401, 403, 408, 409, 425, 429}
+# Response headers that are recomputed rather than replayed
+_SKIPPED_HEADERS = {"content-length", "x-process-time", "set-cookie"}
 
 
 def generate_idempotency_key() -> str:
@@ -11,11 +33,211 @@ def generate_idempotency_key() -> str:
     return str(uuid.uuid4())
 
 
-def store_idempotency_key(key: str, user_id: str) -> None:
-    """Store key associated with user/service."""
-    IDEMPOTENCY_STORE[key] = user_id
+# =========================================================
+# 1. STORE (Redis)
+# =========================================================
+@dataclass
+class StoredResponse:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    fingerprint: str
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "s": self.status_code,
+            "h": self.headers,
+            "b": base64.b64encode(self.body).decode("ascii"),
+            "f": self.fingerprint,
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> "StoredResponse":
+        data = json.loads(raw)
+        return cls(data["s"], data["h"], base64.b64decode(data["b"]), data["f"])
+
+
+@dataclass
+class Claim:
+    """Result of IdempotencyStore.begin()."""
+    outcome: str  # acquired / replay / mismatch / busy / unavailable
+    key: str
+    response: Optional[StoredResponse] = None
+    token: Optional[str] = field(default=None, repr=False)
+
+
+class IdempotencyStore:
+    """
+    Idempotency keys in Redis: key -> (status, headers, body, request fingerprint).
+
+    begin() either finds a stored response (replay, or mismatch when the key
+    was used for a different request), or takes the in-flight lock (SET NX PX)
+    so this request runs once. Concurrent retries poll until the first one
+    stores its result, then replay it; if the first attempt ends without a
+    storable result its lock is released and a waiter takes over. Responses
+    live IDEMPOTENCY_TTL_SECONDS.
+    """
+
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(
+        self,
+        redis_getter: Callable[[], Optional[Any]] = get_shared_redis,
+        namespace: str = "idem",
+        ttl_seconds: Optional[int] = None,
+        lock_seconds: Optional[float] = None,
+        wait_seconds: Optional[float] = None,
+        poll_seconds: float = 0.05,
+    ):
+        self._redis_getter = redis_getter
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self.lock_ms = int((lock_seconds or settings.IDEMPOTENCY_LOCK_SECONDS) * 1000)
+        self.wait_seconds = wait_seconds if wait_seconds is not None else settings.IDEMPOTENCY_WAIT_SECONDS
+        self.poll_seconds = poll_seconds
+
+    @property
+    def available(self) -> bool:
+        return self._redis_getter() is not None
+
+    def _response_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}:lock"
+
+    async def begin(self, key: str, fingerprint: str) -> Claim:
+        client = self._redis_getter()
+        if client is None:
+            return Claim("unavailable", key)
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_seconds
+        try:
+            while True:
+                raw = await client.get(self._response_key(key))
+                if raw is not None:
+                    stored = StoredResponse.loads(raw)
+                    outcome = "replay" if stored.fingerprint == fingerprint else "mismatch"
+                    return Claim(outcome, key, response=stored)
+
+                if await client.set(self._lock_key(key), token, nx=True, px=self.lock_ms):
+                    return Claim("acquired", key, token=token)
+
+                # Another attempt with this key is in flight; wait for its result
+                if time.monotonic() >= deadline:
+                    return Claim("busy", key)
+                await asyncio.sleep(self.poll_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ [IDEMPOTENCY] Redis unavailable for {key}: {e}")
+            return Claim("unavailable", key)
+
+    async def finish(self, claim: Claim, response: Optional[StoredResponse] = None) -> None:
+        """Stores the response (if any) and releases the in-flight lock."""
+        if claim.outcome != "acquired":
+            return
+        client = self._redis_getter()
+        if client is None:
+            return
+        try:
+            if response is not None:
+                await client.set(self._response_key(claim.key), response.dumps(), ex=self.ttl_seconds)
+            await client.eval(self.RELEASE_SCRIPT, 1, self._lock_key(claim.key), claim.token)
+        except Exception as e:
+            logger.warning(f"⚠️ [IDEMPOTENCY] Could not store result for {claim.key}: {e}")
+
+
+idempotency_store = IdempotencyStore()
+
+
+# =========================================================
+# 2. MIDDLEWARE
+# =========================================================
+def request_fingerprint(method: str, path: str, query: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query.encode(), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _caller_scope(request: Request) -> str:
+    # Keys are per caller: the bearer token hash, never an unverified claim in
+    # it, so one user's key can never replay another user's response
+    auth = request.headers.get("authorization", "")
+    return hashlib.sha256(auth.encode()).hexdigest()[:24]
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Replays stored responses for mutating requests that carry X-Idempotency-Key.
+
+    A retry with the same key (from the same caller, for the same method,
+    path, query and body) gets the first response back with
+    Idempotent-Replayed: true, without reaching the route or Postgres; a
+    retry racing the first attempt waits for it. Reusing a key for a
+    different request is a 422; a retry still waiting after
+    IDEMPOTENCY_WAIT_SECONDS gets a 409. 5xx and transient statuses are not
+    stored, so they can be retried. Without Redis, requests pass through and
+    the routes' own database checks apply.
+    """
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        super().__init__(app)
+        self.store = store or idempotency_store
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or request.method not in _MUTATING_METHODS or not self.store.available:
+            return await call_next(request)
+
+        body = await request.body()
+        fingerprint = request_fingerprint(request.method, request.url.path, request.url.query, body)
+        claim = await self.store.begin(f"{_caller_scope(request)}:{key}", fingerprint)
+
+        if claim.outcome == "replay":
+            record_idempotency("replayed")
+            stored = claim.response
+            return Response(
+                content=stored.body,
+                status_code=stored.status_code,
+                headers={**stored.headers, REPLAYED_HEADER: "true"},
+            )
+        if claim.outcome == "mismatch":
+            record_idempotency("mismatch")
+            return JSONResponse(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+            )
+        if claim.outcome == "busy":
+            record_idempotency("busy")
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"detail": "A request with this idempotency key is still in progress"},
+                headers={"Retry-After": "1"},
+            )
+        if claim.outcome == "unavailable":
+            record_idempotency("passthrough")
+            return await call_next(request)
+
+        try:
+            response = await call_next(request)
+            content = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            await self.store.finish(claim)
+            raise
 
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        if response.status_code < 500 and response.status_code not in _UNCACHED_STATUSES:
+            await self.store.finish(claim, StoredResponse(response.status_code, headers, content, fingerprint))
+            record_idempotency("stored")
+        else:
+            await self.store.finish(claim)
+            record_idempotency("not_stored")
 
-def get_user_by_idempotency_key(key: str) -> Optional[str]:
-    """Return user_id if key exists, else None."""
-    return IDEMPOTENCY_STORE.get(key)
+        passed_on = Response(content=content, status_code=response.status_code)
+        passed_on.raw_headers = response.raw_headers
+        return passed_on
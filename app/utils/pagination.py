@@ -0,0 +1,234 @@
+# app/utils/pagination.py
+
+import base64
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import Response
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or was issued for another list or filter set."""
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    # Only when the caller asked for it; see count_rows()
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: Any            # mapped column; rows must never hold NULL here
+    descending: bool = False
+
+
+# =========================================================
+# KEYSET
+# =========================================================
+class Keyset:
+    """
+    Cursor pagination over a fixed sort order ending in a unique column.
+
+    Instead of OFFSET n (Postgres reads and discards n rows, so page 10,000
+    costs 10,000 pages of work), each page continues strictly after the last
+    row of the previous one:
+
+        WHERE (created_at, id) < (:last_created_at, :last_id)
+        ORDER BY created_at DESC, id DESC LIMIT :limit + 1
+
+    which an index on the sort columns answers in the same time at any depth.
+    The extra row only tells us whether a next page exists.
+
+    Cursors are opaque base64url JSON holding the last row's sort values and a
+    fingerprint of the list name and filters, so a cursor cannot be replayed
+    against another endpoint or filter set.
+    """
+
+    def __init__(self, name: str, *keys: SortKey):
+        self.name = name
+        self.keys = keys
+
+    # ---------------------------------------------------------
+    # Cursor codec
+    # ---------------------------------------------------------
+    def _fingerprint(self, filters: Optional[Dict[str, Any]]) -> str:
+        raw = json.dumps([self.name, filters or {}], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+    def encode(self, values: Sequence[Any], filters: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps(
+            {"k": [_dump(value) for value in values], "f": self._fingerprint(filters)},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[Any, ...]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            raw, fingerprint = payload["k"], payload["f"]
+            if len(raw) != len(self.keys):
+                raise ValueError("wrong number of sort values")
+            values = tuple(_load(key.column, value) for key, value in zip(self.keys, raw))
+        except Exception as e:
+            raise InvalidCursor("Malformed pagination cursor") from e
+
+        if fingerprint != self._fingerprint(filters):
+            raise InvalidCursor("Cursor was issued for a different list or filter")
+        return values
+
+    # ---------------------------------------------------------
+    # Query
+    # ---------------------------------------------------------
+    def order_by(self) -> List[Any]:
+        return [key.column.desc() if key.descending else key.column.asc() for key in self.keys]
+
+    def after(self, values: Sequence[Any]):
+        """Rows strictly after `values` in this sort order."""
+        directions = {key.descending for key in self.keys}
+        columns = [key.column for key in self.keys]
+
+        if len(self.keys) == 1:
+            key = self.keys[0]
+            return key.column < values[0] if key.descending else key.column > values[0]
+
+        if len(directions) == 1:
+            # One direction: a row comparison, which Postgres matches to a composite index
+            if directions == {True}:
+                return tuple_(*columns) < tuple_(*values)
+            return tuple_(*columns) > tuple_(*values)
+
+        # Mixed directions: (a > x) OR (a = x AND b < y) OR ...
+        clauses = []
+        for i, key in enumerate(self.keys):
+            beyond = key.column < values[i] if key.descending else key.column > values[i]
+            clauses.append(and_(*(columns[j] == values[j] for j in range(i)), beyond))
+        return or_(*clauses)
+
+    def paginate(self, stmt, limit: int, cursor: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None, offset: int = 0):
+        """
+        Applies cursor position, sort order and LIMIT limit+1 to a filtered SELECT.
+
+        `offset` only serves clients still sending skip=; it is ignored once
+        they pass a cursor.
+        """
+        if cursor:
+            stmt = stmt.where(self.after(self.decode(cursor, filters)))
+        elif offset:
+            stmt = stmt.offset(offset)
+        return stmt.order_by(*self.order_by()).limit(limit + 1)
+
+    def page(self, rows: Sequence[T], limit: int, filters: Optional[Dict[str, Any]] = None) -> Page[T]:
+        """Turns the limit+1 rows from paginate() into a Page with next_cursor."""
+        items = list(rows[:limit])
+        next_cursor = None
+        if len(rows) > limit and items:
+            last = items[-1]
+            next_cursor = self.encode([getattr(last, key.column.key) for key in self.keys], filters)
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def fetch(self, db, stmt, limit: int, cursor: Optional[str] = None,
+                    filters: Optional[Dict[str, Any]] = None, offset: int = 0,
+                    with_total: bool = False) -> Page:
+        """One page of ORM rows for a filtered SELECT (plus optional total)."""
+        rows = (await db.execute(self.paginate(stmt, limit, cursor, filters, offset))).scalars().all()
+        page = self.page(rows, limit, filters)
+        if with_total:
+            page.total, page.total_is_estimate = await count_rows(db, stmt)
+        return page
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(column: Any, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is bool:
+        if not isinstance(value, bool):
+            raise ValueError("expected a boolean sort value")
+        return value
+    return python_type(value)
+
+
+# =========================================================
+# TOTALS
+# =========================================================
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <select>, keeping the statement's bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db, stmt) -> int:
+    """Planner row estimate for `stmt`: catalog statistics only, no rows read."""
+    plan = (await db.execute(Explain(stmt))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db, stmt, exact_limit: Optional[int] = None) -> Tuple[int, bool]:
+    """
+    -> (total, is_estimate) for a filtered SELECT (no ORDER BY / LIMIT).
+
+    Counts exactly up to `exact_limit` rows (a bounded index scan), then falls
+    back to the planner's estimate: a full count(*) over a large table costs
+    as much as the deep OFFSET it is meant to accompany.
+    """
+    exact_limit = settings.PAGINATION_EXACT_COUNT_LIMIT if exact_limit is None else exact_limit
+    bounded = await db.scalar(select(func.count()).select_from(stmt.limit(exact_limit + 1).subquery()))
+    if bounded <= exact_limit:
+        return bounded, False
+
+    try:
+        return max(await estimate_rows(db, stmt), exact_limit + 1), True
+    except Exception as e:
+        logger.warning(f"⚠️ [PAGINATION] Row estimate failed, reporting the exact floor: {e}")
+        return exact_limit + 1, True
+
+
+# =========================================================
+# HTTP
+# =========================================================
+def set_page_headers(response: Response, page: Page) -> None:
+    """For list endpoints whose body stays a bare JSON array."""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Approximate"] = "true" if page.total_is_estimate else "false"
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.redis import get_shared_redis
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Two-level read-through cache for expensive, JSON-serialisable results.
+
+    L1: per-process dict with monotonic expiry.
+    L2: optional Redis (the lifespan client), shared across workers.
+
+    Stampede protection:
+    - In-process: concurrent misses for one key await a single computation.
+    - Cross-worker: the first worker to miss takes a short Redis lock
+      (SET NX PX) and computes; the others poll L2 briefly before
+      falling back to computing themselves.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        lock_timeout_seconds: float = 10.0,
+        lock_wait_seconds: float = 2.0,
+        redis_getter: Callable[[], Optional[Any]] = get_shared_redis,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.lock_wait_seconds = lock_wait_seconds
+        self._redis_getter = redis_getter
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._local.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, compute)
+            self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged as lost
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drops one key (or everything) from L1. L2 expires on its own TTL."""
+        if key is None:
+            self._local.clear()
+        else:
+            self._local.pop(key, None)
+
+    # ---------------------------------------------------------
+    # L2 (Redis)
+    # ---------------------------------------------------------
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        client = self._redis_getter()
+        if client is None:
+            return await compute()
+
+        redis_key = self._redis_key(key)
+        cached = await self._redis_get(client, redis_key)
+        if cached is not None:
+            return cached
+
+        lock_key = f"{redis_key}:lock"
+        try:
+            got_lock = await client.set(lock_key, "1", nx=True, px=int(self.lock_timeout_seconds * 1000))
+        except Exception as e:
+            logger.warning(f"⚠️ Cache lock unavailable for {redis_key}: {e}")
+            return await compute()
+
+        if not got_lock:
+            # Another worker is computing; give it a moment before piling on
+            deadline = time.monotonic() + self.lock_wait_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await self._redis_get(client, redis_key)
+                if cached is not None:
+                    return cached
+            return await compute()
+
+        try:
+            value = await compute()
+            try:
+                await client.set(redis_key, json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+            except Exception as e:
+                logger.warning(f"⚠️ Cache write failed for {redis_key}: {e}")
+            return value
+        finally:
+            try:
+                await client.delete(lock_key)
+            except Exception:
+                pass
+
+    async def _redis_get(self, client, redis_key: str) -> Optional[Any]:
+        try:
+            raw = await client.get(redis_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache read failed for {redis_key}: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
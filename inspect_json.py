@@ -1,24 +1,33 @@
-import json
 import os
+import sys
+
+from app.tasks.bulk_import import iter_records, open_source
 
 EXPORT_DIR = "firestore_exports"
+EXTENSIONS = (".json", ".ndjson", ".json.gz", ".ndjson.gz")
+
 
-def inspect_collection(file_name):
-    path = os.path.join(EXPORT_DIR, file_name)
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    print(f"Collection {file_name}: {len(data)} documents")
-    # Collect all keys across docs
-    keys = set()
-    for doc in data:
-        keys.update(doc.keys())
+def inspect_collection(file_name, export_dir=EXPORT_DIR):
+    # Streams the file: exports can be far larger than memory
+    path = os.path.join(export_dir, file_name)
+    count, keys, sample = 0, set(), None
+    with open_source(path) as f:
+        for doc in iter_records(f):
+            count += 1
+            if isinstance(doc, dict):
+                # Collect all keys across docs
+                keys.update(doc.keys())
+                sample = sample or doc
+    print(f"Collection {file_name}: {count} documents")
     print("Fields:", keys)
     # Optionally show sample doc
-    if data:
-        print("Sample document:", data[0])
+    if sample:
+        print("Sample document:", sample)
     print()
 
+
 if __name__ == "__main__":
-    for fname in os.listdir(EXPORT_DIR):
-        if fname.endswith(".json"):
-            inspect_collection(fname)
+    export_dir = sys.argv[1] if len(sys.argv) > 1 else EXPORT_DIR
+    for fname in sorted(os.listdir(export_dir)):
+        if fname.endswith(EXTENSIONS):
+            inspect_collection(fname, export_dir)
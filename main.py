@@ -19,12 +19,21 @@ from sqlalchemy import text
 # Core Infrastructure
 from app.api.endpoints import monitoring
 from app.config import settings
+from app.core.redis import set_shared_redis
 from app.database import init_db
+from app.gateways.transport import gateway_transport
 from app.db.session import get_db, engine
 
 # 2026 Service & Task Imports
-from app.tasks.payment_tasks import run_payment_worker_loop
+from app.tasks.payment_tasks import build_payment_scheduler
+from app.services.notification_queue import NotificationConsumer
+from app.services.autocomplete import autocomplete_index
+from app.services.chat_broadcast import build_chat_broadcast
+from app.services.chat_writer import chat_writer
+from app.services.service_config import service_config_sync
+from app.routers.chat import manager as chat_manager
 from app.firebase_client import _init_firebase
+from app.utils.idempotency import IdempotencyMiddleware
 
 # -------------------------
 # Logging Configuration
@@ -65,6 +74,9 @@ async def lifespan(app: FastAPI):
     # Keep optional services safe by default
     app.state.redis = None
     app.state.background_worker = None
+    app.state.scheduler = None
+    app.state.notification_consumer = None
+    app.state.notification_worker = None
 
     # DB
     try:
@@ -83,6 +95,7 @@ async def lifespan(app: FastAPI):
                 health_check_interval=30,
             )
             await app.state.redis.ping()
+            set_shared_redis(app.state.redis)
             log.info("✅ Redis connected")
         except Exception as e:
             log.warning("⚠️ Redis unavailable, continuing without Redis: %s", e)
@@ -91,13 +104,51 @@ async def lifespan(app: FastAPI):
         log.warning("⚠️ No REDIS_URL provided, skipping Redis")
         app.state.redis = None
 
-    # Background worker
+    # Chat fan-out: Redis pub/sub across workers when connected, else in-process
     try:
-        app.state.background_worker = asyncio.create_task(run_payment_worker_loop())
-        log.info("🚀 Payment worker started")
+        await chat_manager.set_backend(build_chat_broadcast(app.state.redis))
+        log.info("💬 Chat broadcast backend: %s", chat_manager.backend.name)
     except Exception as e:
-        log.warning("⚠️ Payment worker failed to start: %s", e, exc_info=True)
-        app.state.background_worker = None
+        log.warning("⚠️ Chat broadcast backend failed to start: %s", e, exc_info=True)
+
+    # Batched chat message persistence
+    chat_writer.start()
+
+    # Runtime pricing overrides: load now, then follow admin changes (pub/sub + poll)
+    try:
+        await service_config_sync.start()
+    except Exception as e:
+        log.warning("⚠️ Service config sync failed to start: %s", e)
+
+    # Autocomplete prefix index (built in the background; Redis mirror needs the client above)
+    if settings.AUTOCOMPLETE_ENABLED:
+        autocomplete_index.start()
+
+    # Background scheduler (leader-elected: one worker per cluster runs jobs)
+    if settings.SCHEDULER_ENABLED:
+        try:
+            app.state.scheduler = build_payment_scheduler()
+            app.state.background_worker = asyncio.create_task(app.state.scheduler.run())
+            log.info("🚀 Payment scheduler started")
+        except Exception as e:
+            log.warning("⚠️ Payment scheduler failed to start: %s", e, exc_info=True)
+            app.state.background_worker = None
+
+    # Payment gateway clients (one pooled keep-alive client per provider)
+    try:
+        await gateway_transport.start()
+    except Exception as e:
+        log.warning("⚠️ Gateway clients failed to start: %s", e, exc_info=True)
+
+    # Outbound push queue consumers (every worker; rows are claimed with SKIP LOCKED)
+    if settings.NOTIFY_QUEUE_ENABLED:
+        try:
+            app.state.notification_consumer = NotificationConsumer()
+            app.state.notification_worker = asyncio.create_task(app.state.notification_consumer.run())
+            log.info("📬 Notification queue consumers started")
+        except Exception as e:
+            log.warning("⚠️ Notification consumers failed to start: %s", e, exc_info=True)
+            app.state.notification_worker = None
 
     # Firebase
     try:
@@ -111,7 +162,8 @@ async def lifespan(app: FastAPI):
     log.info("🛑 SHUTDOWN STARTING")
 
     if getattr(app.state, "background_worker", None) is not None:
-        app.state.background_worker.cancel()
+        # Graceful handover: finish in-flight jobs, then release the lease
+        await app.state.scheduler.stop()
         try:
             await app.state.background_worker
         except asyncio.CancelledError:
@@ -119,12 +171,38 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             log.warning("⚠️ Background worker shutdown issue: %s", e)
 
+    if getattr(app.state, "notification_worker", None) is not None:
+        # In-flight batches finish; anything claimed but unsent is re-claimed after its lease
+        await app.state.notification_consumer.stop()
+        try:
+            await asyncio.wait_for(app.state.notification_worker, timeout=settings.NOTIFY_LEASE_SECONDS)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            log.warning("⚠️ Notification worker shutdown issue: %s", e)
+
+    # Drop any in-flight index build (startup or periodic)
+    autocomplete_index.stop()
+
+    # Unsubscribe chat rooms before the Redis client goes away
+    await chat_manager.close()
+    await service_config_sync.stop()
+
+    # Write buffered chat messages while the engine is still up
+    try:
+        await chat_writer.stop()
+    except Exception as e:
+        log.warning("⚠️ Chat writer flush failed: %s", e)
+
     if getattr(app.state, "redis", None) is not None:
+        set_shared_redis(None)
         try:
             await app.state.redis.aclose()
         except Exception as e:
             log.warning("⚠️ Redis close failed: %s", e)
 
+    await gateway_transport.aclose()
+
     try:
         await engine.dispose()
     except Exception as e:
@@ -153,11 +231,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Search paging metadata travels in headers
+    expose_headers=["X-Next-Cursor", "X-Search-Partial", "X-Total-Count", "X-Total-Approximate"],
 )
 
 # -------------------------
 # MIDDLEWARE
 # -------------------------
+# Replays X-Idempotency-Key retries from Redis before they reach a route
+app.add_middleware(IdempotencyMiddleware)
+
+
 @app.middleware("http")
 async def add_process_time(request: Request, call_next):
     start = time.time()
@@ -0,0 +1,108 @@
+# scripts/bench_autocomplete.py
+"""
+Benchmark for the in-memory autocomplete index against per-keystroke SQL.
+
+Seeds --rows service_users (same name generator as bench_search), builds
+AutocompleteIndex from the database, then times each prefix over --repeat runs:
+  - ilike-prefix:   full_name ILIKE 'q%' LIMIT n (what a naive endpoint would send)
+  - ilike-anyword:  full_name ILIKE '%q%' LIMIT n (match any word, like the index does)
+  - index:          AutocompleteIndex.complete (bisect over the sorted key array)
+
+    python -m scripts.bench_autocomplete --rows 200000 --repeat 200
+
+Seeded rows are tagged 'bench-search' and removed afterwards unless --keep is set.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.service_listing import ServiceUser
+from app.services.autocomplete import AutocompleteIndex
+from scripts.bench_search import SEED_USERS
+
+PREFIXES = ["j", "je", "jean", "ndo", "yaou", "nurse", "zzz"]
+
+
+async def _time(label: str, q: str, run_once, repeat: int, unit: str = "ms") -> None:
+    scale = 1000 if unit == "ms" else 1_000_000
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await run_once()
+        latencies.append((time.perf_counter() - started) * scale)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"  {label:<14} q={q!r:<8} rows={rows:<3} p50={p50:9.1f}{unit} p95={p95:9.1f}{unit}")
+
+
+async def run(rows: int, repeat: int, limit: int, keep: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_USERS, {"n": rows})
+        await db.commit()
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE service_users"))
+    print(f"Seeded {rows} providers; limit={limit}, repeat={repeat}")
+
+    try:
+        index = AutocompleteIndex(redis_getter=lambda: None)
+        stalls = [0.0]
+
+        async def ticker():
+            # Longest gap between 1ms ticks: how long build() blocks other requests
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                stalls[0], last = max(stalls[0], now - last), now
+
+        tick = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await index.build()
+        tick.cancel()
+        sizes = {kind: (len(idx), len(idx._keys)) for kind, idx in index.indexes.items()}
+        print(f"Index built in {time.perf_counter() - started:.2f}s (longest loop stall "
+              f"{stalls[0] * 1000:.0f}ms); (labels, keys) per kind: {sizes}\n")
+
+        # SQL runs far fewer rounds: it is milliseconds per call
+        sql_repeat = max(5, repeat // 20)
+        for q in PREFIXES:
+            async def prefix_once():
+                async with AsyncSessionLocal() as db:
+                    stmt = select(ServiceUser.id, ServiceUser.full_name).where(
+                        ServiceUser.full_name.ilike(f"{q}%")).limit(limit)
+                    return len((await db.execute(stmt)).all())
+
+            async def anyword_once():
+                async with AsyncSessionLocal() as db:
+                    stmt = select(ServiceUser.id, ServiceUser.full_name).where(
+                        ServiceUser.full_name.ilike(f"%{q}%")).limit(limit)
+                    return len((await db.execute(stmt)).all())
+
+            async def index_once():
+                return len(await index.complete(q, limit=limit))
+
+            await _time("ilike-prefix", q, prefix_once, sql_repeat)
+            await _time("ilike-anyword", q, anyword_once, sql_repeat)
+            await _time("index", q, index_once, repeat, unit="us")
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM service_users WHERE profile_image = 'bench-search'"))
+                await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.repeat, args.limit, args.keep))
@@ -0,0 +1,125 @@
+# scripts/bench_bulk_import.py
+"""
+Benchmark for the streaming bulk importer against per-row inserts.
+
+Writes --records donor documents to a temporary NDJSON file and the same
+documents as a JSON array, then reports rows/sec for:
+  - per-row:  one INSERT ... ON CONFLICT per document in a single transaction
+              (the old import_neon_data.py loop), over the first --legacy-sample documents
+  - ndjson:   BulkImporter on the NDJSON file (fresh rows: inserts)
+  - array:    BulkImporter on the JSON array (same keys: every row an update)
+
+    python -m scripts.bench_bulk_import --records 1000000 --chunk-size 10000
+
+Imported donors are tagged 'bench-import' (hospital) and removed afterwards unless --keep is set.
+Requires a reachable Postgres.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal, async_engine
+from app.tasks.bulk_import import DATASETS, BulkImporter, donor_row, iter_records, open_source
+
+CITIES = ["Douala", "Yaounde", "Bamenda", "Buea", "Limbe", "Bafoussam", "Garoua", "Kribi"]
+TYPES = ["O+", "O+", "O+", "A+", "A+", "B+", "O-", "A-", "AB+", "AB-"]
+
+LEGACY_UPSERT = """
+    INSERT INTO blood_donors (name, phone, blood_type, city, hospital, is_active, fcm_token)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (phone) DO UPDATE SET
+      name = EXCLUDED.name, blood_type = EXCLUDED.blood_type, city = EXCLUDED.city,
+      hospital = EXCLUDED.hospital, is_active = EXCLUDED.is_active, fcm_token = EXCLUDED.fcm_token
+"""
+
+
+def _document(i: int) -> dict:
+    return {
+        "id": f"bench-{i}",
+        "fullName": f"Bench Donor {i}",
+        "phone": f"8{i:011d}",
+        "bloodType": TYPES[i % len(TYPES)],
+        "city": CITIES[i % len(CITIES)],
+        "hospitalName": "bench-import",
+        "isActive": i % 10 != 0,
+        "fcmToken": f"bench-token-{i}",
+        "timestamp": {"seconds": 1700000000 + i, "nanoseconds": 0},
+    }
+
+
+def _write_files(directory: str, records: int):
+    ndjson_path = os.path.join(directory, "donors.ndjson")
+    array_path = os.path.join(directory, "donors.json")
+    with open(ndjson_path, "w", encoding="utf-8") as nd, open(array_path, "w", encoding="utf-8") as arr:
+        arr.write("[\n")
+        for i in range(records):
+            line = json.dumps(_document(i))
+            nd.write(line + "\n")
+            arr.write(("  " if i == 0 else ",\n  ") + line)
+        arr.write("\n]\n")
+    return ndjson_path, array_path
+
+
+async def _legacy(path: str, sample: int) -> float:
+    async with async_engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        started = time.perf_counter()
+        async with raw.transaction():
+            with open_source(path) as stream:
+                for i, doc in enumerate(iter_records(stream)):
+                    if i >= sample:
+                        break
+                    await raw.execute(LEGACY_UPSERT, *donor_row(doc))
+        return sample / (time.perf_counter() - started)
+
+
+async def _bulk(path: str, chunk_size: int) -> float:
+    importer = BulkImporter(DATASETS["donors"], chunk_size=chunk_size)
+    async with async_engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        report = await importer.run(raw, path)
+    print(f"    inserted={report.inserted} updated={report.updated} rejected={report.rejected} "
+          f"failed chunks={len(report.failed_chunks)} in {report.elapsed_seconds:.1f}s")
+    return report.rows_per_second
+
+
+async def _cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("DELETE FROM blood_donors WHERE hospital = 'bench-import'"))
+        await db.commit()
+
+
+async def run(records: int, chunk_size: int, legacy_sample: int, keep: bool) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        ndjson_path, array_path = _write_files(directory, records)
+        print(f"Wrote {records} documents ({os.path.getsize(ndjson_path) / 1e6:.0f} MB NDJSON, "
+              f"{os.path.getsize(array_path) / 1e6:.0f} MB array) in {time.perf_counter() - started:.1f}s")
+
+        try:
+            rate = await _legacy(ndjson_path, min(legacy_sample, records))
+            print(f"  per-row  {rate:>10,.0f} rows/s  (first {min(legacy_sample, records)} documents)")
+            await _cleanup()
+
+            print(f"  ndjson   {await _bulk(ndjson_path, chunk_size):>10,.0f} rows/s  (inserts)")
+            print(f"  array    {await _bulk(array_path, chunk_size):>10,.0f} rows/s  (updates)")
+        finally:
+            if not keep:
+                await _cleanup()
+            await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--legacy-sample", type=int, default=20000)
+    parser.add_argument("--keep", action="store_true", help="Leave imported donors in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.records, args.chunk_size, args.legacy_sample, args.keep))
@@ -0,0 +1,120 @@
+# scripts/bench_chat_writer.py
+"""
+Benchmark for chat message persistence: per-message transactions vs the batching writer.
+
+Opens --rooms chat rooms with --senders concurrent senders each (one per
+WebSocket), every sender posting --messages messages back to back, and
+reports messages/s (overall and per room) and time-to-broadcast percentiles for:
+  - per-message:   the old ws_chat path (session, create_message, commit + refresh twice)
+  - write-through: ChatMessageWriter, broadcast after the batch commits (CHAT_WRITE_BEHIND=False)
+  - write-behind:  ChatMessageWriter, broadcast right after submit (the default);
+                   throughput counts until every message is committed
+
+    python -m scripts.bench_chat_writer --rooms 20 --senders 5 --messages 200
+
+Rooms are created with request_type 'bench-chat' and removed (with their
+messages) afterwards unless --keep is set. Requires a reachable Postgres.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.crud.chat import create_message
+from app.database import AsyncSessionLocal, async_engine
+from app.schemas.chat import MessageCreate
+from app.services.chat_writer import ChatMessageWriter
+
+SEED_ROOMS = text("""
+    INSERT INTO chat_rooms (request_type, request_id)
+    SELECT 'bench-chat', g FROM generate_series(1, :n) AS g
+    RETURNING id
+""")
+
+
+def _pct(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+async def _per_message(msg_in: MessageCreate) -> None:
+    async with AsyncSessionLocal() as session:
+        msg = await create_message(session, msg_in)
+        await session.commit()
+        await session.refresh(msg)
+
+
+async def _measure(label, rooms, senders, messages, send_one, drain=None):
+    latencies = []
+
+    async def sender(room_id, s):
+        for n in range(messages):
+            msg_in = MessageCreate(room_id=room_id, sender_id=f"bench-{s}", sender_type="donor",
+                                   content=f"{label} message {n} from {s}")
+            started = time.perf_counter()
+            await send_one(msg_in)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(room_id, s) for room_id in rooms for s in range(senders)))
+    if drain is not None:
+        await drain()
+    elapsed = time.perf_counter() - started
+
+    total = len(rooms) * senders * messages
+    latencies.sort()
+    print(f"  {label:<14} {total / elapsed:9.0f} msg/s  ({total / elapsed / len(rooms):7.0f} per room)  "
+          f"broadcast p50={_pct(latencies, 0.5):7.2f}ms p95={_pct(latencies, 0.95):7.2f}ms")
+
+
+async def run(rooms: int, senders: int, messages: int, batch_size: int, flush_ms: int, keep: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        room_ids = list((await db.execute(SEED_ROOMS, {"n": rooms})).scalars())
+        await db.commit()
+    print(f"{rooms} rooms x {senders} senders x {messages} messages; batch {batch_size}, flush {flush_ms}ms")
+
+    try:
+        await _measure("per-message", room_ids, senders, messages, _per_message)
+
+        writer = ChatMessageWriter(batch_size=batch_size, flush_ms=flush_ms)
+
+        async def write_through(msg_in):
+            await (await writer.submit(msg_in)).persisted
+
+        await _measure("write-through", room_ids, senders, messages, write_through)
+
+        pending = []
+
+        async def write_behind(msg_in):
+            pending.append((await writer.submit(msg_in)).persisted)
+
+        async def drain():
+            await asyncio.gather(*pending)
+
+        await _measure("write-behind", room_ids, senders, messages, write_behind, drain)
+        await writer.stop()
+
+        async with AsyncSessionLocal() as db:
+            stored = (await db.execute(
+                text("SELECT count(*) FROM messages WHERE room_id = ANY(:ids)"), {"ids": room_ids}
+            )).scalar()
+        print(f"  stored {stored} / {3 * rooms * senders * messages} messages")
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM chat_rooms WHERE request_type = 'bench-chat'"))
+                await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--senders", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-ms", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Leave the bench rooms and messages in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rooms, args.senders, args.messages, args.batch_size, args.flush_ms, args.keep))
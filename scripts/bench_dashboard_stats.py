@@ -0,0 +1,146 @@
+# scripts/bench_dashboard_stats.py
+"""
+Benchmark for StatsService.get_dashboard_metrics on a seeded database.
+
+Seeds ~N payments (and N/10 call sessions) with generate_series, backfills
+the daily rollups, then times:
+  - legacy: the old four sequential aggregate queries, plus the
+            consultation-revenue query /admin/dashboard-stats issued
+  - single: the folded query over daily rollups (cache bypassed)
+  - cached: repeated calls served by the TTL cache
+
+    python -m scripts.bench_dashboard_stats --payments 1000000 --runs 20
+
+Seeded rows are tagged 'bench-' and removed afterwards unless --keep is set.
+Requires a reachable Postgres (ASYNC_DATABASE_URL / DB_* settings).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func, select, text
+
+from app.database import AsyncSessionLocal, async_engine, Base
+from app.models.call_session import CallSession, CallStatus
+from app.models.payment import Payment, PaymentStatus, ServiceType
+from app.services.stats_service import StatsService
+from app.tasks.rollups import catch_up_rollups
+
+SEED_DAYS = 61
+
+SEED_PAYMENTS = text("""
+    INSERT INTO payments (
+        id, reference, user_id, user_phone, service_type, amount, currency, provider,
+        idempotency_key, signature, status, expires_at, confirmed_at, created_at, updated_at, metadata_json
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-' || g,
+        'bench-user-' || (g % 5000),
+        '6' || lpad((g % 100000000)::text, 8, '0'),
+        (ARRAY['DOCTOR','NURSE','TAXI','BIKER','BLOOD_REQUEST'])[1 + g % 5],
+        100 + (g % 5) * 100,
+        'XAF',
+        (ARRAY['MTN','ORANGE'])[1 + (g / 60) % 2],
+        'bench-idem-' || g,
+        'bench',
+        CASE WHEN g % 50 = 0 THEN 'PENDING' WHEN g % 7 = 0 THEN 'FAILED' ELSE 'SUCCESS' END,
+        now() - (g % 60) * interval '1 day' + interval '15 minutes',
+        CASE WHEN g % 50 <> 0 AND g % 7 <> 0 THEN now() - (g % 60) * interval '1 day' END,
+        now() - (g % 60) * interval '1 day',
+        now() - (g % 60) * interval '1 day',
+        CASE WHEN g % 3 = 0 THEN '{"verification_mode": "AUTO_MATCH"}'::json END
+    FROM generate_series(1, :n) AS g
+""")
+
+SEED_CALLS = text("""
+    INSERT INTO call_sessions (
+        id, room_name, caller_id, callee_id, callee_type, call_mode, status,
+        created_at, started_at, duration_seconds
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-room-' || g,
+        'bench-user-' || (g % 5000),
+        'bench-doc-' || (g % 300),
+        'doctor',
+        'VIDEO',
+        CASE WHEN g % 7 = 0 THEN 'MISSED' ELSE 'COMPLETED' END,
+        now() - (g % 60) * interval '1 day',
+        now() - (g % 60) * interval '1 day',
+        60 + g % 1800
+    FROM generate_series(1, :n) AS g
+""")
+
+
+async def _legacy_four_queries(db):
+    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    await db.execute(select(func.count(Payment.id)).where(Payment.status == PaymentStatus.PENDING))
+    await db.execute(select(func.sum(Payment.amount)).where(
+        and_(Payment.status == PaymentStatus.SUCCESS, Payment.confirmed_at >= today_start)
+    ))
+    await db.execute(select(func.avg(CallSession.duration_seconds)).where(
+        and_(CallSession.status == CallStatus.COMPLETED, CallSession.started_at >= today_start)
+    ))
+    await db.execute(select(func.count(CallSession.id)).where(CallSession.started_at >= today_start))
+    await db.execute(select(func.sum(Payment.amount)).where(
+        Payment.status == PaymentStatus.SUCCESS,
+        Payment.service_type.in_([ServiceType.DOCTOR, ServiceType.NURSE])
+    ))
+
+
+async def _time(label: str, runs: int, fn) -> None:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<8} median={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  runs={runs}")
+
+
+async def run(payments: int, runs: int, keep: bool) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Payment.__table__, CallSession.__table__])
+
+    print(f"Seeding {payments} payments / {payments // 10} call sessions ...")
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_PAYMENTS, {"n": payments})
+        await db.execute(SEED_CALLS, {"n": payments // 10})
+        await db.commit()
+        await db.execute(text("ANALYZE payments"))
+        await db.execute(text("ANALYZE call_sessions"))
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    await catch_up_rollups(days=SEED_DAYS)
+    print(f"Rollups backfilled in {time.perf_counter() - start:.1f}s")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await _time("legacy", runs, lambda: _legacy_four_queries(db))
+            await _time("single", runs, lambda: StatsService.get_dashboard_metrics(db, use_cache=False))
+            print(await StatsService.get_dashboard_metrics(db))  # warm the cache
+            await _time("cached", runs, lambda: StatsService.get_dashboard_metrics(db))
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM payments WHERE reference LIKE 'bench-%'"))
+                await db.execute(text("DELETE FROM call_sessions WHERE room_name LIKE 'bench-room-%'"))
+                await db.commit()
+            await catch_up_rollups(days=SEED_DAYS)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payments", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.payments, args.runs, args.keep))
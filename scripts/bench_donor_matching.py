@@ -0,0 +1,121 @@
+# scripts/bench_donor_matching.py
+"""
+Benchmark for DonorMatcher against per-request donor queries.
+
+Seeds --donors donors over 20 cities and the 8 ABO/Rh types (~80% reachable:
+active with a push token). For a mix of recipient types, times over --repeat runs:
+  - exact:   the old fan-out query, exact (blood_type, city), no compatible types
+  - sql-in:  compatible types per request: blood_type IN (...) AND lower(trim(city)) = ...
+  - cold:    DonorMatcher on an empty cache (loads the whole city once)
+  - warm:    DonorMatcher with the city cached (no query)
+
+    python -m scripts.bench_donor_matching --donors 300000 --repeat 50
+
+Seeded donors are tagged 'bench-match' (hospital) and removed afterwards unless --keep is set.
+Requires a reachable Postgres with the donor_matching_index migration applied.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.blood_donor import BloodDonor
+from app.services.donor_matching import DonorMatcher, city_key_expr, compatible_donor_types
+
+CITIES = "ARRAY['Douala','Yaounde','Bamenda','Buea','Limbe','Bafoussam','Garoua','Maroua','Kribi','Ebolowa'," \
+         "'Bertoua','Ngaoundere','Kumba','Dschang','Edea','Nkongsamba','Foumban','Mbouda','Tiko','Kousseri']"
+# Roughly the population mix: O+ and A+ common, AB- rare
+TYPES = "ARRAY['O+','O+','O+','O+','A+','A+','A+','B+','B+','O-','A-','B-','AB+','AB-']"
+
+SEED_DONORS = text(f"""
+    INSERT INTO blood_donors (name, phone, blood_type, city, hospital, is_active, fcm_token)
+    SELECT
+        'Bench Donor ' || g,
+        '9' || lpad(g::text, 11, '0'),
+        ({TYPES})[1 + g % 14],
+        ({CITIES})[1 + (g / 14) % 20],
+        'bench-match',
+        random() < 0.9,
+        CASE WHEN random() < 0.1 THEN NULL ELSE 'bench-token-' || g END
+    FROM generate_series(1, :n) AS g
+""")
+
+RECIPIENTS = ["O+", "A-", "AB+"]
+
+
+async def _time(label: str, run_once, repeat: int) -> None:
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await run_once()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"  {label:<8} rows={rows:<6} p50={p50:8.2f}ms p95={p95:8.2f}ms")
+
+
+async def run(donors: int, repeat: int, keep: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_DONORS, {"n": donors})
+        await db.commit()
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE blood_donors"))
+    print(f"Seeded {donors} donors over 20 cities; repeat={repeat}")
+
+    try:
+        city = "Douala"
+        for recipient in RECIPIENTS:
+            print(f"\nrecipient {recipient} in {city} (donor types {', '.join(compatible_donor_types(recipient))})")
+
+            async def exact_once():
+                async with AsyncSessionLocal() as db:
+                    return len((await db.execute(
+                        select(BloodDonor.id, BloodDonor.fcm_token).where(
+                            BloodDonor.blood_type == recipient, BloodDonor.city == city,
+                            BloodDonor.is_active.is_(True), BloodDonor.fcm_token.isnot(None),
+                        ).order_by(BloodDonor.id)
+                    )).all())
+
+            async def sql_in_once():
+                async with AsyncSessionLocal() as db:
+                    return len((await db.execute(
+                        select(BloodDonor.id, BloodDonor.fcm_token).where(
+                            BloodDonor.blood_type.in_(compatible_donor_types(recipient)),
+                            city_key_expr() == city.lower(),
+                            BloodDonor.is_active.is_(True), BloodDonor.fcm_token.isnot(None),
+                        ).order_by(BloodDonor.id)
+                    )).all())
+
+            async def cold_once():
+                return len(await DonorMatcher().match(recipient, city))
+
+            warm = DonorMatcher()
+            await warm.match(recipient, city)
+
+            async def warm_once():
+                return len(await warm.match(recipient, city))
+
+            await _time("exact", exact_once, repeat)
+            await _time("sql-in", sql_in_once, repeat)
+            await _time("cold", cold_once, max(1, repeat // 5))
+            await _time("warm", warm_once, repeat)
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM blood_donors WHERE hospital = 'bench-match'"))
+                await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--donors", type=int, default=300000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded donors in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.donors, args.repeat, args.keep))
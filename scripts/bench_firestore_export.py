@@ -0,0 +1,111 @@
+# scripts/bench_firestore_export.py
+"""
+Benchmark for the streaming Firestore exporter against the old buffered export.
+
+Serves --collections collections of --docs documents each from an in-memory
+client that sleeps --latency-ms per page read (a stand-in for Firestore round
+trips), and reports wall time and peak Python memory for:
+  - buffered: collections one after another, each held in a list and written
+              as indented JSON (the old export_firestore_to_json.py)
+  - stream:   FirestoreExporter, NDJSON pages, --workers collections at once
+  - gzip:     the same with .ndjson.gz output
+
+    python -m scripts.bench_firestore_export --collections 8 --docs 50000 --workers 4
+
+No Firestore or database needed; files go to a temporary directory.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.tasks.firestore_export import FirestoreExporter, document_line
+
+
+class _Snapshot:
+    __slots__ = ("id", "_data")
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Collection:
+    def __init__(self, name, docs, latency, page=None, after=None):
+        self.id, self.docs, self.latency = name, docs, latency
+        self._page, self._after = page, after
+
+    def order_by(self, field):
+        return self
+
+    def limit(self, n):
+        return _Collection(self.id, self.docs, self.latency, n, self._after)
+
+    def start_after(self, cursor):
+        return _Collection(self.id, self.docs, self.latency, self._page, cursor["__name__"])
+
+    def stream(self):
+        # Documents are generated on demand, like a server-side cursor
+        start = 0 if self._after is None else int(self._after[1:]) + 1
+        end = self.docs if self._page is None else min(self.docs, start + self._page)
+        time.sleep(self.latency)
+        for i in range(start, end):
+            if self._page is None and i and i % 1000 == 0:
+                time.sleep(self.latency)  # the SDK also pages an unbounded stream()
+            yield _Snapshot(f"d{i:09d}", {
+                "fullName": f"Donor {i}", "phone": f"6{i:08d}", "city": "Douala",
+                "bloodType": "O+", "fcmToken": f"token-{i}", "isActive": True,
+            })
+
+
+class _Client:
+    def __init__(self, collections, docs, latency):
+        self._collections = [_Collection(f"coll{c}", docs, latency) for c in range(collections)]
+
+    def collections(self):
+        return self._collections
+
+
+def _buffered(client, output_dir):
+    for coll in client.collections():
+        data = [json.loads(document_line(doc)) for doc in coll.stream()]
+        with open(os.path.join(output_dir, f"{coll.id}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def _measure(label, run_once):
+    with tempfile.TemporaryDirectory() as output_dir:
+        tracemalloc.start()
+        started = time.perf_counter()
+        run_once(output_dir)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = sum(os.path.getsize(os.path.join(output_dir, f)) for f in os.listdir(output_dir))
+    print(f"  {label:<9} {elapsed:7.1f}s  peak {peak / 1e6:7.1f} MB  output {size / 1e6:7.1f} MB")
+
+
+def run(collections, docs, latency_ms, workers, page_size):
+    client = _Client(collections, docs, latency_ms / 1000)
+    print(f"{collections} collections x {docs} documents, {latency_ms}ms per page read")
+    _measure("buffered", lambda out: _buffered(client, out))
+    _measure("stream", lambda out: FirestoreExporter(client, out, page_size=page_size, workers=workers).run())
+    _measure("gzip", lambda out: FirestoreExporter(
+        client, out, compress=True, page_size=page_size, workers=workers).run())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collections", type=int, default=8)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    run(args.collections, args.docs, args.latency_ms, args.workers, args.page_size)
@@ -0,0 +1,150 @@
+# scripts/bench_gateway_transport.py
+"""
+Benchmark for shared gateway clients against a local fake MTN MoMo proxy (TLS, no internet).
+
+Each round is one charge (POST requesttopay) plus one status poll (GET):
+  - legacy: a fresh httpx.AsyncClient per call, as the adapters used to do
+  - pooled: MTNMomoPaymentGateway on one keep-alive GatewayTransport client
+
+    python -m scripts.bench_gateway_transport --rounds 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import socket
+import ssl
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.gateways.mtn_momo_adapter import MTNMomoPaymentGateway
+from app.gateways.transport import GatewayTransport
+
+
+# ---------------------------------------------------------
+# Fake provider
+# ---------------------------------------------------------
+async def fake_momo(scope, receive, send):
+    """Minimal ASGI MoMo proxy: 202 on requesttopay, SUCCESSFUL on status polls."""
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+
+    if scope["method"] == "POST":
+        status, body = 202, b""
+    else:
+        status, body = 200, b'{"status": "SUCCESSFUL"}'
+
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _self_signed(directory: Path):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return cert_path, key_path
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ---------------------------------------------------------
+# Clients
+# ---------------------------------------------------------
+async def legacy_round(base_url: str, verify: ssl.SSLContext) -> None:
+    async with httpx.AsyncClient(verify=verify, timeout=30.0) as client:
+        await client.post(f"{base_url}/v1_0/requesttopay", json={"amount": "500"})
+    async with httpx.AsyncClient(verify=verify, timeout=5.0) as client:
+        await client.get(f"{base_url}/v1_0/requesttopay/ref")
+
+
+async def pooled_round(gateway: MTNMomoPaymentGateway) -> None:
+    response = await gateway.charge(phone="670000000", amount=500)
+    await gateway.verify_transaction(response.reference)
+
+
+async def _measure(label: str, make_round, rounds: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await make_round()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(rounds)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<7} rounds={rounds} elapsed={elapsed:.2f}s ({rounds / elapsed:.0f} rounds/s)  "
+          f"p50={p50:.1f}ms p95={p95:.1f}ms")
+
+
+async def run(rounds: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = _self_signed(Path(tmp))
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(
+            fake_momo, host="127.0.0.1", port=port, log_level="warning",
+            ssl_certfile=str(cert_path), ssl_keyfile=str(key_path),
+        ))
+        serve = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        base_url = f"https://127.0.0.1:{port}/collection"
+        verify = ssl.create_default_context(cafile=str(cert_path))
+
+        transport = GatewayTransport(verify=verify)
+        gateway = MTNMomoPaymentGateway(api_key="bench", subscription_key="bench", transport=transport)
+        gateway.BASE_URL = base_url
+
+        try:
+            await _measure("legacy", lambda: legacy_round(base_url, verify), rounds, concurrency)
+            await _measure("pooled", lambda: pooled_round(gateway), rounds, concurrency)
+        finally:
+            await transport.aclose()
+            server.should_exit = True
+            await serve
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rounds, args.concurrency))
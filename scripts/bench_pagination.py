@@ -0,0 +1,161 @@
+# scripts/bench_pagination.py
+"""
+Benchmark for keyset (cursor) pagination against the OFFSET/LIMIT it replaces.
+
+Seeds --rows payments and --rows blood requests, then times, over --repeat runs:
+  - offset: ORDER BY ... OFFSET (page - 1) * limit LIMIT limit (the old queries)
+  - keyset: Keyset.fetch() continuing from the previous page's last row
+at page 1 and page --deep (the cursor for the deep page is taken once, untimed),
+plus the old per-page count(*) against count_rows().
+
+    python -m scripts.bench_pagination --rows 600000 --deep 10000 --limit 50
+
+Seeded rows are tagged 'bench-page-' and removed afterwards unless --keep is set.
+Requires a reachable Postgres with the keyset_pagination migration applied.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import desc, func, select, text
+
+from app.api.dashboard import PAYMENTS_KEYSET
+from app.crud.blood_request import FEED_KEYSET
+from app.database import AsyncSessionLocal, async_engine
+from app.models.blood_request import BloodRequest
+from app.models.payment import Payment, PaymentStatus
+from app.utils.pagination import count_rows
+
+SEED_PAYMENTS = text("""
+    INSERT INTO payments (
+        id, reference, user_id, user_phone, service_type, amount, currency, provider,
+        idempotency_key, signature, status, expires_at, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-page-' || g,
+        'bench-user-' || (g % 5000),
+        '6' || lpad((g % 100000000)::text, 8, '0'),
+        'DOCTOR',
+        500,
+        'XAF',
+        (ARRAY['MTN','ORANGE'])[1 + g % 2],
+        'bench-page-idem-' || g,
+        'bench',
+        (ARRAY['SUCCESS','SUCCESS','SUCCESS','PENDING','FAILED'])[1 + g % 5],
+        now() + interval '15 minutes',
+        now() - g * interval '1 second',
+        now()
+    FROM generate_series(1, :n) AS g
+""")
+
+SEED_REQUESTS = text("""
+    INSERT INTO blood_requests (user_id, requester_name, city, phone, blood_type, needed_units, urgent, status, created_at)
+    SELECT
+        'bench-page-' || (g % 5000),
+        'Bench Requester',
+        'Douala',
+        '670000000',
+        'O+',
+        1,
+        g % 10 = 0,
+        'PENDING',
+        now() - (g / 3) * interval '1 second'
+    FROM generate_series(1, :n) AS g
+""")
+
+
+async def _time(label: str, run_once, repeat: int) -> None:
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await run_once()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"  {label:<34} rows={rows:<7} p50={p50:8.1f}ms p95={p95:8.1f}ms")
+
+
+async def _compare(title: str, keyset, stmt, legacy_order, filters, limit: int, deep: int, repeat: int) -> None:
+    print(f"\n{title}")
+    # Cursor for the deep page: the last row of page deep-1, found once with OFFSET (untimed)
+    async with AsyncSessionLocal() as db:
+        boundary = (await db.execute(
+            stmt.order_by(*legacy_order).offset((deep - 1) * limit - 1).limit(1)
+        )).scalars().first()
+    cursor = keyset.encode([getattr(boundary, key.column.key) for key in keyset.keys], filters)
+
+    for page_no, page_cursor in ((1, None), (deep, cursor)):
+        async def offset_once():
+            async with AsyncSessionLocal() as db:
+                query = stmt.order_by(*legacy_order).offset((page_no - 1) * limit).limit(limit)
+                return len((await db.execute(query)).scalars().all())
+
+        async def keyset_once():
+            async with AsyncSessionLocal() as db:
+                return len((await keyset.fetch(db, stmt, limit, page_cursor, filters)).items)
+
+        await _time(f"offset page {page_no}", offset_once, repeat)
+        await _time(f"keyset page {page_no}", keyset_once, repeat)
+
+    async def count_once():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+    async def approx_once():
+        async with AsyncSessionLocal() as db:
+            return (await count_rows(db, stmt))[0]
+
+    await _time("count(*) per page (old)", count_once, repeat)
+    await _time("count_rows (bounded/estimate)", approx_once, repeat)
+
+
+async def run(rows: int, deep: int, limit: int, repeat: int, keep: bool) -> None:
+    if (deep - 1) * limit >= rows:
+        raise SystemExit(f"--rows must exceed (deep - 1) * limit = {(deep - 1) * limit}")
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_PAYMENTS, {"n": rows})
+        await db.execute(SEED_REQUESTS, {"n": rows})
+        await db.commit()
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE payments"))
+        await conn.execute(text("VACUUM ANALYZE blood_requests"))
+    print(f"Seeded {rows} payments + {rows} blood requests; limit={limit}, deep page={deep}, repeat={repeat}")
+
+    try:
+        await _compare(
+            "/dashboard/payments (no filter)", PAYMENTS_KEYSET, select(Payment),
+            [desc(Payment.created_at)], {"status": None, "provider": None}, limit, deep, repeat,
+        )
+        success = select(Payment).where(Payment.status == PaymentStatus.SUCCESS)
+        await _compare(
+            "/dashboard/payments?status=SUCCESS", PAYMENTS_KEYSET, success,
+            [desc(Payment.created_at)], {"status": "SUCCESS", "provider": None}, limit, deep // 2, repeat,
+        )
+        feed = select(BloodRequest).where(BloodRequest.status == "PENDING")
+        await _compare(
+            "blood request feed (urgent, created_at)", FEED_KEYSET, feed,
+            [desc(BloodRequest.urgent), desc(BloodRequest.created_at)], {"status": "PENDING"}, limit, deep, repeat,
+        )
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM payments WHERE reference LIKE 'bench-page-%'"))
+                await db.execute(text("DELETE FROM blood_requests WHERE user_id LIKE 'bench-page-%'"))
+                await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=600000)
+    parser.add_argument("--deep", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.deep, args.limit, args.repeat, args.keep))
@@ -0,0 +1,69 @@
+# scripts/bench_quota_concurrency.py
+"""
+Concurrency benchmark for SQLAlchemyUsageRepository.try_consume_free_usage.
+
+Fires N parallel consumers (one session each) at a single user and checks
+that exactly `limit` of them were granted and usage_counter.used == limit.
+
+    python -m scripts.bench_quota_concurrency --consumers 200 --limit 5
+
+Requires a reachable Postgres (ASYNC_DATABASE_URL / DB_* settings).
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal, async_engine, Base
+from app.models.usage_counter import UsageCounter
+from app.repositories.usage_repo import SQLAlchemyUsageRepository
+
+
+async def _consume(user_id: str, limit: int) -> bool:
+    async with AsyncSessionLocal() as session:
+        repo = SQLAlchemyUsageRepository(session)
+        granted = await repo.try_consume_free_usage(user_id, "taxi-request", free_limit=limit)
+        await session.commit()
+        return granted
+
+
+async def run(consumers: int, limit: int) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[UsageCounter.__table__])
+
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(_consume(user_id, limit) for _ in range(consumers)))
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as session:
+        used = await session.scalar(
+            select(UsageCounter.used).where(
+                UsageCounter.user_id == user_id,
+                UsageCounter.service == "taxi_request"
+            )
+        )
+        await session.execute(delete(UsageCounter).where(UsageCounter.user_id == user_id))
+        await session.commit()
+
+    granted = sum(outcomes)
+    print(f"consumers={consumers} limit={limit} granted={granted} used={used}")
+    print(f"elapsed={elapsed:.3f}s  ({consumers / elapsed:.0f} consumes/sec)")
+
+    assert granted == limit, f"expected {limit} grants, got {granted}"
+    assert used == limit, f"expected used={limit}, got {used}"
+    print("✅ Quota count is exact")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--consumers", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.consumers, args.limit))
@@ -0,0 +1,136 @@
+# scripts/bench_reconciliation.py
+"""
+Benchmark for ReconciliationEngine on a seeded database with fake provider gateways.
+
+Seeds N PENDING payments split across MTN and STRIPE. Fake gateways sleep per
+verify call (STRIPE deliberately slow) and report 1/3 SUCCESS, 1/6 FAILED.
+Times:
+  - legacy: load every pending row, then verify one at a time and UPDATE per row
+            (run on --legacy-sample rows only; it is linear)
+  - engine: keyset pages, per-provider bounded concurrency, batched UPDATEs
+
+    python -m scripts.bench_reconciliation --payments 20000 --concurrency 16 --rate 0
+
+Seeded rows are tagged 'bench-rec-' and removed afterwards unless --keep is set.
+Requires a reachable Postgres (ASYNC_DATABASE_URL / DB_* settings).
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text, update
+
+from app.database import AsyncSessionLocal, async_engine, Base
+from app.models.payment import Payment, PaymentProvider, PaymentStatus
+from app.models.rollup import PaymentDailyRollup
+from app.services.reconciliation_service import PROVIDER_STATUS_MAP, ReconciliationEngine
+from app.tasks.rollups import catch_up_rollups
+
+SEED_PENDING = text("""
+    INSERT INTO payments (
+        id, reference, user_id, user_phone, service_type, amount, currency, provider, provider_tx_id,
+        idempotency_key, signature, status, expires_at, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-rec-' || g,
+        'bench-user-' || (g % 5000),
+        '6' || lpad((g % 100000000)::text, 8, '0'),
+        'DOCTOR',
+        500,
+        'XAF',
+        (ARRAY['MTN','STRIPE'])[1 + g % 2],
+        'bench-rec-tx-' || g,
+        'bench-rec-idem-' || g,
+        'bench',
+        'PENDING',
+        now() + interval '15 minutes',
+        now() - (g % 3600) * interval '1 second',
+        now()
+    FROM generate_series(1, :n) AS g
+""")
+
+
+class FakeGateway:
+    """verify_transaction only; outcome is a function of the provider TxID's number."""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    async def charge(self, *args, **kwargs):
+        raise NotImplementedError
+
+    async def verify_transaction(self, provider_tx_id: str) -> str:
+        await asyncio.sleep(self.latency_seconds)
+        n = int(provider_tx_id.rsplit("-", 1)[-1])
+        if n % 3 == 0:
+            return "SUCCESS"
+        if n % 6 == 1:
+            return "FAILED"
+        return "PENDING"
+
+
+async def _legacy(gateways, sample: int) -> float:
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(Payment).where(Payment.status == PaymentStatus.PENDING, Payment.reference.like("bench-rec-%"))
+        )).scalars().all()
+        for payment in rows[:sample]:
+            raw = await gateways[payment.provider].verify_transaction(payment.provider_tx_id)
+            new_status = PROVIDER_STATUS_MAP.get(raw)
+            if new_status:
+                await db.execute(update(Payment).where(Payment.id == payment.id).values(status=new_status))
+        await db.rollback()  # leave rows PENDING for the engine run
+    return time.perf_counter() - start
+
+
+async def run(payments: int, concurrency: int, rate: float, mtn_ms: float, stripe_ms: float,
+              legacy_sample: int, keep: bool) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Payment.__table__, PaymentDailyRollup.__table__])
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_PENDING, {"n": payments})
+        await db.commit()
+        await db.execute(text("ANALYZE payments"))
+    print(f"Seeded {payments} PENDING payments (MTN {mtn_ms:.0f}ms, STRIPE {stripe_ms:.0f}ms per verify)")
+
+    gateways = {
+        PaymentProvider.MTN: FakeGateway(mtn_ms / 1000),
+        PaymentProvider.STRIPE: FakeGateway(stripe_ms / 1000),
+    }
+
+    try:
+        if legacy_sample:
+            elapsed = await _legacy(gateways, legacy_sample)
+            print(f"legacy  sample={legacy_sample} elapsed={elapsed:.2f}s  ({legacy_sample / elapsed:.1f} payments/s)")
+
+        engine = ReconciliationEngine(gateways=gateways, concurrency=concurrency, rate_per_second=rate)
+        report = await engine.run()
+        print(f"engine  checked={report.checked} elapsed={report.seconds:.2f}s  ({report.throughput:.1f} payments/s)")
+        for name, provider in report.as_dict()["providers"].items():
+            print(f"        {name:<6} {provider}")
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM payments WHERE reference LIKE 'bench-rec-%'"))
+                await db.commit()
+            # Engine confirmations bumped today's rollups; recompute without the bench rows
+            await catch_up_rollups(days=1)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payments", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16, help="verify calls in flight per provider")
+    parser.add_argument("--rate", type=float, default=0.0, help="verify calls started per second per provider (0 = off)")
+    parser.add_argument("--mtn-ms", type=float, default=20.0)
+    parser.add_argument("--stripe-ms", type=float, default=200.0)
+    parser.add_argument("--legacy-sample", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.payments, args.concurrency, args.rate, args.mtn_ms, args.stripe_ms,
+                    args.legacy_sample, args.keep))
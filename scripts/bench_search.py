@@ -0,0 +1,182 @@
+# scripts/bench_search.py
+"""
+Benchmark for ranked full-text search against the ILIKE queries it replaces.
+
+Seeds --rows rows split evenly between service_users and service_listings
+(names/titles built from common first names, surnames, roles and cities plus
+one rare token per row). For each query times, over --repeat runs:
+  - ilike:    /services/search before: ILIKE '%q%' OR-ed over three columns, LIMIT n
+  - unbound:  /search before: ILIKE '%q%' on name/title with no LIMIT
+  - ranked:   SearchService (tsvector @@ prefix tsquery, ts_rank over the nearest-name candidates, LIMIT n),
+              providers then listings on one session
+  - parallel: SearchExecutor, both sources at once on separate connections, merged
+
+    python -m scripts.bench_search --rows 500000 --repeat 20
+
+Seeded rows are tagged 'bench-search' and removed afterwards unless --keep is set.
+Requires a reachable Postgres with the search_vectors migration applied.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import or_, select, text
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.models.service_listing import ServiceListing, ServiceUser
+from app.services.search_service import SearchExecutor, SearchService, trigram_available
+
+FIRST = "ARRAY['Jean','Marie','Paul','Grace','Emmanuel','Esther','Samuel','Brenda','Eric','Linda'," \
+        "'Patrick','Carine','Didier','Nadege','Herve','Ange','Boris','Sandrine','Franck','Vanessa']"
+LAST = "ARRAY['Ndongo','Mbarga','Fotso','Tchinda','Ngono','Essomba','Kamga','Nkwenti','Atangana','Biya'," \
+       "'Fouda','Ekane','Manga','Ondoa','Tabi','Njoya','Abena','Nana','Mvondo','Eto']"
+ROLES = "ARRAY['donor','nurse','doctor','driver','patient']"
+TYPES = "ARRAY['blood-request','taxi','bike','nurse-visit','consultation']"
+CITIES = "ARRAY['Douala','Yaounde','Bamenda','Buea','Limbe','Bafoussam','Garoua','Maroua','Kribi','Ebolowa']"
+
+SEED_USERS = text(f"""
+    INSERT INTO service_users (id, full_name, role, city, profile_image)
+    SELECT
+        gen_random_uuid(),
+        ({FIRST})[1 + g % 20] || ' ' || ({LAST})[1 + (g / 20) % 20] || ' ' || initcap(substr(md5(g::text), 1, 7)),
+        ({ROLES})[1 + g % 5],
+        ({CITIES})[1 + (g / 7) % 10],
+        'bench-search'
+    FROM generate_series(1, :n) AS g
+""")
+
+SEED_LISTINGS = text(f"""
+    INSERT INTO service_listings (id, user_id, service_type, status, title, location_city, activation_ref, details)
+    SELECT
+        gen_random_uuid(),
+        owner.id,
+        ({TYPES})[1 + g % 5],
+        'ACTIVE',
+        'Need ' || replace(({TYPES})[1 + g % 5], '-', ' ') || ' for ' || ({FIRST})[1 + (g / 3) % 20]
+            || ' ' || initcap(substr(md5('l' || g), 1, 7)),
+        ({CITIES})[1 + (g / 11) % 10],
+        'bench-search-' || g,
+        '{{}}'::jsonb
+    FROM generate_series(1, :n) AS g,
+         (SELECT id FROM service_users WHERE profile_image = 'bench-search' LIMIT 1) AS owner
+""")
+
+QUERIES = ["jean", "ndo", "nurse douala", "blood yaounde", "{rare}", "zzzz"]
+
+
+def ilike_queries(q: str, limit: int):
+    pattern = f"%{q}%"
+    return [
+        select(ServiceUser).where(or_(
+            ServiceUser.full_name.ilike(pattern), ServiceUser.role.ilike(pattern), ServiceUser.city.ilike(pattern)
+        )).limit(limit),
+        select(ServiceListing).where(or_(
+            ServiceListing.title.ilike(pattern), ServiceListing.service_type.ilike(pattern),
+            ServiceListing.location_city.ilike(pattern),
+        )).limit(limit),
+    ]
+
+
+def unbound_queries(q: str):
+    pattern = f"%{q}%"
+    return [
+        select(ServiceUser).where(ServiceUser.full_name.ilike(pattern)),
+        select(ServiceListing).where(ServiceListing.title.ilike(pattern)),
+    ]
+
+
+async def _count_all(db, statements) -> int:
+    total = 0
+    for stmt in statements:
+        total += len((await db.execute(stmt)).scalars().all())
+    return total
+
+
+async def _time(label: str, q: str, run_once, repeat: int) -> None:
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await run_once()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"  {label:<8} q={q!r:<18} rows={rows:<7} p50={p50:8.1f}ms p95={p95:8.1f}ms")
+
+
+async def run(rows: int, repeat: int, limit: int, keep: bool) -> None:
+    half = rows // 2
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_USERS, {"n": half})
+        await db.execute(SEED_LISTINGS, {"n": rows - half})
+        await db.commit()
+        rare = (await db.execute(text("SELECT initcap(substr(md5('4242'), 1, 7))"))).scalar()
+    # Merge the GIN pending lists so timings reflect steady state, not fresh inserts
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE service_users"))
+        await conn.execute(text("VACUUM ANALYZE service_listings"))
+    print(f"Seeded {half} providers + {rows - half} listings; limit={limit}, repeat={repeat}")
+
+    try:
+        # Unbound ILIKE materialises every match: only run a few rounds
+        unbound_repeat = max(1, repeat // 5)
+
+        for template in QUERIES:
+            q = template.format(rare=rare)
+
+            # Fresh session per call, like one API request
+            async def ilike_once():
+                async with AsyncSessionLocal() as db:
+                    return await _count_all(db, ilike_queries(q, limit))
+
+            async def unbound_once():
+                async with AsyncSessionLocal() as db:
+                    return await _count_all(db, unbound_queries(q))
+
+            async def ranked_once():
+                async with AsyncSessionLocal() as db:
+                    search = SearchService(db)
+                    return len(await search.search_providers(q, limit)) + len(await search.search_listings(q, limit))
+
+            await _time("ilike", q, ilike_once, repeat)
+            await _time("unbound", q, unbound_once, unbound_repeat)
+            async def parallel_once():
+                return len((await SearchExecutor().search(q, limit)).hits)
+
+            await _time("ranked", q, ranked_once, repeat)
+            await _time("parallel", q, parallel_once, repeat)
+
+        async with AsyncSessionLocal() as db:
+            # With pg_trgm the candidate pool is the nearest names (GiST distance order)
+            trigram = await trigram_available(db)
+            fuzzy = "OR 'ndo' <% full_name" if trigram else ""
+            pool = "ORDER BY full_name <->> 'ndo', id LIMIT :candidates" if trigram else ""
+            plan = await db.execute(text(f"""
+                EXPLAIN SELECT c.id FROM (
+                    SELECT id, search_vector FROM service_users
+                    WHERE search_vector @@ to_tsquery('simple', 'ndo:*') {fuzzy} {pool}
+                ) AS c
+                ORDER BY ts_rank(c.search_vector, to_tsquery('simple', 'ndo:*')) DESC, c.id
+                LIMIT :limit
+            """), {"limit": limit, "candidates": settings.SEARCH_RANK_CANDIDATES})
+            print("\nranked provider plan:\n  " + "\n  ".join(r[0] for r in plan))
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM service_listings WHERE activation_ref LIKE 'bench-search-%'"))
+                await db.execute(text("DELETE FROM service_users WHERE profile_image = 'bench-search'"))
+                await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.repeat, args.limit, args.keep))
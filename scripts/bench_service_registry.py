@@ -0,0 +1,95 @@
+# scripts/bench_service_registry.py
+"""
+Micro-benchmark for the quota hot path: ServiceRegistry lookups before and after the snapshot.
+
+Per simulated request, the quota path resolves the usage-counter key
+(usage_repo._resolve_service) and the fee (calculate_effective_fee), and
+/remaining reads the service meta as well. Times both for:
+  - legacy:   the old registry (meta dict rebuilt from the settings map
+              properties on every call, including as the .get() default)
+  - snapshot: ServiceRegistry (precomputed records, alias lookup)
+for a canonical key, an alias and an unknown key.
+
+    python -m scripts.bench_service_registry --number 200000
+
+No database needed.
+"""
+import argparse
+import timeit
+
+from app.config import settings
+from app.services.registry import ServiceRegistry
+
+
+# The registry as it was, for the baseline
+def _legacy_meta(service_key):
+    display_name = service_key.replace("-", " ").title()
+    rtc_supported_list = getattr(settings, "RTC_SERVICES", ["doctor", "nurse", "consultation"])
+    is_rtc_eligible = service_key in rtc_supported_list
+    return {
+        "key": service_key,
+        "display_name": display_name,
+        "base_fee": settings.fee_map.get(service_key, 0),
+        "free_limit": settings.free_limits.get(service_key, 0),
+        "is_enabled": settings.payment_switches.get(service_key, True),
+        "is_payment_globally_enabled": getattr(settings, "PAYMENT_ENABLED", True),
+        "promo_message": settings.promo_messages.get(service_key, ""),
+        "quota_type": service_key.replace("-", "_"),
+        "is_rtc_supported": is_rtc_eligible,
+        "category": "medical" if is_rtc_eligible or "blood" in service_key else "logistics",
+    }
+
+
+_LEGACY_SERVICES = {key: _legacy_meta(key) for key in settings.fee_map}
+
+
+def _legacy_quota_path(service, used):
+    try:
+        quota_type = _legacy_meta(service).get("quota_type", service)
+    except Exception:
+        quota_type = service
+    meta = _LEGACY_SERVICES.get(service, _legacy_meta(service))
+    if not meta["is_enabled"] or not meta["is_payment_globally_enabled"]:
+        return quota_type, 0
+    if used < meta["free_limit"]:
+        return quota_type, 0
+    return quota_type, meta["base_fee"]
+
+
+def _legacy_remaining(service, used):
+    meta = _legacy_meta(service)
+    quota_type = _legacy_meta(service).get("quota_type", service)
+    return quota_type, max(0, meta["free_limit"] - used), meta["base_fee"]
+
+
+def run(number):
+    registry = ServiceRegistry()
+
+    def quota_path(service, used):
+        return registry.quota_type(service), registry.calculate_effective_fee(service, used)
+
+    def remaining(service, used):
+        meta = registry.get(service)
+        return registry.quota_type(service), max(0, meta.free_limit - used), meta.base_fee
+
+    print(f"{number} calls per case")
+    for service in ("doctor-consult", "doctor", "ambulance-ride"):
+        # Same counter key as before, except that an alias now counts against its service
+        assert quota_path(service, 0)[0] == _legacy_quota_path(registry.get(service).key, 0)[0]
+        print(f"\n  service={service}")
+        for label, legacy, current in (
+            ("quota path", _legacy_quota_path, quota_path),
+            ("/remaining", _legacy_remaining, remaining),
+        ):
+            before = min(timeit.repeat(lambda: legacy(service, 10), number=number, repeat=3)) / number
+            after = min(timeit.repeat(lambda: current(service, 10), number=number, repeat=3)) / number
+            print(f"    {label:<11} legacy {before * 1e9:8.0f} ns   snapshot {after * 1e9:6.0f} ns   "
+                  f"x{before / after:5.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    run(args.number)
@@ -0,0 +1,154 @@
+# scripts/bench_sms_matching.py
+"""
+Benchmark for SMSMatchingEngine on a seeded database.
+
+Seeds N open payments (MTN/Orange, 5% of MTN ones AWAITING_VERIFICATION with the
+user's TxID, every 500th sharing payer phone and amount with its neighbour) and
+builds provider SMS bodies for a share of them, plus noise and resent SMS.
+Times:
+  - legacy: one query per SMS on status + amount + metadata_json->>'phone',
+            the lookup /admin/verify-bypass asks for (run on --legacy-sample SMS)
+  - engine: parse_many, one index build, in-memory matching, batched confirms
+            and the per-payment service activation (no listings are seeded, so
+            that is the listing UPDATE finding nothing)
+
+    python -m scripts.bench_sms_matching --payments 50000 --sms 20000
+
+Seeded rows are tagged 'bench-sms-' and removed afterwards unless --keep is set.
+Requires a reachable Postgres (ASYNC_DATABASE_URL / DB_* settings).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import func, select, text
+
+from app.database import AsyncSessionLocal, async_engine, Base
+from app.models.payment import Payment, PaymentStatus
+from app.models.rollup import PaymentDailyRollup
+from app.services.sms_matching import SMSMatchingEngine
+from app.tasks.rollups import catch_up_rollups
+
+AMOUNTS = (500, 1000, 1500, 2500, 12500)
+
+SEED_OPEN = text("""
+    WITH seed AS (
+        SELECT g, CASE WHEN g % 500 = 1 THEN g - 1 ELSE g END AS base FROM generate_series(1, :n) AS g
+    )
+    INSERT INTO payments (
+        id, reference, user_id, user_phone, service_type, amount, currency, provider, provider_tx_id,
+        idempotency_key, signature, status, expires_at, created_at, updated_at, metadata_json
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-sms-' || g,
+        gen_random_uuid()::text,
+        '237' || (6 * 100000000 + base),
+        'DOCTOR',
+        (ARRAY[500, 1000, 1500, 2500, 12500])[1 + base % 5],
+        'XAF',
+        CASE WHEN g % 4 < 2 THEN 'MTN' ELSE 'ORANGE' END,
+        CASE WHEN g % 20 = 5 THEN (2600000000 + g)::text END,
+        'bench-sms-idem-' || g,
+        'bench',
+        CASE WHEN g % 20 = 5 THEN 'AWAITING_VERIFICATION' ELSE 'PENDING' END,
+        now() + interval '15 minutes',
+        now() - (g % 3600) * interval '1 second',
+        now(),
+        json_build_object('phone', (6 * 100000000 + base)::text)
+    FROM seed
+""")
+
+
+def _amount_text(value, rng):
+    return f"{value:,}".replace(",", rng.choice((",", " ", "."))) if value >= 1000 else str(value)
+
+
+def build_sms(payments, count, rng):
+    """SMS bodies for `count` of the seeded payments (g, provider), plus 5% noise and 2% resends."""
+    bodies = []
+    for g in rng.sample(range(1, payments + 1), min(count, payments)):
+        base = g - 1 if g % 500 == 1 else g
+        phone = str(600000000 + base)
+        amount = _amount_text(AMOUNTS[base % 5], rng)
+        if g % 4 < 2:
+            tx_id = 2600000000 + g if g % 20 == 5 else 2700000000 + g
+            bodies.append(f"You have received {amount} FCFA from CLIENT ({phone}). TransID: {tx_id}")
+        else:
+            bodies.append(f"Depot de {amount} FCFA recu du {phone}. Reference: CM26{g:08d}")
+    bodies += [f"Your code is {rng.randint(100000, 999999)}" for _ in range(len(bodies) // 20)]
+    bodies += rng.sample(bodies, len(bodies) // 50)
+    return bodies
+
+
+async def _legacy(bodies, sample: int) -> float:
+    from app.services.sms_parser import SMSParser
+
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for sms in SMSParser.parse_many(bodies[:sample]):
+            if sms is None or sms.phone is None:
+                continue
+            await db.execute(
+                select(Payment.id).where(
+                    Payment.status == PaymentStatus.PENDING,
+                    Payment.amount == sms.amount,
+                    Payment.metadata_json["phone"].as_string() == sms.phone,
+                )
+            )
+    return time.perf_counter() - start
+
+
+async def run(payments: int, sms: int, legacy_sample: int, keep: bool) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Payment.__table__, PaymentDailyRollup.__table__])
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(SEED_OPEN, {"n": payments})
+        await db.commit()
+        await db.execute(text("ANALYZE payments"))
+    rng = random.Random(11)
+    bodies = build_sms(payments, sms, rng)
+    rng.shuffle(bodies)
+    print(f"Seeded {payments} open payments; {len(bodies)} SMS bodies")
+
+    try:
+        if legacy_sample:
+            elapsed = await _legacy(bodies, legacy_sample)
+            print(f"legacy  sample={legacy_sample} elapsed={elapsed:.2f}s  "
+                  f"({elapsed / legacy_sample * 1000:.1f} ms/SMS, ~{elapsed / legacy_sample * len(bodies):.0f}s for all)")
+
+        report = await SMSMatchingEngine().run(bodies)
+        print(f"engine  elapsed={report.seconds:.2f}s  ({len(bodies) / report.seconds:.0f} SMS/s, "
+              f"{report.indexed} payments indexed)")
+        print(f"        outcomes={report.outcomes} flagged={report.flagged}")
+
+        async with AsyncSessionLocal() as db:
+            auto = (await db.execute(
+                select(func.count()).where(
+                    Payment.reference.like("bench-sms-%"),
+                    Payment.status == PaymentStatus.SUCCESS,
+                    Payment.metadata_json["verification_mode"].as_string() == "AUTO_MATCH",
+                )
+            )).scalar()
+        print(f"        SUCCESS/AUTO_MATCH rows in the ledger: {auto}")
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM payments WHERE reference LIKE 'bench-sms-%'"))
+                await db.commit()
+            # Confirmations bumped today's rollups; recompute without the bench rows
+            await catch_up_rollups(days=1)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payments", type=int, default=50000)
+    parser.add_argument("--sms", type=int, default=20000, help="payments that get an SMS")
+    parser.add_argument("--legacy-sample", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="Leave seeded rows in place")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.payments, args.sms, args.legacy_sample, args.keep))
@@ -0,0 +1,160 @@
+# scripts/load_chat_fanout.py
+"""
+Multi-process load test for chat fan-out (ConnectionManager + broadcast backend).
+
+Starts --workers processes, each with its own ConnectionManager, as uvicorn
+--workers would. --sockets simulated sockets are spread over the processes
+and --rooms rooms (socket s: room s % rooms, process (s // rooms) % workers,
+so every room has sockets in every process). Every process then publishes its
+share of --messages at --rate messages/s in total. Each socket records the
+delivery latency of every message (after --send-ms, to mimic slow clients), and
+the parent checks delivery counts against the expected total and reports
+latency percentiles and drops. With --slow-fraction below 1 only that share
+of sockets is slow, and latency is reported for fast and slow sockets apart.
+
+    python -m scripts.load_chat_fanout --redis-url redis://localhost:6379/0 --workers 4 --sockets 4000
+    python -m scripts.load_chat_fanout --backend memory --workers 4     # shows what single-process fan-out misses
+    python -m scripts.load_chat_fanout --workers 1 --send-ms 200 --slow-fraction 0.05   # a few bad networks
+
+Sockets are in-process stand-ins (send_text records latency), so this
+measures the fan-out path itself, not WebSocket framing. Needs Redis for the
+redis backend.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import Counter
+
+import redis.asyncio as aredis
+
+from app.routers.chat import ConnectionManager
+from app.services.chat_broadcast import LocalChatBroadcast, RedisChatBroadcast
+
+
+class LoadSocket:
+    __slots__ = ("latencies", "send_seconds")
+
+    def __init__(self, send_seconds=0.0):
+        self.latencies = []
+        self.send_seconds = send_seconds
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.send_seconds:
+            await asyncio.sleep(self.send_seconds)
+        self.latencies.append(time.monotonic() - json.loads(frame)["sent_at"])
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _worker_main(index, args, barrier, results):
+    manager = ConnectionManager()
+    redis = None
+    if args.backend == "redis":
+        redis = aredis.from_url(args.redis_url, decode_responses=True)
+        await manager.set_backend(RedisChatBroadcast(redis, queue_size=args.queue_size))
+    else:
+        await manager.set_backend(LocalChatBroadcast())
+
+    sockets = []
+    local_per_room = Counter()
+    for s in range(args.sockets):
+        if (s // args.rooms) % args.workers != index:
+            continue
+        slow = (s * 7919) % 1000 < args.slow_fraction * 1000
+        ws = LoadSocket(args.send_ms / 1000 if slow else 0.0)
+        await manager.connect(s % args.rooms, ws)
+        sockets.append(ws)
+        local_per_room[s % args.rooms] += 1
+
+    # Every process subscribed before anyone publishes
+    await asyncio.to_thread(barrier.wait)
+
+    # Message m goes to room m % rooms; this process sends m = index, index + workers, ...
+    mine = range(index, args.messages, args.workers)
+    interval = args.workers / args.rate if args.rate else 0
+    started = time.monotonic()
+    for n, m in enumerate(mine):
+        if interval:
+            delay = started + n * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await manager.broadcast(m % args.rooms, {"m": m, "sent_at": time.monotonic()})
+
+    # Wait until every message addressed to a local room has arrived (or time out)
+    messages_per_room = Counter(m % args.rooms for m in range(args.messages))
+    expected = sum(count * messages_per_room[room] for room, count in local_per_room.items())
+    deadline = time.monotonic() + args.drain_seconds
+    while sum(len(ws.latencies) for ws in sockets) < expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    fast = [lat for ws in sockets if not ws.send_seconds for lat in ws.latencies]
+    slow = [lat for ws in sockets if ws.send_seconds for lat in ws.latencies]
+    dropped = getattr(manager.backend, "dropped", 0) + sum(s.dropped for s in manager.senders.values())
+    await manager.close()
+    if redis is not None:
+        await redis.aclose()
+    results.put((index, fast, slow, dropped))
+
+
+def _worker(index, args, barrier, results):
+    asyncio.run(_worker_main(index, args, barrier, results))
+
+
+def _pct(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else float("nan")
+
+
+def run(args):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(args.workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(i, args, barrier, results)) for i in range(args.workers)]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    collected = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    sockets_per_room = Counter(s % args.rooms for s in range(args.sockets))
+    expected = sum(sockets_per_room[m % args.rooms] for m in range(args.messages))
+    fast = sorted(lat for _, lats, _, _ in collected for lat in lats)
+    slow = sorted(lat for _, _, lats, _ in collected for lat in lats)
+    latencies = sorted(fast + slow)
+    dropped = sum(d for _, _, _, d in collected)
+
+    print(f"backend={args.backend} workers={args.workers} sockets={args.sockets} rooms={args.rooms} "
+          f"messages={args.messages} rate={args.rate}/s (cpus: {os.cpu_count()})")
+    print(f"  deliveries {len(latencies)}/{expected} ({100 * len(latencies) / expected:.1f}%), "
+          f"dropped {dropped}, wall {elapsed:.1f}s")
+    print(f"  latency p50={_pct(latencies, 0.50):.2f}ms p95={_pct(latencies, 0.95):.2f}ms "
+          f"p99={_pct(latencies, 0.99):.2f}ms max={_pct(latencies, 1.0):.2f}ms")
+    if fast and slow:
+        print(f"  fast sockets p50={_pct(fast, 0.50):.2f}ms p99={_pct(fast, 0.99):.2f}ms | "
+              f"slow sockets p50={_pct(slow, 0.50):.2f}ms p99={_pct(slow, 0.99):.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["redis", "memory"], default="redis")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sockets", type=int, default=4000)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500.0, help="Messages per second over all workers (0 = flat out)")
+    parser.add_argument("--queue-size", type=int, default=10000, help="Per-worker inbound fan-out queue")
+    parser.add_argument("--send-ms", type=float, default=0.0, help="Simulated per-socket send time")
+    parser.add_argument("--slow-fraction", type=float, default=1.0, help="Share of sockets that take --send-ms")
+    parser.add_argument("--drain-seconds", type=float, default=15.0)
+    args = parser.parse_args()
+
+    run(args)
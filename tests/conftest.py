@@ -55,6 +55,93 @@ async def override_get_db():
     yield FakeDB()
 
 
+# ======================================================
+# FAKE REDIS (ASYNC, IN-MEMORY)
+# ======================================================
+class FakeRedis:
+    """
+    Minimal async stand-in for redis.asyncio.Redis.
+    Set `fail = True` to simulate an outage.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("fake redis is down")
+
+    async def ping(self):
+        self._check()
+        return True
+
+    async def get(self, key):
+        self._check()
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False, xx=False):
+        self._check()
+        if nx and key in self.store:
+            return None
+        if xx and key not in self.store:
+            return None
+        self.store[key] = str(value) if not isinstance(value, (str, bytes)) else value
+        if ex is not None:
+            self.ttls[key] = ex
+        elif px is not None:
+            self.ttls[key] = px / 1000
+        return True
+
+    async def delete(self, *keys):
+        self._check()
+        removed = 0
+        for key in keys:
+            if self.store.pop(key, None) is not None:
+                removed += 1
+            self.ttls.pop(key, None)
+        return removed
+
+    async def incr(self, key, amount=1):
+        self._check()
+        value = int(self.store.get(key, 0)) + amount
+        self.store[key] = str(value)
+        return value
+
+    async def expire(self, key, seconds):
+        self._check()
+        if key not in self.store:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def pexpire(self, key, milliseconds):
+        self._check()
+        if key not in self.store:
+            return False
+        self.ttls[key] = milliseconds / 1000
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        """Covers the compare-and-pexpire / compare-and-del lease scripts."""
+        self._check()
+        key, token = args[0], args[1]
+        if self.store.get(key) != token:
+            return 0
+        if "pexpire" in script:
+            return int(await self.pexpire(key, int(args[2])))
+        return await self.delete(key)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
 # ======================================================
 # FIXED CLIENT FIXTURE (NO event_loop, NO pytest_asyncio.fixture)
 # ======================================================
@@ -0,0 +1,272 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.autocomplete import (
+    AutocompleteIndex, PrefixIndex, diff_entries, normalize, prefix_keys, provider_entries, service_user_entries,
+)
+
+
+# =========================================================
+# FAKES
+# =========================================================
+class SortedSetRedis:
+    """Sorted-set / hash subset of redis.asyncio used by the autocomplete mirror."""
+
+    def __init__(self):
+        self.zsets, self.hashes, self.strings = {}, {}, {}
+
+    def pipeline(self, transaction=False):
+        return _Pipeline(self)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.zsets.pop(key, None)
+            self.hashes.pop(key, None)
+
+    async def rename(self, src, dst):
+        self.zsets[dst] = self.zsets.pop(src)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, set()).update(mapping)
+
+    async def zrem(self, key, *members):
+        self.zsets.get(key, set()).difference_update(members)
+
+    async def zrangebylex(self, key, low, high, start=0, num=None):
+        members = sorted(m for m in self.zsets.get(key, ()) if low[1:] <= m <= high[1:])
+        return members[start:start + num]
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hincrby(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    async def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client, self.calls = client, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class RowsSession:
+    """build(): streams the provider, user and listing SELECTs in order."""
+
+    def __init__(self, providers, users, listings, on_execute=None):
+        self.results = [providers, users, listings]
+        self.on_execute = on_execute
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, stmt):
+        if self.on_execute:
+            await self.on_execute()
+        rows = self.results.pop(0)
+
+        class _Stream:
+            async def partitions(self, size):
+                for i in range(0, len(rows), size):
+                    yield rows[i:i + size]
+
+        return _Stream()
+
+
+def _provider(id, name, city, service_type="doctor"):
+    return SimpleNamespace(id=id, name=name, city=city, service_type=service_type)
+
+
+def _user(id, full_name, city):
+    return SimpleNamespace(id=id, full_name=full_name, city=city)
+
+
+# =========================================================
+# PREFIX INDEX
+# =========================================================
+def test_normalize_and_word_start_keys():
+    assert normalize("  Yaoundé   Centre ") == "yaounde centre"
+    assert prefix_keys("Dr Jean Ndongo") == ["dr jean ndongo", "jean ndongo", "ndongo"]
+
+
+def test_lookup_matches_any_word_and_ranks_leading_matches_first():
+    index = PrefixIndex.from_entries([("1", "Paul Ndongo"), ("2", "Ndongo Clinic"), ("3", "Grace Fotso")])
+
+    assert [label for _, label in index.lookup("ndo", 10)] == ["Ndongo Clinic", "Paul Ndongo"]
+    assert index.lookup("NDONGO C", 10) == [("2", "Ndongo Clinic")]
+    assert index.lookup("x", 10) == []
+
+
+def test_entity_add_is_upsert_and_remove_drops_every_key():
+    index = PrefixIndex()
+    index.add("1", "Jean Ndongo")
+    index.add("1", "Jean Mbarga")
+
+    assert index.lookup("ndo", 5) == []
+    assert index.lookup("mba", 5) == [("1", "Jean Mbarga")]
+
+    index.remove("1")
+    assert index.lookup("jean", 5) == [] and index._keys == []
+
+
+def test_shared_values_live_until_last_reference_goes():
+    cities = PrefixIndex.from_entries([("douala", "Douala"), ("douala", "Douala")], counted=True)
+
+    cities.remove("douala")
+    assert cities.lookup("dou", 5) == [("douala", "Douala")]
+    cities.remove("douala")
+    assert cities.lookup("dou", 5) == []
+
+
+def test_update_diff_only_touches_changed_entries():
+    before = provider_entries(_provider(7, "Jean Ndongo", "Douala"))
+    after = provider_entries(_provider(7, "Jean Ndongo", "Buea"))
+
+    assert diff_entries(before, after) == [
+        ("remove", ("city", "douala", "Douala")),
+        ("add", ("city", "buea", "Buea")),
+    ]
+
+
+# =========================================================
+# SERVICE
+# =========================================================
+async def test_build_then_complete_without_database():
+    index = AutocompleteIndex(
+        session_factory=lambda: RowsSession(
+            providers=[_provider(1, "Hopital Laquintinie", "Douala", "clinic")],
+            users=[_user("u1", "Jean Ndongo", "Douala"), _user("u2", "Marie Ngono", "Buea")],
+            listings=[("blood-request", "Douala", 3)],
+        ),
+        redis_getter=lambda: None,
+    )
+    await index.build()
+
+    assert await index.complete("dou", ["city"]) == [{"type": "city", "id": "douala", "label": "Douala"}]
+    assert [s["label"] for s in await index.complete("n", ["user"])] == ["Jean Ndongo", "Marie Ngono"]
+    assert await index.complete("blo", ["service_type"]) == [
+        {"type": "service_type", "id": "blood-request", "label": "blood-request"}
+    ]
+    # Douala: one provider + one user + three listings
+    assert index.indexes["city"]._counts["douala"] == 5
+
+
+async def test_changes_committed_during_build_are_replayed():
+    index = AutocompleteIndex(redis_getter=lambda: None)
+
+    async def write_mid_build():
+        if not index.indexes["user"]._labels:
+            await index.track(object(), [], service_user_entries(_user("u9", "Boris Tabi", "Kribi")))
+
+    index._session_factory = lambda: RowsSession([], [], [], on_execute=write_mid_build)
+    await index.build()
+
+    assert await index.complete("tab", ["user"]) == [{"type": "user", "id": "u9", "label": "Boris Tabi"}]
+
+
+async def test_index_is_built_off_the_event_loop(monkeypatch):
+    index = AutocompleteIndex(redis_getter=lambda: None)
+    index._session_factory = lambda: RowsSession([], [_user("u1", "Jean Ndongo", "Douala")], [])
+    from_entries = PrefixIndex.from_entries.__func__
+    started, release, threads = threading.Event(), threading.Event(), set()
+
+    def blocking_from_entries(cls, entries, counted=False):
+        threads.add(threading.current_thread())
+        started.set()
+        release.wait(5)
+        return from_entries(cls, entries, counted)
+
+    monkeypatch.setattr(PrefixIndex, "from_entries", classmethod(blocking_from_entries))
+    build = asyncio.create_task(index.build())
+    await asyncio.to_thread(started.wait, 5)
+
+    # The loop keeps serving while the index builds; a commit made now is replayed
+    await index.track(object(), [], service_user_entries(_user("u2", "Boris Tabi", "Kribi")))
+    release.set()
+    await build
+
+    assert threading.current_thread() not in threads
+    assert await index.complete("tab", ["user"]) == [{"type": "user", "id": "u2", "label": "Boris Tabi"}]
+    assert await index.complete("nd", ["user"]) == [{"type": "user", "id": "u1", "label": "Jean Ndongo"}]
+
+
+async def test_track_waits_for_commit_and_drops_on_rollback():
+    index = AutocompleteIndex(redis_getter=lambda: None)
+
+    class OrmBackedSession:
+        sync_session = Session()
+
+    session = OrmBackedSession()
+    # CRUD helpers flush before tracking, so a transaction is always open
+    session.sync_session.begin()
+
+    await index.track(session, [], service_user_entries(_user("u1", "Esther Fouda", "Limbe")))
+    assert await index.complete("fou") == []
+
+    session.sync_session.rollback()
+    assert await index.complete("fou") == []
+
+    session.sync_session.begin()
+    await index.track(session, [], service_user_entries(_user("u2", "Esther Fouda", "Limbe")))
+    session.sync_session.commit()
+    assert await index.complete("fou", ["user"]) == [{"type": "user", "id": "u2", "label": "Esther Fouda"}]
+
+
+async def test_redis_mirror_is_shared_across_workers(monkeypatch):
+    monkeypatch.setattr(settings, "AUTOCOMPLETE_REDIS_ENABLED", True)
+    redis = SortedSetRedis()
+    worker_a = AutocompleteIndex(redis_getter=lambda: redis)
+    worker_b = AutocompleteIndex(redis_getter=lambda: redis)
+
+    # Written through worker A, immediately visible to worker B
+    await worker_a.track(object(), [], provider_entries(_provider(3, "Clinique Eto", "Garoua")))
+    await worker_a.track(object(), [], service_user_entries(_user("u4", "Franck Eto", "Garoua")))
+    assert [s["label"] for s in await worker_b.complete("eto", ["provider", "user"])] == ["Clinique Eto", "Franck Eto"]
+
+    # City survives while the user still references it
+    await worker_a.track(object(), provider_entries(_provider(3, "Clinique Eto", "Garoua")), [])
+    assert await worker_b.complete("gar", ["city"]) == [{"type": "city", "id": "garoua", "label": "Garoua"}]
+    assert await worker_b.complete("eto", ["provider"]) == []
+
+
+async def test_failed_build_is_retried_soon(monkeypatch):
+    calls = []
+
+    class Failing:
+        async def __aenter__(self):
+            calls.append(1)
+            raise ConnectionError("db down")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    index = AutocompleteIndex(session_factory=Failing, redis_getter=lambda: None)
+    await index.start()
+    assert not index.ready and await index.complete("a") == []
+
+    monkeypatch.setattr(AutocompleteIndex, "RETRY_SECONDS", 0.0)
+    await index.complete("a")
+    await asyncio.sleep(0)
+    assert len(calls) == 2
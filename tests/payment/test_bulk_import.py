@@ -0,0 +1,229 @@
+import asyncio
+import gzip
+import io
+import json
+
+import pytest
+
+from app.tasks.bulk_import import (
+    DATASETS,
+    BulkImporter,
+    SourceError,
+    UndecodableLine,
+    donor_row,
+    iter_records,
+    open_source,
+    request_row,
+)
+
+
+class FakeCopyConnection:
+    """
+    asyncpg stand-in: COPY lands in a per-transaction staging list and the
+    merge upserts it into `table` keyed by the dataset's conflict column.
+    """
+
+    def __init__(self, dataset, fail_chunks=(), crash_chunk=None):
+        self.key = dataset.column_names.index(dataset.conflict) + 1  # after _seq
+        self.table = {}
+        self.sql = []
+        self.copies = 0
+        self.fail_chunks = set(fail_chunks)
+        self.crash_chunk = crash_chunk
+        self.staged = []
+
+    async def execute(self, sql):
+        self.sql.append(sql)
+
+    def transaction(self):
+        conn = self
+
+        class _Tx:
+            async def __aenter__(self):
+                conn.staged = []
+
+            async def __aexit__(self, exc_type, exc, tb):
+                conn.staged = []
+                return False
+
+        return _Tx()
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies += 1
+        if self.copies == self.crash_chunk:
+            raise asyncio.CancelledError()
+        if self.copies in self.fail_chunks:
+            raise RuntimeError("value too long for type character varying(20)")
+        self.staged = list(records)
+
+    async def fetchrow(self, sql):
+        self.sql.append(sql)
+        latest = {}
+        for row in sorted(self.staged, key=lambda r: r[0]):
+            latest[row[self.key]] = row
+        inserted = sum(1 for key in latest if key not in self.table)
+        self.table.update(latest)
+        return {"inserted": inserted, "merged": len(latest)}
+
+
+def _donor(i, **overrides):
+    doc = {"id": f"doc{i}", "fullName": f"Donor {i}", "phone": f"+237 6{i:08d}", "city": "Douala",
+           "bloodType": "o+", "fcmToken": f"tok{i}"}
+    doc.update(overrides)
+    return doc
+
+
+def _write_ndjson(path, docs):
+    path.write_text("\n".join(json.dumps(d) for d in docs) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_iter_records_streams_arrays_across_buffer_edges():
+    docs = [{"id": i, "note": "a,b]{c}[", "nested": {"xs": [1, 2.5, None]}, "n": 12345} for i in range(50)]
+    text = json.dumps(docs, indent=2)
+
+    for read_size in (1, 7, 64, 1 << 16):
+        assert list(iter_records(io.StringIO(text), read_size=read_size)) == docs
+
+    assert list(iter_records(io.StringIO("  [ ]  "))) == []
+    assert list(iter_records(io.StringIO("[1, 22, 333]"), read_size=2)) == [1, 22, 333]
+
+
+def test_iter_records_reads_ndjson_and_gzip(tmp_path):
+    docs = [_donor(i) for i in range(5)]
+    text = "\n\n".join(json.dumps(d) for d in docs)
+    assert list(iter_records(io.StringIO(text), read_size=10)) == docs
+
+    path = tmp_path / "donors.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(text)
+    with open_source(str(path)) as stream:
+        assert list(iter_records(stream)) == docs
+
+    # A bad line stands in for its document; the lines after it still decode
+    first, bad, last = iter_records(io.StringIO('{"a": 1}\n{"a": \n{"a": 3}'))
+    assert first == {"a": 1} and last == {"a": 3}
+    assert isinstance(bad, UndecodableLine) and bad.line_no == 2 and "line 2" in bad.reason
+
+
+def test_iter_records_reports_where_an_array_breaks():
+    text = '[{"a": 1}, {"a": 2}, {"a": '
+    records = iter_records(io.StringIO(text), read_size=4)
+    assert next(records) == {"a": 1} and next(records) == {"a": 2}
+    with pytest.raises(SourceError) as err:
+        next(records)
+    assert err.value.offset == len(text)
+
+    with pytest.raises(SourceError) as err:
+        list(iter_records(io.StringIO('[1, 2, ')))
+    assert err.value.offset == 7
+
+
+def test_transforms_normalise_and_reject():
+    assert donor_row(_donor(1, isActive="false")) == (
+        "Donor 1", "237600000001", "O+", "Douala", None, False, "tok1"
+    )
+    for bad, reason in ((_donor(2, city=" "), "city"), (_donor(3, bloodType="Z"), "blood_type"),
+                        (_donor(4, phone="12"), "phone")):
+        with pytest.raises(ValueError, match=reason):
+            donor_row(bad)
+
+    row = request_row({"id": "r1", "bloodGroup": "ab-", "hospitalName": "General", "city": "Buea",
+                       "phone": "677000111", "timestamp": {"seconds": 1700000000, "nanoseconds": 0}})
+    assert row[0] == "r1" and row[5] == "AB-" and row[7] == "General"
+    assert row[10].timestamp() == 1700000000
+    with pytest.raises(ValueError, match="blood_type"):
+        request_row({"id": "r2", "city": "Buea", "phone": "677000111", "bloodGroup": "UNKNOWN"})
+
+
+async def test_import_merges_chunks_and_reports(tmp_path):
+    dataset = DATASETS["donors"]
+    docs = [_donor(i) for i in range(23)] + [_donor(5, city="Buea"), _donor(99, city=""), "oops"]
+    path = _write_ndjson(tmp_path / "donors.ndjson", docs)
+    conn = FakeCopyConnection(dataset)
+
+    report = await BulkImporter(dataset, chunk_size=10, checkpoint_path=str(tmp_path / "cp.json")).run(conn, path)
+
+    assert report.done and report.chunks == 3 and report.position == 26
+    assert report.inserted == 23 and report.updated == 1 and report.rejected == 2
+    assert conn.table["237600000005"][4] == "Buea"  # later copy of a key wins
+    assert [r["reason"] for r in report.rejects] == ["missing city", "document is not an object"]
+    merge = next(sql for sql in conn.sql if "INSERT INTO blood_donors" in sql)
+    assert "DISTINCT ON (phone)" in merge and "ON CONFLICT (phone) DO UPDATE" in merge
+    assert "ON COMMIT DELETE ROWS" in conn.sql[0] and conn.sql[-1].startswith("DROP TABLE")
+
+    # A finished import is not repeated
+    again = FakeCopyConnection(dataset)
+    await BulkImporter(dataset, chunk_size=10, checkpoint_path=str(tmp_path / "cp.json")).run(again, path)
+    assert again.copies == 0
+
+
+async def test_undecodable_lines_are_rejected_in_place(tmp_path):
+    dataset = DATASETS["donors"]
+    lines = [json.dumps(_donor(i)) for i in range(12)]
+    lines[3] = lines[3][:-5]
+    path = tmp_path / "donors.ndjson"
+    path.write_text("\n".join(lines) + '\n{"id": "cut', encoding="utf-8")
+    conn = FakeCopyConnection(dataset)
+
+    report = await BulkImporter(dataset, chunk_size=5).run(conn, str(path))
+
+    assert report.done and report.error is None and report.position == 13
+    assert report.inserted == 11 and report.rejected == 2
+    assert [r["position"] for r in report.rejects] == [3, 12]
+    assert report.rejects[0]["reason"].startswith("Invalid JSON on line 4:")
+    assert report.rejects[1]["reason"].startswith("Invalid JSON on line 13:")
+
+
+async def test_broken_array_stops_with_checkpoint_at_offset(tmp_path):
+    dataset = DATASETS["donors"]
+    text = json.dumps([_donor(i) for i in range(7)])[:-40]
+    path = tmp_path / "donors.json"
+    path.write_text(text, encoding="utf-8")
+    checkpoint = str(tmp_path / "cp.json")
+    conn = FakeCopyConnection(dataset)
+
+    report = await BulkImporter(dataset, chunk_size=4, checkpoint_path=checkpoint).run(conn, str(path))
+
+    assert not report.done and report.position == 6 and report.inserted == 6
+    assert report.error.startswith("Invalid JSON array element") and report.error.endswith(f"character {len(text)}")
+    saved = json.loads(open(checkpoint).read())
+    assert saved["position"] == 6 and saved["error"] == report.error and not saved["done"]
+    assert conn.sql[-1].startswith("DROP TABLE")
+
+
+async def test_failed_chunk_is_reported_and_skipped(tmp_path):
+    dataset = DATASETS["donors"]
+    path = _write_ndjson(tmp_path / "donors.ndjson", [_donor(i) for i in range(30)])
+    conn = FakeCopyConnection(dataset, fail_chunks={2})
+
+    report = await BulkImporter(dataset, chunk_size=10).run(conn, path)
+
+    assert report.done and report.inserted == 20
+    assert report.failed_chunks == [{
+        "chunk": 2, "first": 10, "last": 19,
+        "error": "RuntimeError: value too long for type character varying(20)",
+    }]
+
+
+async def test_interrupted_import_resumes_from_checkpoint(tmp_path):
+    dataset = DATASETS["donors"]
+    path = _write_ndjson(tmp_path / "donors.ndjson", [_donor(i) for i in range(25)])
+    checkpoint = str(tmp_path / "cp.json")
+
+    crashed = FakeCopyConnection(dataset, crash_chunk=2)
+    with pytest.raises(asyncio.CancelledError):
+        await BulkImporter(dataset, chunk_size=10, checkpoint_path=checkpoint).run(crashed, path)
+    assert json.loads(open(checkpoint).read())["position"] == 10
+
+    resumed = FakeCopyConnection(dataset)
+    report = await BulkImporter(dataset, chunk_size=10, checkpoint_path=checkpoint).run(resumed, path)
+
+    assert report.resumed_from == 10 and report.position == 25 and report.inserted == 25
+    assert sorted(resumed.table) == [f"2376{i:08d}" for i in range(10, 25)]
+
+    # A changed file invalidates the checkpoint
+    _write_ndjson(tmp_path / "donors.ndjson", [_donor(i) for i in range(3)])
+    fresh = FakeCopyConnection(dataset)
+    report = await BulkImporter(dataset, chunk_size=10, checkpoint_path=checkpoint).run(fresh, path)
+    assert report.resumed_from == 0 and len(fresh.table) == 3
@@ -0,0 +1,234 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from app.config import settings
+from app.routers.chat import ConnectionManager
+from app.services.chat_broadcast import (
+    LocalChatBroadcast,
+    RedisChatBroadcast,
+    build_chat_broadcast,
+    room_channel,
+)
+
+
+class PubSubBus:
+    """A Redis server's pub/sub, shared by the fake clients of several 'workers'."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+
+
+class FakePubSub:
+    def __init__(self, bus):
+        self.bus = bus
+        self.inbox = asyncio.Queue()
+        self.channels = set()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.channels.add(channel)
+            self.bus.subscribers[channel].add(self)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            self.channels.discard(channel)
+            self.bus.subscribers[channel].discard(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        await self.unsubscribe(*list(self.channels))
+
+
+class FakeRedis:
+    def __init__(self, bus):
+        self.bus = bus
+
+    def pubsub(self):
+        return FakePubSub(self.bus)
+
+    async def publish(self, channel, data):
+        for pubsub in list(self.bus.subscribers[channel]):
+            pubsub.inbox.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(self.bus.subscribers[channel])
+
+
+class FakeSocket:
+    def __init__(self, fail=False, gate=None):
+        self.sent = []
+        self.fail = fail
+        self.gate = gate  # an Event the socket waits on before each send (a slow client)
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(json.loads(frame))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _worker(bus, name, **kwargs):
+    manager = ConnectionManager()
+    await manager.set_backend(RedisChatBroadcast(FakeRedis(bus), node_id=name, **kwargs))
+    return manager
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_memory_backend_delivers_locally_and_drops_dead_sockets():
+    manager = ConnectionManager()
+    alive, dead = FakeSocket(), FakeSocket(fail=True)
+    await manager.connect(1, alive)
+    await manager.connect(1, dead)
+
+    await manager.broadcast(1, {"content": "hi"})
+    await _settle()
+
+    assert alive.sent == [{"content": "hi"}]
+    assert manager.active_connections[1] == [alive]
+
+
+async def test_messages_reach_sockets_on_every_worker_once():
+    bus = PubSubBus()
+    a, b, c = [await _worker(bus, name) for name in ("a", "b", "c")]
+    on_a, on_b, on_c = FakeSocket(), FakeSocket(), FakeSocket()
+    await a.connect(7, on_a)
+    await b.connect(7, on_b)
+    await c.connect(8, on_c)
+
+    await a.broadcast(7, {"id": 1, "content": "need O-"})
+    await _settle()
+
+    assert on_a.sent == on_b.sent == [{"id": 1, "content": "need O-"}]
+    assert on_c.sent == []
+    for manager in (a, b, c):
+        await manager.close()
+
+
+async def test_subscription_follows_local_room_membership():
+    bus = PubSubBus()
+    worker = await _worker(bus, "a")
+    first, second = FakeSocket(), FakeSocket()
+
+    await worker.connect(3, first)
+    await worker.connect(3, second)
+    assert len(bus.subscribers[room_channel(3)]) == 1
+
+    await worker.disconnect(3, first)
+    assert len(bus.subscribers[room_channel(3)]) == 1
+    await worker.disconnect(3, second)
+    assert not bus.subscribers[room_channel(3)]
+    assert 3 not in worker.active_connections
+
+    # A join racing a leave settles on the final membership
+    await asyncio.gather(worker.connect(4, FakeSocket()), worker.backend.leave(4), worker.backend.join(4))
+    assert len(bus.subscribers[room_channel(4)]) == 1
+    await worker.close()
+
+
+async def test_slow_local_fanout_drops_instead_of_blocking_the_reader():
+    bus = PubSubBus()
+    sender = await _worker(bus, "sender")
+    receiver = await _worker(bus, "receiver", queue_size=2)
+    release = asyncio.Event()
+    delivered = []
+
+    async def slow_deliver(room_id, message):
+        await release.wait()
+        delivered.append(message["n"])
+
+    receiver.backend.bind(slow_deliver)
+    await receiver.connect(1, FakeSocket())
+
+    for n in range(5):
+        await sender.broadcast(1, {"n": n})
+    await _settle()
+    # One message in the blocked dispatcher, two queued, the rest dropped
+    assert receiver.backend.dropped == 2
+
+    release.set()
+    await _settle()
+    assert delivered == [0, 1, 2]
+    await sender.close()
+    await receiver.close()
+
+
+async def test_slow_socket_does_not_hold_up_the_room():
+    manager = ConnectionManager()
+    gate = asyncio.Event()
+    fast, slow = FakeSocket(), FakeSocket(gate=gate)
+    await manager.connect(1, fast)
+    await manager.connect(1, slow)
+
+    for n in range(3):
+        await manager.broadcast(1, {"n": n})
+    await _settle()
+    assert [m["n"] for m in fast.sent] == [0, 1, 2]
+    assert slow.sent == []
+
+    gate.set()
+    await _settle()
+    assert [m["n"] for m in slow.sent] == [0, 1, 2]
+    await manager.close()
+
+
+async def test_full_send_queue_drops_oldest(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_CLIENT_QUEUE_SIZE", 2)
+    manager = ConnectionManager()
+    gate = asyncio.Event()
+    slow = FakeSocket(gate=gate)
+    await manager.connect(1, slow)
+
+    for n in range(5):
+        await manager.broadcast(1, {"n": n})
+        await _settle()
+    gate.set()
+    await _settle()
+
+    # 0 was already being sent; 1 and 2 made way for 3 and 4
+    assert [m["n"] for m in slow.sent] == [0, 3, 4]
+    assert manager.senders[(1, slow)].dropped == 2
+    await manager.close()
+
+
+async def test_full_send_queue_disconnects_under_that_policy(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_CLIENT_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "CHAT_SLOW_CLIENT_POLICY", "disconnect")
+    manager = ConnectionManager()
+    slow, other = FakeSocket(gate=asyncio.Event()), FakeSocket()
+    await manager.connect(1, slow)
+    await manager.connect(1, other)
+
+    for n in range(3):
+        await manager.broadcast(1, {"n": n})
+        await _settle()
+
+    assert slow.closed_with == 1013
+    assert manager.active_connections[1] == [other]
+    assert [m["n"] for m in other.sent] == [0, 1, 2]
+    await manager.close()
+
+
+def test_backend_selection(monkeypatch):
+    redis = FakeRedis(PubSubBus())
+    monkeypatch.setattr(settings, "CHAT_BROADCAST_BACKEND", "auto")
+    assert isinstance(build_chat_broadcast(redis), RedisChatBroadcast)
+    assert type(build_chat_broadcast(None)) is LocalChatBroadcast
+
+    monkeypatch.setattr(settings, "CHAT_BROADCAST_BACKEND", "memory")
+    assert type(build_chat_broadcast(redis)) is LocalChatBroadcast
@@ -0,0 +1,142 @@
+import asyncio
+import itertools
+
+import pytest
+from sqlalchemy.sql.dml import Insert
+
+from app.schemas.chat import MessageCreate
+from app.services.chat_writer import ChatMessageWriter
+
+
+class FakeDatabase:
+    """Stands in for Postgres: a messages sequence and table, plus rooms that reject inserts."""
+
+    def __init__(self, missing_rooms=()):
+        self.sequence = itertools.count(1)
+        self.rows = {}
+        self.inserts = []  # rows per INSERT statement that reached execute()
+        self.missing_rooms = set(missing_rooms)
+
+    def session(self):
+        return FakeSession(self)
+
+
+class _Scalars:
+    def __init__(self, values):
+        self._values = values
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._values
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+        self.staged = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.staged = []
+
+    async def execute(self, stmt, params=None):
+        if isinstance(stmt, Insert):
+            compiled = stmt.compile().params
+            rows = [
+                {key[:-len(f"_m{i}")]: value for key, value in compiled.items() if key.endswith(f"_m{i}")}
+                for i in range(len(compiled) // 6)
+            ]
+            self.db.inserts.append(len(rows))
+            if any(row["room_id"] in self.db.missing_rooms for row in rows):
+                raise RuntimeError("violates foreign key constraint messages_room_id_fkey")
+            self.staged.extend(rows)
+            return None
+        return _Scalars([next(self.db.sequence) for _ in range(params["n"])])
+
+    async def commit(self):
+        for row in self.staged:
+            self.db.rows[row["id"]] = row
+        self.staged = []
+
+
+def _msg(room_id=1, content="need O- in Douala"):
+    return MessageCreate(room_id=room_id, sender_id="uid-1", sender_type="donor", content=content)
+
+
+def _writer(db, **kwargs):
+    kwargs.setdefault("flush_ms", 10_000)
+    return ChatMessageWriter(session_factory=db.session, **kwargs)
+
+
+async def test_full_batch_is_one_insert_with_preassigned_ids():
+    db = FakeDatabase()
+    writer = _writer(db, batch_size=3, id_block=2)
+
+    messages = [await writer.submit(_msg(content=f"m{n}")) for n in range(3)]
+    # Ids and timestamps are known before anything is written
+    assert [m.id for m in messages] == [1, 2, 3]
+    assert all(m.created_at.tzinfo is not None for m in messages)
+
+    assert await asyncio.gather(*(m.persisted for m in messages)) == [1, 2, 3]
+    assert db.inserts == [3]
+    assert db.rows[2]["content"] == "m1"
+    await writer.stop()
+
+
+async def test_partial_batch_flushes_after_the_interval():
+    db = FakeDatabase()
+    writer = _writer(db, batch_size=100, flush_ms=20)
+
+    message = await writer.submit(_msg())
+    assert db.rows == {}
+    assert await asyncio.wait_for(message.persisted, 1) == message.id
+    assert db.inserts == [1]
+    await writer.stop()
+
+
+async def test_failed_batch_isolates_the_bad_row():
+    db = FakeDatabase(missing_rooms={99})
+    writer = _writer(db, batch_size=3)
+
+    good, bad, other = [await writer.submit(_msg(room_id=room)) for room in (1, 99, 2)]
+    await asyncio.wait([good.persisted, bad.persisted, other.persisted])
+
+    assert good.persisted.result() == good.id and other.persisted.result() == other.id
+    with pytest.raises(RuntimeError, match="foreign key"):
+        bad.persisted.result()
+    assert sorted(db.rows) == [good.id, other.id]
+    # One failed batch, then row by row
+    assert db.inserts == [3, 1, 1, 1]
+    await writer.stop()
+
+
+async def test_stop_flushes_everything_buffered():
+    db = FakeDatabase()
+    writer = _writer(db, batch_size=2)
+
+    messages = [await writer.submit(_msg(content=f"m{n}")) for n in range(5)]
+    await writer.stop()
+
+    assert all(m.persisted.done() for m in messages)
+    assert sorted(db.rows) == [1, 2, 3, 4, 5]
+    assert db.inserts == [2, 2, 1]
+
+
+async def test_submit_blocks_once_max_pending_is_reached():
+    db = FakeDatabase()
+    writer = _writer(db, batch_size=10, flush_ms=30, max_pending=2)
+
+    await writer.submit(_msg())
+    await writer.submit(_msg())
+    third = asyncio.create_task(writer.submit(_msg()))
+    await asyncio.sleep(0)
+    assert not third.done()
+
+    # The flush frees the slots
+    message = await asyncio.wait_for(third, 1)
+    await writer.stop()
+    assert message.persisted.done() and len(db.rows) == 3
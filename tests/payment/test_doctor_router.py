@@ -28,6 +28,12 @@ async def test_pay_doctor_consult_success(client, monkeypatch):
         mock_service
     )
 
+    # Free tier used up: the paid flow takes over
+    monkeypatch.setattr(
+        "app.routers.doctor_payments.SQLAlchemyUsageRepository.try_consume_free_usage",
+        AsyncMock(return_value=False)
+    )
+
     payload = {"phone": "670000000"}
 
     response = await client.post(
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.donor_fanout import DonorFanout, StubMessagingBackend
+
+
+class PurgeSession:
+    """Async-context session that records UPDATE statements."""
+
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.statements.append(stmt)
+        return SimpleNamespace(rowcount=len(stmt.compile().params["fcm_token_1"]))
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+async def _pages(tokens, page_size):
+    for i in range(0, len(tokens), page_size):
+        yield tokens[i:i + page_size]
+
+
+async def test_batches_are_capped_at_500_and_concurrency_is_bounded():
+    backend = StubMessagingBackend(latency_seconds=0.01)
+    fanout = DonorFanout(session_factory=lambda: None, backend=backend, batch_size=800, max_concurrency=2)
+    tokens = [f"t{i}" for i in range(1234)]
+
+    report = await fanout.dispatch(_pages(tokens, 300), "title", "body")
+
+    assert [len(b) for b in backend.batches] == [500, 500, 234]
+    assert backend.max_in_flight <= 2
+    assert report.recipients == 1234
+    assert report.success == 1234
+    assert len(report.batches) == 3
+
+
+async def test_duplicate_tokens_are_sent_once():
+    backend = StubMessagingBackend()
+    fanout = DonorFanout(session_factory=lambda: None, backend=backend)
+
+    report = await fanout.dispatch(_pages(["a", "b", "a", "c", "b"], 2), "title", "body")
+
+    assert report.recipients == 3
+    assert sorted(t for batch in backend.batches for t in batch) == ["a", "b", "c"]
+
+
+async def test_unregistered_tokens_are_purged_in_bulk():
+    session = PurgeSession()
+    backend = StubMessagingBackend(unregistered={"dead-1", "dead-2"})
+    fanout = DonorFanout(session_factory=lambda: session, backend=backend)
+
+    report = await fanout.dispatch(_pages(["ok-1", "dead-1", "ok-2", "dead-2"], 10), "title", "body")
+
+    assert report.failure == 2
+    assert report.purged == 2
+    assert len(session.statements) == 1
+    assert session.committed
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE blood_donors SET fcm_token=")
@@ -0,0 +1,128 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.donor_fanout import DonorFanout, StubMessagingBackend
+from app.services.donor_matching import COMPATIBLE_DONORS, DonorMatcher, compatible_donor_types
+
+ALL_TYPES = {"O-", "O+", "A-", "A+", "B-", "B+", "AB-", "AB+"}
+
+
+class DonorRows:
+    """Session factory serving reachable donors per city: {city_key: [(id, blood_type, token)]}."""
+
+    def __init__(self, by_city, delay=0.0):
+        self.by_city = by_city
+        self.delay = delay
+        self.queries = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.queries.append(str(compiled))
+        await asyncio.sleep(self.delay)
+        city = next(v for v in compiled.params.values() if isinstance(v, str))
+        return _Rows(sorted(self.by_city.get(city, []), key=lambda r: (r[1], r[0])))
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+DOUALA = [
+    (1, "O-", "t-o-neg"),
+    (2, "A+", "t-a-pos"),
+    (3, "B+", "t-b-pos"),
+    (4, "O+", "t-o-pos"),
+    (5, "A-", "t-a-neg"),
+    (6, "AB+", "t-ab-pos"),
+]
+
+
+def test_compatibility_matrix():
+    assert all(recipient in donors for recipient, donors in COMPATIBLE_DONORS.items())
+    assert all("O-" in donors for donors in COMPATIBLE_DONORS.values())
+    assert set(COMPATIBLE_DONORS["AB+"]) == ALL_TYPES
+    assert compatible_donor_types(" a+ ") == ("A+", "A-", "O+", "O-")
+    assert compatible_donor_types("UNKNOWN") == ()
+
+
+async def test_match_returns_compatible_donors_exact_type_first():
+    matcher = DonorMatcher(session_factory=DonorRows({"douala": DOUALA}))
+
+    matches = await matcher.match("A+", "Douala")
+
+    assert [m.id for m in matches] == [2, 5, 4, 1]
+    assert [m.token for m in await matcher.match("O-", "douala")] == ["t-o-neg"]
+
+
+async def test_city_is_loaded_once_and_case_insensitive():
+    rows = DonorRows({"douala": DOUALA})
+    matcher = DonorMatcher(session_factory=rows)
+
+    await asyncio.gather(*(matcher.match(t, c) for t in ("A+", "B+", "AB+") for c in ("Douala", " DOUALA ")))
+
+    assert len(rows.queries) == 1
+    sql = rows.queries[0]
+    assert "lower(trim(blood_donors.city))" in sql
+    assert "blood_donors.is_active IS true" in sql and "blood_donors.fcm_token IS NOT NULL" in sql
+
+
+async def test_invalidate_reloads_only_that_city():
+    rows = DonorRows({"douala": DOUALA, "buea": [(9, "O+", "t-buea")]})
+    matcher = DonorMatcher(session_factory=rows)
+    await matcher.match("O+", "Douala")
+    await matcher.match("O+", "Buea")
+
+    rows.by_city["douala"] = DOUALA + [(7, "O+", "t-new")]
+    matcher.invalidate("DOUALA")
+
+    assert 7 in [m.id for m in await matcher.match("O+", "Douala")]
+    await matcher.match("O+", "Buea")
+    assert len(rows.queries) == 3
+
+
+async def test_unknown_type_or_blank_city_skips_the_database():
+    rows = DonorRows({})
+    matcher = DonorMatcher(session_factory=rows)
+
+    assert await matcher.match("UNKNOWN", "Douala") == []
+    assert await matcher.match("O+", "  ") == []
+    assert rows.queries == []
+
+
+async def test_fanout_sends_to_every_compatible_donor():
+    backend = StubMessagingBackend()
+    matcher = DonorMatcher(session_factory=DonorRows({"douala": DOUALA}))
+    fanout = DonorFanout(session_factory=lambda: None, backend=backend, matcher=matcher, page_size=2)
+
+    report = await fanout.notify_donors("B+", "Douala", "title", "body")
+
+    assert report.recipients == 3
+    assert sorted(t for batch in backend.batches for t in batch) == ["t-b-pos", "t-o-neg", "t-o-pos"]
+
+
+async def test_fanout_pages_buckets_without_copying_the_match():
+    backend = StubMessagingBackend()
+    matcher = DonorMatcher(session_factory=DonorRows({"douala": DOUALA}))
+    fanout = DonorFanout(session_factory=lambda: None, backend=backend, matcher=matcher, page_size=1)
+
+    async def no_union(*args):
+        raise AssertionError("fan-out must not build the full match list")
+
+    matcher.match = no_union
+    pages = [page async for page in fanout.stream_donor_tokens("B+", "Douala")]
+
+    assert pages == [["t-b-pos"], ["t-o-pos"], ["t-o-neg"]]
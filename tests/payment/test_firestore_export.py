@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.tasks.bulk_import import iter_records, open_source
+from app.tasks.firestore_export import STATE_FILE, FirestoreExporter
+
+
+class FakeTimestamp:
+    def __init__(self, dt):
+        self.dt = dt
+
+    def to_datetime(self):
+        return self.dt
+
+
+class FakeGeoPoint:
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeCollection:
+    """Just the query surface the exporter uses: order by id, limit, start_after, stream."""
+
+    def __init__(self, client, name, docs, order=None, limit=None, after=None):
+        self.client, self.id, self.docs = client, name, docs
+        self._order, self._limit, self._after = order, limit, after
+
+    def order_by(self, field):
+        return FakeCollection(self.client, self.id, self.docs, field, self._limit, self._after)
+
+    def limit(self, n):
+        return FakeCollection(self.client, self.id, self.docs, self._order, n, self._after)
+
+    def start_after(self, cursor):
+        return FakeCollection(self.client, self.id, self.docs, self._order, self._limit, cursor["__name__"])
+
+    def stream(self):
+        assert self._order == "__name__"
+        client = self.client
+        client.reads.append((self.id, self._after))
+        if client.fail_on_read == len(client.reads):
+            raise RuntimeError("deadline exceeded")
+        with client.lock:
+            client.active += 1
+            client.max_active = max(client.max_active, client.active)
+        try:
+            time.sleep(client.latency)
+            ids = sorted(i for i in self.docs if self._after is None or i > self._after)
+            for doc_id in ids[:self._limit]:
+                yield _Snapshot(doc_id, self.docs[doc_id])
+        finally:
+            with client.lock:
+                client.active -= 1
+
+
+class FakeFirestore:
+    def __init__(self, data, latency=0.0, fail_on_read=None):
+        self.data = data
+        self.latency = latency
+        self.fail_on_read = fail_on_read
+        self.reads = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def collections(self):
+        return [FakeCollection(self, name, docs) for name, docs in self.data.items()]
+
+
+def _donors(n):
+    return {f"d{i:04d}": {"name": f"Donor {i}", "phone": f"6{i:08d}", "city": "Douala"} for i in range(n)}
+
+
+def _read(path):
+    with open_source(str(path)) as f:
+        return list(iter_records(f))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_exports_each_collection_as_ndjson(tmp_path, compress):
+    created = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    client = FakeFirestore({
+        "blood_donors": _donors(25),
+        "blood_requesters": {"r1": {"timestamp": FakeTimestamp(created), "where": FakeGeoPoint(4.05, 9.7),
+                                    "at": created, "blob": b"\x00\x01"}},
+    })
+
+    states = FirestoreExporter(client, str(tmp_path), compress=compress, page_size=10).run()
+
+    suffix = ".ndjson.gz" if compress else ".ndjson"
+    donors = _read(tmp_path / f"blood_donors{suffix}")
+    assert [d["id"] for d in donors] == sorted(_donors(25))
+    assert donors[3] == {**_donors(25)["d0003"], "id": "d0003"}
+    assert _read(tmp_path / f"blood_requesters{suffix}") == [{
+        "timestamp": "2024-05-01T12:30:00+00:00", "where": {"latitude": 4.05, "longitude": 9.7},
+        "at": "2024-05-01T12:30:00+00:00", "blob": "AAE=", "id": "r1",
+    }]
+    assert states["blood_donors"].documents == 25 and states["blood_donors"].done
+    # Pages continue after the previous page's last id
+    assert [after for name, after in client.reads if name == "blood_donors"] == [None, "d0009", "d0019"]
+
+
+def test_collections_export_concurrently_within_the_worker_limit(tmp_path):
+    client = FakeFirestore({f"c{i}": _donors(2) for i in range(6)}, latency=0.05)
+
+    FirestoreExporter(client, str(tmp_path), workers=3).run()
+
+    assert client.max_active == 3
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".ndjson")) == [f"c{i}.ndjson" for i in range(6)]
+
+
+def test_selected_collections_only(tmp_path):
+    client = FakeFirestore({"a": _donors(1), "b": _donors(1)})
+
+    assert list(FirestoreExporter(client, str(tmp_path)).run(["b"])) == ["b"]
+    assert not (tmp_path / "a.ndjson").exists()
+
+
+def test_interrupted_export_resumes_after_the_last_document(tmp_path):
+    data = {"blood_donors": _donors(35)}
+    with pytest.raises(RuntimeError):
+        FirestoreExporter(FakeFirestore(data, fail_on_read=3), str(tmp_path), page_size=10).run()
+
+    state = json.loads((tmp_path / STATE_FILE).read_text())["collections"]["blood_donors"]
+    assert state["last_id"] == "d0019" and state["documents"] == 20 and not state["done"]
+    # A partial page written before the crash is dropped on resume
+    with open(tmp_path / "blood_donors.ndjson", "a") as f:
+        f.write('{"id": "d0020", "name": "half wr')
+
+    client = FakeFirestore(data)
+    states = FirestoreExporter(client, str(tmp_path), page_size=10).run()
+
+    assert [after for _, after in client.reads] == ["d0019", "d0029"]
+    assert [d["id"] for d in _read(tmp_path / "blood_donors.ndjson")] == sorted(data["blood_donors"])
+    assert states["blood_donors"].documents == 35
+
+    # Finished collections are skipped until --restart
+    again = FakeFirestore(data)
+    FirestoreExporter(again, str(tmp_path), page_size=10).run()
+    assert again.reads == []
+    FirestoreExporter(again, str(tmp_path), page_size=10).run(restart=True)
+    assert len(_read(tmp_path / "blood_donors.ndjson")) == 35
@@ -0,0 +1,75 @@
+import httpx
+
+from app.gateways.flutterwave_adapter import FlutterwavePaymentGateway
+from app.gateways.mtn_momo_adapter import MTNMomoPaymentGateway
+from app.gateways.transport import GatewayTransport
+
+
+class RecordingTransport(GatewayTransport):
+    """Routes every provider client to an in-process httpx.MockTransport."""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.built = []
+
+    def _build(self, provider):
+        self.built.append(provider)
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _momo_handler(request: httpx.Request) -> httpx.Response:
+    if request.method == "POST":
+        return httpx.Response(202)
+    return httpx.Response(200, json={"status": "SUCCESSFUL"})
+
+
+async def test_one_client_per_provider_is_reused():
+    transport = GatewayTransport()
+
+    first = transport.client("MTN")
+    assert transport.client("MTN") is first
+    assert transport.client("STRIPE") is not first
+
+    await transport.aclose()
+    assert first.is_closed
+    assert transport.client("MTN") is not first
+    await transport.aclose()
+
+
+def test_provider_timeout_overrides_default(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "GATEWAY_TIMEOUT", 30.0)
+    monkeypatch.setattr(settings, "GATEWAY_PROVIDER_TIMEOUTS", {"STRIPE": 10.0})
+
+    transport = GatewayTransport()
+    assert transport.timeout_for("STRIPE") == 10.0
+    assert transport.timeout_for("MTN") == 30.0
+
+
+async def test_mtn_charge_and_poll_share_the_pooled_client():
+    transport = RecordingTransport(_momo_handler)
+    gateway = MTNMomoPaymentGateway(api_key="k", subscription_key="s", transport=transport)
+
+    response = await gateway.charge(phone="670000000", amount=500)
+    status = await gateway.verify_transaction(response.reference)
+
+    assert response.status == "PENDING"
+    assert status == "SUCCESS"
+    assert transport.built == ["MTN"]
+    await transport.aclose()
+
+
+async def test_flutterwave_uses_its_own_provider_client():
+    def handler(request):
+        return httpx.Response(200, json={"status": "success", "data": {"id": 77}})
+
+    transport = RecordingTransport(handler)
+    gateway = FlutterwavePaymentGateway(secret_key="sk", transport=transport)
+
+    response = await gateway.charge(phone="670000000", amount=500)
+
+    assert response.reference == "77"
+    assert transport.built == ["FLUTTERWAVE"]
+    await transport.aclose()
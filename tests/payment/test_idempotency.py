@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.utils.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+def _app(store, delay=0.0, fail_first=False):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    app.state.calls = 0
+
+    @app.post("/v1/payments/{service}")
+    async def initiate(service: str, request: Request):
+        app.state.calls += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if fail_first and app.state.calls == 1:
+            return JSONResponse(status_code=503, content={"detail": "gateway down"})
+        body = await request.json()
+        return {"reference": f"ref-{app.state.calls}", "service": service, "phone": body["phone"]}
+
+    return app
+
+
+def _client(app):
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+def _headers(key, token="token-a"):
+    return {"X-Idempotency-Key": key, "Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def store(fake_redis):
+    return IdempotencyStore(redis_getter=lambda: fake_redis, wait_seconds=2, poll_seconds=0.01)
+
+
+async def test_retry_is_replayed_without_reaching_the_route(store):
+    app = _app(store)
+    async with _client(app) as client:
+        first = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k1"))
+        retry = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k1"))
+
+    assert app.state.calls == 1
+    assert retry.status_code == first.status_code == 200
+    assert retry.json() == first.json() == {"reference": "ref-1", "service": "bike", "phone": "670000000"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+
+async def test_concurrent_retries_wait_for_the_first_result(store):
+    app = _app(store, delay=0.1)
+    async with _client(app) as client:
+        responses = await asyncio.gather(*(
+            client.post("/v1/payments/taxi", json={"phone": "670000000"}, headers=_headers("k2"))
+            for _ in range(5)
+        ))
+
+    assert app.state.calls == 1
+    assert {r.json()["reference"] for r in responses} == {"ref-1"}
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 4
+
+
+async def test_key_reused_for_a_different_request_is_rejected(store):
+    app = _app(store)
+    async with _client(app) as client:
+        await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k3"))
+        other = await client.post("/v1/payments/bike", json={"phone": "690000000"}, headers=_headers("k3"))
+
+    assert other.status_code == 422
+    assert app.state.calls == 1
+
+
+async def test_server_errors_are_not_stored(store):
+    app = _app(store, fail_first=True)
+    async with _client(app) as client:
+        first = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k4"))
+        retry = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k4"))
+
+    assert first.status_code == 503
+    assert retry.status_code == 200 and retry.json()["reference"] == "ref-2"
+    assert app.state.calls == 2
+
+
+async def test_keys_are_scoped_to_the_caller(store):
+    app = _app(store)
+    async with _client(app) as client:
+        mine = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k5"))
+        theirs = await client.post(
+            "/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k5", token="token-b")
+        )
+
+    assert app.state.calls == 2
+    assert mine.json()["reference"] != theirs.json()["reference"]
+
+
+async def test_without_redis_requests_pass_through():
+    app = _app(IdempotencyStore(redis_getter=lambda: None))
+    async with _client(app) as client:
+        for _ in range(2):
+            response = await client.post("/v1/payments/bike", json={"phone": "670000000"}, headers=_headers("k6"))
+            assert response.status_code == 200
+
+    assert app.state.calls == 2
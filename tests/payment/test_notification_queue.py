@@ -0,0 +1,242 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from firebase_admin import messaging
+from sqlalchemy.dialects import postgresql
+
+from app.models.outbound_notification import NotificationKind, NotificationStatus
+from app.services.notification_queue import (
+    LocalTransport,
+    NotificationConsumer,
+    NotificationQueue,
+    QueuedNotification,
+    build_call_message,
+    build_message,
+)
+from app.services.notification_service import NotificationService
+
+
+class MemoryQueue:
+    """In-memory stand-in for NotificationQueue's claim/complete contract."""
+
+    def __init__(self):
+        self.rows = {}
+        self.enqueued = []
+        self.wakeup = asyncio.Event()
+        self._ids = 0
+
+    async def enqueue(self, kind, target, payload, expires_at=None, db=None):
+        self._ids += 1
+        self.enqueued.append((kind, target, payload, expires_at))
+        self.rows[self._ids] = {
+            "row": QueuedNotification(self._ids, kind, target, payload, 0, expires_at, datetime.now(timezone.utc)),
+            "status": NotificationStatus.PENDING,
+            "last_error": None,
+        }
+        self.wakeup.set()
+
+    async def claim(self, batch_size, lease_seconds=None):
+        # Retries are due immediately here; backoff is asserted on the Outcome
+        due = [r for r in self.rows.values() if r["status"] == NotificationStatus.PENDING][:batch_size]
+        for r in due:
+            r["row"].attempts += 1
+        return [r["row"] for r in due]
+
+    async def next_due_in(self):
+        # Pending rows are always due here
+        pending = any(r["status"] == NotificationStatus.PENDING for r in self.rows.values())
+        return 0.0 if pending else None
+
+    async def complete(self, outcomes):
+        for o in outcomes:
+            self.rows[o.id]["status"] = o.status
+            self.rows[o.id]["last_error"] = o.last_error
+
+    def status_of(self, target):
+        return next(r["status"] for r in self.rows.values() if r["row"].target == target)
+
+
+def _payload(title="t"):
+    return {"title": title, "body": "b", "data": {}}
+
+
+# =========================================================
+# SQL SHAPE
+# =========================================================
+def test_claim_is_skip_locked_and_leases_rows():
+    stmt = NotificationQueue.build_claim(100, 60, datetime.now(timezone.utc))
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "WHERE outbound_notifications.id IN (SELECT outbound_notifications.id" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "attempts=(outbound_notifications.attempts +" in sql
+    assert "RETURNING" in sql
+
+
+# =========================================================
+# CONSUMER
+# =========================================================
+async def test_transient_failure_is_retried_then_sent():
+    queue = MemoryQueue()
+    await queue.enqueue(NotificationKind.TOKEN, "tok-a", _payload())
+    transport = LocalTransport(errors={"tok-a": [RuntimeError("503 unavailable")]})
+    consumer = NotificationConsumer(queue=queue, transport=transport, workers=1, max_attempts=3)
+
+    first = await consumer.process(await queue.claim(10))
+    assert first[0].status == NotificationStatus.PENDING
+    assert first[0].next_attempt_at > datetime.now(timezone.utc)
+    await queue.complete(first)
+
+    await consumer.drain_once()
+
+    assert queue.status_of("tok-a") == NotificationStatus.SENT
+    assert [m.token for m in transport.delivered] == ["tok-a"]
+
+
+async def test_unregistered_token_is_dead_lettered_without_retry():
+    queue = MemoryQueue()
+    await queue.enqueue(NotificationKind.TOKEN, "gone", _payload())
+    transport = LocalTransport(errors={"gone": [messaging.UnregisteredError("not found")]})
+
+    await NotificationConsumer(queue=queue, transport=transport, workers=1).drain_once()
+
+    assert queue.status_of("gone") == NotificationStatus.DEAD
+
+
+async def test_exhausted_retries_go_to_dead_letter():
+    queue = MemoryQueue()
+    await queue.enqueue(NotificationKind.TOPIC, "category_BLOOD", _payload())
+    transport = LocalTransport(errors={"category_BLOOD": [RuntimeError("boom")] * 5})
+    consumer = NotificationConsumer(queue=queue, transport=transport, workers=1, max_attempts=3)
+
+    for _ in range(3):
+        await consumer.drain_once()
+
+    assert queue.status_of("category_BLOOD") == NotificationStatus.DEAD
+    assert transport.calls == 3
+    assert consumer.stats["DEAD"] == 1
+
+
+async def test_expired_call_signal_is_not_sent():
+    queue = MemoryQueue()
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await queue.enqueue(NotificationKind.CALL, "callee", {"data": {"type": "INCOMING_CALL"}}, expires_at=past)
+    transport = LocalTransport()
+
+    await NotificationConsumer(queue=queue, transport=transport, workers=1).drain_once()
+
+    assert queue.status_of("callee") == NotificationStatus.DEAD
+    assert transport.calls == 0
+
+
+async def test_consumer_pool_wakes_on_enqueue_and_stops():
+    queue = MemoryQueue()
+    transport = LocalTransport()
+    consumer = NotificationConsumer(queue=queue, transport=transport, workers=2, poll_seconds=5)
+    task = asyncio.create_task(consumer.run())
+    await asyncio.sleep(0)
+
+    await queue.enqueue(NotificationKind.TOKEN, "tok-b", _payload())
+    for _ in range(20):
+        if transport.delivered:
+            break
+        await asyncio.sleep(0.01)
+
+    await consumer.stop()
+    await asyncio.wait_for(task, timeout=1)
+
+    assert queue.status_of("tok-b") == NotificationStatus.SENT
+
+
+async def test_idle_polls_back_off_but_not_past_the_next_retry():
+    class ScheduledQueue(MemoryQueue):
+        due_in = None
+
+        async def next_due_in(self):
+            return self.due_in
+
+    queue = ScheduledQueue()
+    consumer = NotificationConsumer(queue=queue, transport=LocalTransport(), poll_seconds=1, idle_poll_max_seconds=600)
+
+    # Nothing pending: doubling up to the cap, so an idle database can suspend
+    assert [await consumer.idle_wait(n) for n in (1, 2, 3, 10, 11, 50)] == [1, 2, 4, 512, 600, 600]
+
+    # A retry scheduled in 30s caps the wait; one due now is picked up on the next poll
+    queue.due_in = 30.0
+    assert await consumer.idle_wait(10) == 30.0
+    queue.due_in = -5.0
+    assert await consumer.idle_wait(10) == 1
+
+
+# =========================================================
+# PRODUCERS
+# =========================================================
+async def test_service_notifications_are_queued_not_sent_inline():
+    queue = MemoryQueue()
+    service = NotificationService(queue=queue)
+
+    await service.trigger_service_notifications("blood_request", "blood", "42", uuid.uuid4())
+
+    kind, target, payload, _ = queue.enqueued[0]
+    assert kind == NotificationKind.TOPIC
+    assert target == "category_BLOOD"
+    assert payload["data"]["listing_id"] == "42"
+
+
+async def test_call_signal_is_queued_with_expiry():
+    queue = MemoryQueue()
+
+    await NotificationService(queue=queue).enqueue_call_signal("tok", "s1", "Dr A", "video", "room-1")
+
+    kind, _, payload, expires_at = queue.enqueued[0]
+    assert kind == NotificationKind.CALL
+    assert payload["data"]["type"] == "INCOMING_CALL"
+    assert expires_at > datetime.now(timezone.utc)
+
+
+async def test_send_call_signal_goes_through_the_queue(monkeypatch):
+    queue = MemoryQueue()
+    monkeypatch.setattr(messaging, "send", lambda message: pytest.fail("sent inline"))
+
+    result = await NotificationService(queue=queue).send_call_signal("tok", "s1", "Dr A", "video", "room-1")
+
+    assert result == "queued" and queue.enqueued[0][0] == NotificationKind.CALL
+
+
+async def test_send_call_signal_sends_inline_when_queue_is_down(monkeypatch):
+    class DownQueue(MemoryQueue):
+        async def enqueue(self, *args, **kwargs):
+            raise ConnectionError("db down")
+
+    sent = []
+    monkeypatch.setattr(messaging, "send", lambda message: sent.append(message) or "msg-1")
+    service = NotificationService(queue=DownQueue())
+    monkeypatch.setattr(service, "_ensure_firebase_initialized", lambda: None)
+
+    assert await service.send_call_signal("tok", "s1", "Dr A", "video", "room-1") == "msg-1"
+    assert sent[0].android.priority == "high"
+
+
+async def test_donor_alerts_are_queued_and_keep_their_high_priority_shape(monkeypatch):
+    from app.firebase_client import send_fcm_to_donor
+    from app.services.notification_service import notification_service
+
+    queue = MemoryQueue()
+    monkeypatch.setattr(notification_service, "queue", queue)
+
+    assert await send_fcm_to_donor("donation", "Blood needed", "O+ in Douala", {"request_id": 7}) == "QUEUED"
+
+    kind, target, payload, _ = queue.enqueued[0]
+    assert kind == NotificationKind.DONOR and payload["data"] == {"request_id": "7"}
+    message = build_message(kind, target, payload)
+    assert message.topic == "donation" and message.android.priority == "high"
+
+
+def test_call_message_sets_apns_priority_header():
+    message = build_call_message("tok", {"type": "INCOMING_CALL"})
+
+    assert message.apns.headers == {"apns-priority": "10"}
+    assert message.android.priority == "high"
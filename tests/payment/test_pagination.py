@@ -0,0 +1,147 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.crud.blood_request import FEED_KEYSET
+from app.crud.transport_offer import get_transport_offers
+from app.models.payment import Payment
+from app.utils.pagination import InvalidCursor, Keyset, SortKey, count_rows
+
+PAYMENTS = Keyset("payments", SortKey(Payment.created_at, descending=True), SortKey(Payment.id, descending=True))
+
+
+def _sql(stmt):
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows
+
+
+class RecordingSession:
+    """Returns queued results in order and keeps every statement it ran."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return Result(self.results.pop(0))
+
+    async def scalar(self, stmt):
+        self.statements.append(stmt)
+        return self.results.pop(0)
+
+
+def _payment(minutes_ago):
+    created = datetime(2026, 10, 16, 12, tzinfo=timezone.utc) - timedelta(minutes=minutes_ago)
+    return SimpleNamespace(id=uuid.uuid4(), created_at=created)
+
+
+# =========================================================
+# CURSOR
+# =========================================================
+def test_cursor_round_trips_typed_sort_values():
+    row = _payment(5)
+    cursor = PAYMENTS.encode([row.created_at, row.id], {"status": "PENDING"})
+
+    assert PAYMENTS.decode(cursor, {"status": "PENDING"}) == (row.created_at, row.id)
+    assert FEED_KEYSET.decode(FEED_KEYSET.encode([True, row.created_at, 7])) == (True, row.created_at, 7)
+
+
+def test_cursor_is_bound_to_list_and_filters():
+    cursor = PAYMENTS.encode([datetime.now(timezone.utc), uuid.uuid4()], {"status": "PENDING"})
+
+    with pytest.raises(InvalidCursor):
+        PAYMENTS.decode(cursor, {"status": "SUCCESS"})
+    with pytest.raises(InvalidCursor):
+        Keyset("other", *PAYMENTS.keys).decode(cursor, {"status": "PENDING"})
+    with pytest.raises(InvalidCursor):
+        PAYMENTS.decode("bm90LWpzb24", {})
+
+
+# =========================================================
+# QUERY
+# =========================================================
+def test_single_direction_uses_row_comparison_without_offset():
+    row = _payment(1)
+    cursor = PAYMENTS.encode([row.created_at, row.id])
+
+    sql, params = _sql(PAYMENTS.paginate(select(Payment), 50, cursor, offset=5000))
+
+    assert "(payments.created_at, payments.id) < (" in sql
+    assert "ORDER BY payments.created_at DESC, payments.id DESC" in sql
+    assert "OFFSET" not in sql
+    assert 51 in params.values()
+
+
+def test_mixed_directions_expand_to_or_chain():
+    mixed = Keyset("messages", SortKey(Payment.created_at), SortKey(Payment.id, descending=True))
+    row = _payment(1)
+
+    sql, _ = _sql(select(Payment).where(mixed.after((row.created_at, row.id))))
+
+    assert "payments.created_at > " in sql
+    assert "payments.created_at = " in sql and "payments.id < " in sql
+
+
+def test_legacy_skip_still_offsets_first_page():
+    sql, _ = _sql(PAYMENTS.paginate(select(Payment), 20, offset=40))
+    assert "OFFSET" in sql
+
+
+def test_page_emits_cursor_only_when_more_rows_exist():
+    rows = [_payment(i) for i in range(4)]
+
+    page = PAYMENTS.page(rows, 3)
+    assert page.items == rows[:3]
+    assert PAYMENTS.decode(page.next_cursor) == (rows[2].created_at, rows[2].id)
+
+    assert PAYMENTS.page(rows[:3], 3).next_cursor is None
+
+
+async def test_crud_walks_pages_by_cursor():
+    offers = [SimpleNamespace(id=i) for i in (9, 8, 7)]
+    db = RecordingSession(offers, [offers[2]])
+
+    first = await get_transport_offers(db, limit=2)
+    second = await get_transport_offers(db, limit=2, cursor=first.next_cursor)
+
+    assert [o.id for o in first.items] == [9, 8] and [o.id for o in second.items] == [7]
+    assert second.next_cursor is None
+    sql, params = _sql(db.statements[1])
+    assert "transport_offers.id < " in sql and 8 in params.values()
+
+
+# =========================================================
+# TOTALS
+# =========================================================
+async def test_small_lists_get_exact_totals_without_explain():
+    db = RecordingSession(42)
+
+    assert await count_rows(db, select(Payment), exact_limit=100) == (42, False)
+    assert len(db.statements) == 1
+    assert "LIMIT" in _sql(db.statements[0])[0]
+
+
+async def test_large_lists_fall_back_to_planner_estimate():
+    db = RecordingSession(101, [{"Plan": {"Plan Rows": 250000}}])
+
+    assert await count_rows(db, select(Payment), exact_limit=100) == (250000, True)
+    assert _sql(db.statements[1])[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.tasks.payment_janitor import ABANDONED_USSD, build_batch_update, sweep
+
+
+class RowcountResult:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+
+
+class BatchSession:
+    """Replies to each UPDATE with the next rowcount in `batches`."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.executed = 0
+        self.commits = 0
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.executed += 1
+        return RowcountResult(self.batches.pop(0) if self.batches else 0)
+
+    async def commit(self):
+        self.commits += 1
+
+
+# =========================================================
+# SQL SHAPE
+# =========================================================
+def test_batch_update_is_bounded_and_skips_locked_rows():
+    now = datetime.now(timezone.utc)
+    stmt = build_batch_update(ABANDONED_USSD, now, 500, now)
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "WHERE payments.id IN (SELECT payments.id" in sql
+    assert "payments.expires_at <" in sql
+    assert "LIMIT" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+# =========================================================
+# DRAIN LOOP
+# =========================================================
+async def test_sweep_loops_until_short_batch():
+    session = BatchSession([500, 500, 120])
+
+    total = await sweep(session, ABANDONED_USSD, datetime.now(timezone.utc), batch_size=500)
+
+    assert total == 1120
+    assert session.executed == 3
+    assert session.commits == 3
+
+
+async def test_sweep_stops_at_max_batches():
+    session = BatchSession([10] * 5)
+
+    total = await sweep(session, ABANDONED_USSD, datetime.now(timezone.utc), batch_size=10, max_batches=2)
+
+    assert total == 20
+    assert session.executed == 2
@@ -0,0 +1,213 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.payment import PaymentProvider, PaymentStatus
+from app.repositories.payment_repo import PaymentRepository
+from app.services.reconciliation_service import RateLimiter, ReconciliationEngine
+
+
+class ScriptedGateway:
+    """verify_transaction returns statuses[provider_tx_id]; tracks peak concurrency."""
+
+    def __init__(self, statuses, latency_seconds=0.0):
+        self.statuses = statuses
+        self.latency_seconds = latency_seconds
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def verify_transaction(self, provider_tx_id):
+        self.calls.append(provider_tx_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_seconds)
+            status = self.statuses[provider_tx_id]
+            if isinstance(status, Exception):
+                raise status
+            return status
+        finally:
+            self.in_flight -= 1
+
+
+class LedgerSession:
+    """
+    Async-context session over a shared ledger dict.
+    Answers page SELECTs from the ledger and records bulk UPDATEs by id.
+    """
+
+    def __init__(self, ledger, updates):
+        self.ledger = ledger
+        self.updates = updates
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, *args, **kwargs):
+        params = stmt.compile().params
+        if stmt.is_select:
+            provider, limit = params["provider_1"], stmt._limit
+            # Keyset bound renders as (param_1, param_2) ahead of the LIMIT param
+            after = (params["param_1"], params["param_2"]) if "param_3" in params else None
+            rows = sorted(
+                (r for r in self.ledger.values()
+                 if r.status == PaymentStatus.PENDING and r.provider == provider and r.provider_tx_id),
+                key=lambda r: (r.created_at, r.id),
+            )
+            if after:
+                rows = [r for r in rows if (r.created_at, r.id) > after]
+            return SimpleNamespace(all=lambda: rows[:limit])
+
+        ids, new_status = params["id_1"], params["status"]
+        moved = []
+        for payment_id in ids:
+            row = self.ledger[payment_id]
+            if row.status == PaymentStatus.PENDING:
+                row.status = new_status
+                row.confirmed_at = datetime.now(timezone.utc)
+                moved.append(row)
+        self.updates.append((new_status, len(ids)))
+        return SimpleNamespace(all=lambda: moved)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def _ledger(n, provider=PaymentProvider.MTN):
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    rows = {}
+    for i in range(n):
+        row = SimpleNamespace(
+            id=uuid.UUID(int=i + 1), reference=f"ref-{provider.value}-{i}", provider_tx_id=f"tx-{provider.value}-{i}",
+            created_at=base,
+            status=PaymentStatus.PENDING, provider=provider, service_type="DOCTOR", amount=500,
+            confirmed_at=None, metadata_json=None,
+        )
+        rows[row.id] = row
+    return rows
+
+
+def _engine(ledger, gateways, updates, **kwargs):
+    kwargs.setdefault("rate_per_second", 0)
+    return ReconciliationEngine(
+        gateways=gateways, session_factory=lambda: LedgerSession(ledger, updates), **kwargs
+    )
+
+
+# =========================================================
+# SQL SHAPE
+# =========================================================
+def test_page_query_is_keyset_not_offset():
+    after = (datetime.now(timezone.utc), uuid.uuid4())
+    stmt = ReconciliationEngine.build_page_query(PaymentProvider.MTN, after, 500)
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "(payments.created_at, payments.id) >" in sql
+    assert "ORDER BY payments.created_at, payments.id" in sql
+    assert "OFFSET" not in sql
+    assert "payments.provider_tx_id IS NOT NULL" in sql
+
+
+def test_bulk_update_only_moves_pending_rows():
+    stmt = PaymentRepository.build_bulk_status_update([uuid.uuid4()], PaymentStatus.SUCCESS)
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "payments.status = %(status_1)s" in sql
+    assert stmt.compile(dialect=postgresql.dialect()).params["status_1"] == PaymentStatus.PENDING
+    assert "confirmed_at=coalesce(payments.confirmed_at, now())" in sql
+    assert "RETURNING" in sql
+
+
+# =========================================================
+# ENGINE
+# =========================================================
+async def test_changes_are_applied_in_batched_updates(monkeypatch):
+    async def no_rollup(self, rows):
+        pass
+    monkeypatch.setattr("app.repositories.rollup_repo.RollupRepository.record_payments_confirmed", no_rollup)
+
+    ledger = _ledger(30)
+    statuses = {r.provider_tx_id: ["SUCCESS", "FAILED", "PENDING"][i % 3] for i, r in enumerate(ledger.values())}
+    updates = []
+
+    report = await _engine(ledger, {PaymentProvider.MTN: ScriptedGateway(statuses)}, updates,
+                           page_size=7, flush_size=100).run()
+
+    assert report.checked == 30
+    assert report.providers["MTN"].updated == {"SUCCESS": 10, "FAILED": 10}
+    assert report.providers["MTN"].unchanged == 10
+    # One UPDATE per target status, not one per payment
+    assert set(updates) == {(PaymentStatus.SUCCESS, 10), (PaymentStatus.FAILED, 10)}
+    assert report.throughput > 0
+
+
+async def test_per_provider_concurrency_is_bounded():
+    ledger = _ledger(20)
+    gateway = ScriptedGateway({r.provider_tx_id: "PENDING" for r in ledger.values()}, latency_seconds=0.01)
+
+    await _engine(ledger, {PaymentProvider.MTN: gateway}, [], concurrency=3).run()
+
+    assert len(gateway.calls) == 20
+    assert gateway.max_in_flight <= 3
+
+
+async def test_slow_provider_does_not_stall_fast_one():
+    ledger = {**_ledger(10, PaymentProvider.MTN), **{
+        uuid.UUID(int=1000 + i): r for i, r in enumerate(_ledger(2, PaymentProvider.STRIPE).values())
+    }}
+    for key, row in ledger.items():
+        row.id = key
+    fast = ScriptedGateway({r.provider_tx_id: "PENDING" for r in ledger.values()})
+    slow = ScriptedGateway({r.provider_tx_id: "PENDING" for r in ledger.values()}, latency_seconds=0.3)
+
+    report = await _engine(ledger, {PaymentProvider.MTN: fast, PaymentProvider.STRIPE: slow}, []).run()
+
+    assert report.providers["MTN"].checked == 10
+    assert report.providers["MTN"].seconds < 0.1
+    assert report.providers["STRIPE"].checked == 2
+
+
+async def test_gateway_errors_are_counted_not_fatal():
+    ledger = _ledger(3)
+    refs = [r.provider_tx_id for r in ledger.values()]
+    statuses = {refs[0]: RuntimeError("timeout"), refs[1]: "PENDING", refs[2]: "PENDING"}
+
+    report = await _engine(ledger, {PaymentProvider.MTN: ScriptedGateway(statuses)}, []).run()
+
+    assert report.providers["MTN"].errors == 1
+    assert report.checked == 3
+
+
+async def test_provider_is_asked_by_its_tx_id_and_unsubmitted_rows_are_skipped():
+    ledger = _ledger(4)
+    rows = list(ledger.values())
+    rows[0].provider_tx_id = None   # no provider id yet: cannot be verified
+    gateway = ScriptedGateway({r.provider_tx_id: "PENDING" for r in rows[1:]})
+
+    report = await _engine(ledger, {PaymentProvider.MTN: gateway}, []).run()
+
+    assert gateway.calls == [r.provider_tx_id for r in rows[1:]]
+    assert report.checked == 3
+
+
+async def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate_per_second=50)
+    started = time.monotonic()
+
+    for _ in range(5):
+        await limiter.acquire()
+
+    assert time.monotonic() - started >= 0.07
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.call_session import CallSession, CallStatus
+from app.models.payment import Payment, PaymentProvider, PaymentStatus, ServiceType
+from app.repositories.rollup_repo import RollupRepository
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.statements.append(stmt)
+
+
+def _payment(**overrides):
+    fields = dict(
+        reference="ref-1",
+        amount=500,
+        service_type=ServiceType.DOCTOR,
+        provider=PaymentProvider.MTN,
+        status=PaymentStatus.SUCCESS,
+        confirmed_at=datetime(2026, 3, 2, 23, 30, tzinfo=timezone.utc),
+        metadata_json={"verification_mode": "AUTO_MATCH"},
+    )
+    fields.update(overrides)
+    return Payment(**fields)
+
+
+def _params(stmt):
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+# =========================================================
+# INCREMENTAL UPSERTS
+# =========================================================
+async def test_confirm_adds_to_confirmation_day_bucket():
+    db = RecordingSession()
+
+    await RollupRepository(db).record_payment_confirmed(_payment())
+
+    stmt = db.statements[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    params = _params(stmt)
+
+    assert "ON CONFLICT (day, service_type, provider) DO UPDATE" in sql
+    assert "success_count = (payment_daily_rollups.success_count + excluded.success_count)" in sql
+    assert str(params["day"]) == "2026-03-02"
+    assert params["success_count"] == 1
+    assert params["success_amount"] == 500.0
+    assert params["auto_match_count"] == 1
+
+
+async def test_refund_moves_totals_to_refunded_columns():
+    db = RecordingSession()
+
+    await RollupRepository(db).record_payment_refunded(_payment(metadata_json=None))
+
+    params = _params(db.statements[0])
+    assert params["success_count"] == -1
+    assert params["success_amount"] == -500.0
+    assert params["auto_match_count"] == 0
+    assert params["refunded_count"] == 1
+    assert params["refunded_amount"] == 500.0
+
+
+async def test_failed_call_counts_without_duration():
+    db = RecordingSession()
+    session = CallSession(
+        callee_id="doc-1",
+        callee_type="doctor",
+        status=CallStatus.FAILED,
+        started_at=datetime(2026, 3, 2, 10, 0, tzinfo=timezone.utc),
+        duration_seconds=120,
+    )
+
+    await RollupRepository(db).record_call_ended(session)
+
+    params = _params(db.statements[0])
+    assert params["completed_count"] == 0
+    assert params["failed_count"] == 1
+    assert params["total_duration_seconds"] == 0
+
+
+# =========================================================
+# ADMIN VERIFY-BYPASS
+# =========================================================
+async def test_admin_bypass_counts_in_todays_rollup(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.api import admin
+    from app.schemas.payment_admin import AdminConfirmPaymentRequest
+
+    payment = _payment(status=PaymentStatus.PENDING, metadata_json=None)
+    confirmed = _payment(metadata_json=None, user_id="user-1", idempotency_key="idem-1")
+
+    class ScriptedSession(RecordingSession):
+        def __init__(self, replies):
+            super().__init__()
+            self.replies = iter(replies)
+            self.committed = False
+
+        async def execute(self, stmt, *args, **kwargs):
+            self.statements.append(stmt)
+            reply = next(self.replies, None)
+            return SimpleNamespace(scalar_one_or_none=lambda: reply)
+
+        async def commit(self):
+            self.committed = True
+
+    async def activate_listing(**kwargs):
+        return None
+
+    monkeypatch.setattr(admin.service_orchestrator, "activate_listing", activate_listing)
+    db = ScriptedSession([payment, confirmed])
+    req = AdminConfirmPaymentRequest(transaction_id="2589631470", payer_phone="237670000000", amount=500)
+
+    response = await admin.verify_payment_override(req, db=db, admin=SimpleNamespace(email="ops@bloodonal"))
+
+    # lookup, guarded update, then the rollup upsert before the commit
+    rollup = db.statements[2]
+    assert "payment_daily_rollups" in str(rollup.compile(dialect=postgresql.dialect()))
+    assert _params(rollup)["success_count"] == 1 and _params(rollup)["success_amount"] == 500.0
+    assert db.committed and response.new_status == PaymentStatus.SUCCESS
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.tasks.payment_tasks import build_payment_scheduler
+from app.tasks.scheduler import CronSpec, RedisLease, ScheduledJob, Scheduler
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# =========================================================
+# CRON
+# =========================================================
+def test_daily_cron_rolls_to_next_day():
+    spec = CronSpec("0 23 * * *")
+
+    assert spec.next_after(_utc(2026, 3, 1, 22, 59)) == _utc(2026, 3, 1, 23, 0)
+    assert spec.next_after(_utc(2026, 3, 1, 23, 0)) == _utc(2026, 3, 2, 23, 0)
+
+
+def test_cron_steps_and_weekdays():
+    # Every 15 minutes on Mondays only (2026-03-02 is a Monday)
+    spec = CronSpec("*/15 * * * 1")
+
+    assert spec.next_after(_utc(2026, 3, 1, 12, 0)) == _utc(2026, 3, 2, 0, 0)
+    assert spec.next_after(_utc(2026, 3, 2, 0, 7)) == _utc(2026, 3, 2, 0, 15)
+
+
+def test_cron_weekday_zero_and_seven_are_sunday():
+    # 2026-03-01 is a Sunday
+    for expr in ("0 6 * * 0", "0 6 * * 7"):
+        assert CronSpec(expr).next_after(_utc(2026, 2, 27, 0, 0)) == _utc(2026, 3, 1, 6, 0)
+
+    # Mon-Fri skips the weekend
+    assert CronSpec("0 9 * * 1-5").next_after(_utc(2026, 2, 27, 10, 0)) == _utc(2026, 3, 2, 9, 0)
+
+
+def test_job_requires_exactly_one_trigger():
+    async def noop():
+        pass
+
+    with pytest.raises(ValueError):
+        ScheduledJob(name="bad", func=noop)
+    with pytest.raises(ValueError):
+        ScheduledJob(name="bad", func=noop, interval_seconds=5, cron="* * * * *")
+
+
+# =========================================================
+# LEADER ELECTION
+# =========================================================
+def _counting_job(calls):
+    async def job():
+        calls.append(1)
+    return ScheduledJob(name="count", func=job, interval_seconds=60)
+
+
+async def test_only_lease_holder_runs_jobs(fake_redis):
+    calls = []
+    leader = Scheduler([_counting_job(calls)], lease=RedisLease(fake_redis))
+    follower = Scheduler([_counting_job(calls)], lease=RedisLease(fake_redis))
+
+    await leader.tick()
+    await follower.tick()
+    await asyncio.sleep(0)
+
+    assert leader.is_leader is True
+    assert follower.is_leader is False
+    assert len(calls) == 1
+
+
+async def test_graceful_handover_frees_lease_for_follower(fake_redis):
+    leader = Scheduler([], lease=RedisLease(fake_redis), tick_seconds=0.01)
+    follower = Scheduler([], lease=RedisLease(fake_redis))
+
+    task = asyncio.create_task(leader.run())
+    await asyncio.sleep(0.02)
+    await follower.tick()
+    assert follower.is_leader is False
+
+    await leader.stop()
+    await task
+
+    await follower.tick()
+    assert follower.is_leader is True
+
+
+async def test_losing_the_lease_cancels_in_flight_jobs(fake_redis):
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    scheduler = Scheduler([ScheduledJob(name="slow", func=slow, interval_seconds=60)], lease=RedisLease(fake_redis))
+    await scheduler.tick()
+    await started.wait()
+
+    fake_redis.fail = True
+    await scheduler.tick()
+
+    assert scheduler.is_leader is False
+    assert cancelled.is_set()
+    assert scheduler._running == {}
+
+
+async def test_lease_lost_when_redis_is_down(fake_redis):
+    lease = RedisLease(fake_redis)
+    assert await lease.acquire() is True
+
+    fake_redis.fail = True
+    assert await lease.acquire() is False
+
+
+def test_payment_scheduler_registers_jobs():
+    scheduler = build_payment_scheduler(lease=object())
+
+    names = {job.name for job in scheduler.jobs}
+    assert {"expire_unconfirmed_payments", "send_daily_platform_report"} <= names
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.search_service import (
+    InvalidCursor, SearchExecutor, SearchHit, SearchService, clamp_limit, decode_cursor, encode_cursor, tokenize,
+)
+
+
+def _sql(stmt):
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_tokenize_strips_tsquery_operators():
+    assert tokenize("Dr. Jo-ndo & !(nurse):*") == ["dr", "jo", "ndo", "nurse"]
+    assert tokenize("  __ ;; ") == []
+
+
+def test_limit_is_clamped():
+    assert clamp_limit(None) == 20
+    assert clamp_limit(10_000) == 100
+    assert clamp_limit(0) == 20
+
+
+def test_provider_query_is_ranked_prefix_search_with_limit():
+    sql, params = _sql(SearchService.build_provider_query("jo ndo", 15))
+
+    assert "service_users.search_vector @@ to_tsquery" in sql
+    assert "ORDER BY score DESC, candidates.id" in sql
+    assert "ILIKE" not in sql.upper()
+    assert params["to_tsquery_2"] == "jo:* & ndo:*"
+    # No relevance-ordered index without pg_trgm: every match is ranked
+    assert "ORDER BY service_users" not in sql
+    assert [v for v in params.values() if isinstance(v, int)] == [15]
+
+
+def test_trigram_adds_fuzzy_name_match():
+    sql, _ = _sql(SearchService.build_listing_query("blod", 20, trigram=True))
+
+    assert "<%% service_listings.title" in sql
+    assert "word_similarity" in sql
+
+
+async def test_blank_query_does_not_hit_database():
+    page = await SearchExecutor(session_factory=lambda: pytest.fail("opened a session")).search("?!")
+    assert page.hits == [] and page.next_cursor is None
+
+
+class NullSession:
+    """Session for the executor: accepts SET LOCAL, nothing else."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, *args, **kwargs):
+        return None
+
+
+def _fake_sources(monkeypatch, corpus, delays=None):
+    """search_source served from {source: [rank, ...]} honouring `after` and `limit`."""
+    delays = delays or {}
+
+    async def search_source(self, name, q, limit=None, after=None):
+        await asyncio.sleep(delays.get(name, 0))
+        rows = sorted(((rank, f"{name}-{i}") for i, rank in enumerate(corpus[name])), key=lambda r: (-r[0], r[1]))
+        if after is not None:
+            rows = [r for r in rows if r[0] < after[0] or (r[0] == after[0] and r[1] > after[1])]
+        return [SearchHit(source=name, id=row_id, score=rank, item=None, rank=rank) for rank, row_id in rows[:limit]]
+
+    monkeypatch.setattr(SearchService, "search_source", search_source)
+
+
+def test_keyset_position_filters_after_last_hit():
+    sql, params = _sql(SearchService.build_source_query("listing", "blood", 20, after=(0.5, "abc")))
+
+    assert "candidates.id >" in sql
+    assert 0.5 in params.values() and "abc" in params.values()
+
+
+def test_every_page_ranks_the_same_candidate_pool():
+    def pool(limit, after=None):
+        stmt = SearchService.build_source_query("provider", "jo", limit, trigram=True, after=after)
+        candidates = stmt.get_final_froms()[0]
+        return str(candidates.element.compile(dialect=postgresql.dialect())), candidates.element._limit
+
+    # Same relevance-ordered, size-capped pool whatever the page size; the keyset only filters outside it
+    assert pool(5) == pool(100, after=(0.5, "abc"))
+    sql, size = pool(5)
+    assert "ORDER BY service_users.full_name <->> %(param_1)s, service_users.id" in sql and size == 1000
+    assert "candidates.id" not in sql
+
+
+async def test_cursor_walks_every_hit_once_in_score_order(monkeypatch):
+    corpus = {"provider": [0.9, 0.7, 0.5, 0.3, 0.1], "listing": [0.8, 0.6, 0.4]}
+    _fake_sources(monkeypatch, corpus)
+    executor = SearchExecutor(session_factory=NullSession)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await executor.search("jean", limit=3, cursor=cursor)
+        seen.extend(hit.score for hit in page.hits)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.1]
+    assert pages == 3
+
+
+async def test_sources_run_in_parallel(monkeypatch):
+    _fake_sources(monkeypatch, {"provider": [0.5], "listing": [0.4]}, delays={"provider": 0.2, "listing": 0.2})
+
+    started = time.perf_counter()
+    page = await SearchExecutor(session_factory=NullSession).search("jean")
+
+    assert len(page.hits) == 2
+    assert time.perf_counter() - started < 0.35
+
+
+async def test_slow_source_is_dropped_and_retried_by_cursor(monkeypatch):
+    _fake_sources(monkeypatch, {"provider": [0.5], "listing": [0.9]}, delays={"listing": 1.0})
+
+    page = await SearchExecutor(session_factory=NullSession, timeout_seconds=0.1).search("jean")
+
+    assert [hit.source for hit in page.hits] == ["provider"]
+    assert page.partial and page.failed_sources == ["listing"]
+    # Provider is exhausted; the cursor only keeps the listing source open
+    positions, done = decode_cursor(page.next_cursor, tokenize("jean"))
+    assert done == {"provider"} and "listing" not in positions
+
+
+def test_cursor_is_bound_to_its_query():
+    cursor = encode_cursor(["jean"], {"provider": [0.5, "x"]}, [])
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, ["paul"])
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", ["jean"])
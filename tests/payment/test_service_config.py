@@ -0,0 +1,194 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from app.config import settings
+from app.services import service_config
+from app.services.registry import RegistrySnapshot, ServiceRegistry
+from app.services.service_config import CHANNEL, ServiceConfigSync
+
+
+class FakeTable:
+    """service_config_overrides as the loaders see it, plus a query count."""
+
+    def __init__(self):
+        self.version = 0
+        self.overrides = {}
+        self.loads = 0
+
+    def save(self, key, **fields):
+        self.version += 1
+        self.overrides.setdefault(key, {}).update(fields)
+        return self.version
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePubSub:
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.inbox = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.subscribers[channel].add(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        for subs in self.subscribers.values():
+            subs.discard(self)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+
+    def pubsub(self):
+        return FakePubSub(self.subscribers)
+
+    async def publish(self, channel, data):
+        for pubsub in list(self.subscribers[channel]):
+            pubsub.inbox.put_nowait({"type": "message", "channel": channel, "data": data})
+
+
+def _patch_table(monkeypatch, table):
+    async def load_overrides(db):
+        table.loads += 1
+        return table.version, {k: dict(v) for k, v in table.overrides.items()}
+
+    async def current_version(db):
+        return table.version
+
+    monkeypatch.setattr(service_config, "load_overrides", load_overrides)
+    monkeypatch.setattr(service_config, "current_version", current_version)
+
+
+def _worker(redis=None, poll_seconds=60.0):
+    return ServiceConfigSync(
+        target=ServiceRegistry(),
+        session_factory=FakeSession,
+        redis_getter=lambda: redis,
+        poll_seconds=poll_seconds,
+    )
+
+
+def test_overrides_apply_to_every_alias_and_leave_the_rest_alone():
+    snapshot = RegistrySnapshot.build(
+        settings,
+        overrides={
+            "doctor-consult": {"base_fee": 123, "promo_message": "Promo", "free_limit": None},
+            "no-such-service": {"base_fee": 1},
+        },
+        config_version=7,
+    )
+
+    record = snapshot.lookup["doctor"]
+    assert record is snapshot.lookup["doctor_consult"]
+    assert record.base_fee == 123 and record.promo_message == "Promo"
+    # None means "not overridden"
+    assert record.free_limit == settings.LIMIT_DOCTOR_CONSULT
+    assert snapshot.lookup["bike"].base_fee == settings.FEE_BIKE_REQUEST
+    assert "no-such-service" not in snapshot.records
+    assert snapshot.config_version == 7
+
+
+async def test_refresh_only_reloads_on_a_new_version(monkeypatch):
+    table = FakeTable()
+    _patch_table(monkeypatch, table)
+    sync = _worker()
+    await sync.refresh("startup")
+    snapshot = sync.registry.snapshot
+
+    await sync.refresh("poll")
+    assert sync.registry.snapshot is snapshot
+
+    version = table.save("taxi-request", is_enabled=False)
+    assert await sync.refresh("local", min_version=version) == version
+    assert sync.registry.calculate_effective_fee("taxi", 10_000) == 0
+    # Already there: answered without a query
+    loads = table.loads
+    await sync.refresh("local", min_version=version)
+    assert table.loads == loads
+
+
+async def test_announcement_reaches_every_worker(monkeypatch):
+    table = FakeTable()
+    _patch_table(monkeypatch, table)
+    redis = FakeRedis()
+    admin, other = _worker(redis), _worker(redis)
+    await admin.start()
+    await other.start()
+    try:
+        await asyncio.sleep(0)
+        version = table.save("bike-request", base_fee=999)
+        await admin.refresh("local", min_version=version)
+        await admin.publish(version)
+
+        for _ in range(50):
+            if other.version == version:
+                break
+            await asyncio.sleep(0.01)
+        assert other.registry.get("bike").base_fee == 999
+        assert admin.registry.get("bike").base_fee == 999
+    finally:
+        await admin.stop()
+        await other.stop()
+
+
+async def test_poll_catches_changes_without_redis(monkeypatch):
+    table = FakeTable()
+    _patch_table(monkeypatch, table)
+    sync = _worker(redis=None, poll_seconds=0.02)
+    await sync.start()
+    try:
+        table.save("doctor-consult", promo_message="Free week")
+        for _ in range(50):
+            if sync.version == table.version:
+                break
+            await asyncio.sleep(0.01)
+        assert sync.registry.get("doctor").promo_message == "Free week"
+    finally:
+        await sync.stop()
+
+
+async def test_malformed_announcement_is_ignored(monkeypatch):
+    table = FakeTable()
+    _patch_table(monkeypatch, table)
+    redis = FakeRedis()
+    sync = _worker(redis)
+    await sync.start()
+    try:
+        await asyncio.sleep(0)
+        await redis.publish(CHANNEL, "not json")
+        await redis.publish(CHANNEL, json.dumps({"version": 0}))
+        await asyncio.sleep(0.05)
+        assert sync.version == 0 and len(sync._tasks) == 2 and not any(t.done() for t in sync._tasks)
+    finally:
+        await sync.stop()
+
+
+async def test_writers_lock_the_table_before_drawing_a_version():
+    class RecordingSession:
+        def __init__(self):
+            self.statements = []
+
+        async def execute(self, stmt, *args, **kwargs):
+            self.statements.append(str(stmt))
+            return type("Result", (), {"scalar_one": lambda self: 7})()
+
+    db = RecordingSession()
+
+    assert await service_config.save_override(db, "doctor", {"base_fee": 1500}) == 7
+    # Held until the caller commits, so versions become visible in the order they were drawn
+    assert db.statements[0] == "LOCK TABLE service_config_overrides IN SHARE ROW EXCLUSIVE MODE"
+    assert db.statements[1].startswith("INSERT INTO service_config_overrides")
@@ -0,0 +1,74 @@
+import dataclasses
+
+import pytest
+
+from app.config import settings
+from app.services.registry import ServiceRegistry
+
+
+def test_every_alias_resolves_to_the_same_record():
+    registry = ServiceRegistry()
+
+    record = registry.get("doctor-consult")
+    assert registry.get("doctor") is record
+    assert registry.get("doctor_consult") is record
+    assert registry.get(" Doctor-Consult ") is record
+    assert record.base_fee == settings.FEE_DOCTOR_CONSULT
+    assert record.free_limit == settings.LIMIT_DOCTOR_CONSULT
+    assert record.is_rtc_supported and record.category == "medical"
+
+
+def test_records_and_maps_are_read_only():
+    registry = ServiceRegistry()
+    record = registry.get("bike-request")
+
+    with pytest.raises(AttributeError):
+        record.base_fee = 0
+    with pytest.raises(TypeError):
+        registry.snapshot.fee_map["bike-request"] = 0
+    with pytest.raises(TypeError):
+        registry.get_service_meta("bike")["base_fee"] = 0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        registry.snapshot.version = 99
+
+
+def test_unknown_service_is_free_and_keeps_its_own_quota():
+    registry = ServiceRegistry()
+
+    record = registry.get("ambulance-ride")
+    assert record.base_fee == 0 and record.free_limit == 0 and record.is_enabled
+    assert record.display_name == "Ambulance Ride"
+    assert registry.calculate_effective_fee("ambulance-ride", 5) == 0
+    assert registry.quota_type("ambulance-ride") == "ambulance_ride"
+    # Aliases share the canonical service's counter, so they share its free tier
+    assert registry.quota_type("doctor") == registry.quota_type("doctor_consult") == "doctor_consult"
+    assert registry.quota_type("doctor-consult") == "doctor_consult"
+
+
+def test_effective_fee_honours_free_tier_and_switches(monkeypatch):
+    registry = ServiceRegistry()
+    limit, fee = settings.LIMIT_TAXI_REQUEST, settings.FEE_TAXI_REQUEST
+
+    assert registry.calculate_effective_fee("taxi", limit - 1) == 0
+    assert registry.calculate_effective_fee("taxi", limit) == fee
+
+    monkeypatch.setattr(settings, "PAYMENT_ENABLED_TAXI_REQUEST", False)
+    # Settings changes apply on reload, not mid-snapshot
+    assert registry.calculate_effective_fee("taxi", limit) == fee
+    registry.reload()
+    assert registry.calculate_effective_fee("taxi", limit) == 0
+
+
+def test_reload_swaps_the_whole_snapshot(monkeypatch):
+    registry = ServiceRegistry()
+    before = registry.snapshot
+    old_fee = settings.FEE_BIKE_REQUEST
+
+    monkeypatch.setattr(settings, "FEE_BIKE_REQUEST", old_fee + 250)
+    after = registry.reload()
+
+    assert after.version == before.version + 1
+    assert registry.get("bike").base_fee == old_fee + 250
+    assert registry.get_all_services_manifest()["bike-request"]["base_fee"] == old_fee + 250
+    # Readers holding the old snapshot keep a consistent view
+    assert before.lookup["bike"].base_fee == before.manifest["bike-request"]["base_fee"] == old_fee
@@ -0,0 +1,161 @@
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.payment import PaymentStatus, ServiceType
+from app.services import sms_matching
+from app.services.sms_matching import (
+    PendingIndex,
+    PendingPayment,
+    SMSMatchingEngine,
+    amount_cents,
+    match_messages,
+    normalize_phone,
+)
+from app.services.sms_parser import ParsedSMS
+
+
+def _sms(tx_id, amount, phone=None, sender="MTN"):
+    return ParsedSMS(transaction_id=tx_id, amount=amount, sender=sender, raw_body="", phone=phone)
+
+
+def _payment(amount, phone, provider="MTN", tx_id=None):
+    return PendingPayment(
+        id=uuid.uuid4(), provider=provider, cents=amount_cents(Decimal(amount)),
+        phones=(phone,), tx_id=tx_id,
+    )
+
+
+def test_phone_and_amount_normalization():
+    assert normalize_phone("+237 677-12-34-56") == normalize_phone("237677123456") == "677123456"
+    assert normalize_phone("677123456") == "677123456"
+    assert normalize_phone("12345") is None and normalize_phone(None) is None
+    assert amount_cents(Decimal("1500.00")) == amount_cents(1500.0) == 150000
+
+
+def test_matches_on_provider_amount_and_phone_once_per_batch():
+    mtn = _payment("1500", "677123456")
+    orange = _payment("1500", "677123456", provider="ORANGE")
+    index = PendingIndex([mtn, orange])
+
+    results = match_messages([
+        _sms("2500000001", 1500.0, "677123456"),
+        _sms("CM2600000001", 1500.0, "677123456", sender="ORANGE"),
+        _sms("2500000002", 1500.0, "677123456"),   # second payment from the same payer
+        _sms("2500000003", 1000.0, "677123456"),   # wrong amount
+        _sms("2500000004", 1500.0, None),           # SMS without a phone
+    ], index)
+
+    assert [(r.outcome, r.payment_ids) for r in results] == [
+        ("matched", (mtn.id,)),
+        ("matched", (orange.id,)),
+        ("unmatched", ()),
+        ("unmatched", ()),
+        ("unmatched", ()),
+    ]
+
+
+def test_conflicts_and_duplicates_are_not_guessed():
+    first, second = _payment("500", "650000000"), _payment("500", "650000000")
+    claim = _payment("2500", "699000000", tx_id="2511111111")
+    index = PendingIndex([first, second, claim])
+
+    results = match_messages([
+        _sms("2500000001", 500.0, "650000000"),
+        _sms("2511111111", 1000.0, "699000000"),   # claimed TxID, different amount
+        _sms("2500000001", 500.0, "650000000"),    # resent SMS
+        _sms("2599999999", 500.0, "650000000"),    # TxID already settled elsewhere
+    ], index, used_tx_ids={("MTN", "2599999999")})
+
+    assert [r.outcome for r in results] == ["ambiguous", "amount_mismatch", "duplicate", "duplicate"]
+    assert set(results[0].payment_ids) == {first.id, second.id}
+    assert results[1].payment_ids == (claim.id,)
+
+
+def test_submitted_txid_matches_without_phone():
+    claim = _payment("2500", "699000000", tx_id="2511111111")
+    # A claim is never matched by phone + amount alone
+    assert match_messages([_sms("2522222222", 2500.0, "699000000")], PendingIndex([claim]))[0].outcome == "unmatched"
+
+    result = match_messages([_sms("2511111111", 2500.0)], PendingIndex([claim]))[0]
+    assert result.outcome == "matched" and result.payment_ids == (claim.id,)
+
+
+class RecordingSession:
+    """Confirms every id except `moved`; records flag updates."""
+
+    def __init__(self, moved, flagged):
+        self.moved = moved
+        self.flagged = flagged
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        if params is not None:
+            rows = [
+                SimpleNamespace(id=pid, user_id=f"user-{pid}", idempotency_key=f"idem-{pid}",
+                                service_type=ServiceType.DOCTOR)
+                for pid in params["payment_ids"] if pid not in self.moved
+            ]
+            return SimpleNamespace(all=lambda: rows)
+        ids = stmt.compile().params["id_1"]
+        self.flagged.extend(ids)
+        return SimpleNamespace(rowcount=len(ids))
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+async def test_engine_run_confirms_in_batches_and_flags_conflicts(monkeypatch):
+    matched = [_payment("500", f"6700000{i:02d}") for i in range(5)]
+    twins = [_payment("1000", "690000000"), _payment("1000", "690000000")]
+    index = PendingIndex(matched + twins)
+    moved, flagged, rollups, activated = {matched[4].id}, [], [], []
+
+    async def record_payments_confirmed(self, rows):
+        rollups.append(len(rows))
+
+    async def activate_listing(db, user_id, service_type, activation_ref):
+        activated.append((user_id, service_type, activation_ref))
+
+    monkeypatch.setattr(sms_matching.RollupRepository, "record_payments_confirmed", record_payments_confirmed)
+    monkeypatch.setattr(sms_matching.service_orchestrator, "activate_listing", activate_listing)
+
+    engine = SMSMatchingEngine(session_factory=lambda: RecordingSession(moved, flagged), batch_size=2)
+
+    async def load_index():
+        return index
+
+    async def used_tx_ids(messages):
+        return set()
+
+    monkeypatch.setattr(engine, "load_index", load_index)
+    monkeypatch.setattr(engine, "used_tx_ids", used_tx_ids)
+
+    bodies = [f"You have received 500 FCFA from X (6700000{i:02d}). TransID: 25000000{i:02d}" for i in range(5)]
+    bodies += ["You have received 1,000 FCFA from Y (237690000000). TransID: 2512345678", "Your code is 1234"]
+    report = await engine.run(bodies)
+
+    assert report.outcomes == {"unparsed": 1, "matched": 4, "stale": 1, "ambiguous": 1}
+    assert rollups == [2, 2]   # chunks of two; the moved payment's chunk returns nothing
+    # Every confirmed payment gets its service activated (listing, quota, FCM) like verify-bypass
+    assert activated == [(f"user-{p.id}", "doctor", f"idem-{p.id}") for p in matched[:4]]
+    assert set(flagged) == {t.id for t in twins} and report.flagged == 2
+    conflict = report.as_dict()["conflicts"][0]
+    assert conflict["reason"] == "ambiguous" and conflict["phone"] == "690000000"
+
+
+def test_confirm_statement_has_fixed_parameters():
+    sql = str(SMSMatchingEngine.build_confirm_stmt().compile(dialect=postgresql.dialect()))
+
+    assert "unnest(" in sql and "payment_ids" in sql and "tx_ids" in sql
+    assert "payments.status IN" in sql
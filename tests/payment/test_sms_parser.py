@@ -0,0 +1,86 @@
+import re
+
+import pytest
+
+from app.services.sms_parser import ParsedSMS, SMSParser, SMSTemplate, parse_amount
+
+# (body, (provider, transaction_id, amount, phone)) -- None: must not parse
+CORPUS = [
+    ("Transfer confirmed. 500 FCFA sent to 677123456. Transaction ID: 2501234567",
+     ("MTN", "2501234567", 500.0, "677123456")),
+    ("You have received 1,500 FCFA from JOHN DOE (237677000111). TransID: 250123456789. New balance: 12,000 FCFA",
+     ("MTN", "250123456789", 1500.0, "677000111")),
+    ("Y'ello! You have received 12 500 FCFA from 650112233.\nFinancial Transaction Id: 2512345678",
+     ("MTN", "2512345678", 12500.0, "650112233")),
+    ("Vous avez recu 1.000.000 FCFA de +237 670000001. ID de transaction: 2598765432",
+     ("MTN", "2598765432", 1000000.0, "670000001")),
+    ("MoMo: payment of 750.50 FCFA done. Transaction ID: 2500000001",
+     ("MTN", "2500000001", 750.5, None)),
+    ("Le transfert de 500 FCFA au 691234567 a réussi. ID: CM260101ABCD",
+     ("ORANGE", "CM260101ABCD", 500.0, "691234567")),
+    ("Depot de 2,000 FCFA reussi. Reference: PP260101.1234.A12345. Solde: 9 500 FCFA",
+     ("ORANGE", "PP260101.1234.A12345", 2000.0, None)),
+    ("Orange Money: Dépôt de 25 000 XAF reçu du 655443322. Ref: MP2601AB7788",
+     ("ORANGE", "MP2601AB7788", 25000.0, "655443322")),
+    ("Transfer confirmed. 500 FCFA sent. Transaction ID: 12345", None),   # id too short
+    ("Your code is 123456. Do not share it.", None),
+    ("Le transfert au 691234567 a réussi. ID: CM260101ABCD", None),        # no amount
+]
+
+
+@pytest.mark.parametrize("body, expected", CORPUS)
+def test_corpus(body, expected):
+    parsed = SMSParser.parse_any(body)
+    if expected is None:
+        assert parsed is None
+    else:
+        assert (parsed.sender, parsed.transaction_id, parsed.amount, parsed.phone) == expected
+
+
+def test_batch_matches_single_parses_in_order():
+    bodies = [body for body, _ in CORPUS] * 3
+
+    assert SMSParser.parse_many(bodies) == [SMSParser.parse_any(body) for body in bodies]
+
+
+@pytest.mark.parametrize("raw, amount", [
+    ("500", 500.0), ("1,500", 1500.0), ("1.500", 1500.0), ("12 500", 12500.0),
+    ("1,500.00", 1500.0), ("1 500,5", 1500.5), ("500.5", 500.5), ("1.000.000", 1000000.0),
+])
+def test_thousands_separators(raw, amount):
+    assert parse_amount(raw) == amount
+
+
+def test_label_decides_provider_and_bad_ids_are_skipped():
+    assert SMSParser.detect_provider("500 FCFA recu. Reference: PP26ABCDEFGH") == "ORANGE"
+    assert SMSParser.detect_provider("500 FCFA sent. TransID: 2501234567") == "MTN"
+    assert SMSParser.detect_provider("Your code is 123456") is None
+    # A label whose id does not fit is passed over for the next one
+    parsed = SMSParser.parse_any("Orange: 500 FCFA. ID: 12. Ref: MP2601AB7788")
+    assert parsed.transaction_id == "MP2601AB7788"
+    # "ID" inside another word is not an Orange label
+    assert SMSParser.parse_any("500 FCFA. PaidID: MP2601AB7788") is None
+    # The per-provider helpers keep working
+    assert SMSParser.parse_mtn("500 FCFA ... TransID: 2501234567").sender == "MTN"
+    assert SMSParser.parse_orange("500 FCFA ... TransID: 2501234567") is None
+
+
+def test_registered_template_parses_new_format(monkeypatch):
+    monkeypatch.setattr(SMSParser, "templates", list(SMSParser.templates))
+    body = "EU Mobile: recu 3 000 FCFA de 662000111. Code: EU26XY9988"
+    assert SMSParser.parse_any(body) is None
+
+    SMSParser.register(SMSTemplate(
+        name="eu_mobile",
+        provider="EU",
+        label=re.compile(r"code"),
+        tx_id=re.compile(r"EU[A-Z0-9]{6,}"),
+    ))
+    try:
+        assert SMSParser.parse_any(body) == ParsedSMS(
+            transaction_id="EU26XY9988", amount=3000.0, sender="EU",
+            raw_body=body, phone="662000111", template="eu_mobile",
+        )
+    finally:
+        monkeypatch.undo()
+        SMSParser._build_scanner()
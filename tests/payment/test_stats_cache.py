@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.stats_service import StatsService, _dashboard_metrics_stmt
+from app.utils.ttl_cache import TTLCache
+
+
+class OneRowResult:
+    def __init__(self, row):
+        self._row = row
+
+    def one(self):
+        return self._row
+
+
+class CountingSession:
+    def __init__(self):
+        self.executed = 0
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.executed += 1
+        return OneRowResult(SimpleNamespace(
+            awaiting=3, revenue=1500, bypass=2, mtn=1000, orange=500,
+            consultation_revenue=700, avg_duration=61.234, volume=4,
+        ))
+
+
+# =========================================================
+# SINGLE QUERY
+# =========================================================
+def test_dashboard_metrics_compile_to_filter_aggregates():
+    sql = str(_dashboard_metrics_stmt(datetime.now(timezone.utc)).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("FILTER (WHERE") >= 5
+    assert "call_sessions" in sql
+
+
+async def test_dashboard_metrics_is_one_round_trip_with_expected_keys():
+    db = CountingSession()
+
+    metrics = await StatsService.get_dashboard_metrics(db, use_cache=False)
+
+    assert db.executed == 1
+    assert metrics["bypass_matches_today"] == 2
+    assert metrics["mtn_volume"] == 1000.0
+    assert metrics["orange_volume"] == 500.0
+    assert metrics["avg_call_duration_seconds"] == 61.23
+
+
+# =========================================================
+# TTL CACHE
+# =========================================================
+async def test_concurrent_misses_compute_once():
+    cache = TTLCache("test", ttl_seconds=60, redis_getter=lambda: None)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(20)))
+
+    assert len(calls) == 1
+    assert all(r == {"value": 1} for r in results)
+
+
+async def test_redis_layer_is_shared_between_workers(fake_redis):
+    worker_a = TTLCache("test", ttl_seconds=60, redis_getter=lambda: fake_redis)
+    worker_b = TTLCache("test", ttl_seconds=60, redis_getter=lambda: fake_redis)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert await worker_a.get_or_compute("k", compute) == {"value": 1}
+    assert await worker_b.get_or_compute("k", compute) == {"value": 1}
+    assert len(calls) == 1
+    assert "test:k:lock" not in fake_redis.store
+
+
+async def test_redis_outage_falls_back_to_compute(fake_redis):
+    fake_redis.fail = True
+    cache = TTLCache("test", ttl_seconds=60, redis_getter=lambda: fake_redis)
+
+    async def compute():
+        return {"value": 7}
+
+    assert await cache.get_or_compute("k", compute) == {"value": 7}
@@ -113,4 +113,68 @@ async def test_pay_taxi_exceeds_limit(client, monkeypatch):
     assert data["success"] is True
     assert "ussd_string" in data
 
-    mock_repo.try_consume_free_usage.assert_called_once()
\ No newline at end of file
+    mock_repo.try_consume_free_usage.assert_called_once()
+
+# =========================================================
+# TEST 4: PRICING FOLLOWS REGISTRY OVERRIDES
+# =========================================================
+@pytest.fixture
+def taxi_override():
+    from app.services.registry import registry
+
+    def apply(**fields):
+        registry.reload(overrides={"taxi-request": fields})
+
+    yield apply
+    registry.reload(overrides={})
+
+
+@pytest.mark.asyncio
+async def test_taxi_fee_and_limit_follow_registry(client, monkeypatch, taxi_override):
+
+    mock_repo = AsyncMock()
+    mock_repo.count_uses.return_value = 2
+
+    monkeypatch.setattr(
+        "app.routers.taxi_payment.SQLAlchemyUsageRepository",
+        lambda db: mock_repo
+    )
+
+    taxi_override(base_fee=750, free_limit=2)
+
+    data = (await client.get("/v1/payments/taxi/remaining")).json()
+    assert data == {"remaining": 0, "fee": 750}
+
+    mock_repo.try_consume_free_usage.return_value = False
+    response = await client.post(
+        "/v1/payments/taxi",
+        json={"phone": "670000000", "taxi_driver_id": "DRV-123", "ride_distance_km": 5.0}
+    )
+
+    assert response.json()["ussd_string"].endswith("*750#")
+    assert mock_repo.try_consume_free_usage.call_args.kwargs["free_limit"] == 2
+
+
+@pytest.mark.asyncio
+async def test_taxi_payments_switched_off_are_free(client, monkeypatch, taxi_override):
+
+    mock_repo = AsyncMock()
+
+    monkeypatch.setattr(
+        "app.routers.taxi_payment.SQLAlchemyUsageRepository",
+        lambda db: mock_repo
+    )
+
+    taxi_override(is_enabled=False, promo_message="Rides are on us")
+
+    data = (await client.get("/v1/payments/taxi/remaining")).json()
+    assert data == {"remaining": 999, "fee": 0}
+
+    response = await client.post(
+        "/v1/payments/taxi",
+        json={"phone": "670000000", "taxi_driver_id": "DRV-123", "ride_distance_km": 5.0}
+    )
+
+    assert response.json()["message"] == "Rides are on us"
+    mock_repo.try_consume_free_usage.assert_not_called()
+    mock_repo.record_usage.assert_awaited_once()
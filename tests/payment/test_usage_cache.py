@@ -0,0 +1,192 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.monitoring import USAGE_CACHE_LOOKUPS
+from app.repositories import usage_cache
+from app.repositories.usage_cache import UsageCounterCache
+from app.repositories.usage_repo import SQLAlchemyUsageRepository
+
+
+# =========================================================
+# FAKE SESSION (COUNTS ROUND TRIPS)
+# =========================================================
+class CountingResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class CountingSession:
+    def __init__(self, value=0):
+        self.value = value
+        self.executed = 0
+
+    async def execute(self, *args, **kwargs):
+        self.executed += 1
+        return CountingResult(self.value)
+
+
+def _lookups(result: str) -> float:
+    return USAGE_CACHE_LOOKUPS.labels(result)._value.get()
+
+
+# =========================================================
+# READ PATH
+# =========================================================
+@pytest.mark.asyncio
+async def test_count_uses_miss_then_hit(fake_redis):
+    session = CountingSession(value=3)
+    repo = SQLAlchemyUsageRepository(session, cache=UsageCounterCache(fake_redis))
+
+    misses, hits = _lookups("miss"), _lookups("hit")
+
+    assert await repo.count_uses("user-1", "taxi-request") == 3
+    assert await repo.count_uses("user-1", "taxi-request") == 3
+
+    # Only the miss reached Postgres
+    assert session.executed == 1
+    assert fake_redis.store["usage:user-1:taxi_request"] == "3"
+    assert _lookups("miss") == misses + 1
+    assert _lookups("hit") == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_count_uses_falls_back_when_redis_down(fake_redis):
+    fake_redis.fail = True
+    session = CountingSession(value=2)
+    repo = SQLAlchemyUsageRepository(session, cache=UsageCounterCache(fake_redis))
+
+    errors = _lookups("error")
+
+    assert await repo.count_uses("user-2", "doctor") == 2
+    assert session.executed == 1
+    assert _lookups("error") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_count_uses_without_redis(monkeypatch):
+    monkeypatch.setattr("app.repositories.usage_cache.get_shared_redis", lambda: None)
+
+    session = CountingSession(value=1)
+    repo = SQLAlchemyUsageRepository(session)
+
+    assert repo.cache is None
+    assert await repo.count_uses("user-3", "bike") == 1
+
+
+# =========================================================
+# WRITE PATH
+# =========================================================
+@pytest.mark.asyncio
+async def test_record_usage_writes_through(fake_redis):
+    # RETURNING used -> 4
+    session = CountingSession(value=4)
+    repo = SQLAlchemyUsageRepository(session, cache=UsageCounterCache(fake_redis))
+
+    await repo.record_usage(user_id="user-4", service="nurse-consult", paid=False, amount=0.0)
+
+    assert fake_redis.store["usage:user-4:nurse_consult"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_write_through_waits_for_commit(fake_redis):
+    cache = UsageCounterCache(fake_redis)
+
+    class OrmBackedSession:
+        sync_session = Session()
+
+    session = OrmBackedSession()
+
+    await cache.write_through(session, "user-5", "taxi_request", 1)
+    assert "usage:user-5:taxi_request" not in fake_redis.store
+
+    session.sync_session.rollback()
+    await cache.write_through(session, "user-5", "taxi_request", 2)
+    session.sync_session.commit()
+    await usage_cache._publishes.drain()
+
+    assert fake_redis.store["usage:user-5:taxi_request"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_commits_publish_in_commit_order(fake_redis):
+    class SlowFirstWrite:
+        async def set(self, key, value, **kwargs):
+            if value == 1:
+                await asyncio.sleep(0.05)
+            await fake_redis.set(key, value, **kwargs)
+
+    cache = UsageCounterCache(SlowFirstWrite())
+    for used in (1, 2):
+        session = Session()
+        await cache.write_through(SimpleNamespace(sync_session=session), "user-7", "bike_request", used)
+        session.commit()
+
+    # Nothing holds the tasks but the module; they still run, and in order
+    assert len(usage_cache._publishes.tasks) == 2
+    await usage_cache._publishes.drain()
+    assert fake_redis.store["usage:user-7:bike_request"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_read_miss_fill_never_replaces_a_write_through(fake_redis):
+    class RacingSession(CountingSession):
+        async def execute(self, *args, **kwargs):
+            result = await super().execute(*args, **kwargs)
+            # A concurrent record_usage commits and publishes 4 after this read saw 3
+            fake_redis.store["usage:user-6:doctor_consult"] = "4"
+            return result
+
+    repo = SQLAlchemyUsageRepository(RacingSession(value=3), cache=UsageCounterCache(fake_redis))
+
+    assert await repo.count_uses("user-6", "doctor") == 3
+    assert fake_redis.store["usage:user-6:doctor_consult"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_confirm_and_refund_publish_the_counter(fake_redis, monkeypatch):
+    from types import SimpleNamespace
+
+    from app.models.payment import PaymentStatus, ServiceType
+    from app.services import payment_confirmation
+
+    payment = SimpleNamespace(
+        reference="BLD-1", user_id="user-7", service_type=ServiceType.DOCTOR, amount=500,
+        status=PaymentStatus.PENDING, confirmed_at=None, provider_tx_id=None, user_phone=None, provider=None,
+    )
+    wallet = SimpleNamespace(balance=0.0)
+
+    class ScriptedSession:
+        def __init__(self, replies):
+            self.replies = iter(replies)
+
+        async def execute(self, *args, **kwargs):
+            return CountingResult(next(self.replies))
+
+        async def commit(self):
+            pass
+
+        async def rollback(self):
+            pass
+
+    async def no_rollup(self, payment):
+        pass
+
+    # confirm/refund query Wallet.user_id, which the phone-keyed model lacks; the
+    # scripted session ignores statements, so any mapped class with user_id will do
+    monkeypatch.setattr(payment_confirmation, "Wallet", payment_confirmation.Payment)
+    monkeypatch.setattr(payment_confirmation, "get_usage_cache", lambda: UsageCounterCache(fake_redis))
+    monkeypatch.setattr(payment_confirmation.RollupRepository, "record_payment_confirmed", no_rollup)
+    monkeypatch.setattr(payment_confirmation.RollupRepository, "record_payment_refunded", no_rollup)
+
+    # payment, wallet, Usage update, UsageCounter ... RETURNING used
+    assert await payment_confirmation.confirm_payment(ScriptedSession([payment, wallet, None, 3]), "BLD-1")
+    assert fake_redis.store["usage:user-7:doctor_consult"] == "3"
+
+    assert await payment_confirmation.refund_payment(ScriptedSession([payment, wallet, None, 2]), "BLD-1")
+    assert fake_redis.store["usage:user-7:doctor_consult"] == "2"
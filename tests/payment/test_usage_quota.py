@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.usage_repo import SQLAlchemyUsageRepository
+
+
+class ReturningResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class RecordingSession:
+    """Captures statements; replies with a fixed RETURNING value."""
+
+    def __init__(self, returning):
+        self.returning = returning
+        self.statements = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.statements.append(stmt)
+        return ReturningResult(self.returning)
+
+
+# =========================================================
+# SQL SHAPE
+# =========================================================
+def test_conditional_consume_is_single_guarded_upsert():
+    repo = SQLAlchemyUsageRepository(RecordingSession(None))
+    stmt = repo._conditional_consume_stmt("user-1", "taxi_request", 5)
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (user_id, service) DO UPDATE" in sql
+    assert "WHERE usage_counter.used <" in sql
+    assert "RETURNING usage_counter.used" in sql
+
+
+# =========================================================
+# OUTCOMES
+# =========================================================
+@pytest.mark.asyncio
+async def test_consume_granted_in_one_round_trip():
+    session = RecordingSession(returning=3)
+    repo = SQLAlchemyUsageRepository(session)
+
+    assert await repo.try_consume_free_usage("user-1", "taxi", free_limit=5) is True
+    assert len(session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_consume_denied_when_no_row_returned():
+    session = RecordingSession(returning=None)
+    repo = SQLAlchemyUsageRepository(session)
+
+    assert await repo.try_consume_free_usage("user-1", "taxi", free_limit=5) is False
+    assert len(session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_limit_skips_database():
+    session = RecordingSession(returning=1)
+    repo = SQLAlchemyUsageRepository(session)
+
+    assert await repo.try_consume_free_usage("user-1", "taxi", free_limit=0) is False
+    assert session.statements == []
+
+
+class CounterTable:
+    """
+    usage_counter as the repository's statements see it:
+    (user_id, service) -> {"used", "idempotency_key"}.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    async def execute(self, stmt, *args, **kwargs):
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        if stmt.is_select:
+            found = next((
+                SimpleNamespace(user_id=user_id, service=service, **row)
+                for (user_id, service), row in self.rows.items()
+                if row["idempotency_key"] == params["idempotency_key_1"]
+                and params.get("user_id_1", user_id) == user_id
+                and params.get("service_1", service) == service
+            ), None)
+            return ReturningResult(found)
+
+        key = (params["user_id"], params["service"])
+        row = self.rows.get(key)
+        limit = params.get("used_2")   # conditional (free) upsert only
+        if row is not None and limit is not None and row["used"] >= limit:
+            return ReturningResult(None)
+        row = self.rows.setdefault(key, {"used": 0, "idempotency_key": None})
+        row["used"] += 1
+        row["idempotency_key"] = params["idempotency_key"] or row["idempotency_key"]
+        return ReturningResult(row["used"])
+
+
+@pytest.mark.asyncio
+async def test_retried_free_grant_does_not_consume_again():
+    table = CounterTable()
+    repo = SQLAlchemyUsageRepository(table, cache=None)
+
+    assert await repo.try_consume_free_usage("user-1", "doctor", free_limit=2, idempotency_key="idem-1") is True
+    assert await repo.try_consume_free_usage("user-1", "doctor", free_limit=2, idempotency_key="idem-1") is True
+    assert table.rows[("user-1", "doctor_consult")]["used"] == 1
+
+
+@pytest.mark.asyncio
+async def test_paid_or_foreign_key_is_not_a_free_grant():
+    table = CounterTable()
+    repo = SQLAlchemyUsageRepository(table, cache=None)
+
+    # Free tier used up, then a paid request records its key
+    assert await repo.try_consume_free_usage("user-1", "doctor", free_limit=1, idempotency_key="idem-1") is True
+    await repo.record_usage("user-1", "doctor", paid=True, amount=2000, idempotency_key="idem-paid")
+
+    # Its retry must fall through to the paid flow, not be answered "free"
+    assert await repo.try_consume_free_usage("user-1", "doctor", free_limit=1, idempotency_key="idem-paid") is False
+    # Another user's free key grants nothing here either
+    assert await repo.try_consume_free_usage("user-2", "doctor", free_limit=1, idempotency_key="idem-1") is True
+    assert table.rows[("user-2", "doctor_consult")]["used"] == 1
+
+
+@pytest.mark.asyncio
+async def test_aliases_draw_on_one_free_tier():
+    table = CounterTable()
+    repo = SQLAlchemyUsageRepository(table, cache=None)
+
+    granted = [
+        await repo.try_consume_free_usage("user-1", alias, free_limit=2)
+        for alias in ("doctor", "doctor-consult", "doctor", "doctor_consult")
+    ]
+
+    assert granted == [True, True, False, False]
+    assert list(table.rows) == [("user-1", "doctor_consult")]
+    assert table.rows[("user-1", "doctor_consult")]["used"] == 2